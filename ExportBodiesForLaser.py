@@ -1,11 +1,26 @@
 #Author-John Antolik
 #Description-detect all flat bodies in the current selection and save to a single dxf file for laser cutting
 
-from tkinter import OUTSIDE
 import adsk.core, adsk.fusion, traceback
 
 handlers = []
 
+# the export runs as a job, a time slice at a time from this custom event, so Fusion stays responsive meanwhile
+EXPORT_EVENT_ID = 'LaserExportJobEventId'
+
+# the export command module, imported on the first run of the command so loading the add-in at startup only
+# registers the button
+exportCommand = None
+
+
+def loadExportCommand():
+    global exportCommand
+    if exportCommand is None:
+        from .laserexport import command
+        exportCommand = command
+    return exportCommand
+
+
 def run(context):
     ui = None
     try:
@@ -24,6 +39,9 @@ def run(context):
         cmdDef.commandCreated.add(laserExportCommandCreated)
         handlers.append(laserExportCommandCreated)
 
+        # connect to the event that drives the export job
+        startExportEvent(app)
+
         # add the button to requisite control panels (next to '3D Print' command)
         qat = ui.toolbars.itemById('QAT')
         fileDropDown = qat.controls.itemById('FileSubMenuCommand')
@@ -37,6 +55,13 @@ def run(context):
             ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
 
+def startExportEvent(app):
+    exportEvent = app.registerCustomEvent(EXPORT_EVENT_ID)
+    onExportEvent = laserExportJobEventHandler()
+    exportEvent.add(onExportEvent)
+    handlers.append(onExportEvent)
+
+
 # event handler for commandCreated event
 class laserExportCommandCreatedEventHandler(adsk.core.CommandCreatedEventHandler):
     def __init__(self) -> None:
@@ -60,6 +85,41 @@ class laserExportCommandCreatedEventHandler(adsk.core.CommandCreatedEventHandler
 
         kerfInput = inputs.addValueInput('kerf', 'Kerf', units, adsk.core.ValueInput.createByReal(0.0))
 
+        # the rigorous check also makes sure every side edge is a straight line along the sheet normal
+        rigorousInput = inputs.addBoolValueInput('rigorous', 'Rigorous flatness check', True, '', False)
+
+        # a sheet size of zero keeps the parts in a single row instead of packing them onto sheets
+        sheetWidthInput = inputs.addValueInput('sheetWidth', 'Sheet width', units, adsk.core.ValueInput.createByReal(0.0))
+        sheetHeightInput = inputs.addValueInput('sheetHeight', 'Sheet height', units, adsk.core.ValueInput.createByReal(0.0))
+        rotationInput = inputs.addBoolValueInput('allowRotation', 'Allow rotation', True, '', True)
+
+        # true-shape nesting searches for a tighter layout of the part outlines for up to the given time
+        trueShapeInput = inputs.addBoolValueInput('trueShape', 'True-shape nesting', True, '', False)
+        nestTimeInput = inputs.addIntegerSpinnerCommandInput('nestTime', 'Nesting time (s)', 1, 600, 1, 10)
+
+        # bodies whose thicknesses differ by no more than the tolerance are cut from the same material and share a file
+        groupInput = inputs.addBoolValueInput('groupByThickness', 'Separate file per thickness', True, '', False)
+        thicknessToleranceInput = inputs.addValueInput('thicknessTolerance', 'Thickness tolerance', units, adsk.core.ValueInput.createByReal(0.01))
+
+        # the extracted geometry can also be saved as json, to export it again without Fusion (see laserlib/cli.py)
+        dumpInput = inputs.addBoolValueInput('dumpGeometry', 'Save geometry for batch export', True, '', False)
+
+        # copies of the same part are extracted once and written as a shared block
+        shareInput = inputs.addBoolValueInput('shareRepeated', 'Share repeated parts', True, '', True)
+
+        # holes are cut before the outline around them, and the parts in the order that travels least between pierces
+        orderInput = inputs.addBoolValueInput('orderCuts', 'Optimize cut order', True, '', True)
+
+        # end-to-end lines and arcs are written as polylines, optionally dropping vertices that stray less than the tolerance
+        polylineInput = inputs.addBoolValueInput('polylines', 'Join into polylines', True, '', True)
+        simplifyInput = inputs.addValueInput('simplifyTolerance', 'Simplify tolerance', units, adsk.core.ValueInput.createByReal(0.0))
+
+        # profiles of bodies that haven't changed since an earlier export can be reused instead of extracted again
+        incrementalInput = inputs.addBoolValueInput('incremental', 'Reuse unchanged profiles', True, '', False)
+
+        # the time and number of API calls spent on each body and phase can be saved next to the dxf
+        profileInput = inputs.addBoolValueInput('profile', 'Save timing profile', True, '', False)
+
         # connect to the execute event
         onExecute = laserExportCommandExecuteHandler()
         cmd.execute.add(onExecute)
@@ -75,125 +135,30 @@ class laserExportCommandExecuteHandler(adsk.core.CommandEventHandler):
         eventArgs = adsk.core.CommandEventArgs.cast(args)
         
         #### code to execute the command ####
+        ui = None
         try:
-            app = adsk.core.Application.get()
-            ui  = app.userInterface
-            des = adsk.fusion.Design.cast(app.activeProduct)
-            unitsManager = des.unitsManager
-            units = unitsManager.defaultLengthUnits
-            root: adsk.fusion.Component = adsk.fusion.Component.cast(des.rootComponent)
-
-            # get the selection from the command inputs
-            inputs = eventArgs.command.commandInputs
-            selectionInput = inputs.itemById('selection')
-            kerf = inputs.itemById('kerf').value / 2 
-
-            # get the bodies to export from the use5r selection
-            bodies = []
-            for i in range(selectionInput.selectionCount):
-                selectedEntity = selectionInput.selection(i).entity
-                if selectedEntity.objectType == adsk.fusion.BRepBody.classType():
-                    bodies.append(selectedEntity)
-
-            if len(bodies) == 0:
-                return
-
-            # make a sketch to accumulate all of the face profiles
-            accumulateSketch: adsk.fusion.Sketch = root.sketches.add(root.xYConstructionPlane)
-            accumulateSketch.isComputeDeferred = True  # dont compute the sketch to increase performance
-            resultStr = ''
-            numFlatBodies = 0
-            spacing = 0.5
-            xDispTotal = 0.0
-
-            # export each body
-            for body in bodies:
-                # get all the faces of the body, sorted by area because the profile sides are likely to be largest
-                faces = body.faces
-                sortedFaces = [face for face in faces]
-                sortedFaces.sort(key = lambda f: f.area, reverse = True)
-
-                # check if the body is flat with respect to the largest face
-                flat, thickness = isBodyFlat(sortedFaces[0], body)
-                if flat:
-                    numFlatBodies += 1
-                    resultStr += body.name + ' can be cut from ' + str(round(unitsManager.convert(thickness, 
-                        'internalUnits', units), 3)) + ' ' + unitsManager.formatUnits(units) + ' material\n'
-
-                    # make a temporary sketch from the face
-                    # this automatically projects the face onto the sketch, seemingly even when the option to do so in preferences is turned off
-                    tempSketch: adsk.fusion.Sketch = root.sketches.add(sortedFaces[0])
-                    tempSketch.project(sortedFaces[0])
-                    curvesToCopy = adsk.core.ObjectCollection.create()
-
-                    # offset profile to compensate for laser kerf
-                    if kerf > 0.0:
-                        tempSketch.isComputeDeferred = True
-                        for profile in tempSketch.profiles:
-                            # determine which is the main profile
-                            if profile.profileLoops.count > 1:
-                                break
-                        loops = profile.profileLoops
-                        loop = adsk.fusion.ProfileLoop.cast(None)
-                        for loop in loops:
-                            prCurves = loop.profileCurves
-                            skCurves = convertProfCurvesToSketchCurves(prCurves)
-
-                            # compute the bounding box from the profilecurves because sketch arcs and circles wont return a good bounding box
-                            boundBox = None
-                            for curve in prCurves:
-                                if not boundBox:
-                                    boundBox = curve.boundingBox
-                                else:
-                                    boundBox.combine(curve.boundingBox)  
-
-                            # perform the offsets
-                            if loop.isOuter:
-                                # expand the loop
-                                offsetCurves = tempSketch.offset(skCurves, getPointOutsideCurves(skCurves, boundBox), kerf)
-                            else:
-                                # contract the loop
-                                offsetCurves = tempSketch.offset(skCurves, getPointInsideCurves(skCurves, boundBox), kerf)
-                            [curvesToCopy.add(curve) for curve in offsetCurves]
-                    else:
-                        [curvesToCopy.add(curve) for curve in tempSketch.sketchCurves]
-                            
-                    # now copy the sketch curves onto the accumulate sketch with the correct displacements
-                    xDisp = -tempSketch.boundingBox.minPoint.x + xDispTotal
-                    yDisp = -tempSketch.boundingBox.minPoint.y
-                    tempSketch.copy(curvesToCopy, getXYTranslationMatrix(xDisp, yDisp), accumulateSketch)
-
-                    # update the total size of the sketch
-                    width = tempSketch.boundingBox.maxPoint.x - tempSketch.boundingBox.minPoint.x
-                    xDispTotal += width + spacing
-
-                    # delete the sketch
-                    tempSketch.deleteMe()
-                else:
-                    resultStr += body.name + ' is not flat\n'
-
-            ui.messageBox('Detected ' + str(numFlatBodies) + ' bodies to export for laser cutting:\n\n' + resultStr)
-
-            if numFlatBodies > 0:
-                # get file path from user to save the dxf
-                fileDialog = ui.createFileDialog()
-                fileDialog.isMultiSelectEnabled = False
-                fileDialog.title = "Specify file to save DXF"
-                fileDialog.filter = 'DXF files (*.dxf)'
-                fileDialog.filterIndex = 0
-                dialogResult = fileDialog.showSave()
-
-                # save the profiles to dxf
-                if dialogResult == adsk.core.DialogResults.DialogOK:
-                    filename = fileDialog.filename
-                    accumulateSketch.saveAsDXF(filename)
-
-            # clean up the sketch
-            accumulateSketch.deleteMe()
+            ui = adsk.core.Application.get().userInterface
+            loadExportCommand().startExport(eventArgs, EXPORT_EVENT_ID)
         except:
             if ui:
                 ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
-        
+
+
+# event handler for the export event, runs the export job for another time slice
+class laserExportJobEventHandler(adsk.core.CustomEventHandler):
+    def __init__(self) -> None:
+        super().__init__()
+
+    def notify(self, args):
+        ui = None
+        try:
+            ui = adsk.core.Application.get().userInterface
+            if exportCommand is not None:
+                exportCommand.runExportJob()
+        except:
+            if ui:
+                ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+
 
 # clean up the added buttons when the add-in is stopped
 def stop(context):
@@ -201,6 +166,11 @@ def stop(context):
         app = adsk.core.Application.get()
         ui = app.userInterface
 
+        # stop a running export and its event
+        if exportCommand is not None:
+            exportCommand.cancelExport()
+        app.unregisterCustomEvent(EXPORT_EVENT_ID)
+
         # clean up the command
         cmdDef = ui.commandDefinitions.itemById('LaserExportButtonId')
         if cmdDef:
@@ -220,219 +190,3 @@ def stop(context):
     except:
         if ui:
             ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
-
-
-def isBodyFlat(face, body, rigorous = False):
-    # conditions which must all be satisfied in order for the body to be flat, i.e. can be laser cut:
-    # 1) has a flat face
-    # 2) has exactly one face encountered by a ray cast normal to the first face
-    # 3) this new face must be flat and parallel to the first face
-    # 4) all edges in the body that do not belong to one of these faces must be straight lines and normal to the first face
-
-    # since the largest face is the profile to be laser cut 99% of the time, we only need to perform these checks starting with the largest face of the body
-    # this will be much faster than performing the check for every face on the body
-
-    result = False
-    bodyThickness = 0.0
-
-    if isFacePlanar(face):
-        # get the normal and reverse its direction so it points into the body
-        normal: adsk.core.Vector3D = getPlanarFaceNormal(face)
-        normal.scaleBy(-1.0)
-        
-        # cast a ray to find the back face of the body
-        # first need to get the root component since it only seems to work to cast a ray from the root comp
-        app = adsk.core.Application.get()
-        des = adsk.fusion.Design.cast(app.activeProduct)
-        root: adsk.fusion.Component = adsk.fusion.Component.cast(des.rootComponent)
-
-        # cast the ray, looking for faces (entityType=1)
-        hitCol: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
-        objCol = root.findBRepUsingRay(face.pointOnFace, normal, 1, 1e-5, False, hitCol)
-
-        # now we need to exclude any faces we found that don't belong to this body
-        intersectedFaces = []
-        for obj, hit in zip(objCol, hitCol):
-            if obj.body == body and obj != face:
-                originPoint = hit
-                intersectedFaces.append(obj)
-                
-        if len(intersectedFaces) == 1:
-            backFace = intersectedFaces[0]
-            # we have intersected exactly one face
-            # now check that this face is planar and parallel to the first face
-            if isFacePlanar(backFace) and face.geometry.isParallelToPlane(backFace.geometry):
-                if rigorous:
-                    # finally, we need to check that all of the edges in the body that don't belong to these faces are lines and perpendicular to them
-                    # this part is quite slow
-                    for edge in body.edges:
-                        if edge not in face.edges and edge not in backFace.edges:
-                            if edge.geometry.curveType != 0 or not face.geometry.isPerpendicularToLine(edge.geometry):
-                                break
-                    else:
-                        # we get here if the for loop completes without breaking
-                        result = True
-                else:
-                    # if we don't need to rigorously determine if the body can be laser cut, just check that the face areas are the same as a quick litmus test
-                    if abs(face.area - backFace.area) < 1e-4:
-                        result = True
-
-    # calculate the material thickness needed
-    if result:
-        bodyThickness = originPoint.distanceTo(face.pointOnFace)
-
-    return result, bodyThickness
-
-
-def isFacePlanar(face) -> bool:
-    # surfaceType is an enum, value of 0 indicates plane
-    return face.geometry.surfaceType == 0
-
-
-def getPlanarFaceNormal(face) -> adsk.core.Vector3D:
-    # use a surfaceEvaluator so the normal is guaranteed to point outward from the body
-    success, normal = face.evaluator.getNormalAtPoint(face.pointOnFace)
-    if success:
-        return normal
-    else:
-        return adsk.core.Vector3D.create() # return a default vector if fails
-
-
-def getIndicatorAppearance() -> adsk.core.Appearance:
-    app: adsk.fusion.Application = adsk.core.Application.get()
-    des: adsk.fusion.Design = app.activeProduct
-
-    appearanceName = 'laserCutScriptIndicator'
-    indAppearance = des.appearances.itemByName(appearanceName)
-
-    if indAppearance is None:
-        # get a base appearance from the material library
-        lib = app.materialLibraries.itemByName('Fusion 360 Appearance Library')
-        baseAppearance: adsk.core.Appearance = lib.appearances.itemByName('Plastic - Matte (Yellow)')
-        indAppearance: adsk.core.Appearance = des.appearances.addByCopy(baseAppearance, appearanceName)
-
-    return indAppearance
-
-
-def getAllSketchCurves(sketch) -> adsk.core.ObjectCollection:
-    sketchEntities: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
-    [sketchEntities.add(curve) for curve in sketch.sketchCurves]  # add all of the curves in the sketch to a collection
-    return sketchEntities
-
-
-def getXYTranslationMatrix(xDisp, yDisp) -> adsk.core.Matrix3D:
-    matMove: adsk.core.Matrix3D = adsk.core.Matrix3D.create()
-    translation: adsk.core.Vector3D = adsk.core.Vector3D.create()
-    translation.x = xDisp
-    translation.y = yDisp
-    matMove.translation = translation
-    return matMove
-
-
-def convertProfCurvesToSketchCurves(prCurves) -> adsk.core.ObjectCollection:
-    skCurves = adsk.core.ObjectCollection.create()
-    for curve in prCurves:
-        skCurves.add(curve.sketchEntity)
-    return skCurves
-
-
-def getPointOutsideCurves(skCurves, boundBox) -> adsk.core.Point3D:
-
-    # move a point outside the bounding box
-    cornerVec = boundBox.minPoint.vectorTo(boundBox.maxPoint)
-    cornerVec.normalize() 
-    outsidePoint = boundBox.maxPoint.copy()
-    outsidePoint.translateBy(cornerVec)
-    return outsidePoint
-
-
-# from:
-# https://forums.autodesk.com/t5/fusion-360-api-and-scripts/how-to-determine-a-directionpoint-to-offset-an-arbitrary-sketch/m-p/6425999#M1930
-def getPointInsideCurves(skCurves, boundBox) -> adsk.core.Point3D:
-    try:
-        # Build up list of connected points.
-        curve = adsk.fusion.SketchCurve.cast(None)
-        pointSets = []
-        for curve in skCurves:          
-            if isinstance(curve, adsk.fusion.SketchLine):
-                skLine = adsk.fusion.SketchLine.cast(curve)
-                pointSets.append((skLine.startSketchPoint.geometry, skLine.endSketchPoint.geometry))
-            else:
-                curveEval = adsk.core.CurveEvaluator3D.cast(curve.geometry.evaluator)
-                (retVal, startParam, endParam) = curveEval.getParameterExtents()
-                
-                (retVal, strokePoints) = curveEval.getStrokes(startParam, endParam, 1e-3)
-                pointSets.append(strokePoints)
-            
-        # Create two points that define a line that crosses the entire range.  They're moved
-        # to be outside the bounding box so there's not problem with coincident points.
-        lineVec = boundBox.minPoint.vectorTo(boundBox.maxPoint)
-        lineVec.normalize()
-        maxPoint = boundBox.maxPoint.copy()
-        maxPoint.translateBy(lineVec)
-        lineVec.scaleBy(-1)
-        minPoint = boundBox.minPoint.copy()
-        minPoint.translateBy(lineVec)
-    
-        # Iterate through all of the lines and get the intersection between the lines
-        # and the long crossing line.
-        intPointList = []
-        for pointSet in pointSets:
-            pnt1 = None
-            pnt2 = None
-            for point in pointSet:
-                if not pnt2:
-                    pnt2 = point
-                else:
-                    pnt1 = pnt2
-                    pnt2 = point
-    
-                    intCoords = getLineIntersection(minPoint.x, minPoint.y, maxPoint.x, maxPoint.y, pnt1.x, pnt1.y, pnt2.x, pnt2.y)
-                    if intCoords:
-                        intPoint = adsk.core.Point3D.create(intCoords[0], intCoords[1], 0)
-                        intPointList.append((intPoint, intPoint.distanceTo(minPoint)))
-        
-        # Make sure at least two intersection points were found.
-        if len(intPointList) >= 2:
-            # Sort the points by the distance from the min point.
-            sortedPoints = sorted(intPointList, key=getKey) 
-        
-            # Get the first two points and compute a mid point.  That's a point in the area.                
-            pnt1 = sortedPoints[0]
-            pnt2 = sortedPoints[1]
-            midPoint = adsk.core.Point3D.create((pnt1[0].x + pnt2[0].x)/2, (pnt1[0].y + pnt2[0].y)/2, 0)
-            return midPoint
-        else:
-            return False
-    except:
-        ui = adsk.core.Application.get().userInterface
-        ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
-    
-                                
-# Function that's used to get the value to sort with.
-def getKey(item):
-    return item[1]
-
-                
-# Calculate the intersection between two line segments.  This is based on the JS
-# sample in the second answer at:
-# http://stackoverflow.com/questions/563198/how-do-you-detect-where-two-line-segments-intersect
-def getLineIntersection(p0_x, p0_y, p1_x, p1_y, p2_x, p2_y, p3_x, p3_y):
-    s1_x = p1_x - p0_x
-    s1_y = p1_y - p0_y
-    s2_x = p3_x - p2_x
-    s2_y = p3_y - p2_y
-
-    d = (-s2_x * s1_y + s1_x * s2_y)
-
-    if d:
-        s = (-s1_y * (p0_x - p2_x) + s1_x * (p0_y - p2_y)) / d
-        t = ( s2_x * (p0_y - p2_y) - s2_y * (p0_x - p2_x)) / d
-
-        if (s >= 0 and s <= 1 and t >= 0 and t <= 1):
-            # Collision detected
-            i_x = p0_x + (t * s1_x)
-            i_y = p0_y + (t * s1_y)
-            return (i_x, i_y)
-
-    return False  # No collision
\ No newline at end of file
@@ -0,0 +1,80 @@
+# classifying the face tables of many bodies at once: laserlib.flatness.classifyFaceTable with NumPy, as array
+# operations over every face, against its per-body loop without NumPy
+# run from the repository root with: python benchmarks/bench_batch_flatness.py [--sizes 100 500 5000]
+# every body is a plate with a dozen side faces and a few holes, turned to a random direction, and every tenth one
+# has a pocket, which leaves it to the ray cast
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import laserlib.flatness as flatness
+from laserlib.flatness import AMBIGUOUS, CYLINDER, FLAT, PLANE, FaceTable, classifyFaceTable
+
+
+def randomFrame(rng):
+    # a random unit normal and two directions perpendicular to it
+    z = rng.uniform(-1.0, 1.0)
+    angle = rng.uniform(0.0, 2.0 * math.pi)
+    r = math.sqrt(1.0 - z * z)
+    normal = (r * math.cos(angle), r * math.sin(angle), z)
+    helper = (1.0, 0.0, 0.0) if abs(normal[0]) < 0.9 else (0.0, 1.0, 0.0)
+    u = (normal[1] * helper[2] - normal[2] * helper[1], normal[2] * helper[0] - normal[0] * helper[2],
+         normal[0] * helper[1] - normal[1] * helper[0])
+    length = math.sqrt(sum(c * c for c in u))
+    u = tuple(c / length for c in u)
+    return normal, u
+
+
+def makeTable(count, seed = 0):
+    rng = random.Random(seed)
+    table = FaceTable()
+    for i in range(count):
+        normal, u = randomFrame(rng)
+        offset, thickness, area = rng.uniform(-50.0, 50.0), rng.choice((0.3, 0.6, 1.2)), rng.uniform(20.0, 400.0)
+        faces = [(PLANE, normal, offset, area), (PLANE, tuple(-c for c in normal), -(offset - thickness), area)]
+        faces.extend((PLANE, u if k % 2 else tuple(-c for c in u), rng.uniform(-50.0, 50.0), rng.uniform(1.0, 10.0))
+                     for k in range(12))
+        faces.extend((CYLINDER, None, None, rng.uniform(0.5, 5.0)) for k in range(3))
+        if i % 10 == 0:
+            faces.append((PLANE, normal, offset - 0.5 * thickness, 5.0))
+        rng.shuffle(faces)
+        table.addBody(faces)
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type = int, nargs = '+', default = [100, 500, 5000])
+    args = parser.parse_args()
+
+    numpyModule = flatness.numpy
+    print('%8s %8s %14s %14s %8s %10s %8s' % ('bodies', 'faces', 'numpy (ms)', 'loop (ms)', 'flat', 'ambiguous', 'agree'))
+    for size in args.sizes:
+        table = makeTable(size)
+        if numpyModule is not None:
+            start = time.perf_counter()
+            vectorized = classifyFaceTable(table)
+            numpyTime = '%14.1f' % ((time.perf_counter() - start) * 1e3)
+        flatness.numpy = None
+        try:
+            start = time.perf_counter()
+            looped = classifyFaceTable(table)
+            loopTime = time.perf_counter() - start
+        finally:
+            flatness.numpy = numpyModule
+        if numpyModule is None:
+            vectorized, numpyTime = looped, '%14s' % '-'
+        agree = all(a.status == b.status and a.profileFace == b.profileFace and a.backFace == b.backFace and
+                    abs(a.thickness - b.thickness) < 1e-9 for a, b in zip(vectorized, looped))
+        print('%8d %8d %s %14.1f %8d %10d %8s' % (size, len(table.rows), numpyTime, loopTime * 1e3,
+                                                  sum(1 for v in vectorized if v.status == FLAT),
+                                                  sum(1 for v in vectorized if v.status == AMBIGUOUS), 'yes' if agree else 'NO'))
+
+
+if __name__ == '__main__':
+    main()
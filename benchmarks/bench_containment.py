@@ -0,0 +1,75 @@
+# classifying the loops of plates with many holes, with the grid index of laserlib.containment and with the
+# pairwise point in polygon tests of every loop against every other loop it replaced
+# run from the repository root with: python benchmarks/bench_containment.py [--sizes 100 1000 10000]
+# every plate has a square outline with a grid of holes, and an island with a hole of its own in every tenth hole
+
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from laserlib.containment import loopContainment, loopDepths
+from laserlib.geometry import Circle, Line, tessellateLoop
+
+
+def square(minX, minY, maxX, maxY):
+    points = [(minX, minY), (maxX, minY), (maxX, maxY), (minX, maxY)]
+    return [Line(points[i], points[(i + 1) % 4]) for i in range(4)]
+
+
+def makePlate(holes):
+    columns = max(int(math.sqrt(holes)), 1)
+    rows = (holes + columns - 1) // columns
+    loops = [square(0.0, 0.0, 10.0 * columns + 10.0, 10.0 * rows + 10.0)]
+    for i in range(holes):
+        x, y = 10.0 + 10.0 * (i % columns), 10.0 + 10.0 * (i // columns)
+        if i % 10 == 0:
+            loops.extend(([Circle((x, y), 4.0)], square(x - 2.0, y - 2.0, x + 2.0, y + 2.0), [Circle((x, y), 1.0)]))
+        else:
+            loops.append([Circle((x, y), 2.0)])
+    return loops
+
+
+def pointInPolygon(points, x, y):
+    inside = False
+    x0, y0 = points[-1]
+    for x1, y1 in points:
+        if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+        x0, y0 = x1, y1
+    return inside
+
+
+# the depth of every loop from testing a point of it against every other loop
+def pairwiseDepths(loops):
+    polygons = [tessellateLoop(loop, 1e-2) for loop in loops]
+    return [sum(1 for j, other in enumerate(polygons) if j != i and pointInPolygon(other, polygon[0][0], polygon[0][1]))
+            for i, polygon in enumerate(polygons)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type = int, nargs = '+', default = [100, 1000, 10000])
+    parser.add_argument('--pairwise-limit', type = int, default = 2000, help = 'largest plate to classify pairwise')
+    args = parser.parse_args()
+
+    print('%8s %8s %14s %14s %12s' % ('holes', 'loops', 'index (ms)', 'pairwise (ms)', 'agree'))
+    for size in args.sizes:
+        loops = makePlate(size)
+        start = time.perf_counter()
+        depths = loopDepths(loopContainment(loops).parents())
+        indexTime = time.perf_counter() - start
+        if size <= args.pairwise_limit:
+            start = time.perf_counter()
+            expected = pairwiseDepths(loops)
+            pairwiseTime = '%14.1f' % ((time.perf_counter() - start) * 1e3)
+            agree = 'yes' if depths == expected else 'NO'
+        else:
+            pairwiseTime, agree = '%14s' % '-', '-'
+        print('%8d %8d %14.1f %s %12s' % (size, len(loops), indexTime * 1e3, pairwiseTime, agree))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# runs the export command and the tab and slot script against the stand-in Fusion API on synthetic assemblies,
+# reporting wall time and the number of API calls by method so changes in the round-trips to Fusion stand out
+# the time spent inside the stand-in itself is reported separately and left out of the script time
+# run from the repository root with: python benchmarks/bench_fusion_api.py [--latency 20] [--recompute 50] [--sizes 10 100 1000]
+# the latency is in microseconds per API call, Fusion itself is typically somewhere between 5 and 50
+# the recompute time is in milliseconds and is added to every call that makes the timeline recompute
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fakeadsk'))
+import adsk
+import scenes
+
+# the calls that add to or remove from the timeline, which makes Fusion recompute it
+RECOMPUTE_CALLS = ('BaseFeature.finishEdit', 'CombineFeatures.add', 'Sketches.add', 'Sketch.deleteMe')
+
+
+def measure(label, function, top):
+    adsk.resetCalls()
+    start = time.perf_counter()
+    messages = function()
+    elapsed = time.perf_counter() - start
+    overhead = adsk.overheadTime
+    failures = [message for message in messages if message.startswith('Failed')]
+    if failures:
+        raise RuntimeError(label + ' failed:\n' + failures[0])
+    total = sum(adsk.calls.values())
+    print('%-48s %10.1f %10.1f %10.1f %10d' % (label, elapsed * 1e3, overhead * 1e3, (elapsed - overhead) * 1e3, total))
+    for name, count in adsk.calls.most_common(top):
+        print('    %-76s %10d' % (name, count))
+    return elapsed, total
+
+
+def benchExport(size, outputDir, top):
+    addIn = scenes.loadAddIn()
+    # the add-in imports the export command on its first run, which isn't part of what is measured here
+    addIn.loadExportCommand()
+    outputPath = os.path.join(outputDir, 'plates.dxf')
+    cases = (('quick', {}, 1), ('rigorous', {'rigorous': True}, 1), ('kerf', {'kerf': 0.02}, 1),
+             ('sheets', {'sheetWidth': 60.0, 'sheetHeight': 40.0}, 1), ('incremental', {'incremental': True, 'kerf': 0.02}, 1),
+             ('5 copies each, not shared', {'shareRepeated': False, 'kerf': 0.02}, 5), ('5 copies each', {'kerf': 0.02}, 5))
+    for label, options, copies in cases:
+        app, design = scenes.newSession(saveFileName = outputPath)
+        bodies = scenes.buildPlateAssembly(design, size, copies = copies)
+        if options.get('incremental'):
+            # start without any stored profiles
+            for name in os.listdir(tempfile.gettempdir()):
+                if name.startswith('LaserCutProfileStore.'):
+                    os.remove(os.path.join(tempfile.gettempdir(), name))
+        measure('export %s, %d bodies' % (label, size), lambda: scenes.runExport(addIn, bodies, **options), top)
+        if label in ('quick', 'incremental'):
+            # the classification cache stored with the design and the stored profiles are used by the second run
+            measure('export %s again, %d bodies' % (label, size), lambda: scenes.runExport(addIn, bodies, **options), top)
+        if copies > 1:
+            print('    %-76s %10d' % ('dxf size (bytes)', os.path.getsize(outputPath)))
+        # the export runs from the event loop a slice at a time, this is how long Fusion would be unresponsive
+        print('    %-76s %10.1f' % ('longest event (ms)', app.longestEvent * 1e3))
+
+
+def benchTabAndSlot(size, top):
+    script = scenes.loadScript('tab_and_slot_testing')
+    for label, batchCombine in (('per joint', False), ('batched', True)):
+        script.batch_combine = batchCombine
+        app, design = scenes.newSession()
+        # a handful of joints on every panel, as on a box
+        points = scenes.buildTabAndSlotAssembly(design, size, jointsPerPanel = 5)
+        measure('tab and slot %s, %d joints' % (label, size), lambda: scenes.runTabAndSlot(script, points), top)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type = float, default = 0.0, help = 'microseconds added to every API call')
+    parser.add_argument('--sizes', type = int, nargs = '+', default = [10, 100, 1000])
+    parser.add_argument('--recompute', type = float, default = 0.0, help = 'milliseconds added to every timeline recompute')
+    parser.add_argument('--top', type = int, default = 5, help = 'number of most called methods to list')
+    args = parser.parse_args()
+    recompute = args.latency * 1e-6 + args.recompute * 1e-3
+    adsk.setLatency(args.latency * 1e-6, {name: recompute for name in RECOMPUTE_CALLS})
+
+    print('%-48s %10s %10s %10s %10s' % ('case', 'wall (ms)', 'stand-in', 'script', 'API calls'))
+    with tempfile.TemporaryDirectory() as outputDir:
+        for size in args.sizes:
+            benchExport(size, outputDir, args.top)
+            benchTabAndSlot(size, args.top)
+
+
+if __name__ == '__main__':
+    main()
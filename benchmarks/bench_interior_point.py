@@ -0,0 +1,114 @@
+# compares the original scalar interior point search with the batched kernel in laserlib.intersect,
+# and the strokes of plates with large circular holes with intersecting the circles exactly
+# run from the repository root with: python benchmarks/bench_interior_point.py
+
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from laserlib import intersect
+from laserlib.geometry import Circle, Line
+from laserlib.intersect import getCrossingLine, getInteriorPoint, getLineIntersection, getSegmentArrays
+
+
+# a wobbly closed loop made of strokes, like getStrokes returns for a large arc or spline
+def makeLoop(segmentCount, radius = 50.0, seed = 0):
+    rng = random.Random(seed)
+    points = []
+    for i in range(segmentCount + 1):
+        angle = 2.0 * math.pi * i / segmentCount
+        r = radius * (1.0 + 0.2 * math.sin(7 * angle)) + rng.uniform(-0.01, 0.01)
+        points.append((r * math.cos(angle), r * math.sin(angle)))
+    points[-1] = points[0]
+
+    # split the strokes into a few curves
+    step = max(segmentCount // 8, 1)
+    return [points[i:i + step + 1] for i in range(0, segmentCount, step)]
+
+
+def boundingBox(pointSets):
+    xs = [p[0] for pointSet in pointSets for p in pointSet]
+    ys = [p[1] for pointSet in pointSets for p in pointSet]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+# the loop getPointInsideCurves used to run, one getLineIntersection call and one distance per stroke segment
+def scalarInteriorPoint(pointSets, boundBox):
+    (minX, minY), (maxX, maxY) = getCrossingLine(boundBox)
+    intPointList = []
+    for pointSet in pointSets:
+        for pnt1, pnt2 in zip(pointSet[:-1], pointSet[1:]):
+            intCoords = getLineIntersection(minX, minY, maxX, maxY, pnt1[0], pnt1[1], pnt2[0], pnt2[1])
+            if intCoords:
+                intPointList.append((intCoords, math.hypot(intCoords[0] - minX, intCoords[1] - minY)))
+    if len(intPointList) < 2:
+        return None
+    sortedPoints = sorted(intPointList, key = lambda item: item[1])
+    pnt1, pnt2 = sortedPoints[0][0], sortedPoints[1][0]
+    return ((pnt1[0] + pnt2[0]) / 2, (pnt1[1] + pnt2[1]) / 2)
+
+
+# a square plate with circular holes of the given radius, as records and as the strokes getStrokes returns at 1e-3
+def makePlateWithHoles(holes, radius):
+    size = 2.5 * radius * holes
+    corners = [(0.0, 0.0), (size, 0.0), (size, size), (0.0, size), (0.0, 0.0)]
+    records = [Line(a, b) for a, b in zip(corners[:-1], corners[1:])]
+    pointSets = [corners]
+    strokeCount = int(math.ceil(math.pi / math.acos(1.0 - 1e-3 / radius)))
+    for i in range(holes):
+        center = (2.5 * radius * (i + 0.5), 2.5 * radius * (i + 0.5))
+        records.append(Circle(center, radius))
+        pointSets.append([(center[0] + radius * math.cos(2.0 * math.pi * k / strokeCount),
+                           center[1] + radius * math.sin(2.0 * math.pi * k / strokeCount)) for k in range(strokeCount + 1)])
+    return records, pointSets, (0.0, 0.0, size, size)
+
+
+def exactInteriorPoint(records, boundBox):
+    lines = [(record.start, record.end) for record in records if isinstance(record, Line)]
+    arcs = [record for record in records if not isinstance(record, Line)]
+    return getInteriorPoint(getSegmentArrays(lines), boundBox, arcs)
+
+
+def timeIt(function, repeats):
+    best = float('inf')
+    for i in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    backend = 'numpy' if intersect.numpy is not None else 'pure python (numpy not installed)'
+    print('batched kernel backend: ' + backend)
+    print('%10s %12s %12s %12s %8s' % ('segments', 'scalar (ms)', 'batched (ms)', 'kernel (ms)', 'match'))
+    for segmentCount in (1000, 10000, 50000, 200000):
+        pointSets = makeLoop(segmentCount, seed = segmentCount)
+        boundBox = boundingBox(pointSets)
+        repeats = 5 if segmentCount <= 50000 else 2
+
+        scalarTime, expected = timeIt(lambda: scalarInteriorPoint(pointSets, boundBox), repeats)
+        # the batched time includes flattening the point sets, the kernel time is the intersection search alone
+        batchedTime, result = timeIt(lambda: getInteriorPoint(getSegmentArrays(pointSets), boundBox), repeats)
+        segments = getSegmentArrays(pointSets)
+        kernelTime, kernelResult = timeIt(lambda: getInteriorPoint(segments, boundBox), repeats)
+
+        match = all(abs(a - b) < 1e-9 for a, b in zip(expected, result)) and result == kernelResult
+        print('%10d %12.2f %12.2f %12.2f %8s' % (segmentCount, scalarTime * 1e3, batchedTime * 1e3, kernelTime * 1e3, match))
+
+    print()
+    print('%10s %10s %12s %12s %12s %10s' % ('holes', 'radius', 'strokes', 'strokes (ms)', 'exact (ms)', 'distance'))
+    for holes, radius in ((1, 1.0), (1, 50.0), (4, 50.0), (16, 100.0)):
+        records, pointSets, boundBox = makePlateWithHoles(holes, radius)
+        strokeTime, expected = timeIt(lambda: getInteriorPoint(getSegmentArrays(pointSets), boundBox), 3)
+        exactTime, result = timeIt(lambda: exactInteriorPoint(records, boundBox), 3)
+        strokes = sum(len(pointSet) - 1 for pointSet in pointSets)
+        distance = math.hypot(expected[0] - result[0], expected[1] - result[1])
+        print('%10d %10.1f %12d %12.2f %12.3f %10.2g' % (holes, radius, strokes, strokeTime * 1e3, exactTime * 1e3, distance))
+
+
+if __name__ == '__main__':
+    main()
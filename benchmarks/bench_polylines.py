@@ -0,0 +1,83 @@
+# joining faceted profiles into polylines: time per segment as the profiles grow, which should stay flat
+# since chaining goes through a hashed endpoint index, and the number of DXF entities and bytes with and without joining
+# run from the repository root with: python benchmarks/bench_polylines.py [--sizes 1000 10000 100000] [--simplify 0.01]
+# the profiles are plates with a faceted outline and faceted holes, the segments shuffled as they come out of a sketch
+
+import argparse
+import io
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from laserlib.dxf import DxfWriter
+from laserlib.geometry import Arc, Line
+from laserlib.polylines import joinPolylines
+
+
+# a faceted circle of the given number of segments, with every other segment split in two collinear halves
+# and a fillet arc in place of every tenth corner
+def facetedLoop(center, radius, segments):
+    points = [(center[0] + radius * math.cos(2 * math.pi * i / segments), center[1] + radius * math.sin(2 * math.pi * i / segments))
+              for i in range(segments)]
+    curves = []
+    for i, start in enumerate(points):
+        end = points[(i + 1) % segments]
+        if i % 10 == 9:
+            middle = ((start[0] + end[0]) / 2 - center[0], (start[1] + end[1]) / 2 - center[1])
+            arcCenter = (center[0] + middle[0] * 0.5, center[1] + middle[1] * 0.5)
+            startAngle = math.atan2(start[1] - arcCenter[1], start[0] - arcCenter[0])
+            endAngle = math.atan2(end[1] - arcCenter[1], end[0] - arcCenter[0])
+            sweep = (endAngle - startAngle) % (2 * math.pi)
+            curves.append(Arc(arcCenter, math.hypot(start[0] - arcCenter[0], start[1] - arcCenter[1]), startAngle, sweep))
+        elif i % 2 == 0:
+            middle = ((start[0] + end[0]) / 2, (start[1] + end[1]) / 2)
+            curves.extend((Line(start, middle), Line(middle, end)))
+        else:
+            curves.append(Line(start, end))
+    return curves
+
+
+def makeProfile(segments, seed = 0):
+    rng = random.Random(seed)
+    holes = max(segments // 200, 1)
+    curves = facetedLoop((0.0, 0.0), 100.0, segments // 2)
+    for i in range(holes):
+        angle = 2 * math.pi * i / holes
+        curves.extend(facetedLoop((60.0 * math.cos(angle), 60.0 * math.sin(angle)), 5.0, max(segments // 2 // holes, 8)))
+    # some curves come out of the sketch reversed
+    curves = [Line(curve.end, curve.start) if isinstance(curve, Line) and rng.random() < 0.3 else curve for curve in curves]
+    rng.shuffle(curves)
+    return curves
+
+
+def dxfSize(curves):
+    stream = io.StringIO()
+    with DxfWriter(stream) as writer:
+        writer.writeCurves(curves)
+    return len(stream.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type = int, nargs = '+', default = [1000, 10000, 100000])
+    parser.add_argument('--simplify', type = float, default = 0.05, help = 'simplify tolerance in cm for the last column')
+    args = parser.parse_args()
+
+    print('%10s %14s %12s %12s %12s %12s %14s %12s' % ('segments', 'join (us/seg)', 'entities', 'joined', 'dxf (kB)', 'joined (kB)',
+                                                      'simplified', 'vertices'))
+    for size in args.sizes:
+        curves = makeProfile(size)
+        start = time.perf_counter()
+        joined = joinPolylines(curves)
+        elapsed = time.perf_counter() - start
+        simplified = joinPolylines(curves, simplifyTolerance = args.simplify)
+        vertices = sum(len(curve.points) if hasattr(curve, 'points') else 1 for curve in simplified)
+        print('%10d %14.2f %12d %12d %12.1f %12.1f %14d %12d' % (len(curves), elapsed * 1e6 / len(curves), len(curves), len(joined),
+                                                               dxfSize(curves) / 1e3, dxfSize(joined) / 1e3, len(simplified), vertices))
+
+
+if __name__ == '__main__':
+    main()
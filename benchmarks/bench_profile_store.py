@@ -0,0 +1,82 @@
+# loading the profile store of the incremental export: the array-backed store mapped into memory against the
+# json curve lists it replaced, for stores of many profiles of which an export only needs a few
+# run from the repository root with: python benchmarks/bench_profile_store.py [--sizes 100 1000 5000] [--used 20]
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from laserlib.bodydump import curveFromList, curveToList
+from laserlib.geometry import Arc, Circle, Line
+from laserlib.profilearray import numpy
+from laserlib.profilestore import ProfileStore
+
+
+# a plate with rounded corners, a few holes and a faceted edge, about 200 segments
+def makeProfile(seed):
+    size = 10.0 + seed % 7
+    curves = []
+    for i in range(4):
+        angle = 0.5 * math.pi * i
+        corner = (size * (1 if i in (0, 1) else 0), size * (1 if i in (1, 2) else 0))
+        curves.append(Arc(corner, 1.0, angle, 0.5 * math.pi))
+    for i in range(180):
+        curves.append(Line((i * size / 180, 0.0), ((i + 1) * size / 180, 0.0)))
+    curves.extend(Circle((2.0 + 2.0 * k, size / 2), 0.5) for k in range(4))
+    return curves
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type = int, nargs = '+', default = [100, 1000, 5000])
+    parser.add_argument('--used', type = int, default = 20, help = 'number of stored profiles the export reads back')
+    args = parser.parse_args()
+
+    print('numpy: ' + ('yes, segments mapped into memory' if numpy is not None else 'no, segments read'))
+    print('%10s %14s %14s %14s %14s %12s %12s' % ('profiles', 'json save', 'json load', 'array save', 'array load',
+                                                  'json (kB)', 'array (kB)'))
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            profiles = [makeProfile(seed) for seed in range(size)]
+
+            # the json layout the store used to have, one list of curve lists per entry
+            jsonPath = os.path.join(directory, 'old%d.json' % size)
+            start = time.perf_counter()
+            with open(jsonPath, 'w') as f:
+                json.dump([['key%d' % i, {'thickness': 0.3, 'curves': [curveToList(curve) for curve in curves]}]
+                           for i, curves in enumerate(profiles)], f)
+            jsonSave = time.perf_counter() - start
+            start = time.perf_counter()
+            with open(jsonPath) as f:
+                entries = dict((key, value) for key, value in json.load(f))
+            for i in range(args.used):
+                [curveFromList(curve) for curve in entries['key%d' % i]['curves']]
+            jsonLoad = time.perf_counter() - start
+
+            storePath = os.path.join(directory, 'store%d.json' % size)
+            store = ProfileStore(storePath, size)
+            for i, curves in enumerate(profiles):
+                store.putProfile('key%d' % i, 0.3, curves)
+            start = time.perf_counter()
+            store.save()
+            arraySave = time.perf_counter() - start
+            start = time.perf_counter()
+            store = ProfileStore(storePath, size)
+            for i in range(args.used):
+                store.getProfile('key%d' % i)
+            arrayLoad = time.perf_counter() - start
+            arrayBytes = os.path.getsize(storePath) + os.path.getsize(store.segmentsPath)
+            del store
+
+            print('%10d %14.1f %14.1f %14.1f %14.1f %12.1f %12.1f' % (size, jsonSave * 1e3, jsonLoad * 1e3, arraySave * 1e3,
+                                                                     arrayLoad * 1e3, os.path.getsize(jsonPath) / 1e3,
+                                                                     arrayBytes / 1e3))
+
+
+if __name__ == '__main__':
+    main()
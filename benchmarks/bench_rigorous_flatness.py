@@ -0,0 +1,170 @@
+# compares the original rigorous flatness edge scan with the single pass over precomputed cap edge ids
+# the BRep is stubbed with collections that search linearly like Fusion's, and each stub API call is counted
+# run from the repository root with: python benchmarks/bench_rigorous_flatness.py
+
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from laserlib.flatness import areSideEdgesPerpendicular
+
+apiCalls = 0
+
+
+def countCall():
+    global apiCalls
+    apiCalls += 1
+
+
+class StubPoint:
+    def __init__(self, x, y, z) -> None:
+        self.x, self.y, self.z = x, y, z
+
+
+class StubLine:
+    curveType = 0
+
+    def __init__(self, start, end) -> None:
+        self._start, self._end = start, end
+
+    @property
+    def startPoint(self):
+        countCall()
+        return self._start
+
+    @property
+    def endPoint(self):
+        countCall()
+        return self._end
+
+
+class StubEdge:
+    def __init__(self, tempId, geometry) -> None:
+        self._tempId = tempId
+        self._geometry = geometry
+
+    @property
+    def tempId(self):
+        countCall()
+        return self._tempId
+
+    @property
+    def geometry(self):
+        countCall()
+        return self._geometry
+
+    def __eq__(self, other):
+        # comparing two API objects is a round trip as well
+        countCall()
+        return self is other
+
+    __hash__ = object.__hash__
+
+
+# a Fusion collection, iterating and membership tests go item by item
+class StubCollection:
+    def __init__(self, items) -> None:
+        self._items = items
+
+    def __iter__(self):
+        for item in self._items:
+            countCall()
+            yield item
+
+    def __contains__(self, target):
+        return any(item == target for item in self)
+
+
+class StubPlane:
+    def __init__(self, normal) -> None:
+        self.normal = normal
+
+    def isPerpendicularToLine(self, line):
+        countCall()
+        start, end = line._start, line._end
+        d = (end.x - start.x, end.y - start.y, end.z - start.z)
+        n = self.normal
+        cross = (d[1] * n[2] - d[2] * n[1], d[2] * n[0] - d[0] * n[2], d[0] * n[1] - d[1] * n[0])
+        return math.sqrt(sum(c * c for c in cross)) < 1e-9
+
+
+class StubFace:
+    def __init__(self, edges, normal) -> None:
+        self.edges = StubCollection(edges)
+        self.geometry = StubPlane(normal)
+
+
+class StubBody:
+    def __init__(self, edges) -> None:
+        self.edges = StubCollection(edges)
+
+
+# an extruded n-gon plate: n edges on each cap and n side edges
+def makePlate(sides, thickness = 0.3):
+    points = [(10.0 * math.cos(2 * math.pi * i / sides), 10.0 * math.sin(2 * math.pi * i / sides)) for i in range(sides)]
+    edges = []
+    capEdges = ([], [])
+    for z, cap in ((0.0, capEdges[0]), (thickness, capEdges[1])):
+        for i in range(sides):
+            (x0, y0), (x1, y1) = points[i], points[(i + 1) % sides]
+            edge = StubEdge(len(edges), StubLine(StubPoint(x0, y0, z), StubPoint(x1, y1, z)))
+            edges.append(edge)
+            cap.append(edge)
+    for x, y in points:
+        edges.append(StubEdge(len(edges), StubLine(StubPoint(x, y, 0.0), StubPoint(x, y, thickness))))
+    return StubFace(capEdges[0], (0.0, 0.0, 1.0)), StubFace(capEdges[1], (0.0, 0.0, -1.0)), StubBody(edges)
+
+
+# the side edge loop getBodyFlatness used to run
+def originalCheck(face, backFace, body):
+    for edge in body.edges:
+        if edge not in face.edges and edge not in backFace.edges:
+            if edge.geometry.curveType != 0 or not face.geometry.isPerpendicularToLine(edge.geometry):
+                return False
+    return True
+
+
+def singlePassCheck(face, backFace, body):
+    capEdgeIds = {edge.tempId for edge in face.edges}
+    capEdgeIds.update(edge.tempId for edge in backFace.edges)
+
+    def sideEdges():
+        for edge in body.edges:
+            if edge.tempId in capEdgeIds:
+                continue
+            geometry = edge.geometry
+            if geometry.curveType != 0:
+                yield (False, None, None)
+            else:
+                start, end = geometry.startPoint, geometry.endPoint
+                yield (True, (start.x, start.y, start.z), (end.x, end.y, end.z))
+
+    return areSideEdgesPerpendicular(face.geometry.normal, sideEdges())
+
+
+def run(check, plate):
+    global apiCalls
+    apiCalls = 0
+    start = time.perf_counter()
+    result = check(*plate)
+    return time.perf_counter() - start, apiCalls, result
+
+
+def main():
+    print('%8s %14s %14s %14s %14s' % ('edges', 'original (ms)', 'original calls', 'one pass (ms)', 'one pass calls'))
+    for sides in (10, 100, 300, 1000, 3000):
+        plate = makePlate(sides)
+        edgeCount = 3 * sides
+        if sides <= 1000:
+            originalTime, originalCalls, originalResult = run(originalCheck, plate)
+        else:
+            originalTime, originalCalls, originalResult = float('nan'), float('nan'), True
+        newTime, newCalls, newResult = run(singlePassCheck, plate)
+        assert originalResult == newResult
+        print('%8d %14.2f %14.0f %14.2f %14d' % (edgeCount, originalTime * 1e3, originalCalls, newTime * 1e3, newCalls))
+
+
+if __name__ == '__main__':
+    main()
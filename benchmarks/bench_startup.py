@@ -0,0 +1,70 @@
+# what loading the add-in costs at Fusion startup: importing it and running run(), against the stand-in API
+# every repeat runs in a fresh interpreter, so nothing is imported yet, the way Fusion finds it when it starts
+# the first command import is what the first run of the command adds, before the add-in loaded the export engines lazily
+# that was part of the startup cost
+# run from the repository root with: python benchmarks/bench_startup.py [--repeats 10]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+FAKE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fakeadsk')
+
+
+# runs in the fresh interpreter, prints the timings as json
+def measureStartup():
+    sys.path.insert(0, FAKE_ROOT)
+    import adsk.core
+    import scenes
+    app, design = scenes.newSession()
+    before = set(sys.modules)
+
+    start = time.perf_counter()
+    addIn = scenes.loadAddIn()
+    importTime = time.perf_counter() - start
+    start = time.perf_counter()
+    addIn.run(None)
+    runTime = time.perf_counter() - start
+    loaded = sorted(set(sys.modules) - before)
+
+    start = time.perf_counter()
+    addIn.loadExportCommand()
+    commandTime = time.perf_counter() - start
+    addIn.stop(None)
+
+    failures = [message for message in app.userInterface.messages if message.startswith('Failed')]
+    if failures:
+        raise RuntimeError('run failed:\n' + failures[0])
+    print(json.dumps({'import': importTime, 'run': runTime, 'command': commandTime, 'modules': len(loaded),
+                      'numpy': 'numpy' in loaded}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeats', type = int, default = 10)
+    parser.add_argument('--child', action = 'store_true', help = argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        measureStartup()
+        return
+
+    results = []
+    for i in range(args.repeats):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'], capture_output = True, text = True,
+                                check = True).stdout
+        results.append(json.loads(output.splitlines()[-1]))
+
+    print('median of %d fresh interpreters' % args.repeats)
+    print('%-40s %10.1f' % ('import add-in (ms)', statistics.median(r['import'] for r in results) * 1e3))
+    print('%-40s %10.1f' % ('run (ms)', statistics.median(r['run'] for r in results) * 1e3))
+    print('%-40s %10d' % ('modules loaded at startup', results[0]['modules']))
+    print('%-40s %10s' % ('numpy loaded at startup', 'yes' if results[0]['numpy'] else 'no'))
+    print('%-40s %10.1f' % ('first command import (ms)', statistics.median(r['command'] for r in results) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
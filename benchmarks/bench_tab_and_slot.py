@@ -0,0 +1,49 @@
+# per-joint cost of the tab and slot script against the stand-in Fusion API, with the tool bodies built for every joint
+# and with them copied from the templates built once per pair of sheet thicknesses
+# run from the repository root with: python benchmarks/bench_tab_and_slot.py [--latency 20] [--modeling 2] [--sizes 10 100 1000]
+# the latency is in microseconds per API call, the modeling time is in milliseconds and is added to every call
+# that builds or unites a temporary body, which is where Fusion spends most of its time in this script
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fakeadsk'))
+import adsk
+import scenes
+
+# the temporary body calls that do solid modeling, copying and transforming a body is much cheaper
+MODELING_CALLS = ('TemporaryBRepManager.createBox', 'TemporaryBRepManager.createCylinderOrCone',
+                  'TemporaryBRepManager.booleanOperation')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type = float, default = 0.0, help = 'microseconds added to every API call')
+    parser.add_argument('--modeling', type = float, default = 0.0, help = 'milliseconds added to every modeling call')
+    parser.add_argument('--sizes', type = int, nargs = '+', default = [10, 100, 1000])
+    args = parser.parse_args()
+    modeling = args.latency * 1e-6 + args.modeling * 1e-3
+    adsk.setLatency(args.latency * 1e-6, {name: modeling for name in MODELING_CALLS})
+
+    script = scenes.loadScript('tab_and_slot_testing')
+    # every column after the number of joints is per joint
+    print('%-12s %8s %16s %16s %14s %14s' % ('tool bodies', 'joints', 'wall (ms)', 'script (ms)', 'API calls', 'modeling calls'))
+    for size in args.sizes:
+        for label, cacheTemplates in (('per joint', False), ('templates', True)):
+            script.cache_tool_templates = cacheTemplates
+            app, design = scenes.newSession()
+            points = scenes.buildTabAndSlotAssembly(design, size, jointsPerPanel = 5)
+            start = time.perf_counter()
+            messages = scenes.runTabAndSlot(script, points)
+            elapsed = time.perf_counter() - start
+            if messages:
+                raise RuntimeError('tab and slot failed:\n' + messages[0])
+            modelingCalls = sum(adsk.calls[name] for name in MODELING_CALLS)
+            print('%-12s %8d %16.3f %16.3f %14.1f %14.2f' % (label, size, elapsed * 1e3 / size, (elapsed - adsk.overheadTime) * 1e3 / size,
+                                                           sum(adsk.calls.values()) / size, modelingCalls / size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# stand-in for the parts of the Fusion 360 API used by the add-in and the tab and slot script
+# put benchmarks/fakeadsk on sys.path ahead of everything else to import it as adsk
+#
+# every API method and property records a call under its qualified name (e.g. 'BRepFace.area') and waits for the
+# configured latency, which makes the number of round-trips to Fusion visible outside of it
+# the stand-in's own work (e.g. a linear search for ray hits) is summed in overheadTime, so it can be taken out of timings
+
+import collections
+import functools
+import time
+
+calls = collections.Counter()
+overheadTime = 0.0
+_depth = 0
+
+# seconds added to every call, methods listed in latencies use their own value instead
+defaultLatency = 0.0
+latencies = {}
+
+
+def setLatency(seconds = 0.0, perMethod = None):
+    global defaultLatency
+    defaultLatency = seconds
+    latencies.clear()
+    latencies.update(perMethod or {})
+
+
+def resetCalls():
+    global overheadTime
+    calls.clear()
+    overheadTime = 0.0
+
+
+def recordCall(name):
+    calls[name] += 1
+    delay = latencies.get(name, defaultLatency)
+    if delay > 0.0:
+        # sleeping is too coarse for latencies of a few microseconds
+        end = time.perf_counter() + delay
+        while time.perf_counter() < end:
+            pass
+
+
+# decorator for API methods, use under @property for API properties
+def api(function):
+    name = function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        global overheadTime, _depth
+        recordCall(name)
+        if _depth > 0:
+            return function(*args, **kwargs)
+        _depth += 1
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            overheadTime += time.perf_counter() - start
+            _depth -= 1
+    return wrapper
+
+
+# base of all API classes, cast and classType are counted under the name of the class they are called on
+class Base:
+    @classmethod
+    def cast(cls, obj):
+        recordCall(cls.__name__ + '.cast')
+        return obj if isinstance(obj, cls) else None
+
+    @classmethod
+    def classType(cls) -> str:
+        recordCall(cls.__name__ + '.classType')
+        return cls._typeName()
+
+    @classmethod
+    def _typeName(cls) -> str:
+        return 'adsk::' + cls.__module__.split('.')[-1] + '::' + cls.__name__
+
+    @property
+    def objectType(self) -> str:
+        recordCall(type(self).__name__ + '.objectType')
+        return self._typeName()
@@ -0,0 +1 @@
+# tab_and_slot_testing.py imports adsk.cam without using it
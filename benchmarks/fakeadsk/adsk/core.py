@@ -0,0 +1,765 @@
+# stand-in for adsk.core, see __init__.py
+
+import math
+import queue
+import time
+from . import Base, api, recordCall
+
+
+class Curve3DTypes:
+    Line3DCurveType = 0
+    Arc3DCurveType = 1
+    Circle3DCurveType = 2
+
+
+class SurfaceTypes:
+    PlaneSurfaceType = 0
+    CylinderSurfaceType = 1
+
+
+class DialogResults:
+    DialogOK = 0
+    DialogCancel = 1
+
+
+class Point3D(Base):
+    def __init__(self, x = 0.0, y = 0.0, z = 0.0) -> None:
+        self._x, self._y, self._z = x, y, z
+
+    @staticmethod
+    def create(x = 0.0, y = 0.0, z = 0.0):
+        recordCall('Point3D.create')
+        return Point3D(x, y, z)
+
+    @property
+    @api
+    def x(self):
+        return self._x
+
+    @property
+    @api
+    def y(self):
+        return self._y
+
+    @property
+    @api
+    def z(self):
+        return self._z
+
+    @api
+    def distanceTo(self, other) -> float:
+        return math.sqrt((self._x - other._x) ** 2 + (self._y - other._y) ** 2 + (self._z - other._z) ** 2)
+
+    @api
+    def asArray(self) -> list:
+        return [self._x, self._y, self._z]
+
+    @api
+    def copy(self):
+        return Point3D(self._x, self._y, self._z)
+
+    # copies made inside the stand-in aren't API calls
+    def _clone(self):
+        return Point3D(self._x, self._y, self._z)
+
+    @api
+    def translateBy(self, vector) -> bool:
+        self._x += vector._x
+        self._y += vector._y
+        self._z += vector._z
+        return True
+
+    @api
+    def vectorTo(self, other):
+        return Vector3D(other._x - self._x, other._y - self._y, other._z - self._z)
+
+
+class Vector3D(Base):
+    def __init__(self, x = 0.0, y = 0.0, z = 0.0) -> None:
+        self._x, self._y, self._z = x, y, z
+
+    @staticmethod
+    def create(x = 0.0, y = 0.0, z = 0.0):
+        recordCall('Vector3D.create')
+        return Vector3D(x, y, z)
+
+    @property
+    @api
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self, value):
+        recordCall('Vector3D.x')
+        self._x = value
+
+    @property
+    @api
+    def y(self):
+        return self._y
+
+    @y.setter
+    def y(self, value):
+        recordCall('Vector3D.y')
+        self._y = value
+
+    @property
+    @api
+    def z(self):
+        return self._z
+
+    @api
+    def scaleBy(self, scale) -> bool:
+        self._x *= scale
+        self._y *= scale
+        self._z *= scale
+        return True
+
+    @api
+    def normalize(self) -> bool:
+        length = math.sqrt(self._x ** 2 + self._y ** 2 + self._z ** 2)
+        if length == 0.0:
+            return False
+        self._x, self._y, self._z = self._x / length, self._y / length, self._z / length
+        return True
+
+    @api
+    def crossProduct(self, other):
+        return Vector3D(self._y * other._z - self._z * other._y, self._z * other._x - self._x * other._z,
+                        self._x * other._y - self._y * other._x)
+
+    @api
+    def dotProduct(self, other) -> float:
+        return self._x * other._x + self._y * other._y + self._z * other._z
+
+    @api
+    def asArray(self) -> list:
+        return [self._x, self._y, self._z]
+
+    @api
+    def copy(self):
+        return Vector3D(self._x, self._y, self._z)
+
+    # copies made inside the stand-in aren't API calls
+    def _clone(self):
+        return Vector3D(self._x, self._y, self._z)
+
+
+class Matrix3D(Base):
+    def __init__(self) -> None:
+        # rows of a 4x4 affine transform
+        self._rows = [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]]
+
+    @staticmethod
+    def create():
+        recordCall('Matrix3D.create')
+        return Matrix3D()
+
+    @api
+    def setWithCoordinateSystem(self, origin, xAxis, yAxis, zAxis) -> bool:
+        self._rows[0] = [xAxis._x, yAxis._x, zAxis._x, origin._x]
+        self._rows[1] = [xAxis._y, yAxis._y, zAxis._y, origin._y]
+        self._rows[2] = [xAxis._z, yAxis._z, zAxis._z, origin._z]
+        return True
+
+    @property
+    @api
+    def translation(self):
+        return Vector3D(self._rows[0][3], self._rows[1][3], self._rows[2][3])
+
+    @translation.setter
+    def translation(self, vector):
+        recordCall('Matrix3D.translation')
+        self._rows[0][3], self._rows[1][3], self._rows[2][3] = vector._x, vector._y, vector._z
+
+    @api
+    def copy(self):
+        matrix = Matrix3D()
+        matrix._rows = [list(row) for row in self._rows]
+        return matrix
+
+    def _apply(self, x, y, z):
+        r = self._rows
+        return (r[0][0] * x + r[0][1] * y + r[0][2] * z + r[0][3], r[1][0] * x + r[1][1] * y + r[1][2] * z + r[1][3],
+                r[2][0] * x + r[2][1] * y + r[2][2] * z + r[2][3])
+
+
+class ObjectCollection(Base):
+    def __init__(self, items = None) -> None:
+        self._items = list(items or [])
+
+    @staticmethod
+    def create():
+        recordCall('ObjectCollection.create')
+        return ObjectCollection()
+
+    @api
+    def add(self, item) -> bool:
+        self._items.append(item)
+        return True
+
+    @api
+    def item(self, index):
+        return self._items[index] if 0 <= index < len(self._items) else None
+
+    @api
+    def clear(self) -> bool:
+        self._items = []
+        return True
+
+    @property
+    @api
+    def count(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        recordCall(type(self).__name__ + '.__iter__')
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        recordCall(type(self).__name__ + '.item')
+        return self._items[index]
+
+
+class BoundingBox3D(Base):
+    def __init__(self, minPoint, maxPoint) -> None:
+        self._minPoint, self._maxPoint = minPoint, maxPoint
+
+    @staticmethod
+    def create(minPoint, maxPoint):
+        recordCall('BoundingBox3D.create')
+        return BoundingBox3D(minPoint._clone(), maxPoint._clone())
+
+    @property
+    @api
+    def minPoint(self):
+        return Point3D(self._minPoint._x, self._minPoint._y, self._minPoint._z)
+
+    @property
+    @api
+    def maxPoint(self):
+        return Point3D(self._maxPoint._x, self._maxPoint._y, self._maxPoint._z)
+
+    @api
+    def combine(self, other) -> bool:
+        self._minPoint = Point3D(min(self._minPoint._x, other._minPoint._x), min(self._minPoint._y, other._minPoint._y),
+                                 min(self._minPoint._z, other._minPoint._z))
+        self._maxPoint = Point3D(max(self._maxPoint._x, other._maxPoint._x), max(self._maxPoint._y, other._maxPoint._y),
+                                 max(self._maxPoint._z, other._maxPoint._z))
+        return True
+
+
+class OrientedBoundingBox3D(Base):
+    def __init__(self, centerPoint, lengthDirection, widthDirection, length, width, height) -> None:
+        self.centerPoint = centerPoint
+        self.lengthDirection = lengthDirection
+        self.widthDirection = widthDirection
+        self.length, self.width, self.height = length, width, height
+
+    @staticmethod
+    def create(centerPoint, lengthDirection, widthDirection, length, width, height):
+        recordCall('OrientedBoundingBox3D.create')
+        return OrientedBoundingBox3D(centerPoint, lengthDirection, widthDirection, length, width, height)
+
+
+# curve and surface geometry
+class Line3D(Base):
+    def __init__(self, startPoint, endPoint) -> None:
+        self._start, self._end = startPoint, endPoint
+
+    @property
+    @api
+    def curveType(self):
+        return Curve3DTypes.Line3DCurveType
+
+    @property
+    @api
+    def startPoint(self):
+        return self._start._clone()
+
+    @property
+    @api
+    def endPoint(self):
+        return self._end._clone()
+
+
+class Circle3D(Base):
+    def __init__(self, center, normal, radius) -> None:
+        self._center, self._normal, self._radius = center, normal, radius
+
+    @property
+    @api
+    def curveType(self):
+        return Curve3DTypes.Circle3DCurveType
+
+    @property
+    @api
+    def center(self):
+        return self._center._clone()
+
+    @property
+    @api
+    def radius(self):
+        return self._radius
+
+
+class Plane(Base):
+    def __init__(self, origin, normal) -> None:
+        self._origin, self._normal = origin, normal
+
+    @property
+    @api
+    def surfaceType(self):
+        return SurfaceTypes.PlaneSurfaceType
+
+    @property
+    @api
+    def normal(self):
+        return self._normal._clone()
+
+    @property
+    @api
+    def origin(self):
+        return self._origin._clone()
+
+    @api
+    def getData(self):
+        return True, self._origin._clone(), self._normal._clone()
+
+    @api
+    def isParallelToPlane(self, plane) -> bool:
+        a, b = self._normal, plane._normal
+        cross = (a._y * b._z - a._z * b._y, a._z * b._x - a._x * b._z, a._x * b._y - a._y * b._x)
+        return math.sqrt(sum(c * c for c in cross)) < 1e-9
+
+    @api
+    def isPerpendicularToLine(self, line) -> bool:
+        start, end = line._start, line._end
+        direction = (end._x - start._x, end._y - start._y, end._z - start._z)
+        n = self._normal
+        cross = (direction[1] * n._z - direction[2] * n._y, direction[2] * n._x - direction[0] * n._z,
+                 direction[0] * n._y - direction[1] * n._x)
+        return math.sqrt(sum(c * c for c in cross)) < 1e-9 * math.sqrt(sum(d * d for d in direction))
+
+
+class Cylinder(Base):
+    def __init__(self, origin, axis, radius) -> None:
+        self._origin, self._axis, self._radius = origin, axis, radius
+
+    @property
+    @api
+    def surfaceType(self):
+        return SurfaceTypes.CylinderSurfaceType
+
+    @api
+    def isParallelToPlane(self, plane) -> bool:
+        return False
+
+
+class SurfaceEvaluator(Base):
+    def __init__(self, face) -> None:
+        self._face = face
+
+    @api
+    def getNormalAtPoint(self, point):
+        return True, self._face._normal._clone()
+
+
+# application and user interface
+class Application(Base):
+    _instance = None
+
+    def __init__(self, product = None, userInterface = None) -> None:
+        self._product = product
+        self._userInterface = userInterface or UserInterface()
+        self._customEvents = {}
+        # fired custom events wait here until processEvents, like in Fusion's event loop
+        self._eventQueue = queue.Queue()
+        # the longest any single event handler has kept the event loop busy
+        self.longestEvent = 0.0
+
+    @staticmethod
+    def get():
+        recordCall('Application.get')
+        return Application._instance
+
+    @property
+    @api
+    def activeProduct(self):
+        return self._product
+
+    @property
+    @api
+    def userInterface(self):
+        return self._userInterface
+
+    @api
+    def registerCustomEvent(self, eventId):
+        return self._customEvents.setdefault(eventId, CustomEvent(eventId))
+
+    @api
+    def unregisterCustomEvent(self, eventId) -> bool:
+        return self._customEvents.pop(eventId, None) is not None
+
+    # can be called from any thread, the handlers run later from processEvents
+    @api
+    def fireCustomEvent(self, eventId, additionalInfo = '') -> bool:
+        if eventId not in self._customEvents:
+            return False
+        self._eventQueue.put((eventId, additionalInfo))
+        return True
+
+    # the event loop: run the handlers of fired events until done() is true, waiting up to timeout for the next event
+    def processEvents(self, done, timeout = 60.0):
+        while not done():
+            eventId, additionalInfo = self._eventQueue.get(timeout = timeout)
+            event = self._customEvents.get(eventId)
+            if event is None:
+                continue
+            start = time.perf_counter()
+            for handler in list(event._handlers):
+                handler.notify(CustomEventArgs(eventId, additionalInfo))
+            self.longestEvent = max(self.longestEvent, time.perf_counter() - start)
+
+
+class UserInterface(Base):
+    def __init__(self) -> None:
+        self.messages = []
+        self._activeSelections = Selections()
+        # the file name every save dialog answers with, None cancels the dialog
+        self.saveFileName = None
+        # progress dialogs report being cancelled once their value reaches this, None never cancels
+        self.cancelProgressAt = None
+        self.progressDialog = None
+        self._commandDefinitions = CommandDefinitions()
+        quickAccess = Toolbar()
+        quickAccess.controls._controls['FileSubMenuCommand'] = DropDownControl('FileSubMenuCommand')
+        self._toolbars = ToolbarItems({'QAT': quickAccess})
+        self._toolbarPanels = ToolbarItems({'SolidMakePanel': ToolbarPanel()})
+
+    @api
+    def messageBox(self, text, title = '', buttons = 0, icon = 0):
+        self.messages.append(text)
+        return DialogResults.DialogOK
+
+    @api
+    def createFileDialog(self):
+        return FileDialog(self.saveFileName)
+
+    @api
+    def createProgressDialog(self):
+        self.progressDialog = ProgressDialog(self.cancelProgressAt)
+        return self.progressDialog
+
+    @property
+    @api
+    def activeSelections(self):
+        return self._activeSelections
+
+    @property
+    @api
+    def commandDefinitions(self):
+        return self._commandDefinitions
+
+    @property
+    @api
+    def toolbars(self):
+        return self._toolbars
+
+    @property
+    @api
+    def allToolbarPanels(self):
+        return self._toolbarPanels
+
+
+class FileDialog(Base):
+    def __init__(self, fileName) -> None:
+        self._fileName = fileName
+        self.isMultiSelectEnabled = False
+        self.title = ''
+        self.filter = ''
+        self.filterIndex = 0
+
+    @api
+    def showSave(self):
+        return DialogResults.DialogOK if self._fileName else DialogResults.DialogCancel
+
+    @property
+    @api
+    def filename(self):
+        return self._fileName
+
+
+class ProgressDialog(Base):
+    def __init__(self, cancelAt) -> None:
+        self._cancelAt = cancelAt
+        self._value = 0
+        self.isShowing = False
+        self.cancelButtonText = ''
+        self.isBackgroundTranslucent = True
+        self.isCancelButtonShown = True
+        self.message = ''
+        self.title = ''
+        # every value the dialog was set to, in order
+        self.values = []
+
+    @api
+    def show(self, title, message, minimumValue, maximumValue, delay = 0) -> bool:
+        self.title, self.message = title, message
+        self.minimumValue, self.maximumValue = minimumValue, maximumValue
+        self._value = minimumValue
+        self.isShowing = True
+        return True
+
+    @api
+    def hide(self) -> bool:
+        self.isShowing = False
+        return True
+
+    @property
+    @api
+    def progressValue(self):
+        return self._value
+
+    @progressValue.setter
+    def progressValue(self, value):
+        recordCall('ProgressDialog.progressValue')
+        self._value = value
+        self.values.append(value)
+
+    @property
+    @api
+    def wasCancelled(self) -> bool:
+        return self._cancelAt is not None and self._value >= self._cancelAt
+
+
+class Selection(Base):
+    def __init__(self, entity) -> None:
+        self._entity = entity
+
+    @property
+    @api
+    def entity(self):
+        return self._entity
+
+
+class Selections(ObjectCollection):
+    pass
+
+
+# commands, only what the execute handlers read
+class ValueInput(Base):
+    @staticmethod
+    def createByReal(value):
+        recordCall('ValueInput.createByReal')
+        return value
+
+
+class CommandInput(Base):
+    def __init__(self, inputId, value) -> None:
+        self.id = inputId
+        self._value = value
+
+    @property
+    @api
+    def value(self):
+        return self._value
+
+
+class SelectionCommandInput(CommandInput):
+    def __init__(self, inputId, entities) -> None:
+        super().__init__(inputId, None)
+        self._selections = [Selection(entity) for entity in entities]
+
+    @property
+    @api
+    def selectionCount(self) -> int:
+        return len(self._selections)
+
+    @api
+    def selection(self, index):
+        return self._selections[index]
+
+
+class CommandInputs(Base):
+    def __init__(self, inputs) -> None:
+        self._inputs = {commandInput.id: commandInput for commandInput in inputs}
+
+    @api
+    def itemById(self, inputId):
+        return self._inputs.get(inputId)
+
+
+class Command(Base):
+    def __init__(self, inputs) -> None:
+        self._commandInputs = CommandInputs(inputs)
+
+    @property
+    @api
+    def commandInputs(self):
+        return self._commandInputs
+
+
+class CommandEventArgs(Base):
+    def __init__(self, command) -> None:
+        self._command = command
+
+    @property
+    @api
+    def command(self):
+        return self._command
+
+
+class CommandCreatedEventArgs(CommandEventArgs):
+    pass
+
+
+class CommandEventHandler:
+    def __init__(self) -> None:
+        pass
+
+
+class Event(Base):
+    def __init__(self) -> None:
+        self._handlers = []
+
+    @api
+    def add(self, handler) -> bool:
+        self._handlers.append(handler)
+        return True
+
+    @api
+    def remove(self, handler) -> bool:
+        self._handlers.remove(handler)
+        return True
+
+
+class CustomEvent(Event):
+    def __init__(self, eventId) -> None:
+        super().__init__()
+        self.eventId = eventId
+
+
+class CustomEventArgs(Base):
+    def __init__(self, eventId, additionalInfo) -> None:
+        self._eventId = eventId
+        self._additionalInfo = additionalInfo
+
+    @property
+    @api
+    def additionalInfo(self):
+        return self._additionalInfo
+
+
+class CustomEventHandler:
+    def __init__(self) -> None:
+        pass
+
+
+class CommandCreatedEventHandler:
+    def __init__(self) -> None:
+        pass
+
+
+class CurveEvaluator3D(Base):
+    pass
+
+
+class Appearance(Base):
+    pass
+
+
+# command definitions and toolbars, only what the add-in's run and stop use
+class CommandDefinition(Base):
+    def __init__(self, definitions, definitionId, name) -> None:
+        self._definitions = definitions
+        self.id = definitionId
+        self.name = name
+        self._commandCreated = Event()
+
+    @property
+    @api
+    def commandCreated(self):
+        return self._commandCreated
+
+    @api
+    def deleteMe(self) -> bool:
+        return self._definitions._definitions.pop(self.id, None) is not None
+
+
+class CommandDefinitions(Base):
+    def __init__(self) -> None:
+        self._definitions = {}
+
+    @api
+    def addButtonDefinition(self, definitionId, name, tooltip, resourceFolder = ''):
+        definition = self._definitions[definitionId] = CommandDefinition(self, definitionId, name)
+        return definition
+
+    @api
+    def itemById(self, definitionId):
+        return self._definitions.get(definitionId)
+
+
+class CommandControl(Base):
+    def __init__(self, controls, controlId) -> None:
+        self._controls = controls
+        self.id = controlId
+        self.isPromoted = False
+        self.isPromotedByDefault = False
+
+    @api
+    def deleteMe(self) -> bool:
+        return self._controls._controls.pop(self.id, None) is not None
+
+
+class ToolbarControls(Base):
+    def __init__(self) -> None:
+        self._controls = {}
+
+    @api
+    def addCommand(self, commandDefinition, positionID = '', isBefore = True):
+        control = self._controls[commandDefinition.id] = CommandControl(self, commandDefinition.id)
+        return control
+
+    @api
+    def itemById(self, controlId):
+        return self._controls.get(controlId)
+
+
+class DropDownControl(Base):
+    def __init__(self, controlId) -> None:
+        self.id = controlId
+        self._controls = ToolbarControls()
+
+    @property
+    @api
+    def controls(self):
+        return self._controls
+
+
+class Toolbar(Base):
+    def __init__(self) -> None:
+        self._controls = ToolbarControls()
+
+    @property
+    @api
+    def controls(self):
+        return self._controls
+
+
+class ToolbarPanel(Toolbar):
+    pass
+
+
+# the toolbars or toolbar panels of the user interface by id
+class ToolbarItems(Base):
+    def __init__(self, items) -> None:
+        self._items = items
+
+    @api
+    def itemById(self, itemId):
+        return self._items.get(itemId)
@@ -0,0 +1,976 @@
+# stand-in for adsk.fusion, see __init__.py
+# bodies are right prisms: a polygon outline with circular holes in a plane, extruded along the plane normal
+# features record what they were asked to do but don't change the bodies
+
+import math
+from . import Base, api, recordCall
+from .core import (BoundingBox3D, Circle3D, Cylinder, Line3D, ObjectCollection, Plane, Point3D, SurfaceEvaluator,
+                   Vector3D)
+
+
+class BRepEntityTypes:
+    BRepBodyEntityType = 0
+    BRepFaceEntityType = 1
+    BRepEdgeEntityType = 2
+    BRepVertexEntityType = 3
+
+
+class PointContainment:
+    PointInsidePointContainment = 0
+    PointOnPointContainment = 1
+    PointOutsidePointContainment = 2
+    UnknownPointContainment = 3
+
+
+class BooleanTypes:
+    DifferenceBooleanType = 0
+    IntersectionBooleanType = 1
+    UnionBooleanType = 2
+
+
+class FeatureOperations:
+    JoinFeatureOperation = 0
+    CutFeatureOperation = 1
+    IntersectFeatureOperation = 2
+    NewBodyFeatureOperation = 3
+
+
+def _add(a, b):
+    return (a[0] + b[0], a[1] + b[1], a[2] + b[2])
+
+
+def _sub(a, b):
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+
+def _scale(a, s):
+    return (a[0] * s, a[1] * s, a[2] * s)
+
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _cross(a, b):
+    return (a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+
+def _normalized(a):
+    length = math.sqrt(_dot(a, a))
+    return _scale(a, 1.0 / length)
+
+
+def _polygonArea(points):
+    return 0.5 * sum(points[i - 1][0] * points[i][1] - points[i][0] * points[i - 1][1] for i in range(len(points)))
+
+
+def _pointInPolygon(points, x, y):
+    inside = False
+    for i in range(len(points)):
+        (x0, y0), (x1, y1) = points[i - 1], points[i]
+        if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
+
+
+def _distanceToPolygon(points, x, y):
+    best = float('inf')
+    for i in range(len(points)):
+        (x0, y0), (x1, y1) = points[i - 1], points[i]
+        dx, dy = x1 - x0, y1 - y0
+        t = max(0.0, min(1.0, ((x - x0) * dx + (y - y0) * dy) / (dx * dx + dy * dy)))
+        best = min(best, math.hypot(x - x0 - t * dx, y - y0 - t * dy))
+    return best
+
+
+# a local frame, points in the frame are origin + x * xAxis + y * yAxis + z * zAxis
+class _Frame:
+    def __init__(self, origin, xAxis, yAxis) -> None:
+        self.origin = origin
+        self.xAxis = _normalized(xAxis)
+        self.yAxis = _normalized(yAxis)
+        self.zAxis = _cross(self.xAxis, self.yAxis)
+
+    def toWorld(self, x, y, z = 0.0):
+        return _add(self.origin, _add(_scale(self.xAxis, x), _add(_scale(self.yAxis, y), _scale(self.zAxis, z))))
+
+    def toLocal(self, point):
+        offset = _sub(point, self.origin)
+        return (_dot(offset, self.xAxis), _dot(offset, self.yAxis), _dot(offset, self.zAxis))
+
+
+class Design(Base):
+    def __init__(self, units = 'mm') -> None:
+        self._entities = {}
+        self._nextTempId = 1
+        self._unitsManager = FusionUnitsManager(units)
+        self._attributes = Attributes()
+        self._rootComponent = Component(self, 'root')
+
+    def _register(self, entity):
+        entity._tempId = self._nextTempId
+        entity._entityToken = 'token-' + str(self._nextTempId)
+        self._entities[entity._entityToken] = entity
+        self._nextTempId += 1
+
+    @property
+    @api
+    def rootComponent(self):
+        return self._rootComponent
+
+    @property
+    @api
+    def unitsManager(self):
+        return self._unitsManager
+
+    @property
+    @api
+    def attributes(self):
+        return self._attributes
+
+    @api
+    def findEntityByToken(self, entityToken):
+        entity = self._entities.get(entityToken)
+        return [entity] if entity is not None else []
+
+
+class FusionUnitsManager(Base):
+    _scales = {'internalUnits': 1.0, 'cm': 1.0, 'mm': 0.1, 'm': 100.0, 'in': 2.54, 'ft': 30.48}
+
+    def __init__(self, units) -> None:
+        self._units = units
+
+    @property
+    @api
+    def defaultLengthUnits(self):
+        return self._units
+
+    @api
+    def convert(self, valueInInputUnits, inputUnits, outputUnits):
+        return valueInInputUnits * self._scales[inputUnits] / self._scales[outputUnits]
+
+    @api
+    def formatUnits(self, units):
+        return units
+
+
+class Attribute(Base):
+    def __init__(self, value) -> None:
+        self._value = value
+
+    @property
+    @api
+    def value(self):
+        return self._value
+
+
+class Attributes(Base):
+    def __init__(self) -> None:
+        self._items = {}
+
+    @api
+    def itemByName(self, groupName, attributeName):
+        return self._items.get((groupName, attributeName))
+
+    @api
+    def add(self, groupName, attributeName, value):
+        attribute = Attribute(value)
+        self._items[(groupName, attributeName)] = attribute
+        return attribute
+
+
+class Component(Base):
+    def __init__(self, design, name) -> None:
+        self._design = design
+        self._name = name
+        self._bodies = []
+        self._bRepBodies = BRepBodies(self)
+        self._sketches = Sketches(self)
+        self._features = Features(self)
+
+    # build a prism body in this component, outline is a counter-clockwise polygon and holes are (x, y, radius)
+    # in the frame given by origin, xAxis and yAxis, the body is extruded by thickness along xAxis x yAxis
+    def addPrism(self, name, origin, xAxis, yAxis, outline, holes, thickness):
+        body = BRepBody(self, name)
+        body._build(_Frame(origin, xAxis, yAxis), outline, holes, thickness)
+        self._bodies.append(body)
+        return body
+
+    @property
+    @api
+    def name(self):
+        return self._name
+
+    @property
+    @api
+    def bRepBodies(self):
+        return self._bRepBodies
+
+    @property
+    @api
+    def sketches(self):
+        return self._sketches
+
+    # the stand-in has no occurrences, every body is in the root component
+    @property
+    @api
+    def allOccurrences(self):
+        return ObjectCollection([])
+
+    @property
+    @api
+    def features(self):
+        return self._features
+
+    @api
+    def findBRepUsingRay(self, originPoint, rayDirection, entityType, proximityTolerance = 0.0, visibleEntitiesOnly = True,
+                         hitPoints = None):
+        origin = (originPoint._x, originPoint._y, originPoint._z)
+        direction = _normalized((rayDirection._x, rayDirection._y, rayDirection._z))
+        hits = []
+        for body in self._bodies:
+            if visibleEntitiesOnly and not body._visible:
+                continue
+            if body._faces and body._rayMayHit(origin, direction, proximityTolerance):
+                for face in body._faces:
+                    distance = face._rayDistance(origin, direction, proximityTolerance)
+                    if distance is not None:
+                        hits.append((distance, face))
+        hits.sort(key = lambda hit: hit[0])
+
+        entities = []
+        points = []
+        seenBodies = set()
+        for distance, face in hits:
+            if entityType == BRepEntityTypes.BRepBodyEntityType:
+                if face._body in seenBodies:
+                    continue
+                seenBodies.add(face._body)
+                entities.append(face._body)
+            else:
+                entities.append(face)
+            points.append(Point3D(*_add(origin, _scale(direction, distance))))
+        if hitPoints is not None:
+            hitPoints._items = points
+        return ObjectCollection(entities)
+
+    @api
+    def findBRepUsingPoint(self, point, entityType, proximityTolerance = 0.0, visibleEntitiesOnly = True):
+        position = (point._x, point._y, point._z)
+        found = []
+        for body in self._bodies:
+            if visibleEntitiesOnly and not body._visible:
+                continue
+            if not body._faces or not body._boxContains(position, proximityTolerance):
+                continue
+            for face in body._faces:
+                if face._containsPoint(position, proximityTolerance):
+                    found.append(face._body if entityType == BRepEntityTypes.BRepBodyEntityType else face)
+        return ObjectCollection(found)
+
+
+class BRepBody(Base):
+    def __init__(self, component, name = '') -> None:
+        self._component = component
+        self._name = name
+        self._faces = []
+        self._edges = []
+        self._area = 0.0
+        self._volume = 0.0
+        self._box = None
+        self._shape = None
+        self._visible = True
+        if component is not None:
+            component._design._register(self)
+        else:
+            self._tempId, self._entityToken = 0, ''
+
+    def _build(self, frame, outline, holes, thickness):
+        design = self._component._design
+        if _polygonArea(outline) < 0.0:
+            outline = list(reversed(outline))
+        capArea = _polygonArea(outline) - sum(math.pi * r * r for x, y, r in holes)
+        perimeter = sum(math.hypot(outline[i][0] - outline[i - 1][0], outline[i][1] - outline[i - 1][1]) for i in range(len(outline)))
+        self._area = 2.0 * capArea + perimeter * thickness + sum(2.0 * math.pi * r * thickness for x, y, r in holes)
+        self._volume = capArea * thickness
+        self._shape = (frame, outline, holes, thickness)
+
+        # center of mass of the cap region with the holes taken out, halfway through the thickness
+        momentX = sum((outline[i - 1][0] + outline[i][0]) * (outline[i - 1][0] * outline[i][1] - outline[i][0] * outline[i - 1][1])
+                      for i in range(len(outline))) / 6.0 - sum(math.pi * r * r * x for x, y, r in holes)
+        momentY = sum((outline[i - 1][1] + outline[i][1]) * (outline[i - 1][0] * outline[i][1] - outline[i][0] * outline[i - 1][1])
+                      for i in range(len(outline))) / 6.0 - sum(math.pi * r * r * y for x, y, r in holes)
+        self._centerOfMass = frame.toWorld(momentX / capArea, momentY / capArea, 0.5 * thickness)
+
+        def edge(geometry):
+            brepEdge = BRepEdge(self, geometry)
+            design._register(brepEdge)
+            self._edges.append(brepEdge)
+            return brepEdge
+
+        def point(x, y, z):
+            return Point3D(*frame.toWorld(x, y, z))
+
+        # cap edges, then the straight side edges, then the circles of the holes
+        capEdges = []
+        for z in (thickness, 0.0):
+            capEdges.append([edge(Line3D(point(*outline[i - 1], z), point(*outline[i], z))) for i in range(len(outline))])
+        sideEdges = [edge(Line3D(point(x, y, 0.0), point(x, y, thickness))) for x, y in outline]
+        holeEdges = []
+        for z in (thickness, 0.0):
+            holeEdges.append([edge(Circle3D(point(x, y, z), Vector3D(*frame.zAxis), r)) for x, y, r in holes])
+            for holeEdge, (x, y, r) in zip(holeEdges[-1], holes):
+                holeEdge._seam = point(x + r, y, z)
+
+        # a point on the caps near the first corner, away from the holes
+        cx = sum(x for x, y in outline) / len(outline)
+        cy = sum(y for x, y in outline) / len(outline)
+        px, py = outline[0][0] + 0.05 * (cx - outline[0][0]), outline[0][1] + 0.05 * (cy - outline[0][1])
+
+        top = BRepFace(self, _Frame(frame.toWorld(0.0, 0.0, thickness), frame.xAxis, frame.yAxis), outline, holes,
+                       capArea, capEdges[0] + holeEdges[0], (px, py))
+        bottomFrame = _Frame(frame.origin, frame.xAxis, _scale(frame.yAxis, -1.0))
+        bottom = BRepFace(self, bottomFrame, [(x, -y) for x, y in reversed(outline)], [(x, -y, r) for x, y, r in holes],
+                          capArea, capEdges[1] + holeEdges[1], (px, -py))
+        self._faces = [top, bottom]
+        for i in range(len(outline)):
+            (x0, y0), (x1, y1) = outline[i - 1], outline[i]
+            start, end = frame.toWorld(x0, y0, 0.0), frame.toWorld(x1, y1, 0.0)
+            length = math.hypot(x1 - x0, y1 - y0)
+            sideFrame = _Frame(start, _sub(end, start), frame.zAxis)
+            self._faces.append(BRepFace(self, sideFrame, [(0.0, 0.0), (length, 0.0), (length, thickness), (0.0, thickness)], [],
+                                        length * thickness, [capEdges[0][i], capEdges[1][i], sideEdges[i - 1], sideEdges[i]],
+                                        (0.5 * length, 0.5 * thickness)))
+        for i, (x, y, r) in enumerate(holes):
+            self._faces.append(BRepFace(self, None, None, [], 2.0 * math.pi * r * thickness, [holeEdges[0][i], holeEdges[1][i]],
+                                        frame.toWorld(x + r, y, 0.5 * thickness), Cylinder(Point3D(*frame.toWorld(x, y)), Vector3D(*frame.zAxis), r)))
+        for face in self._faces:
+            design._register(face)
+
+        corners = [frame.toWorld(x, y, z) for x, y in outline for z in (0.0, thickness)]
+        self._box = (tuple(min(c[i] for c in corners) for i in range(3)), tuple(max(c[i] for c in corners) for i in range(3)))
+
+    @property
+    @api
+    def boundingBox(self):
+        # the bodies of base features don't model their shape, so they have an empty box at the origin
+        low, high = self._box if self._box is not None else ((0.0, 0.0, 0.0), (0.0, 0.0, 0.0))
+        return BoundingBox3D(Point3D(*low), Point3D(*high))
+
+    def _boxContains(self, point, tolerance):
+        return all(self._box[0][i] - tolerance <= point[i] <= self._box[1][i] + tolerance for i in range(3))
+
+    # slab test of the ray against the bounding box
+    def _rayMayHit(self, origin, direction, tolerance):
+        near, far = -tolerance, float('inf')
+        for i in range(3):
+            low, high = self._box[0][i] - tolerance, self._box[1][i] + tolerance
+            if abs(direction[i]) < 1e-12:
+                if origin[i] < low or origin[i] > high:
+                    return False
+                continue
+            t0, t1 = (low - origin[i]) / direction[i], (high - origin[i]) / direction[i]
+            near, far = max(near, min(t0, t1)), min(far, max(t0, t1))
+            if near > far:
+                return False
+        return True
+
+    @property
+    @api
+    def name(self):
+        return self._name
+
+    @property
+    @api
+    def isVisible(self):
+        return self._visible
+
+    @api
+    def pointContainment(self, point):
+        if self._shape is None:
+            return PointContainment.UnknownPointContainment
+        frame, outline, holes, thickness = self._shape
+        x, y, z = frame.toLocal((point._x, point._y, point._z))
+        tolerance = 1e-9
+        # the distance to the nearest side face, cap or hole wall, negative outside of the body
+        inPlane = _distanceToPolygon(outline, x, y) * (1.0 if _pointInPolygon(outline, x, y) else -1.0)
+        depth = min([inPlane, z, thickness - z] + [math.hypot(x - hx, y - hy) - r for hx, hy, r in holes])
+        if depth < -tolerance:
+            return PointContainment.PointOutsidePointContainment
+        if depth <= tolerance:
+            return PointContainment.PointOnPointContainment
+        return PointContainment.PointInsidePointContainment
+
+    @property
+    @api
+    def faces(self):
+        return BRepFaces(self._faces)
+
+    @property
+    @api
+    def edges(self):
+        return BRepEdges(self._edges)
+
+    @property
+    @api
+    def area(self):
+        return self._area
+
+    @property
+    @api
+    def volume(self):
+        return self._volume
+
+    @property
+    @api
+    def entityToken(self):
+        return self._entityToken
+
+    @property
+    @api
+    def tempId(self):
+        return self._tempId
+
+    @property
+    @api
+    def parentComponent(self):
+        return self._component
+
+    @property
+    @api
+    def physicalProperties(self):
+        return PhysicalProperties(self._centerOfMass, self._volume)
+
+
+class PhysicalProperties(Base):
+    def __init__(self, centerOfMass, volume) -> None:
+        self._centerOfMass = centerOfMass
+        self._volume = volume
+
+    @property
+    @api
+    def centerOfMass(self):
+        return Point3D(*self._centerOfMass)
+
+    @property
+    @api
+    def volume(self):
+        return self._volume
+
+
+class BRepFace(Base):
+    # frame is None for the cylindrical faces of holes, pointOnFace is in the frame or in world space without one
+    def __init__(self, body, frame, outline, holes, area, edges, pointOnFace, surface = None) -> None:
+        self._body = body
+        self._frame = frame
+        self._outline = outline
+        self._holes = holes
+        self._area = area
+        self._edges = edges
+        if frame is not None:
+            self._normal = Vector3D(*frame.zAxis)
+            self._surface = Plane(Point3D(*frame.origin), self._normal)
+            self._point = frame.toWorld(*pointOnFace)
+        else:
+            self._surface = surface
+            self._point = pointOnFace
+
+    def _rayDistance(self, origin, direction, tolerance):
+        if self._frame is None:
+            return None
+        normal = self._frame.zAxis
+        denominator = _dot(direction, normal)
+        if abs(denominator) < 1e-12:
+            return None
+        distance = _dot(_sub(self._frame.origin, origin), normal) / denominator
+        if distance < -tolerance:
+            return None
+        hit = _add(origin, _scale(direction, distance))
+        return distance if self._containsPoint(hit, tolerance) else None
+
+    def _containsPoint(self, point, tolerance):
+        if self._frame is None:
+            return False
+        x, y, z = self._frame.toLocal(point)
+        if abs(z) > tolerance:
+            return False
+        if not _pointInPolygon(self._outline, x, y) and _distanceToPolygon(self._outline, x, y) > tolerance:
+            return False
+        return all(math.hypot(x - hx, y - hy) >= r - tolerance for hx, hy, r in self._holes)
+
+    @property
+    @api
+    def body(self):
+        return self._body
+
+    @property
+    @api
+    def area(self):
+        return self._area
+
+    @property
+    @api
+    def edges(self):
+        return BRepEdges(self._edges)
+
+    @property
+    @api
+    def geometry(self):
+        return self._surface
+
+    @property
+    @api
+    def evaluator(self):
+        return SurfaceEvaluator(self)
+
+    @property
+    @api
+    def pointOnFace(self):
+        return Point3D(*self._point)
+
+    @property
+    @api
+    def entityToken(self):
+        return self._entityToken
+
+    @property
+    @api
+    def tempId(self):
+        return self._tempId
+
+
+class BRepEdge(Base):
+    def __init__(self, body, geometry) -> None:
+        self._body = body
+        self._geometry = geometry
+
+    @property
+    @api
+    def body(self):
+        return self._body
+
+    @property
+    @api
+    def length(self):
+        if isinstance(self._geometry, Circle3D):
+            return 2.0 * math.pi * self._geometry._radius
+        return self._geometry._start.distanceTo(self._geometry._end)
+
+    # circles start and end at their seam, which moves with the body
+    def _endPoints(self):
+        if isinstance(self._geometry, Circle3D):
+            return self._seam, self._seam
+        return self._geometry._start, self._geometry._end
+
+    @property
+    @api
+    def startVertex(self):
+        return BRepVertex(self._endPoints()[0])
+
+    @property
+    @api
+    def endVertex(self):
+        return BRepVertex(self._endPoints()[1])
+
+    @property
+    @api
+    def geometry(self):
+        return self._geometry
+
+    @property
+    @api
+    def tempId(self):
+        return self._tempId
+
+    @property
+    @api
+    def entityToken(self):
+        return self._entityToken
+
+
+class BRepVertex(Base):
+    def __init__(self, point) -> None:
+        self._point = point
+
+    @property
+    @api
+    def geometry(self):
+        return Point3D(self._point._x, self._point._y, self._point._z)
+
+
+class BRepFaces(ObjectCollection):
+    pass
+
+
+class BRepEdges(ObjectCollection):
+    pass
+
+
+class BRepBodies(Base):
+    def __init__(self, component) -> None:
+        self._component = component
+
+    # the body ends up in the base feature, its shape isn't modelled
+    @api
+    def add(self, body, baseFeature = None):
+        newBody = BRepBody(self._component, body._name)
+        self._component._bodies.append(newBody)
+        if baseFeature is not None:
+            baseFeature._bodies.append(newBody)
+        return newBody
+
+    @property
+    @api
+    def count(self):
+        return len(self._component._bodies)
+
+    @api
+    def item(self, index):
+        return self._component._bodies[index]
+
+
+# sketches
+class SketchPoint(Base):
+    def __init__(self, sketch, x, y) -> None:
+        self._sketch = sketch
+        self._x, self._y = x, y
+
+    @property
+    @api
+    def geometry(self):
+        return Point3D(self._x, self._y, 0.0)
+
+    @property
+    @api
+    def worldGeometry(self):
+        return Point3D(*self._sketch._frame.toWorld(self._x, self._y))
+
+
+class SketchCurve(Base):
+    def __init__(self, sketch) -> None:
+        self._sketch = sketch
+
+    @api
+    def deleteMe(self):
+        self._sketch._curves.remove(self)
+        return True
+
+
+class SketchLine(SketchCurve):
+    def __init__(self, sketch, start, end) -> None:
+        super().__init__(sketch)
+        self._start = SketchPoint(sketch, *start)
+        self._end = SketchPoint(sketch, *end)
+
+    def _copy(self, sketch, transform):
+        return SketchLine(sketch, transform(self._start._x, self._start._y), transform(self._end._x, self._end._y))
+
+    def _extent(self):
+        return (min(self._start._x, self._end._x), min(self._start._y, self._end._y),
+                max(self._start._x, self._end._x), max(self._start._y, self._end._y))
+
+    @property
+    @api
+    def startSketchPoint(self):
+        return self._start
+
+    @property
+    @api
+    def endSketchPoint(self):
+        return self._end
+
+    @property
+    @api
+    def geometry(self):
+        return Line3D(Point3D(self._start._x, self._start._y), Point3D(self._end._x, self._end._y))
+
+
+class SketchCircle(SketchCurve):
+    def __init__(self, sketch, center, radius) -> None:
+        super().__init__(sketch)
+        self._center = SketchPoint(sketch, *center)
+        self._radius = radius
+
+    def _copy(self, sketch, transform):
+        return SketchCircle(sketch, transform(self._center._x, self._center._y), self._radius)
+
+    def _extent(self):
+        x, y, r = self._center._x, self._center._y, self._radius
+        return (x - r, y - r, x + r, y + r)
+
+    @property
+    @api
+    def centerSketchPoint(self):
+        return self._center
+
+    @property
+    @api
+    def radius(self):
+        return self._radius
+
+    @property
+    @api
+    def geometry(self):
+        return Circle3D(Point3D(self._center._x, self._center._y), Vector3D(0.0, 0.0, 1.0), self._radius)
+
+
+class SketchArc(SketchCurve):
+    pass
+
+
+class SketchCurves(ObjectCollection):
+    pass
+
+
+class ProfileCurve(Base):
+    def __init__(self, curve) -> None:
+        self._curve = curve
+
+    @property
+    @api
+    def sketchEntity(self):
+        return self._curve
+
+    @property
+    @api
+    def boundingBox(self):
+        minX, minY, maxX, maxY = self._curve._extent()
+        return BoundingBox3D(Point3D(minX, minY), Point3D(maxX, maxY))
+
+
+class ProfileLoop(Base):
+    def __init__(self, curves, isOuter) -> None:
+        self._curves = curves
+        self._isOuter = isOuter
+
+    @property
+    @api
+    def isOuter(self):
+        return self._isOuter
+
+    @property
+    @api
+    def profileCurves(self):
+        return ObjectCollection([ProfileCurve(curve) for curve in self._curves])
+
+
+class Profile(Base):
+    def __init__(self, loops) -> None:
+        self._loops = loops
+
+    @property
+    @api
+    def profileLoops(self):
+        return ObjectCollection(self._loops)
+
+
+class Sketch(Base):
+    def __init__(self, component, frame) -> None:
+        self._component = component
+        self._frame = frame
+        self._curves = []
+        # the loops of the projected face, the first one is the outer loop
+        self._loops = []
+        self.isComputeDeferred = False
+
+    @api
+    def project(self, entity):
+        projected = []
+        if isinstance(entity, BRepFace) and entity._frame is not None:
+            toSketch = lambda x, y: self._frame.toLocal(entity._frame.toWorld(x, y))[:2]
+            outline = [toSketch(x, y) for x, y in entity._outline]
+            loop = [SketchLine(self, outline[i - 1], outline[i]) for i in range(len(outline))]
+            self._loops.append((loop, True))
+            projected.extend(loop)
+            for x, y, r in entity._holes:
+                circle = SketchCircle(self, toSketch(x, y), r)
+                self._loops.append(([circle], False))
+                projected.append(circle)
+        self._curves.extend(projected)
+        return ObjectCollection(projected)
+
+    @property
+    @api
+    def sketchCurves(self):
+        return SketchCurves(self._curves)
+
+    @property
+    @api
+    def profiles(self):
+        if not self._loops:
+            return ObjectCollection()
+        return ObjectCollection([Profile([ProfileLoop(curves, isOuter) for curves, isOuter in self._loops])])
+
+    # the offset curves are copies of the originals, their geometry is not moved
+    @api
+    def offset(self, curves, directionPoint, offset):
+        copies = [curve._copy(self, lambda x, y: (x, y)) for curve in curves]
+        self._curves.extend(copies)
+        return ObjectCollection(copies)
+
+    @api
+    def copy(self, sketchEntities, transform, targetSketch = None):
+        target = targetSketch or self
+        apply = lambda x, y: transform._apply(x, y, 0.0)[:2]
+        copies = [entity._copy(target, apply) for entity in sketchEntities]
+        target._curves.extend(copies)
+        return ObjectCollection(copies)
+
+    @api
+    def saveAsDXF(self, fullFilename):
+        with open(fullFilename, 'w') as stream:
+            stream.write('  0\nSECTION\n  2\nENTITIES\n')
+            for curve in self._curves:
+                if isinstance(curve, SketchLine):
+                    stream.write('  0\nLINE\n 10\n%f\n 20\n%f\n 11\n%f\n 21\n%f\n' % (curve._start._x, curve._start._y, curve._end._x, curve._end._y))
+                else:
+                    stream.write('  0\nCIRCLE\n 10\n%f\n 20\n%f\n 40\n%f\n' % (curve._center._x, curve._center._y, curve._radius))
+            stream.write('  0\nENDSEC\n  0\nEOF\n')
+        return True
+
+    @api
+    def deleteMe(self):
+        self._component._sketches._items.remove(self)
+        return True
+
+
+class Sketches(ObjectCollection):
+    def __init__(self, component) -> None:
+        super().__init__()
+        self._component = component
+
+    # sketches on a face use the face plane, anything else gets the xy plane
+    @api
+    def add(self, planarEntity, occurrenceForCreation = None):
+        if isinstance(planarEntity, BRepFace) and planarEntity._frame is not None:
+            frame = planarEntity._frame
+        else:
+            frame = _Frame((0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0))
+        sketch = Sketch(self._component, frame)
+        self._items.append(sketch)
+        return sketch
+
+
+# features
+class BaseFeature(Base):
+    def __init__(self) -> None:
+        self._bodies = []
+        self._editing = False
+
+    @api
+    def startEdit(self):
+        self._editing = True
+        return True
+
+    @api
+    def finishEdit(self):
+        self._editing = False
+        return True
+
+    @property
+    @api
+    def bodies(self):
+        return ObjectCollection(self._bodies)
+
+
+class BaseFeatures(ObjectCollection):
+    @api
+    def add(self):
+        feature = BaseFeature()
+        self._items.append(feature)
+        return feature
+
+
+class CombineFeatureInput(Base):
+    def __init__(self, targetBody, toolBodies) -> None:
+        self.targetBody = targetBody
+        self.toolBodies = toolBodies
+        self._operation = FeatureOperations.JoinFeatureOperation
+        self.isKeepToolBodies = False
+
+    @property
+    @api
+    def operation(self):
+        return self._operation
+
+    @operation.setter
+    def operation(self, value):
+        recordCall('CombineFeatureInput.operation')
+        self._operation = value
+
+
+class CombineFeature(Base):
+    def __init__(self, combineInput) -> None:
+        self.targetBody = combineInput.targetBody
+        self.toolCount = len(combineInput.toolBodies)
+        self.operation = combineInput._operation
+
+
+class CombineFeatures(ObjectCollection):
+    @api
+    def createInput(self, targetBody, toolBodies):
+        return CombineFeatureInput(targetBody, toolBodies)
+
+    @api
+    def add(self, combineInput):
+        feature = CombineFeature(combineInput)
+        self._items.append(feature)
+        return feature
+
+
+class Features(Base):
+    def __init__(self, component) -> None:
+        self._baseFeatures = BaseFeatures()
+        self._combineFeatures = CombineFeatures()
+
+    @property
+    @api
+    def baseFeatures(self):
+        return self._baseFeatures
+
+    @property
+    @api
+    def combineFeatures(self):
+        return self._combineFeatures
+
+
+# temporary bodies only remember the primitives they were built from and how often they were transformed
+class TemporaryBRepManager(Base):
+    _instance = None
+
+    @staticmethod
+    def get():
+        recordCall('TemporaryBRepManager.get')
+        if TemporaryBRepManager._instance is None:
+            TemporaryBRepManager._instance = TemporaryBRepManager()
+        return TemporaryBRepManager._instance
+
+    def _body(self, primitives):
+        body = BRepBody(None, 'temporary')
+        body._primitives = primitives
+        body._transforms = 0
+        return body
+
+    @api
+    def createBox(self, box):
+        return self._body([('box', box.length, box.width, box.height)])
+
+    @api
+    def createCylinderOrCone(self, pointOne, pointOneRadius, pointTwo, pointTwoRadius):
+        return self._body([('cylinder', pointOne.distanceTo(pointTwo), pointOneRadius, pointTwoRadius)])
+
+    @api
+    def booleanOperation(self, targetBody, toolBody, booleanType):
+        targetBody._primitives = targetBody._primitives + toolBody._primitives
+        return True
+
+    @api
+    def transform(self, body, transform):
+        body._transforms += 1
+        return True
+
+    @api
+    def copy(self, body):
+        copied = self._body(list(body._primitives))
+        copied._transforms = body._transforms
+        return copied
@@ -0,0 +1,133 @@
+# synthetic assemblies for the stand-in API, and helpers to run the add-in and the scripts against them
+
+import importlib
+import math
+import os
+import random
+import sys
+import types
+
+FAKE_ROOT = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(os.path.dirname(FAKE_ROOT))
+
+if FAKE_ROOT not in sys.path:
+    sys.path.insert(0, FAKE_ROOT)
+
+import adsk
+import adsk.core
+import adsk.fusion
+
+# the values the export dialog starts with
+EXPORT_DEFAULTS = {
+    'kerf': 0.0,
+    'rigorous': False,
+    'sheetWidth': 0.0,
+    'sheetHeight': 0.0,
+    'allowRotation': True,
+    'trueShape': False,
+    'nestTime': 10,
+    'groupByThickness': False,
+    'thicknessTolerance': 0.01,
+    'dumpGeometry': False,
+    'shareRepeated': True,
+    'orderCuts': True,
+    'polylines': True,
+    'simplifyTolerance': 0.0,
+    'profile': False,
+    'incremental': False,
+}
+
+
+# start over with an empty design, saveFileName answers every save dialog (None cancels them)
+def newSession(units = 'mm', saveFileName = None):
+    design = adsk.fusion.Design(units)
+    app = adsk.core.Application(design)
+    app._userInterface.saveFileName = saveFileName
+    adsk.core.Application._instance = app
+    adsk.fusion.TemporaryBRepManager._instance = None
+    adsk.resetCalls()
+    return app, design
+
+
+# count plates with a few holes each, laid out on a grid so no two bodies overlap
+# the plates come in a handful of thicknesses and outlines with up to sides corners
+# with copies above 1, every plate design is repeated that many times, turned by a random angle
+def buildPlateAssembly(design, count, holes = 2, sides = 8, seed = 0, copies = 1):
+    rng = random.Random(seed)
+    root = design.rootComponent
+    columns = max(int(math.sqrt(count)), 1)
+    bodies = []
+    for i in range(count):
+        if i % copies == 0:
+            width, height = rng.uniform(5.0, 20.0), rng.uniform(5.0, 20.0)
+            thickness = rng.choice((0.3, 0.6, 0.9))
+            cornerCount = rng.randint(4, max(sides, 4))
+            outline = []
+            for k in range(cornerCount):
+                angle = 2.0 * math.pi * (k + 0.5) / cornerCount
+                outline.append((0.5 * width * (1.0 + math.cos(angle)), 0.5 * height * (1.0 + math.sin(angle))))
+            radius = 0.1 * min(width, height)
+            holeList = [(0.5 * width + (k - 0.5 * (holes - 1)) * 2.5 * radius, 0.5 * height, radius) for k in range(holes)]
+            turn = 0.0
+        else:
+            turn = rng.uniform(0.0, 2.0 * math.pi)
+        origin = ((i % columns) * 25.0, (i // columns) * 25.0, rng.choice((0.0, 5.0, 10.0)))
+        xAxis, yAxis = (math.cos(turn), math.sin(turn), 0.0), (-math.sin(turn), math.cos(turn), 0.0)
+        bodies.append(root.addPrism('Plate' + str(i), origin, xAxis, yAxis, outline, holeList, thickness))
+    return bodies
+
+
+# count T-joints, jointsPerPanel of them along each horizontal top plate resting on the edge of an upright plate
+# returns the sketch points on the top plates that mark where the joints go
+def buildTabAndSlotAssembly(design, count, thickness = 0.3, jointsPerPanel = 1):
+    root = design.rootComponent
+    # the points sit on the top face of the top plates
+    sketch = adsk.fusion.Sketch(root, adsk.fusion._Frame((0.0, 0.0, thickness), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0)))
+    points = []
+    length = 10.0 * jointsPerPanel
+    for i in range((count + jointsPerPanel - 1) // jointsPerPanel):
+        x = i * (length + 10.0)
+        root.addPrism('Top' + str(i), (x, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0),
+                      [(0.0, 0.0), (length, 0.0), (length, 6.0), (0.0, 6.0)], [], thickness)
+        # the upright plate hangs below the top plate, centered under y = 3
+        root.addPrism('Upright' + str(i), (x, 3.0 - thickness / 2, 0.0), (1.0, 0.0, 0.0), (0.0, 0.0, -1.0),
+                      [(1.0, 0.0), (length - 1.0, 0.0), (length - 1.0, 8.0), (1.0, 8.0)], [], thickness)
+        for k in range(min(jointsPerPanel, count - len(points))):
+            points.append(adsk.fusion.SketchPoint(sketch, x + 5.0 + 10.0 * k, 3.0))
+    return points
+
+
+# the add-in and the scripts use relative imports, so they are loaded as modules of a package rooted at the repository,
+# the way Fusion loads them from their folder
+def loadAddIn():
+    return loadScript('ExportBodiesForLaser')
+
+
+def loadScript(name):
+    if 'laseraddin' not in sys.modules:
+        package = types.ModuleType('laseraddin')
+        package.__path__ = [REPO_ROOT]
+        sys.modules['laseraddin'] = package
+    return importlib.import_module('laseraddin.' + name)
+
+
+# run the export command on the bodies as if they had been selected in the dialog, options override EXPORT_DEFAULTS
+def runExport(addIn, bodies, **options):
+    values = dict(EXPORT_DEFAULTS, **options)
+    inputs = [adsk.core.SelectionCommandInput('selection', bodies)]
+    inputs.extend(adsk.core.CommandInput(inputId, value) for inputId, value in values.items())
+    app = adsk.core.Application._instance
+    if addIn.EXPORT_EVENT_ID not in app._customEvents:
+        addIn.startExportEvent(app)
+    addIn.laserExportCommandExecuteHandler().notify(adsk.core.CommandEventArgs(adsk.core.Command(inputs)))
+    # the export continues as a job from the event loop
+    app.processEvents(lambda: addIn.exportCommand is None or not addIn.exportCommand.isExportRunning())
+    return app._userInterface.messages
+
+
+# run the tab and slot script with the points selected
+def runTabAndSlot(script, points):
+    ui = adsk.core.Application._instance._userInterface
+    ui._activeSelections = adsk.core.Selections([adsk.core.Selection(point) for point in points])
+    script.run({})
+    return ui.messages
@@ -0,0 +1,2 @@
+# the export command of the add-in, which unlike laserlib talks to Fusion
+# ExportBodiesForLaser imports it on the first run of the command, not when the add-in is loaded
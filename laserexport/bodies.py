@@ -0,0 +1,395 @@
+# the parts of the export that query Fusion about the selected bodies: flatness, fingerprints and the curves of
+# their profiles, and the classification cache stored with the design
+
+import adsk.core, adsk.fusion, traceback
+import math
+from ..laserlib.cache import LruCache
+from ..laserlib.containment import loopContainment, loopDepths
+from ..laserlib.duplicates import shapeSignature
+from ..laserlib.flatness import AMBIGUOUS, FLAT, PLANE, FaceTable, classifyFaceTable, isExtractedBodyFlat
+from ..laserlib.geometry import Line, Arc, Circle, chainLoops, curveEndPoint, curveStartPoint
+from ..laserlib.intersect import getInteriorPoint, getSegmentArrays
+from ..laserlib.profiling import NULL_PROFILER
+
+# number of bodies whose classification is remembered in the design
+CLASSIFICATION_CACHE_SIZE = 2000
+
+
+def loadClassificationCache(des) -> LruCache:
+    attribute = des.attributes.itemByName('LaserCutUtilities', 'classificationCache')
+    if attribute:
+        return LruCache.fromJson(attribute.value, CLASSIFICATION_CACHE_SIZE)
+    return LruCache(CLASSIFICATION_CACHE_SIZE)
+
+
+def saveClassificationCache(des, cache):
+    des.attributes.add('LaserCutUtilities', 'classificationCache', cache.toJson())
+
+
+# identifies a body and the state of its geometry, any edit that changes the shape changes the fingerprint
+def getBodyFingerprint(body, rigorous = False) -> str:
+    return '{}|{}|{:.6f}|{:.6f}|{}'.format(body.entityToken, body.faces.count, body.area, body.volume, 'r' if rigorous else 'q')
+
+
+# key of a body's profile in the profile store
+# moving a feature within a body can keep its area and volume, but not its center of mass
+def getProfileKey(body, rigorous, kerf) -> str:
+    center = body.physicalProperties.centerOfMass
+    return '{}|{:.6f}|{:.6f}|{:.6f}|{:.6f}'.format(getBodyFingerprint(body, rigorous), center.x, center.y, center.z, kerf)
+
+
+# the classification of a body from an earlier export, if the body hasn't changed since then and the cached faces
+# still resolve to faces of it, returns (flat, profile face, thickness, back face token) or None
+def getCachedClassification(body, fingerprint, cache, des, profiler = NULL_PROFILER):
+    cached = cache.get(fingerprint)
+    if cached:
+        with profiler.phase('validate cache'):
+            faces = des.findEntityByToken(cached['face'])
+            valid = faces and faces[0].body == body
+        if valid:
+            return cached['flat'], faces[0], cached['thickness'], cached['backFace']
+        # cache.get counted a hit, but a stale entry is classified again like a miss
+        cache.discard(fingerprint)
+        cache.hits -= 1
+        cache.misses += 1
+    return None
+
+
+def putClassification(cache, fingerprint, flat, face, thickness, backFaceToken):
+    cache.put(fingerprint, {
+        'flat': flat,
+        'face': face.entityToken,
+        'backFace': backFaceToken,
+        'thickness': thickness
+    })
+
+
+# find out if a body is flat, using the cached result of an earlier export if the body hasn't changed since then
+# returns (flat, profile face, thickness, back face token)
+def classifyBody(body, cache, des, rigorous = False, profiler = NULL_PROFILER):
+    with profiler.phase('fingerprint'):
+        fingerprint = getBodyFingerprint(body, rigorous)
+    cached = getCachedClassification(body, fingerprint, cache, des, profiler)
+    if cached:
+        return cached
+
+    # get all the faces of the body, sorted by area because the profile sides are likely to be largest
+    with profiler.phase('sort faces'):
+        faces = body.faces
+        sortedFaces = [face for face in faces]
+        sortedFaces.sort(key = lambda f: f.area, reverse = True)
+
+    # check if the body is flat with respect to the largest face
+    flat, backFace, thickness = getBodyFlatness(sortedFaces[0], body, rigorous, profiler)
+    backFaceToken = backFace.entityToken if backFace else None
+    putClassification(cache, fingerprint, flat, sortedFaces[0], thickness, backFaceToken)
+    return flat, sortedFaces[0], thickness, backFaceToken
+
+
+# classifyBody for many bodies at once: the faces of every body that isn't cached are pulled into one table and
+# classified together (see laserlib.flatness.classifyFaceTable), only the bodies that leaves undecided are ray cast
+# this is a generator that yields after every body it queries, so it can run as steps of a job,
+# it returns the results of classifyBody in the order of the bodies, and reports the bodies done to progress
+def classifyBodies(bodies, cache, des, rigorous = False, profiler = NULL_PROFILER, progress = None):
+    results = [None] * len(bodies)
+    table = FaceTable()
+    pending = []
+    # the names are only needed to label the phases of the profile
+    names = [body.name for body in bodies] if profiler.enabled else [None] * len(bodies)
+    for index, body in enumerate(bodies):
+        if progress is not None:
+            progress.progressValue = index
+        with profiler.phase('classify', names[index]):
+            with profiler.phase('fingerprint'):
+                fingerprint = getBodyFingerprint(body, rigorous)
+            cached = getCachedClassification(body, fingerprint, cache, des, profiler)
+            if cached:
+                results[index] = cached
+                continue
+            with profiler.phase('face table'):
+                faces = [face for face in body.faces]
+                table.addBody(getFaceRecord(face) for face in faces)
+        pending.append((index, fingerprint, faces))
+        yield
+
+    with profiler.phase('batch flatness'):
+        verdicts = classifyFaceTable(table, compareAreas = not rigorous)
+
+    for (index, fingerprint, faces), verdict in zip(pending, verdicts):
+        body = bodies[index]
+        profileFace = faces[verdict.profileFace]
+        with profiler.phase('classify', names[index]):
+            if verdict.status == AMBIGUOUS:
+                flat, backFace, thickness = getBodyFlatness(profileFace, body, rigorous, profiler)
+            else:
+                flat, thickness = verdict.status == FLAT, verdict.thickness
+                backFace = faces[verdict.backFace] if verdict.backFace >= 0 else None
+                if flat and rigorous:
+                    with profiler.phase('side edges'):
+                        sideEdges = getSideEdgeRecords(body, getCapEdgeIds(profileFace, backFace))
+                        flat = isExtractedBodyFlat(verdict.normal, profileFace.area, backFace.area, sideEdges, rigorous)
+                    if not flat:
+                        thickness = 0.0
+            backFaceToken = backFace.entityToken if backFace else None
+            putClassification(cache, fingerprint, flat, profileFace, thickness, backFaceToken)
+        results[index] = (flat, profileFace, thickness, backFaceToken)
+        if verdict.status == AMBIGUOUS:
+            yield
+    return results
+
+
+# (surface type, normal, offset, area) of a face for the face table, the normal and offset of a plane are those of its
+# geometry, which may point either way, so nothing has to be evaluated on the face itself
+def getFaceRecord(face):
+    geometry = face.geometry
+    surfaceType = geometry.surfaceType
+    if surfaceType != PLANE:
+        return surfaceType, None, None, face.area
+    success, origin, normal = geometry.getData()
+    normal, origin = normal.asArray(), origin.asArray()
+    return surfaceType, normal, sum(n * o for n, o in zip(normal, origin)), face.area
+
+
+# returns (flat, back face, thickness)
+def getBodyFlatness(face, body, rigorous = False, profiler = NULL_PROFILER):
+    # conditions which must all be satisfied in order for the body to be flat, i.e. can be laser cut:
+    # 1) has a flat face
+    # 2) has exactly one face encountered by a ray cast normal to the first face
+    # 3) this new face must be flat and parallel to the first face
+    # 4) all edges in the body that do not belong to one of these faces must be straight lines and normal to the first face
+
+    # since the largest face is the profile to be laser cut 99% of the time, we only need to perform these checks starting with the largest face of the body
+    # this will be much faster than performing the check for every face on the body
+
+    result = False
+    backFace = None
+    bodyThickness = 0.0
+
+    if isFacePlanar(face):
+        # get the normal and reverse its direction so it points into the body
+        normal: adsk.core.Vector3D = getPlanarFaceNormal(face)
+        normal.scaleBy(-1.0)
+        
+        # cast a ray to find the back face of the body
+        # first need to get the root component since it only seems to work to cast a ray from the root comp
+        app = adsk.core.Application.get()
+        des = adsk.fusion.Design.cast(app.activeProduct)
+        root: adsk.fusion.Component = adsk.fusion.Component.cast(des.rootComponent)
+
+        # cast the ray, looking for faces (entityType=1)
+        with profiler.phase('ray cast'):
+            hitCol: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
+            objCol = root.findBRepUsingRay(face.pointOnFace, normal, 1, 1e-5, False, hitCol)
+
+            # now we need to exclude any faces we found that don't belong to this body
+            intersectedFaces = []
+            for obj, hit in zip(objCol, hitCol):
+                if obj.body == body and obj != face:
+                    originPoint = hit
+                    intersectedFaces.append(obj)
+
+        if len(intersectedFaces) == 1:
+            backFace = intersectedFaces[0]
+            # we have intersected exactly one face
+            # now check that this face is planar and parallel to the first face
+            if isFacePlanar(backFace) and face.geometry.isParallelToPlane(backFace.geometry):
+                # finally, the rigorous check makes sure all of the edges in the body that don't belong to these faces are lines and perpendicular to them
+                # if we don't need to rigorously determine if the body can be laser cut, the face areas are compared as a quick litmus test
+                with profiler.phase('side edges' if rigorous else 'face areas'):
+                    sideEdges = getSideEdgeRecords(body, getCapEdgeIds(face, backFace)) if rigorous else ()
+                    result = isExtractedBodyFlat((normal.x, normal.y, normal.z), face.area, backFace.area, sideEdges, rigorous)
+
+    # calculate the material thickness needed
+    if result:
+        bodyThickness = originPoint.distanceTo(face.pointOnFace)
+
+    return result, backFace, bodyThickness
+
+
+# signature of the profile that stays the same when the body is moved, rotated or mirrored, see laserlib.duplicates
+def getShapeSignature(face, thickness):
+    edges = []
+    for edge in face.edges:
+        start, end = edge.startVertex.geometry, edge.endVertex.geometry
+        edges.append((edge.length, start.asArray(), end.asArray()))
+    return shapeSignature(thickness, face.area, edges)
+
+
+# the cap edges are collected once by id so each edge of the body is only visited once
+def getCapEdgeIds(face, backFace) -> set:
+    capEdgeIds = {edge.tempId for edge in face.edges}
+    capEdgeIds.update(edge.tempId for edge in backFace.edges)
+    return capEdgeIds
+
+
+# the evidence behind the flatness decision, dumped with the body so the decision can be made again outside Fusion
+def getFlatnessRecord(body, face, backFace, rigorous = False) -> dict:
+    normal = getPlanarFaceNormal(face)
+    sideEdges = None
+    if rigorous:
+        sideEdges = [[isLine, start, end] for isLine, start, end in getSideEdgeRecords(body, getCapEdgeIds(face, backFace))]
+    return {'normal': [normal.x, normal.y, normal.z], 'profileArea': face.area, 'backArea': backFace.area, 'sideEdges': sideEdges}
+
+
+# (isLine, start, end) for each edge of the body that isn't in capEdgeIds, pulled lazily so a failed check stops early
+def getSideEdgeRecords(body, capEdgeIds):
+    for edge in body.edges:
+        if edge.tempId in capEdgeIds:
+            continue
+        geometry = edge.geometry
+        if geometry.curveType != adsk.core.Curve3DTypes.Line3DCurveType:
+            yield (False, None, None)
+        else:
+            start, end = geometry.startPoint, geometry.endPoint
+            yield (True, (start.x, start.y, start.z), (end.x, end.y, end.z))
+
+
+def isFacePlanar(face) -> bool:
+    # surfaceType is an enum, value of 0 indicates plane
+    return face.geometry.surfaceType == 0
+
+
+def getPlanarFaceNormal(face) -> adsk.core.Vector3D:
+    # use a surfaceEvaluator so the normal is guaranteed to point outward from the body
+    success, normal = face.evaluator.getNormalAtPoint(face.pointOnFace)
+    if success:
+        return normal
+    else:
+        return adsk.core.Vector3D.create() # return a default vector if fails
+
+
+def getIndicatorAppearance() -> adsk.core.Appearance:
+    app: adsk.fusion.Application = adsk.core.Application.get()
+    des: adsk.fusion.Design = app.activeProduct
+
+    appearanceName = 'laserCutScriptIndicator'
+    indAppearance = des.appearances.itemByName(appearanceName)
+
+    if indAppearance is None:
+        # get a base appearance from the material library
+        lib = app.materialLibraries.itemByName('Fusion 360 Appearance Library')
+        baseAppearance: adsk.core.Appearance = lib.appearances.itemByName('Plastic - Matte (Yellow)')
+        indAppearance: adsk.core.Appearance = des.appearances.addByCopy(baseAppearance, appearanceName)
+
+    return indAppearance
+
+
+def convertProfCurvesToSketchCurves(prCurves) -> adsk.core.ObjectCollection:
+    skCurves = adsk.core.ObjectCollection.create()
+    for curve in prCurves:
+        skCurves.add(curve.sketchEntity)
+    return skCurves
+
+
+# offset the loops of a sketch with the sketch's own offset command, outlines and islands in holes grow, holes shrink
+def getSketchOffsetCurves(tempSketch, kerf) -> list:
+    offsetCurves = []
+    tempSketch.isComputeDeferred = True
+
+    # a loop between two regions belongs to the profiles on both sides of it, so keep each loop once
+    loopRecords = []
+    loopCurves = []
+    loopKeys = set()
+    for profile in tempSketch.profiles:
+        for loop in profile.profileLoops:
+            prCurves = loop.profileCurves
+            records = getCurveRecords(convertProfCurvesToSketchCurves(prCurves))
+            key = frozenset((round(point[0], 6), round(point[1], 6)) for record in records
+                            for point in (curveStartPoint(record), curveEndPoint(record)))
+            if key not in loopKeys:
+                loopKeys.add(key)
+                # the curves of a loop come in order, but not necessarily head to tail
+                chained = chainLoops(records)[0]
+                loopRecords.append(chained[0] if len(chained) == 1 else records)
+                loopCurves.append(prCurves)
+
+    # the nesting of the loops decides which are holes, whichever profiles they came from
+    depths = loopDepths(loopContainment(loopRecords).parents())
+    for prCurves, depth in zip(loopCurves, depths):
+        skCurves = convertProfCurvesToSketchCurves(prCurves)
+
+        # compute the bounding box from the profilecurves because sketch arcs and circles wont return a good bounding box
+        boundBox = None
+        for curve in prCurves:
+            if not boundBox:
+                boundBox = curve.boundingBox
+            else:
+                boundBox.combine(curve.boundingBox)  
+
+        # perform the offsets
+        if depth % 2 == 0:
+            # expand the loop
+            loopOffsetCurves = tempSketch.offset(skCurves, getPointOutsideCurves(skCurves, boundBox), kerf)
+        else:
+            # contract the loop
+            loopOffsetCurves = tempSketch.offset(skCurves, getPointInsideCurves(skCurves, boundBox), kerf)
+        offsetCurves.extend(getCurveRecords(loopOffsetCurves))
+    return offsetCurves
+
+
+# pull the geometry of sketch curves into plain 2D curve records in sketch space
+def getCurveRecords(skCurves, strokeTolerance = 1e-3) -> list:
+    records = []
+    for curve in skCurves:
+        if isinstance(curve, adsk.fusion.SketchLine):
+            start = curve.startSketchPoint.geometry
+            end = curve.endSketchPoint.geometry
+            records.append(Line((start.x, start.y), (end.x, end.y)))
+        elif isinstance(curve, adsk.fusion.SketchCircle):
+            center = curve.centerSketchPoint.geometry
+            records.append(Circle((center.x, center.y), curve.radius))
+        elif isinstance(curve, adsk.fusion.SketchArc):
+            # the arc runs counter-clockwise about its normal from the reference vector rotated by the start angle
+            (retVal, center, normal, refVector, radius, startAngle, endAngle) = curve.geometry.getData()
+            refAngle = math.atan2(refVector.y, refVector.x)
+            if normal.z >= 0.0:
+                records.append(Arc((center.x, center.y), radius, refAngle + startAngle, endAngle - startAngle))
+            else:
+                records.append(Arc((center.x, center.y), radius, refAngle - startAngle, startAngle - endAngle))
+        else:
+            # splines, ellipses and conics are written as the lines of their strokes
+            curveEval = adsk.core.CurveEvaluator3D.cast(curve.geometry.evaluator)
+            (retVal, startParam, endParam) = curveEval.getParameterExtents()
+            (retVal, strokePoints) = curveEval.getStrokes(startParam, endParam, strokeTolerance)
+            for pnt1, pnt2 in zip(strokePoints[:-1], strokePoints[1:]):
+                records.append(Line((pnt1.x, pnt1.y), (pnt2.x, pnt2.y)))
+    return records
+
+
+def getPointOutsideCurves(skCurves, boundBox) -> adsk.core.Point3D:
+
+    # move a point outside the bounding box
+    cornerVec = boundBox.minPoint.vectorTo(boundBox.maxPoint)
+    cornerVec.normalize() 
+    outsidePoint = boundBox.maxPoint.copy()
+    outsidePoint.translateBy(cornerVec)
+    return outsidePoint
+
+
+# from:
+# https://forums.autodesk.com/t5/fusion-360-api-and-scripts/how-to-determine-a-directionpoint-to-offset-an-arbitrary-sketch/m-p/6425999#M1930
+# the intersections with the crossing line are found for all segments and arcs of the loop at once by laserlib.intersect
+def getPointInsideCurves(skCurves, boundBox) -> adsk.core.Point3D:
+    try:
+        # lines and the strokes of splines and ellipses are tested as segments, arcs and circles exactly
+        # the strokes only need to be fine compared to the size of the loop
+        minX, minY = boundBox.minPoint.x, boundBox.minPoint.y
+        maxX, maxY = boundBox.maxPoint.x, boundBox.maxPoint.y
+        tolerance = 1e-4 * math.hypot(maxX - minX, maxY - minY)
+        pointSets = []
+        arcs = []
+        for record in getCurveRecords(skCurves, tolerance):
+            if isinstance(record, Line):
+                pointSets.append((record.start, record.end))
+            else:
+                arcs.append(record)
+
+        # the midpoint of the first two crossings of a line across the whole range is a point in the area
+        midPoint = getInteriorPoint(getSegmentArrays(pointSets), (minX, minY, maxX, maxY), arcs)
+        if midPoint:
+            return adsk.core.Point3D.create(midPoint[0], midPoint[1], 0)
+        else:
+            return False
+    except:
+        ui = adsk.core.Application.get().userInterface
+        ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
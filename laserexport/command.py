@@ -0,0 +1,323 @@
+# the export command: the job that extracts the selected bodies and lays them out and writes them as dxf
+# the add-in only imports this when the command is first executed, so the engines it pulls in (NumPy, nesting,
+# the dxf writers) don't add to Fusion's startup time
+
+import adsk.core, adsk.fusion
+import functools, os, shutil, sys, tempfile
+from ..laserlib.bodydump import BodyRecord, writeDump
+from ..laserlib.duplicates import ShapeIndex
+from ..laserlib.geometry import curvesBoundingBox
+from ..laserlib.jobs import ChunkedJob, runInThread
+from ..laserlib.layout import Part, groupFilePath, layoutGroups, writeLayoutFiles
+from ..laserlib.nesting import NfpCache
+from ..laserlib.offset import OffsetError, offsetProfile
+from ..laserlib.profiling import ApiCallCounter, Profiler
+from ..laserlib.profilestore import ProfileStore
+from .bodies import classifyBodies, getCurveRecords, getFlatnessRecord, getProfileKey, getShapeSignature, \
+    getSketchOffsetCurves, loadClassificationCache, saveClassificationCache
+
+# the inputs of the export dialog the job reads, besides the selection
+EXPORT_SETTINGS = ('kerf', 'rigorous', 'sheetWidth', 'sheetHeight', 'allowRotation', 'trueShape', 'nestTime', 'groupByThickness',
+                   'thicknessTolerance', 'dumpGeometry', 'shareRepeated', 'orderCuts', 'polylines', 'simplifyTolerance',
+                   'incremental', 'profile')
+
+exportJob = None
+exportProgress = None
+
+
+# the folder of the current user the caches kept between exports are stored in, created if needed
+# the shared temporary folder would let any user of the machine put a cache file there for the add-in to read
+def getCacheDirectory() -> str:
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    path = os.path.join(base, 'LaserCutUtilities')
+    os.makedirs(path, 0o700, exist_ok = True)
+    return path
+
+
+def isExportRunning() -> bool:
+    return exportJob is not None and not exportJob.finished
+
+
+# start exporting the bodies selected in the command, the inputs are read here while the command is still alive,
+# the export itself runs as a job, a time slice at a time whenever the custom event eventId is fired
+def startExport(eventArgs, eventId):
+    global exportJob, exportProgress
+    app = adsk.core.Application.get()
+    ui  = app.userInterface
+
+    if isExportRunning():
+        ui.messageBox('An export is still running, wait for it to finish or cancel it first')
+        return
+
+    # get the selection from the command inputs
+    inputs = eventArgs.command.commandInputs
+    selectionInput = inputs.itemById('selection')
+    settings = dict((inputId, inputs.itemById(inputId).value) for inputId in EXPORT_SETTINGS)
+
+    # get the bodies to export from the use5r selection
+    bodies = []
+    for i in range(selectionInput.selectionCount):
+        selectedEntity = selectionInput.selection(i).entity
+        if selectedEntity.objectType == adsk.fusion.BRepBody.classType():
+            bodies.append(selectedEntity)
+
+    if len(bodies) == 0:
+        return
+
+    exportProgress = ui.createProgressDialog()
+    exportProgress.cancelButtonText = 'Cancel'
+    exportProgress.isBackgroundTranslucent = False
+    exportProgress.isCancelButtonShown = True
+    exportProgress.show('Laser Cut', 'Extracting body %v of %m', 0, len(bodies))
+    exportJob = ChunkedJob(exportSteps(bodies, settings, exportProgress), lambda: app.fireCustomEvent(eventId),
+                           isCancelled = lambda: exportProgress.wasCancelled)
+    exportJob.start()
+
+
+# run the export job for another time slice, the progress dialog goes away once the job is over, however it ended
+def runExportJob():
+    try:
+        if exportJob is not None:
+            exportJob.tick()
+    finally:
+        if exportJob is not None and exportJob.finished and exportProgress is not None:
+            exportProgress.hide()
+
+
+def cancelExport():
+    if exportJob is not None:
+        exportJob.cancel()
+        if exportProgress is not None:
+            exportProgress.hide()
+
+
+# the export of the selected bodies, one body per step, settings holds the values of the EXPORT_SETTINGS inputs
+# the layout and the dxf serialization don't need Fusion and run on a worker thread while Fusion stays responsive,
+# the export is cancelled between steps, which still saves the classifications made so far
+def exportSteps(bodies, settings, progress):
+    app = adsk.core.Application.get()
+    ui  = app.userInterface
+    des = adsk.fusion.Design.cast(app.activeProduct)
+    unitsManager = des.unitsManager
+    units = unitsManager.defaultLengthUnits
+    root: adsk.fusion.Component = adsk.fusion.Component.cast(des.rootComponent)
+
+    kerf = settings['kerf'] / 2 
+    rigorous = settings['rigorous']
+    sheetWidth = settings['sheetWidth']
+    sheetHeight = settings['sheetHeight']
+    allowRotation = settings['allowRotation']
+    trueShape = settings['trueShape']
+    nestTime = settings['nestTime']
+    groupFiles = settings['groupByThickness']
+    thicknessTolerance = settings['thicknessTolerance']
+    dumpGeometry = settings['dumpGeometry']
+    shareRepeated = settings['shareRepeated']
+    orderCuts = settings['orderCuts']
+    polylines = settings['polylines']
+    simplifyTolerance = settings['simplifyTolerance']
+    profiler = Profiler(settings['profile'])
+    # the raw profiles needed for the dump aren't stored, so dumping extracts every body again
+    incremental = settings['incremental'] and not dumpGeometry
+
+    # the extracted profiles are kept as plain curve records until the layout is known
+    parts = []
+    dumpBodies = []
+    # the parts already extracted by shape, and the curves each shape is written and dumped with
+    shapeIndex = ShapeIndex() if shareRepeated else None
+    shapeCurves = {}
+    resultStr = ''
+    numFlatBodies = 0
+    spacing = 0.5
+    sheetGap = 5.0
+    classificationCache = None
+    profileStore = None
+
+    # classification results of earlier exports are stored with the design
+    # while profiling, every call into the API is counted towards the phase it was made in, the counter is only
+    # installed while a step of the extraction runs and taken out whenever it yields to Fusion
+    def extractSteps():
+        nonlocal resultStr, numFlatBodies, classificationCache, profileStore
+        with profiler.phase('load cache'):
+            classificationCache = loadClassificationCache(des)
+            profileStore = ProfileStore(os.path.join(getCacheDirectory(), 'ProfileStore.json')) if incremental else None
+
+        try:
+            # reuse the profiles from an earlier export of the bodies that haven't changed since then
+            profileKeys = [None] * len(bodies)
+            storedProfiles = [None] * len(bodies)
+            if incremental:
+                progress.message = 'Looking up body %v of %m'
+                for bodyIndex, body in enumerate(bodies):
+                    progress.progressValue = bodyIndex
+                    with profiler.phase('profile store', body.name):
+                        profileKeys[bodyIndex] = getProfileKey(body, rigorous, kerf)
+                        storedProfiles[bodyIndex] = profileStore.getProfile(profileKeys[bodyIndex])
+                    yield
+
+            # check which of the other bodies are flat, and which face is their profile, all at once
+            progress.message = 'Classifying body %v of %m'
+            classifications = yield from classifyBodies([body for body, storedProfile in zip(bodies, storedProfiles) if not storedProfile],
+                                                        classificationCache, des, rigorous, profiler, progress)
+            classifications = iter(classifications)
+
+            # export each body
+            progress.message = 'Extracting body %v of %m'
+            for bodyIndex, body in enumerate(bodies):
+                if bodyIndex > 0:
+                    progress.progressValue = bodyIndex
+                    yield
+                bodyName = body.name
+
+                if storedProfiles[bodyIndex]:
+                    thickness, curvesToWrite = storedProfiles[bodyIndex]
+                    numFlatBodies += 1
+                    resultStr += bodyName + ' can be cut from ' + str(round(unitsManager.convert(thickness, 
+                        'internalUnits', units), 3)) + ' ' + unitsManager.formatUnits(units) + ' material (unchanged)\n'
+                    parts.append(Part(bodyName, curvesToWrite, curvesBoundingBox(curvesToWrite), thickness))
+                    continue
+
+                flat, profileFace, thickness, backFaceToken = next(classifications)
+                if flat:
+                    numFlatBodies += 1
+                    resultStr += bodyName + ' can be cut from ' + str(round(unitsManager.convert(thickness, 
+                        'internalUnits', units), 3)) + ' ' + unitsManager.formatUnits(units) + ' material\n'
+
+                    # copies of a part that was already extracted reuse its curves
+                    shape = None
+                    if shapeIndex is not None:
+                        with profiler.phase('signature', bodyName):
+                            shape, isNewShape = shapeIndex.add(getShapeSignature(profileFace, thickness), bodyName)
+                    if shape is not None and not isNewShape:
+                        curvesToWrite, profileCurves = shapeCurves[shape]
+                    else:
+                        # make a temporary sketch from the face
+                        # this automatically projects the face onto the sketch, seemingly even when the option to do so in preferences is turned off
+                        with profiler.phase('project', bodyName):
+                            tempSketch: adsk.fusion.Sketch = root.sketches.add(profileFace)
+                            tempSketch.project(profileFace)
+                        with profiler.phase('extract curves', bodyName):
+                            profileCurves = getCurveRecords(tempSketch.sketchCurves)
+                        curvesToWrite = []
+
+                        # offset profile to compensate for laser kerf
+                        if kerf > 0.0:
+                            try:
+                                # offset every loop of the face in one pass, the outer loop grows and the holes shrink
+                                with profiler.phase('offset', bodyName):
+                                    curvesToWrite.extend(offsetProfile(profileCurves, kerf))
+                            except OffsetError:
+                                # let the sketch offset the loops instead if the geometry can't be handled
+                                with profiler.phase('sketch offset', bodyName):
+                                    curvesToWrite.extend(getSketchOffsetCurves(tempSketch, kerf))
+                        else:
+                            curvesToWrite.extend(profileCurves)
+
+                        # delete the sketch, everything needed from it has been pulled into the curve records
+                        with profiler.phase('delete sketch', bodyName):
+                            tempSketch.deleteMe()
+
+                        if shape is not None:
+                            shapeCurves[shape] = (curvesToWrite, profileCurves)
+
+                    if dumpGeometry:
+                        with profiler.phase('dump', bodyName):
+                            backFaces = des.findEntityByToken(backFaceToken) if backFaceToken else []
+                            flatness = getFlatnessRecord(body, profileFace, backFaces[0], rigorous) if backFaces else None
+                            dumpBodies.append(BodyRecord(bodyName, thickness, profileCurves, flatness))
+
+                    parts.append(Part(bodyName, curvesToWrite, curvesBoundingBox(curvesToWrite), thickness, shape))
+                    if incremental:
+                        profileStore.putProfile(profileKeys[bodyIndex], thickness, curvesToWrite)
+                else:
+                    resultStr += bodyName + ' is not flat\n'
+        finally:
+            # also after a cancelled export, the bodies classified so far don't have to be classified again
+            with profiler.phase('save cache'):
+                saveClassificationCache(des, classificationCache)
+                if incremental:
+                    profileStore.save()
+    yield from ApiCallCounter(profiler, (adsk.core, adsk.fusion)).countSteps(extractSteps())
+    resultStr += '\nClassification cache: ' + str(classificationCache.hits) + ' hits, ' + str(classificationCache.misses) + ' misses\n'
+    if shapeIndex is not None and len(shapeIndex.names) < sum(shapeIndex.counts):
+        resultStr += '\n' + str(len(shapeIndex.names)) + ' unique parts:\n'
+        for name, quantity in shapeIndex.quantities():
+            resultStr += name + ': ' + str(quantity) + '\n'
+    if incremental:
+        resultStr += 'Reused ' + str(profileStore.hits) + ' unchanged profiles, processed ' + str(profileStore.misses) + ' changed or new bodies\n'
+
+    # lay out each group of parts on its own sheets
+    progress.progressValue = len(bodies)
+    progress.message = 'Laying out ' + str(len(parts)) + ' parts'
+    # the work on the worker threads is timed there, a phase around the yield would take in the ticks spent waiting
+    with profiler.phase('load nfp cache'):
+        nfpCache = NfpCache(os.path.join(getCacheDirectory(), 'NfpCache.json')) if trueShape else None
+    layoutParts = functools.partial(layoutGroups, parts, thicknessTolerance if groupFiles else None, sheetWidth, sheetHeight, spacing,
+                                    allowRotation, trueShape, nestTime, nfpCache, cutOrder = orderCuts, polylines = polylines,
+                                    simplifyTolerance = simplifyTolerance)
+    layouts = yield runInThread(profiler.runPhase, 'layout', layoutParts)
+    for thickness, groupParts, layout in layouts:
+        if thickness is not None:
+            resultStr += '\n' + str(round(unitsManager.convert(thickness, 'internalUnits', units), 3)) + ' ' + \
+                unitsManager.formatUnits(units) + ' material: ' + str(len(layout.transforms)) + ' parts\n'
+        if layout.utilization is not None:
+            resultStr += '\nPlaced onto ' + str(len(layout.utilization)) + ' sheets (' + \
+                ', '.join(str(round(100 * u)) + '%' for u in layout.utilization) + ' used)\n'
+            for key in layout.unplaced:
+                resultStr += groupParts[key].name + ' is too large for the sheet and was not exported\n'
+        if layout.toolpath is not None:
+            resultStr += 'Cut length ' + str(round(unitsManager.convert(layout.toolpath.cutLength, 'internalUnits', units), 1)) + \
+                ' ' + unitsManager.formatUnits(units) + ', ' + str(layout.toolpath.pierces) + ' pierces, travel ' + \
+                str(round(unitsManager.convert(layout.toolpath.travel, 'internalUnits', units), 1)) + ' ' + \
+                unitsManager.formatUnits(units) + '\n'
+
+    # now that nothing more is needed from Fusion, serialize the layouts into temporary dxf files in parallel
+    # the files are moved to the location chosen by the user once everything has been written
+    scale = unitsManager.convert(1.0, 'internalUnits', units)
+    tasks = []
+    taskThicknesses = []
+    try:
+        for thickness, groupParts, layout in layouts:
+            if len(layout.transforms) > 0:
+                tempFile = tempfile.NamedTemporaryFile('w', suffix = '.dxf', delete = False)
+                tempFile.close()
+                tasks.append((tempFile.name, groupParts, layout.transforms, sheetWidth + sheetGap, units, scale))
+                taskThicknesses.append(thickness)
+        progress.message = 'Writing ' + str(len(tasks)) + ' DXF files'
+        tempPaths = yield runInThread(profiler.runPhase, 'write dxf', writeLayoutFiles, tasks)
+
+        progress.hide()
+        ui.messageBox('Detected ' + str(numFlatBodies) + ' bodies to export for laser cutting:\n\n' + resultStr)
+
+        dialogResult = None
+        if len(tempPaths) > 0:
+            # get file path from user to save the dxf
+            fileDialog = ui.createFileDialog()
+            fileDialog.isMultiSelectEnabled = False
+            fileDialog.title = "Specify file to save DXF"
+            fileDialog.filter = 'DXF files (*.dxf)'
+            fileDialog.filterIndex = 0
+            dialogResult = fileDialog.showSave()
+
+        # move the profiles to the chosen location
+        if dialogResult == adsk.core.DialogResults.DialogOK:
+            for tempPath, thickness in zip(tempPaths, taskThicknesses):
+                if thickness is None:
+                    shutil.move(tempPath, fileDialog.filename)
+                else:
+                    shutil.move(tempPath, groupFilePath(fileDialog.filename, unitsManager.convert(thickness, 'internalUnits', units), units))
+            if dumpGeometry:
+                writeDump(os.path.splitext(fileDialog.filename)[0] + '.json', dumpBodies)
+            if profiler.enabled:
+                profiler.writeJson(os.path.splitext(fileDialog.filename)[0] + '_profile.json')
+                profiler.writeCsv(os.path.splitext(fileDialog.filename)[0] + '_profile.csv')
+    finally:
+        # clean up the temporary files that weren't moved, also when the export was cancelled or failed
+        for task in tasks:
+            if os.path.exists(task[0]):
+                os.remove(task[0])
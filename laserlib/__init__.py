@@ -0,0 +1,2 @@
+# pure python geometry engines used by the laser cutting add-in
+# nothing in this package imports adsk, so it can be run and benchmarked outside of Fusion
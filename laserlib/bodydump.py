@@ -0,0 +1,120 @@
+# body geometry dumped from Fusion, so the rest of the export can run without it
+# a dump holds the profile curves and thickness of each body, plus the evidence the flatness decision is based on
+#
+# json layout:
+#   {"version": 1, "bodies": [{"name": ..., "thickness": ..., "curves": [...], "flatness": {...} or null}]}
+#   curves are ["line", x0, y0, x1, y1], ["arc", cx, cy, radius, startAngle, sweep], ["circle", cx, cy, radius]
+#   or ["polyline", [[x, y], ...], [bulge, ...], closed]
+#   flatness is {"normal": [x, y, z], "profileArea": ..., "backArea": ..., "sideEdges": [[isLine, start, end], ...]}
+#
+# npz files hold the same data as arrays for large dumps, they need numpy to read and write:
+#   lines (n, 5), arcs (n, 6) and circles (n, 4) with the body index in the first column, polylines are stored
+#   as their segments, and everything else is in the json string "meta"
+
+import json
+import os
+from collections import namedtuple
+from .geometry import Line, Arc, Circle, Polyline, polylineSegments
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+DUMP_VERSION = 1
+
+# curves are plain curve records in profile sketch space, flatness is None when only the result of the check is known
+BodyRecord = namedtuple('BodyRecord', ['name', 'thickness', 'curves', 'flatness'])
+
+
+def curveToList(curve) -> list:
+    if isinstance(curve, Line):
+        return ['line', curve.start[0], curve.start[1], curve.end[0], curve.end[1]]
+    elif isinstance(curve, Arc):
+        return ['arc', curve.center[0], curve.center[1], curve.radius, curve.startAngle, curve.sweep]
+    elif isinstance(curve, Circle):
+        return ['circle', curve.center[0], curve.center[1], curve.radius]
+    return ['polyline', [list(point) for point in curve.points], list(curve.bulges), curve.closed]
+
+
+def curveFromList(values):
+    kind = values[0]
+    if kind == 'line':
+        return Line((values[1], values[2]), (values[3], values[4]))
+    elif kind == 'arc':
+        return Arc((values[1], values[2]), values[3], values[4], values[5])
+    elif kind == 'circle':
+        return Circle((values[1], values[2]), values[3])
+    elif kind == 'polyline':
+        return Polyline([tuple(point) for point in values[1]], list(values[2]), bool(values[3]))
+    raise ValueError('unknown curve type in dump: ' + str(kind))
+
+
+def _bodyToJson(body) -> dict:
+    return {'name': body.name, 'thickness': body.thickness, 'curves': [curveToList(curve) for curve in body.curves],
+            'flatness': body.flatness}
+
+
+def _bodyFromJson(values) -> BodyRecord:
+    return BodyRecord(values['name'], values['thickness'], [curveFromList(curve) for curve in values.get('curves', [])],
+                      values.get('flatness'))
+
+
+def _writeNpz(path, bodies):
+    lines, arcs, circles = [], [], []
+    for index, body in enumerate(bodies):
+        for curve in body.curves:
+            for segment in (polylineSegments(curve) if isinstance(curve, Polyline) else (curve,)):
+                if isinstance(segment, Line):
+                    lines.append((index, segment.start[0], segment.start[1], segment.end[0], segment.end[1]))
+                elif isinstance(segment, Arc):
+                    arcs.append((index, segment.center[0], segment.center[1], segment.radius, segment.startAngle, segment.sweep))
+                else:
+                    circles.append((index, segment.center[0], segment.center[1], segment.radius))
+    meta = {'version': DUMP_VERSION,
+            'bodies': [{'name': body.name, 'thickness': body.thickness, 'flatness': body.flatness} for body in bodies]}
+    with open(path, 'wb') as stream:
+        numpy.savez_compressed(stream, meta = numpy.array(json.dumps(meta)),
+                               lines = numpy.array(lines, dtype = float).reshape(-1, 5),
+                               arcs = numpy.array(arcs, dtype = float).reshape(-1, 6),
+                               circles = numpy.array(circles, dtype = float).reshape(-1, 4))
+
+
+def _readNpz(path) -> list:
+    with numpy.load(path, allow_pickle = False) as data:
+        meta = json.loads(str(data['meta']))
+        curves = [[] for body in meta['bodies']]
+        for row in data['lines'].tolist():
+            curves[int(row[0])].append(Line((row[1], row[2]), (row[3], row[4])))
+        for row in data['arcs'].tolist():
+            curves[int(row[0])].append(Arc((row[1], row[2]), row[3], row[4], row[5]))
+        for row in data['circles'].tolist():
+            curves[int(row[0])].append(Circle((row[1], row[2]), row[3]))
+    return [BodyRecord(body['name'], body['thickness'], bodyCurves, body.get('flatness'))
+            for body, bodyCurves in zip(meta['bodies'], curves)]
+
+
+def _isNpz(path) -> bool:
+    if os.path.splitext(path)[1].lower() != '.npz':
+        return False
+    if numpy is None:
+        raise ImportError('numpy is needed to read or write ' + path)
+    return True
+
+
+def writeDump(path, bodies):
+    if _isNpz(path):
+        _writeNpz(path, bodies)
+        return
+    with open(path, 'w') as stream:
+        json.dump({'version': DUMP_VERSION, 'bodies': [_bodyToJson(body) for body in bodies]}, stream)
+
+
+def readDump(path) -> list:
+    if _isNpz(path):
+        return _readNpz(path)
+    with open(path) as stream:
+        data = json.load(stream)
+    if data.get('version', DUMP_VERSION) > DUMP_VERSION:
+        raise ValueError(path + ' was written by a newer version of the add-in')
+    return [_bodyFromJson(body) for body in data['bodies']]
@@ -0,0 +1,49 @@
+# small least-recently-used cache that can be saved as JSON, used to remember results between exports
+
+import json
+from collections import OrderedDict
+
+
+class LruCache:
+    def __init__(self, maxEntries = 2000) -> None:
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxEntries:
+            self.entries.popitem(last = False)
+
+    # forget an entry, e.g. when a cached value turned out to be stale
+    def discard(self, key):
+        self.entries.pop(key, None)
+
+    # entries are written oldest first, so loading them back keeps the eviction order
+    def toJson(self) -> str:
+        return json.dumps(list(self.entries.items()))
+
+    @classmethod
+    def fromJson(cls, text, maxEntries = 2000):
+        cache = cls(maxEntries)
+        try:
+            for key, value in json.loads(text):
+                cache.put(key, value)
+        except (ValueError, TypeError):
+            # a damaged cache is just an empty one
+            cache.entries.clear()
+        return cache
@@ -0,0 +1,77 @@
+# export dumped body geometry to DXF files without Fusion, e.g. on a build server
+#
+#   python -m laserlib.cli parts.json more_parts.npz --units mm --kerf 0.2 --sheet 600 400 --output-dir out
+#
+# lengths on the command line are in the output units, each dump is written to a DXF file of the same name
+# and separate dumps are exported in parallel
+
+import argparse
+import os
+import sys
+from .dxf import UNIT_SCALES
+from .pipeline import ExportOptions, exportDumpFile
+from .workers import runInPool
+
+
+def parseArguments(argv = None):
+    parser = argparse.ArgumentParser(prog = 'python -m laserlib.cli', description = 'Export dumped body geometry to DXF files for laser cutting.')
+    parser.add_argument('dumps', nargs = '+', help = 'json or npz geometry dumps written by the add-in')
+    parser.add_argument('--output-dir', help = 'directory for the DXF files, next to each dump by default')
+    parser.add_argument('--units', choices = sorted(UNIT_SCALES), default = 'mm', help = 'units of the DXF files and of the lengths given here')
+    parser.add_argument('--kerf', type = float, default = 0.0, help = 'width of the laser cut to compensate for')
+    parser.add_argument('--rigorous', action = 'store_true', help = 'check every side edge of the bodies when the dump has them')
+    parser.add_argument('--sheet', type = float, nargs = 2, metavar = ('WIDTH', 'HEIGHT'), default = (0.0, 0.0),
+                        help = 'pack the parts onto sheets of this size instead of a single row')
+    parser.add_argument('--spacing', type = float, help = 'gap between parts, 5 mm by default')
+    parser.add_argument('--no-rotation', action = 'store_true', help = 'keep the parts in their original orientation')
+    parser.add_argument('--true-shape', action = 'store_true', help = 'nest the part outlines instead of their bounding boxes')
+    parser.add_argument('--nest-time', type = float, default = 10.0, help = 'seconds to spend nesting each dump')
+    parser.add_argument('--group-thickness', type = float, metavar = 'TOLERANCE',
+                        help = 'write a separate file per material thickness, grouping thicknesses within the tolerance')
+    parser.add_argument('--no-cut-order', action = 'store_true', help = 'write the curves in extraction order instead of cutting order')
+    parser.add_argument('--no-polylines', action = 'store_true', help = 'write separate lines and arcs instead of joining them into polylines')
+    parser.add_argument('--simplify', type = float, default = 0.0, metavar = 'TOLERANCE',
+                        help = 'drop polyline vertices that stray less than the tolerance from the simplified outline')
+    parser.add_argument('--jobs', type = int, help = 'number of worker processes, one per core by default')
+    return parser.parse_args(argv)
+
+
+def main(argv = None) -> int:
+    args = parseArguments(argv)
+    toInternal = 1.0 / UNIT_SCALES[args.units]
+    options = ExportOptions(
+        kerf = args.kerf * toInternal,
+        rigorous = args.rigorous,
+        sheetWidth = args.sheet[0] * toInternal,
+        sheetHeight = args.sheet[1] * toInternal,
+        spacing = args.spacing * toInternal if args.spacing is not None else 0.5,
+        allowRotation = not args.no_rotation,
+        trueShape = args.true_shape,
+        nestTime = args.nest_time,
+        thicknessTolerance = args.group_thickness * toInternal if args.group_thickness is not None else None,
+        units = args.units,
+        orderCuts = not args.no_cut_order,
+        polylines = not args.no_polylines,
+        simplifyTolerance = args.simplify * toInternal)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok = True)
+
+    # with several dumps each one gets a core, a single dump spreads its own work over the cores instead
+    workers = 1 if len(args.dumps) > 1 else args.jobs
+    tasks = []
+    for dumpPath in args.dumps:
+        name = os.path.splitext(os.path.basename(dumpPath))[0] + '.dxf'
+        outputDir = args.output_dir or os.path.dirname(os.path.abspath(dumpPath))
+        tasks.append((dumpPath, os.path.join(outputDir, name), options, workers))
+    results = runInPool(exportDumpFile, tasks, args.jobs)
+
+    for (dumpPath, outputPath, options, workers), (paths, messages) in zip(tasks, results):
+        print(dumpPath + ': ' + (', '.join(paths) if paths else 'nothing to export'))
+        for message in messages:
+            print('  ' + message)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# nesting of the closed loops of a profile: outlines, the holes in them, islands inside the holes and so on
+# a loop at an even depth bounds material from the outside (an outline or an island), one at an odd depth is a hole
+# the loops are tessellated and their edges bucketed into a grid, a ray cast to the right of a point then only looks at
+# the cells up to the first edge it crosses, so a plate with hundreds of holes is classified in about linear time
+# the first loop the ray crosses either encloses the point or sits beside it inside the same parent,
+# which gives the immediately enclosing loop without testing the point against every loop
+
+import math
+from .geometry import curvesBoundingBox, tessellateLoop
+
+
+class ContainmentIndex:
+    # polygons are lists of (x, y) points, one per loop, the loops must not cross each other
+    def __init__(self, polygons) -> None:
+        self.polygons = polygons
+        edges = []
+        for loop, polygon in enumerate(polygons):
+            if len(polygon) < 3:
+                continue
+            x0, y0 = polygon[-1]
+            for x1, y1 in polygon:
+                if y0 != y1:
+                    edges.append((loop, x0, y0, x1, y1))
+                x0, y0 = x1, y1
+
+        # a grid of about one cell per edge
+        self.minX = min((min(edge[1], edge[3]) for edge in edges), default = 0.0)
+        self.minY = min((min(edge[2], edge[4]) for edge in edges), default = 0.0)
+        maxX = max((max(edge[1], edge[3]) for edge in edges), default = 0.0)
+        maxY = max((max(edge[2], edge[4]) for edge in edges), default = 0.0)
+        self.size = max(1, int(math.sqrt(len(edges))))
+        self.cellWidth = (maxX - self.minX) / self.size or 1.0
+        self.cellHeight = (maxY - self.minY) / self.size or 1.0
+        self.cells = {}
+        # the edges of each loop by row, for counting how often a ray crosses one loop
+        self.rows = {}
+        for edge in edges:
+            loop, x0, y0, x1, y1 = edge
+            firstRow, lastRow = self._row(min(y0, y1)), self._row(max(y0, y1))
+            firstColumn, lastColumn = self._column(min(x0, x1)), self._column(max(x0, x1))
+            for row in range(firstRow, lastRow + 1):
+                self.rows.setdefault((row, loop), []).append(edge)
+                for column in range(firstColumn, lastColumn + 1):
+                    self.cells.setdefault((row, column), []).append(edge)
+        self._parents = {}
+
+    def _row(self, y) -> int:
+        row = int((y - self.minY) / self.cellHeight)
+        return row if 0 <= row < self.size else (0 if row < 0 else self.size - 1)
+
+    def _column(self, x) -> int:
+        column = int((x - self.minX) / self.cellWidth)
+        return column if 0 <= column < self.size else (0 if column < 0 else self.size - 1)
+
+    # x where the ray from point towards +x crosses the edge, or None
+    # an edge counts when it spans the height of the point, with its upper end excluded so a ray through a vertex counts once
+    @staticmethod
+    def _crossing(edge, x, y):
+        loop, x0, y0, x1, y1 = edge
+        if (y0 > y) != (y1 > y):
+            crossX = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+            if crossX > x:
+                return crossX
+        return None
+
+    # the first loop the ray from the point crosses and whether the point is inside it, or (-1, False) if it crosses none
+    # the ray walks the cells of its row to the right until it has found a crossing within the cells already searched
+    def _nearestLoop(self, point, exclude):
+        x, y = point
+        row = self._row(y)
+        nearestX, nearest = math.inf, -1
+        for column in range(self._column(x), self.size):
+            for edge in self.cells.get((row, column), ()):
+                if edge[0] != exclude:
+                    crossX = self._crossing(edge, x, y)
+                    if crossX is not None and crossX < nearestX:
+                        nearestX, nearest = crossX, edge[0]
+            if nearestX <= self.minX + (column + 1) * self.cellWidth:
+                break
+        if nearest == -1:
+            return -1, False
+        # inside the nearest loop when the ray crosses it an odd number of times, otherwise beside it in its parent
+        crossings = sum(1 for edge in self.rows[(row, nearest)] if self._crossing(edge, x, y) is not None)
+        return nearest, crossings % 2 == 1
+
+    # index of the innermost loop enclosing the point, or -1
+    def enclosingLoop(self, point) -> int:
+        nearest, inside = self._nearestLoop(point, -1)
+        return nearest if inside or nearest == -1 else self.parent(nearest)
+
+    # index of the loop immediately enclosing a loop, or -1 for an outermost loop
+    # a loop beside its nearest neighbour shares its parent, which is resolved with a stack since rows of holes
+    # can chain further than the recursion limit
+    def parent(self, loop) -> int:
+        if loop in self._parents:
+            return self._parents[loop]
+        stack = [loop]
+        waiting = {loop: None}
+        while stack:
+            current = stack[-1]
+            if waiting[current] is None:
+                polygon = self.polygons[current]
+                waiting[current] = self._nearestLoop(polygon[0], current) if len(polygon) >= 3 else (-1, False)
+            nearest, inside = waiting[current]
+            if inside or nearest == -1:
+                self._parents[current] = nearest
+            elif nearest in self._parents:
+                self._parents[current] = self._parents[nearest]
+            elif nearest in waiting:
+                # only loops that cross each other can lead back to a loop being resolved
+                self._parents[current] = -1
+            else:
+                stack.append(nearest)
+                waiting[nearest] = None
+                continue
+            stack.pop()
+        return self._parents[loop]
+
+    def parents(self) -> list:
+        return [self.parent(loop) for loop in range(len(self.polygons))]
+
+
+# how many loops enclose each loop, given the parent of every loop
+def loopDepths(parents) -> list:
+    depths = [None] * len(parents)
+    for loop in range(len(parents)):
+        path = []
+        while loop != -1 and depths[loop] is None:
+            path.append(loop)
+            loop = parents[loop]
+        depth = depths[loop] + 1 if loop != -1 else 0
+        for node in reversed(path):
+            depths[node] = depth
+            depth += 1
+    return depths
+
+
+# the containment index of loops of curves, tessellated within tolerance or a hundredth of their size if that is finer,
+# so that tiny holes still become polygons, loops closer than the tolerance to a curved loop may be misplaced
+def loopContainment(loops, tolerance = 1e-2) -> ContainmentIndex:
+    polygons = []
+    for loop in loops:
+        minX, minY, maxX, maxY = curvesBoundingBox(loop)
+        polygons.append(tessellateLoop(loop, min(tolerance, max(maxX - minX, maxY - minY) / 100)))
+    return ContainmentIndex(polygons)
@@ -0,0 +1,64 @@
+# recognizing repeated parts, e.g. occurrences of one component or mirrored and patterned bodies
+# the signature of a part only uses quantities that don't change when it is moved, rotated or mirrored:
+# its thickness, the area of its profile, and the length of every profile edge together with the distances
+# of its end points from the mean of all end points, which pin down where the holes sit
+# mirrored copies count as the same part since they are cut from the same profile with the sheet turned over
+
+import math
+from collections import namedtuple
+
+# key is matched exactly, values within a relative tolerance
+ShapeSignature = namedtuple('ShapeSignature', ['key', 'values'])
+
+
+# edges are (length, start point, end point) of every edge of the profile face, with the points in 3D
+def shapeSignature(thickness, area, edges) -> ShapeSignature:
+    points = [point for length, start, end in edges for point in (start, end)]
+    center = tuple(sum(point[i] for point in points) / max(len(points), 1) for i in range(3))
+    edgeValues = []
+    for length, start, end in edges:
+        startDistance, endDistance = math.dist(start, center), math.dist(end, center)
+        edgeValues.append((length, min(startDistance, endDistance), max(startDistance, endDistance)))
+    # rounded for sorting, so that edges of equal length don't swap places over differences in the last digits
+    edgeValues.sort(key = lambda edge: tuple(round(value, 6) for value in edge))
+    return ShapeSignature(len(edgeValues), (thickness, area) + tuple(value for edge in edgeValues for value in edge))
+
+
+def signaturesMatch(first, second, tolerance = 1e-5) -> bool:
+    if first.key != second.key or len(first.values) != len(second.values):
+        return False
+    return all(abs(a - b) <= tolerance * max(1.0, abs(a), abs(b)) for a, b in zip(first.values, second.values))
+
+
+class ShapeIndex:
+    # values are compared within the relative tolerance, so copies whose measurements differ by rounding still match
+    def __init__(self, tolerance = 1e-5) -> None:
+        self.tolerance = tolerance
+        self._shapes = {}
+        # name of the first part of each shape and how many parts share it, by shape
+        self.names = []
+        self.counts = []
+
+    # the shape matching the signature, or None
+    def find(self, signature):
+        for candidate, shape in self._shapes.get(signature.key, ()):
+            if signaturesMatch(candidate, signature, self.tolerance):
+                return shape
+        return None
+
+    # count the part towards its shape, adding a new shape if no earlier part matches
+    # returns (shape, True if the shape is new)
+    def add(self, signature, name):
+        shape = self.find(signature)
+        if shape is not None:
+            self.counts[shape] += 1
+            return shape, False
+        shape = len(self.names)
+        self._shapes.setdefault(signature.key, []).append((signature, shape))
+        self.names.append(name)
+        self.counts.append(1)
+        return shape, True
+
+    # (name of the first part, quantity) of every shape, most repeated first
+    def quantities(self) -> list:
+        return sorted(zip(self.names, self.counts), key = lambda item: -item[1])
@@ -0,0 +1,164 @@
+# streaming DXF writer
+# entities are written to the output as soon as they are added, so memory use does not grow with the number of parts
+
+import math
+from .geometry import Line, Arc, Circle, Polyline
+
+# $INSUNITS codes for the length units Fusion can use as a document default
+INSUNITS = {'in': 1, 'ft': 2, 'mm': 4, 'cm': 5, 'm': 6}
+
+# factors converting Fusion's internal centimeters into each of those units
+UNIT_SCALES = {'in': 1.0 / 2.54, 'ft': 1.0 / 30.48, 'mm': 10.0, 'cm': 1.0, 'm': 0.01}
+
+
+def formatNumber(value) -> str:
+    # fixed precision without the trailing zeros keeps the files small
+    text = '%.6f' % value
+    text = text.rstrip('0').rstrip('.')
+    return '0' if text in ('', '-0') else text
+
+
+class DxfWriter:
+    # stream should be a text file object, scale converts the curve coordinates into the output units
+    # blocks is a list of (name, curves) written ahead of the entities, so parts can be placed with writeInsert
+    def __init__(self, stream, units = 'cm', scale = 1.0, layer = '0', blocks = ()) -> None:
+        self.stream = stream
+        self.units = units
+        self.scale = scale
+        self.layer = layer
+        self.blocks = list(blocks)
+        self.entityCount = 0
+        self._started = False
+        self._closed = False
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, excType, excValue, tb):
+        self.close()
+
+    def _group(self, code, value):
+        self.stream.write('%3d\n%s\n' % (code, value))
+
+    def _point(self, codeX, point, dx = 0.0, dy = 0.0):
+        self._group(codeX, formatNumber((point[0] + dx) * self.scale))
+        self._group(codeX + 10, formatNumber((point[1] + dy) * self.scale))
+
+    def begin(self):
+        if self._started:
+            return
+        self._started = True
+        self._group(0, 'SECTION')
+        self._group(2, 'HEADER')
+        self._group(9, '$ACADVER')
+        self._group(1, 'AC1009')
+        self._group(9, '$INSUNITS')
+        self._group(70, INSUNITS.get(self.units, 0))
+        self._group(0, 'ENDSEC')
+        if self.blocks:
+            self._group(0, 'SECTION')
+            self._group(2, 'BLOCKS')
+            for name, curves in self.blocks:
+                self._writeBlock(name, curves)
+            self._group(0, 'ENDSEC')
+        self._group(0, 'SECTION')
+        self._group(2, 'ENTITIES')
+
+    # the block's base point is the origin of the curves
+    def _writeBlock(self, name, curves):
+        self._group(0, 'BLOCK')
+        self._group(8, self.layer)
+        self._group(2, name)
+        self._group(70, 0)
+        self._point(10, (0.0, 0.0))
+        self._group(3, name)
+        for curve in curves:
+            self.writeCurve(curve)
+        self._group(0, 'ENDBLK')
+        self._group(8, self.layer)
+
+    def close(self):
+        if self._closed:
+            return
+        self.begin()
+        self._closed = True
+        self._group(0, 'ENDSEC')
+        self._group(0, 'EOF')
+
+    def writeLine(self, line, dx = 0.0, dy = 0.0):
+        self._group(0, 'LINE')
+        self._group(8, self.layer)
+        self._point(10, line.start, dx, dy)
+        self._point(11, line.end, dx, dy)
+        self.entityCount += 1
+
+    def writeArc(self, arc, dx = 0.0, dy = 0.0):
+        # DXF arcs always run counter-clockwise from the start angle to the end angle
+        if arc.sweep >= 0.0:
+            startAngle, endAngle = arc.startAngle, arc.startAngle + arc.sweep
+        else:
+            startAngle, endAngle = arc.startAngle + arc.sweep, arc.startAngle
+        self._group(0, 'ARC')
+        self._group(8, self.layer)
+        self._point(10, arc.center, dx, dy)
+        self._group(40, formatNumber(arc.radius * self.scale))
+        self._group(50, formatNumber(math.degrees(startAngle) % 360.0))
+        self._group(51, formatNumber(math.degrees(endAngle) % 360.0))
+        self.entityCount += 1
+
+    def writeCircle(self, circle, dx = 0.0, dy = 0.0):
+        self._group(0, 'CIRCLE')
+        self._group(8, self.layer)
+        self._point(10, circle.center, dx, dy)
+        self._group(40, formatNumber(circle.radius * self.scale))
+        self.entityCount += 1
+
+    # R12 has no LWPOLYLINE, so polylines are written as a POLYLINE with a VERTEX per point, ended by a SEQEND
+    # the bulge of each vertex applies to the segment that starts at it
+    def writePolyline(self, polyline, dx = 0.0, dy = 0.0):
+        self._group(0, 'POLYLINE')
+        self._group(8, self.layer)
+        self._group(66, 1)
+        self._point(10, (0.0, 0.0))
+        self._group(30, 0)
+        self._group(70, 1 if polyline.closed else 0)
+        for i, point in enumerate(polyline.points):
+            self._group(0, 'VERTEX')
+            self._group(8, self.layer)
+            self._point(10, point, dx, dy)
+            self._group(30, 0)
+            if polyline.bulges and polyline.bulges[i]:
+                self._group(42, formatNumber(polyline.bulges[i]))
+        self._group(0, 'SEQEND')
+        self._group(8, self.layer)
+        self.entityCount += 1
+
+    def writeCurve(self, curve, dx = 0.0, dy = 0.0):
+        if isinstance(curve, Line):
+            self.writeLine(curve, dx, dy)
+        elif isinstance(curve, Arc):
+            self.writeArc(curve, dx, dy)
+        elif isinstance(curve, Circle):
+            self.writeCircle(curve, dx, dy)
+        elif isinstance(curve, Polyline):
+            self.writePolyline(curve, dx, dy)
+        else:
+            raise TypeError('Cannot write {} to DXF'.format(type(curve).__name__))
+
+    # place a block rotated counter-clockwise by angle about its base point, then displaced by (dx, dy)
+    def writeInsert(self, name, dx = 0.0, dy = 0.0, angle = 0.0):
+        self.begin()
+        self._group(0, 'INSERT')
+        self._group(8, self.layer)
+        self._group(2, name)
+        self._point(10, (dx, dy))
+        if angle:
+            self._group(50, formatNumber(math.degrees(angle) % 360.0))
+        self.entityCount += 1
+
+    # write a group of curves displaced by (dx, dy), typically one part of the layout
+    def writeCurves(self, curves, dx = 0.0, dy = 0.0):
+        self.begin()
+        for curve in curves:
+            self.writeCurve(curve, dx, dy)
@@ -0,0 +1,174 @@
+# checks on geometry pulled from a body to decide whether it can be cut from flat sheet
+
+import math
+from collections import namedtuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# the caps of a body cut from sheet have the same area within this
+CAP_AREA_TOLERANCE = 1e-4
+
+# the surface types of the face table, the values of adsk.core.SurfaceTypes
+PLANE, CYLINDER, ELLIPTICAL_CYLINDER = 0, 1, 5
+
+# outcomes of the batch classification, AMBIGUOUS bodies need the ray cast to find their back face
+FLAT, NOT_FLAT, AMBIGUOUS = 0, 1, 2
+
+# per body: the outcome, the index of its profile and back face among its faces (-1 if there is none) and the thickness
+# normal is the profile face's normal, for the rigorous check of the side edges
+BatchFlatness = namedtuple('BatchFlatness', ['status', 'profileFace', 'backFace', 'thickness', 'normal'])
+
+
+# the side edges of a body cut from sheet must all be straight lines running along the sheet normal
+# sideEdges yields (isLine, start, end) for every edge that doesn't belong to the two cap faces, with 3D points
+def areSideEdgesPerpendicular(normal, sideEdges, tolerance = 1e-6) -> bool:
+    nx, ny, nz = normal
+    normalLength = math.sqrt(nx * nx + ny * ny + nz * nz)
+    for isLine, start, end in sideEdges:
+        if not isLine:
+            return False
+        dx, dy, dz = end[0] - start[0], end[1] - start[1], end[2] - start[2]
+        length = math.sqrt(dx * dx + dy * dy + dz * dz)
+        # the cross product with the normal vanishes for an edge parallel to it
+        cx, cy, cz = dy * nz - dz * ny, dz * nx - dx * nz, dx * ny - dy * nx
+        if math.sqrt(cx * cx + cy * cy + cz * cz) > tolerance * length * normalLength:
+            return False
+    return True
+
+
+# final step of the flatness check, once a back face parallel to the profile face has been found
+# the quick check only compares the areas of the two caps, the rigorous one looks at every side edge
+def isExtractedBodyFlat(normal, profileArea, backArea, sideEdges, rigorous = False) -> bool:
+    if rigorous:
+        return areSideEdgesPerpendicular(normal, sideEdges)
+    return abs(profileArea - backArea) < CAP_AREA_TOLERANCE
+
+
+# flatness is the evidence stored with a dumped body, bodies dumped without it were already found to be flat
+def isDumpedBodyFlat(flatness, rigorous = False) -> bool:
+    if not flatness:
+        return True
+    sideEdges = flatness.get('sideEdges')
+    if rigorous and sideEdges is None:
+        # the side edges weren't dumped, so only the quick check is possible
+        rigorous = False
+    return isExtractedBodyFlat(flatness['normal'], flatness['profileArea'], flatness['backArea'], sideEdges or (), rigorous)
+
+
+# faces of many bodies as one table for classifying them all at once, one row per face:
+# the body, the face's index within it, its surface type, for planes the unit normal and the offset of the plane
+# along it (normal . point on the plane, either way round), and its area
+class FaceTable:
+    def __init__(self) -> None:
+        self.rows = []
+        self.bodyCount = 0
+
+    # faces are (surfaceType, normal, offset, area) of every face of the body, normal and offset are unused for
+    # faces that aren't planar, returns the index of the body in the table
+    def addBody(self, faces) -> int:
+        body = self.bodyCount
+        for index, (surfaceType, normal, offset, area) in enumerate(faces):
+            nx, ny, nz = normal if normal is not None else (0.0, 0.0, 0.0)
+            self.rows.append((body, index, surfaceType, nx, ny, nz, offset or 0.0, area))
+        self.bodyCount += 1
+        return body
+
+
+# the flatness check of every body of the table at once, as far as it can be decided without the ray cast:
+# the profile face is the largest face, and the body is flat when it is planar, there is exactly one other face on a
+# parallel plane, the back face, and every other face is a planar or cylindrical side face perpendicular to them
+# (cylinders are assumed to be the walls of holes and rounded corners)
+# faces on further parallel planes (steps, pockets) or slanted faces make the body AMBIGUOUS
+# with compareAreas the caps must also agree in area, as in the quick check of isExtractedBodyFlat,
+# without it a FLAT body still needs its side edges checked
+def classifyFaceTable(table, compareAreas = True, tolerance = 1e-6) -> list:
+    if table.bodyCount == 0:
+        return []
+    if numpy is None:
+        rowsByBody = [[] for i in range(table.bodyCount)]
+        for row in table.rows:
+            rowsByBody[row[0]].append(row)
+        return [_classifyBodyRows(rows, compareAreas, tolerance) for rows in rowsByBody]
+
+    body, face, surfaceType, nx, ny, nz, offset, area = numpy.array(table.rows, dtype = numpy.float64).T
+    body = body.astype(numpy.intp)
+    counts = numpy.bincount(body, minlength = table.bodyCount)
+
+    # the profile face of each body is its largest face, the first of equally large ones
+    order = numpy.lexsort((face, -area, body))
+    starts = numpy.concatenate(([0], numpy.cumsum(counts)[:-1]))
+    profile = order[starts]
+    planar = surfaceType == PLANE
+    length = numpy.sqrt(nx * nx + ny * ny + nz * nz)
+    length[length == 0.0] = 1.0
+    nx, ny, nz = nx / length, ny / length, nz / length
+    offset = offset / length
+
+    # every face against the profile face of its body
+    rowProfile = profile[body]
+    dot = nx * nx[rowProfile] + ny * ny[rowProfile] + nz * nz[rowProfile]
+    isProfile = numpy.arange(len(body)) == rowProfile
+    parallel = planar & ~isProfile & (numpy.abs(dot) > 1.0 - tolerance)
+    side = (planar & (numpy.abs(dot) < tolerance)) | (surfaceType == CYLINDER) | (surfaceType == ELLIPTICAL_CYLINDER)
+    parallelCount = numpy.bincount(body, weights = parallel, minlength = table.bodyCount)
+    otherCount = numpy.bincount(body, weights = ~(parallel | side | isProfile), minlength = table.bodyCount)
+
+    back = numpy.full(table.bodyCount, -1, dtype = numpy.intp)
+    back[body[parallel]] = numpy.nonzero(parallel)[0]
+    # the planes are compared along the profile normal, flipping the offset of a back face whose normal is reversed
+    hasBack = parallelCount == 1
+    backRow = numpy.where(hasBack, back, profile)
+    thickness = numpy.abs(offset[profile] - numpy.sign(dot[backRow]) * offset[backRow])
+
+    status = numpy.full(table.bodyCount, AMBIGUOUS)
+    status[(otherCount == 0) & (parallelCount == 1) & (thickness > tolerance)] = FLAT
+    if compareAreas:
+        status[(status == FLAT) & (numpy.abs(area[profile] - area[backRow]) >= CAP_AREA_TOLERANCE)] = NOT_FLAT
+    status[(otherCount == 0) & (parallelCount == 0)] = NOT_FLAT
+    status[~planar[profile]] = NOT_FLAT
+
+    profileFace, backFace = face[profile].astype(int).tolist(), face[backRow].astype(int).tolist()
+    normals = numpy.stack((nx[profile], ny[profile], nz[profile]), axis = 1).tolist()
+    return [BatchFlatness(int(s), p, b if h else -1, t if s == FLAT else 0.0, tuple(n))
+            for s, p, b, h, t, n in zip(status.tolist(), profileFace, backFace, hasBack.tolist(), thickness.tolist(), normals)]
+
+
+# classifyFaceTable for the rows of one body, without NumPy
+def _classifyBodyRows(rows, compareAreas, tolerance) -> BatchFlatness:
+    normals = []
+    offsets = []
+    for row in rows:
+        length = math.sqrt(row[3] * row[3] + row[4] * row[4] + row[5] * row[5]) or 1.0
+        normals.append((row[3] / length, row[4] / length, row[5] / length))
+        offsets.append(row[6] / length)
+    profile = min(range(len(rows)), key = lambda i: (-rows[i][7], rows[i][1]))
+    profileRow, normal = rows[profile], normals[profile]
+    if profileRow[2] != PLANE:
+        return BatchFlatness(NOT_FLAT, profileRow[1], -1, 0.0, normal)
+
+    parallel = []
+    others = 0
+    for i, row in enumerate(rows):
+        if i == profile:
+            continue
+        dot = sum(a * b for a, b in zip(normals[i], normal))
+        if row[2] == PLANE and abs(dot) > 1.0 - tolerance:
+            parallel.append((i, dot))
+        elif not ((row[2] == PLANE and abs(dot) < tolerance) or row[2] in (CYLINDER, ELLIPTICAL_CYLINDER)):
+            others += 1
+    if others == 0 and len(parallel) == 0:
+        return BatchFlatness(NOT_FLAT, profileRow[1], -1, 0.0, normal)
+    if others > 0 or len(parallel) > 1:
+        return BatchFlatness(AMBIGUOUS, profileRow[1], rows[parallel[0][0]][1] if len(parallel) == 1 else -1, 0.0, normal)
+
+    back, dot = parallel[0]
+    backRow = rows[back]
+    thickness = abs(offsets[profile] - math.copysign(1.0, dot) * offsets[back])
+    if thickness <= tolerance:
+        return BatchFlatness(AMBIGUOUS, profileRow[1], backRow[1], 0.0, normal)
+    if compareAreas and abs(profileRow[7] - backRow[7]) >= CAP_AREA_TOLERANCE:
+        return BatchFlatness(NOT_FLAT, profileRow[1], backRow[1], 0.0, normal)
+    return BatchFlatness(FLAT, profileRow[1], backRow[1], thickness, normal)
@@ -0,0 +1,320 @@
+# lightweight 2D curve records passed between the export stages
+# points are (x, y) tuples, lengths are in Fusion internal units (cm) unless noted otherwise
+
+import math
+from collections import namedtuple
+
+# a straight segment from start to end
+Line = namedtuple('Line', ['start', 'end'])
+
+# a circular arc beginning at startAngle and sweeping by sweep radians (positive sweep is counter-clockwise)
+Arc = namedtuple('Arc', ['center', 'radius', 'startAngle', 'sweep'])
+
+# a full circle
+Circle = namedtuple('Circle', ['center', 'radius'])
+
+# a polyline through points, bulges[i] is the DXF bulge of the segment starting at points[i]
+Polyline = namedtuple('Polyline', ['points', 'bulges', 'closed'])
+
+
+def arcPoint(arc, angle):
+    return (arc.center[0] + arc.radius * math.cos(angle), arc.center[1] + arc.radius * math.sin(angle))
+
+
+def curveStartPoint(curve):
+    if isinstance(curve, Line):
+        return curve.start
+    elif isinstance(curve, Arc):
+        return arcPoint(curve, curve.startAngle)
+    elif isinstance(curve, Circle):
+        return (curve.center[0] + curve.radius, curve.center[1])
+    else:
+        return curve.points[0]
+
+
+def curveEndPoint(curve):
+    if isinstance(curve, Line):
+        return curve.end
+    elif isinstance(curve, Arc):
+        return arcPoint(curve, curve.startAngle + curve.sweep)
+    elif isinstance(curve, Circle):
+        return (curve.center[0] + curve.radius, curve.center[1])
+    else:
+        return curve.points[0] if curve.closed else curve.points[-1]
+
+
+# check if the counter-clockwise angle lies within the angular span of the arc
+def arcContainsAngle(arc, angle) -> bool:
+    if arc.sweep >= 0.0:
+        start, sweep = arc.startAngle, arc.sweep
+    else:
+        start, sweep = arc.startAngle + arc.sweep, -arc.sweep
+    return (angle - start) % (2.0 * math.pi) <= sweep
+
+
+# bounding box of a single curve as (minX, minY, maxX, maxY)
+def curveBoundingBox(curve):
+    if isinstance(curve, Line):
+        (x0, y0), (x1, y1) = curve.start, curve.end
+        return (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+    elif isinstance(curve, Circle):
+        (cx, cy), r = curve.center, curve.radius
+        return (cx - r, cy - r, cx + r, cy + r)
+    elif isinstance(curve, Arc):
+        # start with the end points and then add any quadrant extremes the arc passes through
+        x0, y0 = curveStartPoint(curve)
+        x1, y1 = curveEndPoint(curve)
+        minX, minY, maxX, maxY = min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+        (cx, cy), r = curve.center, curve.radius
+        if arcContainsAngle(curve, 0.0):
+            maxX = cx + r
+        if arcContainsAngle(curve, 0.5 * math.pi):
+            maxY = cy + r
+        if arcContainsAngle(curve, math.pi):
+            minX = cx - r
+        if arcContainsAngle(curve, 1.5 * math.pi):
+            minY = cy - r
+        return (minX, minY, maxX, maxY)
+    else:
+        # bulged polyline segments are bounded through their equivalent arcs
+        boundBox = None
+        for segment in polylineSegments(curve):
+            boundBox = combineBoundingBoxes(boundBox, curveBoundingBox(segment))
+        return boundBox
+
+
+# combine two bounding boxes, either of which may be None
+def combineBoundingBoxes(boxA, boxB):
+    if boxA is None:
+        return boxB
+    if boxB is None:
+        return boxA
+    return (min(boxA[0], boxB[0]), min(boxA[1], boxB[1]), max(boxA[2], boxB[2]), max(boxA[3], boxB[3]))
+
+
+def curvesBoundingBox(curves):
+    boundBox = None
+    for curve in curves:
+        boundBox = combineBoundingBoxes(boundBox, curveBoundingBox(curve))
+    return boundBox
+
+
+def translateCurve(curve, dx, dy):
+    if isinstance(curve, Line):
+        return Line((curve.start[0] + dx, curve.start[1] + dy), (curve.end[0] + dx, curve.end[1] + dy))
+    elif isinstance(curve, Arc):
+        return curve._replace(center = (curve.center[0] + dx, curve.center[1] + dy))
+    elif isinstance(curve, Circle):
+        return curve._replace(center = (curve.center[0] + dx, curve.center[1] + dy))
+    else:
+        return curve._replace(points = [(x + dx, y + dy) for x, y in curve.points])
+
+
+# split a polyline into Line and Arc records
+def polylineSegments(polyline):
+    points = polyline.points
+    count = len(points) if polyline.closed else len(points) - 1
+    segments = []
+    for i in range(count):
+        start = points[i]
+        end = points[(i + 1) % len(points)]
+        bulge = polyline.bulges[i] if polyline.bulges else 0.0
+        if bulge == 0.0:
+            segments.append(Line(start, end))
+        else:
+            segments.append(bulgeToArc(start, end, bulge))
+    return segments
+
+
+# convert a DXF bulge segment into an arc record, the bulge is the tangent of a quarter of the included angle
+def bulgeToArc(start, end, bulge):
+    sweep = 4.0 * math.atan(bulge)
+    chordX, chordY = end[0] - start[0], end[1] - start[1]
+    chord = math.hypot(chordX, chordY)
+    radius = chord / (2.0 * abs(math.sin(sweep / 2.0)))
+
+    # the center sits on the perpendicular bisector of the chord
+    sagitta = radius * math.cos(sweep / 2.0)
+    midX, midY = (start[0] + end[0]) / 2.0, (start[1] + end[1]) / 2.0
+    normX, normY = -chordY / chord, chordX / chord
+    if sweep < 0.0:
+        normX, normY = -normX, -normY
+    center = (midX + normX * sagitta, midY + normY * sagitta)
+    startAngle = math.atan2(start[1] - center[1], start[0] - center[0])
+    return Arc(center, radius, startAngle, sweep)
+
+
+# rotate a curve counter-clockwise about the origin
+def rotateCurve(curve, angle):
+    cosA, sinA = math.cos(angle), math.sin(angle)
+
+    def rotatePoint(point):
+        return (point[0] * cosA - point[1] * sinA, point[0] * sinA + point[1] * cosA)
+
+    if isinstance(curve, Line):
+        return Line(rotatePoint(curve.start), rotatePoint(curve.end))
+    elif isinstance(curve, Arc):
+        return curve._replace(center = rotatePoint(curve.center), startAngle = curve.startAngle + angle)
+    elif isinstance(curve, Circle):
+        return curve._replace(center = rotatePoint(curve.center))
+    else:
+        return curve._replace(points = [rotatePoint(point) for point in curve.points])
+
+
+def reverseCurve(curve):
+    if isinstance(curve, Line):
+        return Line(curve.end, curve.start)
+    elif isinstance(curve, Arc):
+        return Arc(curve.center, curve.radius, curve.startAngle + curve.sweep, -curve.sweep)
+    elif isinstance(curve, Circle):
+        return curve
+    else:
+        points = list(reversed(curve.points))
+        if curve.closed:
+            # keep the same first point, the segments then come in exactly the reverse order
+            bulges = [-b for b in reversed(curve.bulges)] if curve.bulges else curve.bulges
+            points = points[-1:] + points[:-1]
+        else:
+            bulges = [-b for b in reversed(curve.bulges[:-1])] + [0.0] if curve.bulges else curve.bulges
+        return Polyline(points, bulges, curve.closed)
+
+
+def isClosedCurve(curve) -> bool:
+    return isinstance(curve, Circle) or (isinstance(curve, Polyline) and curve.closed)
+
+
+# group an unordered set of curves into loops of end-to-end curves
+# endpoints are hashed onto a grid of size tolerance, so chaining is linear in the number of curves
+# returns (closed loops, open chains), each a list of curves directed head to tail
+def chainLoops(curves, tolerance = 1e-6):
+    def gridKey(point):
+        return (round(point[0] / tolerance), round(point[1] / tolerance))
+
+    loops = []
+    openCurves = []
+    index = {}
+    for curve in curves:
+        if isClosedCurve(curve):
+            loops.append([curve])
+            continue
+        i = len(openCurves)
+        openCurves.append(curve)
+        for end, point in ((0, curveStartPoint(curve)), (1, curveEndPoint(curve))):
+            index.setdefault(gridKey(point), []).append((i, end))
+
+    used = [False] * len(openCurves)
+
+    # find an unused curve with an end at point, checking neighbouring cells so rounding can't split a joint
+    def takeCurveAt(point):
+        kx, ky = gridKey(point)
+        for dx in (0, -1, 1):
+            for dy in (0, -1, 1):
+                for i, end in index.get((kx + dx, ky + dy), ()):
+                    if not used[i]:
+                        curve = openCurves[i]
+                        other = curveStartPoint(curve) if end == 0 else curveEndPoint(curve)
+                        if abs(other[0] - point[0]) <= tolerance and abs(other[1] - point[1]) <= tolerance:
+                            used[i] = True
+                            return curve if end == 0 else reverseCurve(curve)
+        return None
+
+    chains = []
+    for i, curve in enumerate(openCurves):
+        if used[i]:
+            continue
+        used[i] = True
+        chain = [curve]
+        startPoint = curveStartPoint(curve)
+        closed = False
+        while True:
+            endPoint = curveEndPoint(chain[-1])
+            if abs(endPoint[0] - startPoint[0]) <= tolerance and abs(endPoint[1] - startPoint[1]) <= tolerance:
+                closed = True
+                break
+            nextCurve = takeCurveAt(endPoint)
+            if nextCurve is None:
+                break
+            chain.append(nextCurve)
+
+        if not closed:
+            # extend the chain backwards from its start as well
+            while True:
+                prevCurve = takeCurveAt(curveStartPoint(chain[0]))
+                if prevCurve is None:
+                    break
+                chain.insert(0, reverseCurve(prevCurve))
+            endPoint = curveEndPoint(chain[-1])
+            startPoint = curveStartPoint(chain[0])
+            closed = abs(endPoint[0] - startPoint[0]) <= tolerance and abs(endPoint[1] - startPoint[1]) <= tolerance
+
+        if closed:
+            loops.append(chain)
+        else:
+            chains.append(chain)
+    return loops, chains
+
+
+# number of chords needed to stay within tolerance of an arc of the given radius and sweep
+def arcSegmentCount(radius, sweep, tolerance) -> int:
+    if radius <= tolerance:
+        return 1
+    step = 2.0 * math.acos(max(-1.0, 1.0 - tolerance / radius))
+    return max(1, int(math.ceil(abs(sweep) / step)))
+
+
+# convert a directed loop into a polygon, each curve contributes its start point and any interior arc points
+def tessellateLoop(loop, tolerance):
+    points = []
+    for curve in loop:
+        if isinstance(curve, Line):
+            points.append(curve.start)
+        elif isinstance(curve, Polyline):
+            for segment in polylineSegments(curve):
+                points.extend(tessellateLoop([segment], tolerance))
+        else:
+            if isinstance(curve, Circle):
+                curve = Arc(curve.center, curve.radius, 0.0, 2.0 * math.pi)
+            count = arcSegmentCount(curve.radius, curve.sweep, tolerance)
+            for i in range(count):
+                points.append(arcPoint(curve, curve.startAngle + curve.sweep * i / count))
+    return points
+
+
+def curveLength(curve) -> float:
+    if isinstance(curve, Line):
+        return math.hypot(curve.end[0] - curve.start[0], curve.end[1] - curve.start[1])
+    elif isinstance(curve, Arc):
+        return curve.radius * abs(curve.sweep)
+    elif isinstance(curve, Circle):
+        return 2.0 * math.pi * curve.radius
+    else:
+        return sum(curveLength(segment) for segment in polylineSegments(curve))
+
+
+# signed area of a polygon, positive when counter-clockwise
+def polygonArea(points) -> float:
+    area = 0.0
+    x0, y0 = points[-1]
+    for x1, y1 in points:
+        area += x0 * y1 - x1 * y0
+        x0, y0 = x1, y1
+    return 0.5 * area
+
+
+# signed area enclosed by a directed loop of curves, positive when counter-clockwise
+# each arc adds the circular segment between its chord and the arc to the polygon of the loop's end points
+def loopArea(loop) -> float:
+    area = 0.0
+    for curve in loop:
+        if isinstance(curve, Circle):
+            area += math.pi * curve.radius * curve.radius
+            continue
+        if isinstance(curve, Polyline):
+            area += loopArea(polylineSegments(curve))
+            continue
+        x0, y0 = curveStartPoint(curve)
+        x1, y1 = curveEndPoint(curve)
+        area += 0.5 * (x0 * y1 - x1 * y0)
+        if isinstance(curve, Arc):
+            area += 0.5 * curve.radius * curve.radius * (curve.sweep - math.sin(curve.sweep))
+    return area
@@ -0,0 +1,150 @@
+# segment intersection kernels for finding a point inside a closed loop
+# the batched kernels test every segment of a loop against the crossing line at once, using NumPy when it is available
+# arcs and circles are intersected exactly, so they cost the same however large they are
+
+import math
+from .geometry import Circle, arcContainsAngle
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Calculate the intersection between two line segments.  This is based on the JS
+# sample in the second answer at:
+# http://stackoverflow.com/questions/563198/how-do-you-detect-where-two-line-segments-intersect
+def getLineIntersection(p0_x, p0_y, p1_x, p1_y, p2_x, p2_y, p3_x, p3_y):
+    s1_x = p1_x - p0_x
+    s1_y = p1_y - p0_y
+    s2_x = p3_x - p2_x
+    s2_y = p3_y - p2_y
+
+    d = (-s2_x * s1_y + s1_x * s2_y)
+
+    if d:
+        s = (-s1_y * (p0_x - p2_x) + s1_x * (p0_y - p2_y)) / d
+        t = ( s2_x * (p0_y - p2_y) - s2_y * (p0_x - p2_x)) / d
+
+        if (s >= 0 and s <= 1 and t >= 0 and t <= 1):
+            # Collision detected
+            i_x = p0_x + (t * s1_x)
+            i_y = p0_y + (t * s1_y)
+            return (i_x, i_y)
+
+    return False  # No collision
+
+
+# a line that crosses the whole bounding box diagonally, with its ends pushed outside the box
+# so there's no problem with coincident points
+def getCrossingLine(boundBox):
+    minX, minY, maxX, maxY = boundBox
+    length = math.hypot(maxX - minX, maxY - minY)
+    ux, uy = (maxX - minX) / length, (maxY - minY) / length
+    return (minX - ux, minY - uy), (maxX + ux, maxY + uy)
+
+
+# flatten connected point sets into segment end point arrays (x0, y0, x1, y1)
+def getSegmentArrays(pointSets):
+    x0, y0, x1, y1 = [], [], [], []
+    for pointSet in pointSets:
+        for (ax, ay), (bx, by) in zip(pointSet[:-1], pointSet[1:]):
+            x0.append(ax)
+            y0.append(ay)
+            x1.append(bx)
+            y1.append(by)
+    if numpy is not None:
+        return numpy.array(x0), numpy.array(y0), numpy.array(x1), numpy.array(y1)
+    return x0, y0, x1, y1
+
+
+# parameters along the crossing line p -> q of every segment it hits, in segment order
+# a segment counts when its end points lie on different sides of the line, where a point on the line counts as below it,
+# so a vertex the line passes through is counted once, and one it only touches twice or not at all
+def getCrossingParameters(segments, p, q):
+    x0, y0, x1, y1 = segments
+    s1x, s1y = q[0] - p[0], q[1] - p[1]
+    if numpy is not None and isinstance(x0, numpy.ndarray):
+        dx = p[0] - x0
+        dy = p[1] - y0
+        sideA = -s1x * dy + s1y * dx
+        sideB = s1x * (y1 - p[1]) - s1y * (x1 - p[0])
+        # the denominator of the intersection is sideB - sideA, which can't vanish for a segment that is counted
+        hit = (sideA > 0) != (sideB > 0)
+        with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+            t = ((x1 - x0) * dy - (y1 - y0) * dx) / (sideB - sideA)
+        hit &= (t >= 0) & (t <= 1)
+        return t[hit]
+
+    # same arithmetic one segment at a time when NumPy isn't available
+    params = []
+    for ax, ay, bx, by in zip(x0, y0, x1, y1):
+        dx, dy = p[0] - ax, p[1] - ay
+        sideA = -s1x * dy + s1y * dx
+        sideB = s1x * (by - p[1]) - s1y * (bx - p[0])
+        if (sideA > 0) != (sideB > 0):
+            t = ((bx - ax) * dy - (by - ay) * dx) / (sideB - sideA)
+            if 0 <= t <= 1:
+                params.append(t)
+    return params
+
+
+# parameters along the crossing line p -> q where it hits the given arcs and circles
+# solves |p + t (q - p) - center| = radius and keeps the roots on the line that lie within the sweep of the arc
+def getArcCrossingParameters(arcs, p, q):
+    dx, dy = q[0] - p[0], q[1] - p[1]
+    a = dx * dx + dy * dy
+    params = []
+    for arc in arcs:
+        fx, fy = p[0] - arc.center[0], p[1] - arc.center[1]
+        b = 2.0 * (fx * dx + fy * dy)
+        c = fx * fx + fy * fy - arc.radius * arc.radius
+        discriminant = b * b - 4.0 * a * c
+        if discriminant < 0.0:
+            continue
+        root = math.sqrt(discriminant)
+        # a tangent line touches the curve without crossing it
+        if root == 0.0:
+            continue
+        for t in ((-b - root) / (2.0 * a), (-b + root) / (2.0 * a)):
+            if not 0 <= t <= 1:
+                continue
+            if isinstance(arc, Circle):
+                params.append(t)
+                continue
+            angle = math.atan2(fy + t * dy, fx + t * dx)
+            # an end of the arc on the line counts like the end of a segment, when the arc leaves it above the line
+            for endAngle, turn in ((arc.startAngle, 1.0), (arc.startAngle + arc.sweep, -1.0)):
+                if abs(math.remainder(angle - endAngle, 2.0 * math.pi)) < 1e-9:
+                    turn = math.copysign(1.0, arc.sweep) * turn
+                    if dy * turn * math.sin(endAngle) + dx * turn * math.cos(endAngle) > 0:
+                        params.append(t)
+                    break
+            else:
+                if arcContainsAngle(arc, angle):
+                    params.append(t)
+    return params
+
+
+# midpoint of the first stretch of the crossing line inside the loop, between its first two crossings, skipping a stretch
+# that is a single point where the line touches a vertex
+# the loop is given as segment arrays plus any arcs and circles, returns None if no such stretch was found
+def getInteriorPoint(segments, boundBox, arcs = ()):
+    p, q = getCrossingLine(boundBox)
+    params = getCrossingParameters(segments, p, q)
+    if arcs:
+        arcParams = getArcCrossingParameters(arcs, p, q)
+        if numpy is not None and isinstance(params, numpy.ndarray):
+            params = numpy.concatenate((params, arcParams))
+        else:
+            params = list(params) + arcParams
+    if numpy is not None and isinstance(params, numpy.ndarray):
+        params = numpy.sort(params).tolist()
+    else:
+        params = sorted(params)
+    # the crossings pair up into the stretches of the line inside the loop
+    for first, second in zip(params[0::2], params[1::2]):
+        if second - first > 1e-12:
+            t = (first + second) / 2
+            return (p[0] + t * (q[0] - p[0]), p[1] + t * (q[1] - p[1]))
+    return None
@@ -0,0 +1,107 @@
+# long exports run as a job driven by the host application's event loop instead of inside a single event handler,
+# so the application stays responsive and the export can show its progress and be cancelled
+#
+# a job is a generator: each value it yields ends a step, either a progress value or a Future of work running on
+# another thread whose result is sent back into the generator once it is done
+# every tick runs steps until the time slice is used up, then asks the event loop for another tick through post,
+# while waiting for a Future nothing runs on the event loop, the Future posts the next tick when it completes
+# nothing here knows about Fusion, post and isCancelled are plain callables, so any loop (or a stub) can drive a job
+
+import threading
+import time
+from concurrent.futures import Future
+
+
+class ChunkedJob:
+    def __init__(self, steps, post, onProgress = None, isCancelled = None, chunkTime = 0.1, clock = time.perf_counter) -> None:
+        self.steps = steps
+        self.post = post
+        self.onProgress = onProgress
+        self.isCancelled = isCancelled
+        self.chunkTime = chunkTime
+        self.clock = clock
+        self.finished = False
+        self.cancelled = False
+        self.error = None
+        self._waiting = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.post()
+
+    # run the job for one time slice, returns whether it still has work left
+    def tick(self) -> bool:
+        with self._lock:
+            if self.finished:
+                return False
+            value, error = None, None
+            if self._waiting is not None:
+                if not self._waiting.done():
+                    # a stray tick, the Future posts again when it completes
+                    return True
+                future, self._waiting = self._waiting, None
+                error = future.exception()
+                value = future.result() if error is None else None
+
+            deadline = self.clock() + self.chunkTime
+            while True:
+                if self.isCancelled is not None and self.isCancelled():
+                    self._close(True)
+                    return False
+                try:
+                    yielded = self.steps.throw(error) if error is not None else self.steps.send(value)
+                except StopIteration:
+                    self.finished = True
+                    return False
+                except BaseException as e:
+                    # the generator is done for once it raises, the error is left to whoever drives the job
+                    self.finished = True
+                    self.error = e
+                    raise
+                value, error = None, None
+
+                if isinstance(yielded, Future):
+                    if yielded.done():
+                        error = yielded.exception()
+                        value = yielded.result() if error is None else None
+                        continue
+                    self._waiting = yielded
+                    break
+                if self.onProgress is not None:
+                    self.onProgress(yielded)
+                if self.clock() >= deadline:
+                    self.post()
+                    return True
+
+        # outside of the lock, since a Future that completes meanwhile runs the callback right away
+        self._waiting.add_done_callback(lambda future: self.post())
+        return True
+
+    # stop the job between steps, closing the generator runs its finally blocks so it can clean up after itself
+    # a Future that is still running is left to finish, its result is dropped
+    def cancel(self):
+        with self._lock:
+            if not self.finished:
+                self._close(True)
+
+    def _close(self, cancelled):
+        self.finished = True
+        self.cancelled = cancelled
+        self._waiting = None
+        self.steps.close()
+
+
+# run function(*args) on a new daemon thread, returns a Future of its result
+# daemon threads don't keep the host application from closing if a job is abandoned
+def runInThread(function, *args) -> Future:
+    future = Future()
+
+    def target():
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(function(*args))
+            except BaseException as error:
+                future.set_exception(error)
+
+    threading.Thread(target = target, daemon = True).start()
+    return future
@@ -0,0 +1,207 @@
+# placing extracted parts onto sheets and writing the result out as DXF files
+# everything here works on plain curve records, so it can run after the geometry has been pulled from Fusion
+
+import math
+import os
+import re
+from collections import namedtuple
+from .dxf import DxfWriter, formatNumber
+from .geometry import curveEndPoint, curveStartPoint, rotateCurve
+from .nesting import NestPart, nestParts, partPolygon
+from .packing import PackItem, SkylinePacker, placementTransform, rowLayout
+from .polylines import joinPolylines
+from .toolpath import ToolpathStats, addStats, boxContainsBox, orderPartCurves, orderPaths, pathStats
+from .workers import runInPool
+
+# a flat body ready to lay out, boundBox is (minX, minY, maxX, maxY) of its curves
+# parts with the same shape share their curves, repeated shapes are written once as a DXF block
+Part = namedtuple('Part', ['name', 'curves', 'boundBox', 'thickness', 'shape'], defaults = (None,))
+
+# transforms are (part index, sheet, rotation, dx, dy) of the part curves,
+# utilization is None for a single row layout, unplaced lists the indices of parts too large for the sheet
+# toolpath holds the ToolpathStats of the cutting order when the cuts have been ordered
+Layout = namedtuple('Layout', ['transforms', 'utilization', 'unplaced', 'toolpath'], defaults = (None,))
+
+
+# cluster parts whose thicknesses lie within tolerance of the thinnest part of their group
+# returns a list of (thickness, parts) with the groups ordered from thin to thick
+def groupByThickness(parts, tolerance) -> list:
+    groups = []
+    for part in sorted(parts, key = lambda part: part.thickness):
+        if len(groups) > 0 and part.thickness - groups[-1][0].thickness <= tolerance:
+            groups[-1].append(part)
+        else:
+            groups.append([part])
+    return [(sum(part.thickness for part in group) / len(group), group) for group in groups]
+
+
+# sheet sizes of zero keep the parts in a single row instead of placing them on sheets
+def layoutParts(parts, sheetWidth = 0.0, sheetHeight = 0.0, spacing = 0.5, allowRotation = True, trueShape = False,
+                nestTime = 10.0, nfpCache = None, workers = None) -> Layout:
+    items = [PackItem(i, part.boundBox[2] - part.boundBox[0], part.boundBox[3] - part.boundBox[1]) for i, part in enumerate(parts)]
+    if sheetWidth > 0.0 and sheetHeight > 0.0 and trueShape:
+        # the outlines are tessellated for the search, so leave room for the curves to bulge past their chords
+        tolerance = 0.01
+        nestItems = []
+        for i, part in enumerate(parts):
+            minX, minY, maxX, maxY = part.boundBox
+            polygon = partPolygon(part.curves, tolerance) or [(minX, minY), (maxX, minY), (maxX, maxY), (minX, maxY)]
+            nestItems.append(NestPart(i, polygon))
+        result = nestParts(nestItems, sheetWidth - 2 * tolerance, sheetHeight - 2 * tolerance, spacing + 2 * tolerance,
+                           4 if allowRotation else 1, nestTime, workers, nfpCache)
+        transforms = [(p.key, p.sheet, p.angle, p.x + tolerance, p.y + tolerance) for p in result.placements]
+        return Layout(transforms, result.utilization, result.unplaced)
+    elif sheetWidth > 0.0 and sheetHeight > 0.0:
+        # pack the bounding boxes of the parts
+        packer = SkylinePacker(sheetWidth, sheetHeight, spacing, allowRotation)
+        placements, unplaced = packer.pack(items)
+        transforms = [(p.key, p.sheet) + placementTransform(p, parts[p.key].boundBox) for p in placements]
+        return Layout(transforms, packer.sheetUtilization(), unplaced)
+    else:
+        transforms = [(p.key, p.sheet) + placementTransform(p, parts[p.key].boundBox) for p in rowLayout(items, spacing)]
+        return Layout(transforms, None, [])
+
+
+def _placePoint(point, angle, dx, dy):
+    cosA, sinA = math.cos(angle), math.sin(angle)
+    return (point[0] * cosA - point[1] * sinA + dx, point[0] * sinA + point[1] * cosA + dy)
+
+
+# the parts with their curves joined into polylines, copies of a shape share their curves, so each shape is joined once
+def joinPartCurves(parts, simplifyTolerance = 0.0) -> list:
+    joinedCurves = {}
+    joinedParts = []
+    for part in parts:
+        if id(part.curves) not in joinedCurves:
+            joinedCurves[id(part.curves)] = joinPolylines(part.curves, simplifyTolerance = simplifyTolerance)
+        joinedParts.append(part._replace(curves = joinedCurves[id(part.curves)]))
+    return joinedParts
+
+
+# order the cuts of a layout: the loops of every part holes first, then the parts on each sheet by their pierce points,
+# cutting parts that sit inside the bounding box of another part (e.g. nested into its hole) ahead of it
+# returns the parts with their curves in cutting order, the transforms in cutting order and the ToolpathStats
+def orderCuts(parts, layout):
+    # copies of a shape share their curves, so each shape is ordered once
+    orderedCurves = {}
+    partStats = {}
+    orderedParts = []
+    for part in parts:
+        if id(part.curves) not in orderedCurves:
+            curves = orderPartCurves(part.curves)
+            orderedCurves[id(part.curves)] = curves
+            partStats[id(part.curves)] = pathStats(curves)
+        orderedParts.append(part._replace(curves = orderedCurves[id(part.curves)]))
+
+    sheets = {}
+    for transform in layout.transforms:
+        sheets.setdefault(transform[1], []).append(transform)
+
+    transforms = []
+    stats = ToolpathStats(0.0, 0, 0.0)
+    for sheet in sorted(sheets):
+        sheetTransforms = sheets[sheet]
+        entries, exits, boxes = [], [], []
+        for key, partSheet, angle, dx, dy in sheetTransforms:
+            curves = orderedParts[key].curves
+            if len(curves) > 0:
+                entries.append(_placePoint(curveStartPoint(curves[0]), angle, dx, dy))
+                exits.append(_placePoint(curveEndPoint(curves[-1]), angle, dx, dy))
+            else:
+                entries.append((dx, dy))
+                exits.append((dx, dy))
+            minX, minY, maxX, maxY = orderedParts[key].boundBox
+            corners = [_placePoint(corner, angle, dx, dy) for corner in ((minX, minY), (maxX, minY), (maxX, maxY), (minX, maxY))]
+            boxes.append((min(x for x, y in corners), min(y for x, y in corners), max(x for x, y in corners), max(y for x, y in corners)))
+        before = [[j for j in range(len(boxes)) if j != i and boxContainsBox(boxes[i], boxes[j]) and not boxContainsBox(boxes[j], boxes[i])]
+                  for i in range(len(boxes))]
+
+        # every sheet is cut starting from its origin
+        order = orderPaths(entries, exits, before)
+        position = (0.0, 0.0)
+        for i in order:
+            transforms.append(sheetTransforms[i])
+            stats = addStats(stats, partStats[id(parts[sheetTransforms[i][0]].curves)])
+            stats = stats._replace(travel = stats.travel + math.hypot(entries[i][0] - position[0], entries[i][1] - position[1]))
+            position = exits[i]
+    return orderedParts, transforms, stats
+
+
+# lay out the parts, separately for each thickness when a tolerance is given
+# returns a list of (thickness, parts, layout), thickness is None when the parts aren't grouped
+# the nesting time is shared between the groups, with polylines the parts come back with their curves joined
+# (see joinPolylines), with cutOrder the parts and layouts come back in cutting order
+def layoutGroups(parts, thicknessTolerance = None, sheetWidth = 0.0, sheetHeight = 0.0, spacing = 0.5,
+                 allowRotation = True, trueShape = False, nestTime = 10.0, nfpCache = None, workers = None,
+                 cutOrder = False, polylines = False, simplifyTolerance = 0.0) -> list:
+    if thicknessTolerance is not None:
+        groups = groupByThickness(parts, thicknessTolerance)
+    else:
+        groups = [(None, parts)]
+    groupTime = max(1.0, nestTime / max(len(groups), 1))
+    layouts = []
+    for thickness, groupParts in groups:
+        layout = layoutParts(groupParts, sheetWidth, sheetHeight, spacing, allowRotation, trueShape, groupTime, nfpCache, workers)
+        if polylines:
+            groupParts = joinPartCurves(groupParts, simplifyTolerance)
+        if cutOrder and len(layout.transforms) > 0:
+            groupParts, transforms, stats = orderCuts(groupParts, layout)
+            layout = layout._replace(transforms = transforms, toolpath = stats)
+        layouts.append((thickness, groupParts, layout))
+    return layouts
+
+
+# blocks for the shapes placed more than once in the layout, as (name, curves) named after the first part of each shape
+# returns the blocks and the block name of each of those shapes
+def layoutBlocks(parts, transforms):
+    placed = {}
+    for key, sheet, angle, dx, dy in transforms:
+        shape = parts[key].shape
+        if shape is not None:
+            placed.setdefault(shape, []).append(key)
+    blocks = []
+    blockNames = {}
+    for shape, keys in placed.items():
+        if len(keys) > 1:
+            # block names can't contain most punctuation
+            name = re.sub(r'[^A-Za-z0-9_-]', '_', parts[keys[0]].name) or 'PART'
+            while name in blockNames.values():
+                name += '_' + str(len(blocks))
+            blockNames[shape] = name
+            blocks.append((name, parts[keys[0]].curves))
+    return blocks, blockNames
+
+
+# write each placed part, sheets are laid side by side along x every sheetPitch
+# the parts of the shapes in blockNames are placed as inserts of their block
+def writeLayout(writer, parts, transforms, sheetPitch, blockNames = None):
+    for key, sheet, angle, dx, dy in transforms:
+        part = parts[key]
+        if blockNames and part.shape in blockNames:
+            writer.writeInsert(blockNames[part.shape], sheet * sheetPitch + dx, dy, angle)
+            continue
+        curves = part.curves
+        if angle:
+            curves = [rotateCurve(curve, angle) for curve in curves]
+        writer.writeCurves(curves, sheet * sheetPitch + dx, dy)
+
+
+# task is (path, parts, transforms, sheetPitch, units, scale), returns the path once the file is complete
+def writeLayoutFile(task) -> str:
+    path, parts, transforms, sheetPitch, units, scale = task
+    blocks, blockNames = layoutBlocks(parts, transforms)
+    with open(path, 'w') as stream:
+        with DxfWriter(stream, units, scale, blocks = blocks) as writer:
+            writeLayout(writer, parts, transforms, sheetPitch, blockNames)
+    return path
+
+
+# serialize several layouts at once, one file per task
+def writeLayoutFiles(tasks, workers = None) -> list:
+    return runInPool(writeLayoutFile, tasks, workers)
+
+
+# path of the file for one thickness group, e.g. parts.dxf becomes parts_3.175mm.dxf
+def groupFilePath(path, thickness, units) -> str:
+    base, extension = os.path.splitext(path)
+    return base + '_' + formatNumber(round(thickness, 3)) + units + (extension or '.dxf')
@@ -0,0 +1,506 @@
+# true-shape nesting of part outlines on rectangular sheets
+# each part is reduced to a polygon of its outer boundary and split into convex pieces, so the no-fit polygon (NFP)
+# between two parts is the set of convex minkowski sums of their pieces. parts are placed with a bottom-left rule over
+# the NFP vertices, and part orderings are searched in a process pool until the time budget runs out.
+# holes are not used for placement, a part is never nested inside the hole of another part.
+
+import concurrent.futures
+import hashlib
+import math
+import json
+import os
+import random
+import time
+from collections import namedtuple
+from .cache import LruCache
+from .geometry import chainLoops, tessellateLoop, polygonArea
+from .workers import poolContext
+
+# a part to nest, polygon is its outer boundary in the same coordinates as the curves it came from
+NestPart = namedtuple('NestPart', ['key', 'polygon'])
+
+# rotate the part's curves by angle about the origin, then translate them by (x, y) to put them on the sheet
+NestPlacement = namedtuple('NestPlacement', ['key', 'sheet', 'angle', 'x', 'y'])
+
+NestResult = namedtuple('NestResult', ['placements', 'unplaced', 'utilization'])
+
+# a part polygon at one rotation, moved so its bounding box starts at the origin
+PreparedShape = namedtuple('PreparedShape', ['minX', 'minY', 'width', 'height', 'pieces'])
+
+EPSILON = 1e-7
+NFP_CACHE_VERSION = 1
+
+
+# outer boundary of a part as a counter-clockwise polygon, or None if the curves don't form a closed loop
+def partPolygon(curves, tolerance = 0.01):
+    loops, chains = chainLoops(curves, 1e-5)
+    best = None
+    for loop in loops:
+        polygon = tessellateLoop(loop, tolerance)
+        if len(polygon) >= 3 and (best is None or abs(polygonArea(polygon)) > abs(polygonArea(best))):
+            best = polygon
+    if best is None:
+        return None
+    return best if polygonArea(best) > 0.0 else best[::-1]
+
+
+def _cross(o, a, b):
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def _rotatePoints(points, angle):
+    cosA, sinA = math.cos(angle), math.sin(angle)
+    return [(x * cosA - y * sinA, x * sinA + y * cosA) for x, y in points]
+
+
+def _boundingBox(points):
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+# drop repeated and collinear vertices
+def _cleanPolygon(points, tolerance = 1e-9):
+    cleaned = []
+    for point in points:
+        if not cleaned or abs(point[0] - cleaned[-1][0]) > tolerance or abs(point[1] - cleaned[-1][1]) > tolerance:
+            cleaned.append(point)
+    if len(cleaned) > 1 and abs(cleaned[0][0] - cleaned[-1][0]) <= tolerance and abs(cleaned[0][1] - cleaned[-1][1]) <= tolerance:
+        cleaned.pop()
+    changed = True
+    while changed and len(cleaned) > 3:
+        changed = False
+        for i in range(len(cleaned)):
+            if abs(_cross(cleaned[i - 1], cleaned[i], cleaned[(i + 1) % len(cleaned)])) <= tolerance:
+                del cleaned[i]
+                changed = True
+                break
+    return cleaned
+
+
+def convexHull(points):
+    points = sorted(set(points))
+    if len(points) < 3:
+        return points
+    lower, upper = [], []
+    for p in points:
+        while len(lower) >= 2 and _cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(points):
+        while len(upper) >= 2 and _cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
+
+
+def _isConvex(points) -> bool:
+    n = len(points)
+    return all(_cross(points[i - 1], points[i], points[(i + 1) % n]) >= -EPSILON for i in range(n))
+
+
+# split a counter-clockwise simple polygon into convex pieces
+# ear clipping gives triangles, then Hertel-Mehlhorn merging removes every diagonal that isn't needed for convexity
+def convexDecomposition(points):
+    points = _cleanPolygon(points)
+    if len(points) < 3:
+        return []
+    if _isConvex(points):
+        return [points]
+
+    # ear clipping on vertex indices
+    remaining = list(range(len(points)))
+    triangles = []
+    guard = 0
+    while len(remaining) > 3 and guard < 4 * len(points) * len(points):
+        guard += 1
+        n = len(remaining)
+        for k in range(n):
+            i, j, l = remaining[k - 1], remaining[k], remaining[(k + 1) % n]
+            a, b, c = points[i], points[j], points[l]
+            if _cross(a, b, c) <= EPSILON:
+                continue
+            # an ear can't contain any other remaining vertex
+            for m in remaining:
+                if m in (i, j, l):
+                    continue
+                p = points[m]
+                if _cross(a, b, p) >= -EPSILON and _cross(b, c, p) >= -EPSILON and _cross(c, a, p) >= -EPSILON:
+                    break
+            else:
+                triangles.append([i, j, l])
+                del remaining[k]
+                break
+        else:
+            # no ear found, the polygon is not simple so fall back to its hull
+            return [convexHull(points)]
+    triangles.append(remaining)
+
+    # merge pieces across shared diagonals while the result stays convex
+    pieces = triangles
+    merged = True
+    while merged:
+        merged = False
+        edgeOwner = {}
+        for pieceIndex, piece in enumerate(pieces):
+            for k in range(len(piece)):
+                edgeOwner[(piece[k], piece[(k + 1) % len(piece)])] = pieceIndex
+        for (u, v), a in edgeOwner.items():
+            b = edgeOwner.get((v, u))
+            if b is None or b == a:
+                continue
+            pieceA, pieceB = pieces[a], pieces[b]
+            # rotate A to run v..u and B to run u..v, then join them
+            k = pieceA.index(v)
+            pathA = pieceA[k:] + pieceA[:k]
+            k = pieceB.index(u)
+            pathB = pieceB[k:] + pieceB[:k]
+            candidate = pathA[:-1] + pathB[:-1]
+            if _isConvex([points[i] for i in candidate]):
+                pieces = [piece for i, piece in enumerate(pieces) if i not in (a, b)] + [candidate]
+                merged = True
+                break
+    return [[points[i] for i in piece] for piece in pieces]
+
+
+# minkowski sum of two counter-clockwise convex polygons by merging their edges in angular order
+def minkowskiSum(polyA, polyB):
+    def lowestFirst(poly):
+        k = min(range(len(poly)), key = lambda i: (poly[i][1], poly[i][0]))
+        return poly[k:] + poly[:k]
+
+    polyA = lowestFirst(polyA)
+    polyB = lowestFirst(polyB)
+    n, m = len(polyA), len(polyB)
+    result = []
+    i = j = 0
+    while i < n or j < m:
+        a0, a1 = polyA[i % n], polyA[(i + 1) % n]
+        b0, b1 = polyB[j % m], polyB[(j + 1) % m]
+        result.append((a0[0] + b0[0], a0[1] + b0[1]))
+        if i == n:
+            j += 1
+            continue
+        if j == m:
+            i += 1
+            continue
+        cross = (a1[0] - a0[0]) * (b1[1] - b0[1]) - (a1[1] - a0[1]) * (b1[0] - b0[0])
+        if cross > EPSILON:
+            i += 1
+        elif cross < -EPSILON:
+            j += 1
+        else:
+            i += 1
+            j += 1
+    return _cleanPolygon(result)
+
+
+# push every edge of a convex counter-clockwise polygon outwards by distance
+def inflateConvex(points, distance):
+    if distance <= 0.0 or len(points) < 3:
+        return points
+    n = len(points)
+    lines = []
+    for i in range(n):
+        (x0, y0), (x1, y1) = points[i], points[(i + 1) % n]
+        length = math.hypot(x1 - x0, y1 - y0)
+        nx, ny = (y1 - y0) / length, (x0 - x1) / length
+        lines.append(((x0 + nx * distance, y0 + ny * distance), (x1 - x0, y1 - y0)))
+    inflated = []
+    for i in range(n):
+        (p, r), (q, s) = lines[i - 1], lines[i]
+        denom = r[0] * s[1] - r[1] * s[0]
+        if abs(denom) < EPSILON:
+            inflated.append(q)
+        else:
+            t = ((q[0] - p[0]) * s[1] - (q[1] - p[1]) * s[0]) / denom
+            inflated.append((p[0] + t * r[0], p[1] + t * r[1]))
+    return inflated
+
+
+def _strictlyInside(points, x, y) -> bool:
+    n = len(points)
+    for i in range(n):
+        (x0, y0), (x1, y1) = points[i - 1], points[i]
+        if (x1 - x0) * (y - y0) - (y1 - y0) * (x - x0) <= EPSILON:
+            return False
+    return True
+
+
+# canonical form of a polygon: rotated so its longest edge lies along x and moved to the origin
+# returns (shape key, canonical polygon, angle that rotates the canonical polygon back to the original orientation)
+def canonicalShape(polygon, precision = 4):
+    n = len(polygon)
+    longest = max(range(n), key = lambda i: math.hypot(polygon[(i + 1) % n][0] - polygon[i][0], polygon[(i + 1) % n][1] - polygon[i][1]))
+    (x0, y0), (x1, y1) = polygon[longest], polygon[(longest + 1) % n]
+    angle = math.atan2(y1 - y0, x1 - x0)
+    rotated = _rotatePoints(polygon, -angle)
+    minX, minY, maxX, maxY = _boundingBox(rotated)
+    canonical = [(x - minX, y - minY) for x, y in rotated]
+
+    # start from the lowest vertex so the key doesn't depend on where the loop began
+    rounded = [(round(x, precision), round(y, precision)) for x, y in canonical]
+    k = min(range(n), key = lambda i: rounded[i])
+    key = hashlib.sha1(repr(rounded[k:] + rounded[:k]).encode()).hexdigest()
+    return key, canonical, angle
+
+
+def _angleKey(angle):
+    return round(math.degrees(angle) % 360.0, 3)
+
+
+# NFPs keyed by (shape, rotation) of both parts and the spacing, optionally kept on disk between runs
+# the file is plain JSON, reading it back only ever makes numbers and strings, so a file that was tampered with can at
+# worst spoil the layout, it can't run anything
+class NfpCache(LruCache):
+    def __init__(self, path = None, maxEntries = 200000) -> None:
+        super().__init__(maxEntries)
+        self.path = path
+        if path and os.path.isfile(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if data.get('version') != NFP_CACHE_VERSION:
+                    raise ValueError('nfp cache of another version')
+                for (keyA, angleA, keyB, angleB, spacing), value in data['entries']:
+                    self.put((str(keyA), float(angleA), str(keyB), float(angleB), float(spacing)),
+                             [([(float(x), float(y)) for x, y in polygon], tuple(float(c) for c in boundBox)) for polygon, boundBox in value])
+            except (OSError, ValueError, TypeError, KeyError, AttributeError):
+                # a damaged or outdated cache is just an empty one
+                self.entries.clear()
+
+    # the entries between the given shapes at the given spacing, the cache also holds the NFPs of earlier jobs
+    def entriesFor(self, shapes, spacing) -> dict:
+        spacing = round(spacing, 6)
+        return {key: value for key, value in self.entries.items() if key[0] in shapes and key[2] in shapes and key[4] == spacing}
+
+    def save(self):
+        if not self.path:
+            return
+        tempPath = self.path + '.tmp'
+        with open(tempPath, 'w') as f:
+            json.dump({'version': NFP_CACHE_VERSION, 'entries': list(self.entries.items())}, f)
+        os.replace(tempPath, self.path)
+
+
+class _Nester:
+    # shapes maps shape key -> canonical polygon, parts is a list of (shape key, canonical angle, area)
+    # angles are the allowed orientations of the canonical shapes, None keeps every part in its original orientation
+    def __init__(self, shapes, parts, sheetWidth, sheetHeight, spacing, angles, cache) -> None:
+        self.shapes = shapes
+        self.parts = parts
+        self.sheetWidth = sheetWidth
+        self.sheetHeight = sheetHeight
+        self.spacing = spacing
+        self.angles = angles
+        self.cache = cache
+        self.prepared = {}
+        self.nfps = {}
+        self.newEntries = {}
+
+    def prepare(self, shapeKey, angle) -> PreparedShape:
+        key = (shapeKey, _angleKey(angle))
+        shape = self.prepared.get(key)
+        if shape is None:
+            polygon = _rotatePoints(self.shapes[shapeKey], angle)
+            minX, minY, maxX, maxY = _boundingBox(polygon)
+            polygon = [(x - minX, y - minY) for x, y in polygon]
+            shape = PreparedShape(minX, minY, maxX - minX, maxY - minY, convexDecomposition(polygon))
+            self.prepared[key] = shape
+        return shape
+
+    # positions of B's origin (relative to A's origin) where B would come closer to A than the spacing,
+    # as a list of convex polygons with their bounding boxes
+    def nfp(self, keyA, angleA, keyB, angleB):
+        key = (keyA, _angleKey(angleA), keyB, _angleKey(angleB), round(self.spacing, 6))
+        value = self.nfps.get(key)
+        if value is not None:
+            return value
+        value = self.cache.get(key)
+        if value is None:
+            piecesA = self.prepare(keyA, angleA).pieces
+            piecesB = self.prepare(keyB, angleB).pieces
+            value = []
+            for pieceA in piecesA:
+                for pieceB in piecesB:
+                    polygon = inflateConvex(minkowskiSum(pieceA, [(-x, -y) for x, y in pieceB]), self.spacing)
+                    if len(polygon) >= 3:
+                        value.append((polygon, _boundingBox(polygon)))
+            self.cache.put(key, value)
+            self.newEntries[key] = value
+        self.nfps[key] = value
+        return value
+
+    def _feasible(self, placed, shapeKey, angle, x, y) -> bool:
+        for otherKey, otherAngle, otherX, otherY in placed:
+            px, py = x - otherX, y - otherY
+            for polygon, (minX, minY, maxX, maxY) in self.nfp(otherKey, otherAngle, shapeKey, angle):
+                if minX < px < maxX and minY < py < maxY and _strictlyInside(polygon, px, py):
+                    return False
+        return True
+
+    # lowest-left feasible position for a shape on a sheet, or None
+    def _findPosition(self, placed, shapeKey, angle):
+        shape = self.prepare(shapeKey, angle)
+        maxX = self.sheetWidth - shape.width
+        maxY = self.sheetHeight - shape.height
+        if maxX < -EPSILON or maxY < -EPSILON:
+            return None
+        maxX, maxY = max(maxX, 0.0), max(maxY, 0.0)
+
+        candidates = {(0.0, 0.0), (maxX, 0.0), (0.0, maxY), (maxX, maxY)}
+        for otherKey, otherAngle, otherX, otherY in placed:
+            for polygon, boundBox in self.nfp(otherKey, otherAngle, shapeKey, angle):
+                for vx, vy in polygon:
+                    cx = min(max(vx + otherX, 0.0), maxX)
+                    cy = min(max(vy + otherY, 0.0), maxY)
+                    candidates.add((cx, cy))
+        for x, y in sorted(candidates):
+            if self._feasible(placed, shapeKey, angle, x, y):
+                return (x, y)
+        return None
+
+    # place parts in the given order, returns (score, placements, unplaced part indices)
+    def evaluate(self, order):
+        sheets = []
+        placements = []
+        unplaced = []
+        for partIndex in order:
+            shapeKey, canonicalAngle, area = self.parts[partIndex]
+            angles = self.angles if self.angles is not None else [canonicalAngle]
+            found = None
+            for sheetIndex in range(len(sheets) + 1):
+                placed = sheets[sheetIndex] if sheetIndex < len(sheets) else []
+                for angle in angles:
+                    position = self._findPosition(placed, shapeKey, angle)
+                    if position and (found is None or position < found[1]):
+                        found = (angle, position)
+                if found:
+                    if sheetIndex == len(sheets):
+                        sheets.append([])
+                    angle, (x, y) = found
+                    sheets[sheetIndex].append((shapeKey, angle, x, y))
+                    placements.append((partIndex, sheetIndex, angle, x, y))
+                    break
+            if found is None:
+                unplaced.append(partIndex)
+
+        # fewer unplaced parts, then fewer sheets, then a shorter last sheet
+        lastExtent = 0.0
+        if sheets:
+            for shapeKey, angle, x, y in sheets[-1]:
+                lastExtent = max(lastExtent, x + self.prepare(shapeKey, angle).width)
+        return (len(unplaced), len(sheets), lastExtent), placements, unplaced
+
+    def takeNewEntries(self):
+        entries = self.newEntries
+        self.newEntries = {}
+        return entries
+
+
+_workerNester = None
+
+
+def _initWorker(shapes, parts, sheetWidth, sheetHeight, spacing, angles, entries):
+    global _workerNester
+    cache = NfpCache()
+    cache.entries.update(entries)
+    _workerNester = _Nester(shapes, parts, sheetWidth, sheetHeight, spacing, angles, cache)
+
+
+def _evaluateInWorker(order):
+    score, placements, unplaced = _workerNester.evaluate(order)
+    return order, score, placements, unplaced, _workerNester.takeNewEntries()
+
+
+def _mutateOrder(order, rng):
+    order = list(order)
+    if len(order) < 2:
+        return order
+    i, j = rng.sample(range(len(order)), 2)
+    if rng.random() < 0.5:
+        order[i], order[j] = order[j], order[i]
+    else:
+        order.insert(j, order.pop(i))
+    return order
+
+
+# nest parts on sheets, spending up to timeBudget seconds searching for a better part order
+# rotations is the number of evenly spaced orientations each part may take
+def nestParts(parts, sheetWidth, sheetHeight, spacing = 0.0, rotations = 4, timeBudget = 10.0, workers = None,
+              cache = None, seed = None) -> NestResult:
+    startTime = time.time()
+    cache = cache if cache is not None else NfpCache()
+    rng = random.Random(seed)
+
+    # identical outlines share a canonical shape, and with it their NFPs
+    shapes = {}
+    nestItems = []
+    for part in parts:
+        shapeKey, canonical, canonicalAngle = canonicalShape(part.polygon)
+        shapes[shapeKey] = canonical
+        nestItems.append((shapeKey, canonicalAngle, abs(polygonArea(part.polygon))))
+    angles = [2.0 * math.pi * k / rotations for k in range(rotations)] if rotations > 1 else None
+    nester = _Nester(shapes, nestItems, sheetWidth, sheetHeight, spacing, angles, cache)
+
+    bestOrder = sorted(range(len(parts)), key = lambda i: nestItems[i][2], reverse = True)
+    bestScore, bestPlacements, bestUnplaced = nester.evaluate(bestOrder)
+
+    def consider(order, score, placements, unplaced):
+        nonlocal bestOrder, bestScore, bestPlacements, bestUnplaced
+        if score < bestScore:
+            bestOrder, bestScore, bestPlacements, bestUnplaced = order, score, placements, unplaced
+
+    deadline = startTime + timeBudget
+    if len(parts) > 1 and time.time() < deadline:
+        workers = workers or os.cpu_count() or 1
+        context = poolContext() if workers > 1 else None
+        searched = False
+        if context is not None:
+            try:
+                # every worker gets a pickled copy of the entries it starts with, so only the ones this job can use
+                pool = concurrent.futures.ProcessPoolExecutor(workers, context, _initWorker,
+                    (shapes, nestItems, sheetWidth, sheetHeight, spacing, angles, cache.entriesFor(shapes, spacing)))
+                try:
+                    pending = set()
+                    while time.time() < deadline:
+                        while len(pending) < 2 * workers:
+                            pending.add(pool.submit(_evaluateInWorker, _mutateOrder(bestOrder, rng)))
+                        done, pending = concurrent.futures.wait(pending, max(deadline - time.time(), 0.0),
+                            concurrent.futures.FIRST_COMPLETED)
+                        for future in done:
+                            order, score, placements, unplaced, entries = future.result()
+                            for key, value in entries.items():
+                                cache.put(key, value)
+                            consider(order, score, placements, unplaced)
+                finally:
+                    pool.shutdown(wait = True, cancel_futures = True)
+                searched = True
+            except (OSError, concurrent.futures.process.BrokenProcessPool):
+                searched = False
+
+        # search in this process if workers could not be started
+        if not searched:
+            while time.time() < deadline:
+                order = _mutateOrder(bestOrder, rng)
+                score, placements, unplaced = nester.evaluate(order)
+                consider(order, score, placements, unplaced)
+
+    cache.save()
+
+    # express each placement as a transform of the part's original geometry
+    results = []
+    sheetAreas = {}
+    for partIndex, sheetIndex, angle, x, y in bestPlacements:
+        shapeKey, canonicalAngle, area = nestItems[partIndex]
+        # the canonical shape is the original rotated back by canonicalAngle, so the original needs the difference,
+        # after which its bounding box lines up with the placed canonical shape
+        rotation = angle - canonicalAngle
+        minX, minY, maxX, maxY = _boundingBox(_rotatePoints(parts[partIndex].polygon, rotation))
+        results.append(NestPlacement(parts[partIndex].key, sheetIndex, rotation, x - minX, y - minY))
+        sheetAreas[sheetIndex] = sheetAreas.get(sheetIndex, 0.0) + area
+
+    sheetArea = sheetWidth * sheetHeight
+    utilization = [sheetAreas[i] / sheetArea for i in sorted(sheetAreas)]
+    return NestResult(results, [parts[i].key for i in bestUnplaced], utilization)
+
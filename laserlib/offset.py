@@ -0,0 +1,292 @@
+# offsetting of closed loops of lines and arcs, used to compensate for the laser kerf
+# each curve is moved sideways by the offset distance (arcs change radius), neighbouring curves are trimmed to their
+# intersection or joined with a round corner, and curves that collapse or turn back on themselves are removed
+
+import math
+from .containment import loopContainment, loopDepths
+from .geometry import Line, Arc, Circle, Polyline, arcPoint, chainLoops, curveEndPoint, curveStartPoint, loopArea, \
+    polylineSegments, reverseCurve
+
+TOLERANCE = 1e-9
+
+
+class OffsetError(Exception):
+    pass
+
+
+def _tangentAtStart(curve):
+    if isinstance(curve, Line):
+        dx, dy = curve.end[0] - curve.start[0], curve.end[1] - curve.start[1]
+        length = math.hypot(dx, dy)
+        return (dx / length, dy / length)
+    sign = 1.0 if curve.sweep > 0.0 else -1.0
+    return (-sign * math.sin(curve.startAngle), sign * math.cos(curve.startAngle))
+
+
+def _tangentAtEnd(curve):
+    if isinstance(curve, Line):
+        return _tangentAtStart(curve)
+    sign = 1.0 if curve.sweep > 0.0 else -1.0
+    angle = curve.startAngle + curve.sweep
+    return (-sign * math.sin(angle), sign * math.cos(angle))
+
+
+# move a curve by distance to the right of its direction of travel, returns None if an arc shrinks to nothing
+def offsetCurve(curve, distance):
+    if isinstance(curve, Line):
+        tx, ty = _tangentAtStart(curve)
+        nx, ny = ty * distance, -tx * distance
+        return Line((curve.start[0] + nx, curve.start[1] + ny), (curve.end[0] + nx, curve.end[1] + ny))
+
+    # the right side of a counter-clockwise arc is away from its center
+    radius = curve.radius + distance if curve.sweep > 0.0 else curve.radius - distance
+    if radius <= TOLERANCE:
+        return None
+    return curve._replace(radius = radius)
+
+
+# parameter of a point along a curve, 0 at the start, 1 at the end of a line or the absolute sweep at the end of an arc
+def _parameter(curve, point):
+    if isinstance(curve, Line):
+        dx, dy = curve.end[0] - curve.start[0], curve.end[1] - curve.start[1]
+        return ((point[0] - curve.start[0]) * dx + (point[1] - curve.start[1]) * dy) / (dx * dx + dy * dy)
+    sign = 1.0 if curve.sweep > 0.0 else -1.0
+    angle = math.atan2(point[1] - curve.center[1], point[0] - curve.center[0])
+    param = ((angle - curve.startAngle) * sign) % (2.0 * math.pi)
+    # angles just before the start are treated as a small extension rather than an almost full turn
+    if param > abs(curve.sweep) + 0.5 * (2.0 * math.pi - abs(curve.sweep)):
+        param -= 2.0 * math.pi
+    return param
+
+
+def _parameterLength(curve):
+    return 1.0 if isinstance(curve, Line) else abs(curve.sweep)
+
+
+# the part of a curve between two parameters
+def _trimCurve(curve, startParam, endParam):
+    if isinstance(curve, Line):
+        dx, dy = curve.end[0] - curve.start[0], curve.end[1] - curve.start[1]
+        return Line((curve.start[0] + dx * startParam, curve.start[1] + dy * startParam),
+                    (curve.start[0] + dx * endParam, curve.start[1] + dy * endParam))
+    sign = 1.0 if curve.sweep > 0.0 else -1.0
+    return Arc(curve.center, curve.radius, curve.startAngle + sign * startParam, sign * (endParam - startParam))
+
+
+# intersections of the infinite line or full circle carrying each curve
+def _intersections(curveA, curveB):
+    if isinstance(curveA, Line) and isinstance(curveB, Line):
+        (px, py), (rx, ry) = curveA.start, (curveA.end[0] - curveA.start[0], curveA.end[1] - curveA.start[1])
+        (qx, qy), (sx, sy) = curveB.start, (curveB.end[0] - curveB.start[0], curveB.end[1] - curveB.start[1])
+        denom = rx * sy - ry * sx
+        if abs(denom) <= TOLERANCE * math.hypot(rx, ry) * math.hypot(sx, sy):
+            return []
+        t = ((qx - px) * sy - (qy - py) * sx) / denom
+        return [(px + t * rx, py + t * ry)]
+    if isinstance(curveA, Arc) and isinstance(curveB, Line):
+        curveA, curveB = curveB, curveA
+    if isinstance(curveA, Line):
+        # line and circle
+        (px, py) = curveA.start
+        dx, dy = curveA.end[0] - px, curveA.end[1] - py
+        length = math.hypot(dx, dy)
+        dx, dy = dx / length, dy / length
+        (cx, cy), r = curveB.center, curveB.radius
+        along = (cx - px) * dx + (cy - py) * dy
+        footX, footY = px + along * dx, py + along * dy
+        distSq = (cx - footX) ** 2 + (cy - footY) ** 2
+        if distSq > r * r:
+            return []
+        half = math.sqrt(r * r - distSq)
+        return [(footX - half * dx, footY - half * dy), (footX + half * dx, footY + half * dy)]
+
+    # two circles
+    (x0, y0), r0 = curveA.center, curveA.radius
+    (x1, y1), r1 = curveB.center, curveB.radius
+    dist = math.hypot(x1 - x0, y1 - y0)
+    if dist <= TOLERANCE or dist > r0 + r1 or dist < abs(r0 - r1):
+        return []
+    a = (r0 * r0 - r1 * r1 + dist * dist) / (2.0 * dist)
+    h = math.sqrt(max(r0 * r0 - a * a, 0.0))
+    mx, my = x0 + a * (x1 - x0) / dist, y0 + a * (y1 - y0) / dist
+    ox, oy = h * (y1 - y0) / dist, -h * (x1 - x0) / dist
+    return [(mx + ox, my + oy), (mx - ox, my - oy)]
+
+
+def _distance(p, q):
+    return math.hypot(p[0] - q[0], p[1] - q[1])
+
+
+# offset a single closed loop, a positive distance grows the area it encloses and a negative one shrinks it
+# returns the offset loop, or an empty list if the loop vanishes (a hole smaller than the offset)
+def offsetLoop(loop, distance):
+    if len(loop) == 1 and isinstance(loop[0], Circle):
+        radius = loop[0].radius + distance
+        return [loop[0]._replace(radius = radius)] if radius > TOLERANCE else []
+
+    curves = []
+    for curve in loop:
+        curves.extend(polylineSegments(curve) if isinstance(curve, Polyline) else [curve])
+
+    # work on a counter-clockwise loop so growing the area always means moving to the right of the curves
+    if loopArea(curves) < 0.0:
+        curves = [reverseCurve(curve) for curve in reversed(curves)]
+
+    # offset every curve, remembering which original corner follows it
+    items = []
+    for i, curve in enumerate(curves):
+        moved = offsetCurve(curve, distance)
+        if moved is not None:
+            items.append((moved, i))
+    if not items:
+        return []
+
+    for attempt in range(len(curves) + 1):
+        count = len(items)
+        params = [[0.0, _parameterLength(moved)] for moved, i in items]
+        corners = [None] * count
+        for k in range(count):
+            (curveA, indexA), (curveB, indexB) = items[k], items[(k + 1) % count]
+            end, start = curveEndPoint(curveA), curveStartPoint(curveB)
+            if _distance(end, start) <= 1e-7:
+                continue
+
+            adjacent = (indexA + 1) % len(curves) == indexB
+            vertex = curveEndPoint(curves[indexA])
+            tangentA, tangentB = _tangentAtEnd(curveA), _tangentAtStart(curveB)
+            turn = tangentA[0] * tangentB[1] - tangentA[1] * tangentB[0]
+
+            if adjacent and turn * distance > 0.0:
+                # the curves move apart around an outside corner, so fill the gap with an arc about the corner
+                startAngle = math.atan2(end[1] - vertex[1], end[0] - vertex[0])
+                ux, uy = end[0] - vertex[0], end[1] - vertex[1]
+                vx, vy = start[0] - vertex[0], start[1] - vertex[1]
+                sweep = math.atan2(ux * vy - uy * vx, ux * vx + uy * vy)
+                corners[k] = Arc(vertex, abs(distance), startAngle, sweep)
+                continue
+
+            # otherwise the curves overlap, trim both back to the intersection closest to the corner
+            if not adjacent:
+                vertex = ((end[0] + start[0]) / 2.0, (end[1] + start[1]) / 2.0)
+            points = _intersections(curveA, curveB)
+            if not points:
+                if adjacent:
+                    raise OffsetError('Offset curves do not meet at a corner')
+                corners[k] = Line(end, start)
+                continue
+            point = min(points, key = lambda p: _distance(p, vertex))
+            params[k][1] = _parameter(curveA, point)
+            params[(k + 1) % count][0] = _parameter(curveB, point)
+
+        # drop curves that were trimmed away completely or reversed, then trim the rest again
+        valid = [params[k][1] - params[k][0] > 1e-9 for k in range(count)]
+        if all(valid):
+            break
+        items = [item for item, keep in zip(items, valid) if keep]
+        if not items:
+            return []
+    else:
+        raise OffsetError('Offset did not converge')
+
+    result = []
+    for k, (moved, i) in enumerate(items):
+        result.append(_trimCurve(moved, params[k][0], params[k][1]))
+        if corners[k] is not None:
+            result.append(corners[k])
+    # bridged gaps, a flipped orientation or crossings all mean parts of the offset folded over themselves
+    bridged = any(not isinstance(corner, (Arc, type(None))) for corner in corners)
+    if bridged or loopArea(result) <= 0.0 or (len(result) > 3 and _hasSelfIntersection(result)):
+        result = _removeSelfIntersections(result, curves, abs(distance))
+    return result
+
+
+def _boundingBox(curve):
+    if isinstance(curve, Line):
+        (x0, y0), (x1, y1) = curve.start, curve.end
+        return (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+    (cx, cy), r = curve.center, curve.radius
+    return (cx - r, cy - r, cx + r, cy + r)
+
+
+def _pointOnCurve(curve, point) -> bool:
+    param = _parameter(curve, point)
+    return -1e-9 <= param <= _parameterLength(curve) + 1e-9
+
+
+# pairs of crossing curves that are not neighbours in the loop, found by sweeping the bounding boxes along x
+# returns a list of (i, j, point)
+def _findCrossings(curves, firstOnly = False):
+    count = len(curves)
+    boxes = [_boundingBox(curve) for curve in curves]
+    order = sorted(range(count), key = lambda i: boxes[i][0])
+    active = []
+    crossings = []
+    for i in order:
+        minX = boxes[i][0]
+        active = [j for j in active if boxes[j][2] >= minX - 1e-9]
+        for j in active:
+            if abs(i - j) in (1, count - 1):
+                continue
+            if boxes[i][1] > boxes[j][3] + 1e-9 or boxes[j][1] > boxes[i][3] + 1e-9:
+                continue
+            for point in _intersections(curves[i], curves[j]):
+                if _pointOnCurve(curves[i], point) and _pointOnCurve(curves[j], point):
+                    crossings.append((i, j, point))
+                    if firstOnly:
+                        return crossings
+        active.append(i)
+    return crossings
+
+
+def _hasSelfIntersection(curves) -> bool:
+    return len(_findCrossings(curves, True)) > 0
+
+
+def _distanceToCurve(point, curve):
+    param = _parameter(curve, point)
+    if 0.0 <= param <= _parameterLength(curve):
+        if isinstance(curve, Arc):
+            return abs(_distance(point, curve.center) - curve.radius)
+        dx, dy = curve.end[0] - curve.start[0], curve.end[1] - curve.start[1]
+        return abs((point[0] - curve.start[0]) * dy - (point[1] - curve.start[1]) * dx) / math.hypot(dx, dy)
+    return min(_distance(point, curveStartPoint(curve)), _distance(point, curveEndPoint(curve)))
+
+
+# split the offset loop where it crosses itself and keep only the pieces that are the full offset distance away from
+# the original loop, the rest belong to regions where the offset folded over itself
+def _removeSelfIntersections(result, original, distance):
+    splits = [[] for curve in result]
+    for i, j, point in _findCrossings(result):
+        splits[i].append(_parameter(result[i], point))
+        splits[j].append(_parameter(result[j], point))
+
+    kept = []
+    for curve, params in zip(result, splits):
+        bounds = [0.0] + sorted(params) + [_parameterLength(curve)]
+        for startParam, endParam in zip(bounds[:-1], bounds[1:]):
+            if endParam - startParam <= 1e-9:
+                continue
+            midPoint = curveStartPoint(_trimCurve(curve, (startParam + endParam) / 2.0, endParam))
+            if min(_distanceToCurve(midPoint, other) for other in original) >= distance * (1.0 - 1e-6) - 1e-9:
+                kept.append(_trimCurve(curve, startParam, endParam))
+
+    loops, chains = chainLoops(kept, 1e-6)
+    if chains:
+        raise OffsetError('Could not clean up a self intersecting offset')
+    return [curve for loop in loops for curve in loop]
+
+
+# offset the loops of one face, outlines and islands inside holes grow by distance, holes shrink by distance
+# the face may be made of several separate regions
+def offsetProfile(curves, distance, tolerance = 1e-6):
+    loops, chains = chainLoops(curves, tolerance)
+    if chains:
+        raise OffsetError('Profile contains curves that do not form closed loops')
+    if not loops:
+        return []
+    # outlines and islands grow, holes shrink
+    depths = loopDepths(loopContainment(loops).parents())
+    result = []
+    for loop, depth in zip(loops, depths):
+        result.extend(offsetLoop(loop, distance if depth % 2 == 0 else -distance))
+    return result
@@ -0,0 +1,152 @@
+# rectangle packing of part bounding boxes onto stock sheets
+# uses a bottom-left skyline heuristic, each placement scans the skyline of the open sheets once per orientation,
+# so packing costs O(n log n) for the sort plus O(n * s) for the placements where s is the number of skyline segments
+
+import math
+from collections import namedtuple
+
+# a rectangle to place, key is returned untouched in the placement
+PackItem = namedtuple('PackItem', ['key', 'width', 'height'])
+
+# where an item ended up, x and y are the lower left corner of the (possibly rotated) rectangle on its sheet
+Placement = namedtuple('Placement', ['key', 'sheet', 'x', 'y', 'rotated'])
+
+
+class Skyline:
+    def __init__(self, width, height) -> None:
+        self.width = width
+        self.height = height
+        # segments of the skyline as [x, y, width], ordered by x and covering the whole sheet width
+        self.segments = [[0.0, 0.0, width]]
+        self.usedArea = 0.0
+
+    # find the lowest position where a rectangle fits with its left edge on a segment start
+    # returns (top, x, y) or None, lower top then lower x wins
+    def findPosition(self, width, height):
+        best = None
+        segments = self.segments
+        for i in range(len(segments)):
+            x = segments[i][0]
+            if x + width > self.width + 1e-9:
+                break
+
+            # the rectangle rests on the highest segment under its span
+            y = 0.0
+            remaining = width
+            j = i
+            while remaining > 1e-9:
+                y = max(y, segments[j][1])
+                remaining -= segments[j][2]
+                j += 1
+
+            if y + height <= self.height + 1e-9 and (best is None or (y + height, x) < best[:2]):
+                best = (y + height, x, y)
+        return best
+
+    def place(self, x, y, width, height):
+        top = y + height
+        right = x + width
+        newSegments = []
+        inserted = False
+        for segStart, segY, segWidth in self.segments:
+            segEnd = segStart + segWidth
+            if segEnd <= x + 1e-9 or segStart >= right - 1e-9:
+                if not inserted and segStart >= right - 1e-9:
+                    newSegments.append([x, top, width])
+                    inserted = True
+                newSegments.append([segStart, segY, segWidth])
+                continue
+
+            # keep the parts of the segment that stick out either side of the new rectangle
+            if segStart < x - 1e-9:
+                newSegments.append([segStart, segY, x - segStart])
+            if not inserted:
+                newSegments.append([x, top, width])
+                inserted = True
+            if segEnd > right + 1e-9:
+                newSegments.append([right, segY, segEnd - right])
+        if not inserted:
+            newSegments.append([x, top, width])
+
+        # merge neighbouring segments at the same height
+        merged = []
+        for segment in newSegments:
+            if merged and abs(merged[-1][1] - segment[1]) < 1e-9:
+                merged[-1][2] = segment[0] + segment[2] - merged[-1][0]
+            else:
+                merged.append(segment)
+        self.segments = merged
+
+
+class SkylinePacker:
+    def __init__(self, sheetWidth, sheetHeight, spacing = 0.0, allowRotation = True) -> None:
+        self.sheetWidth = sheetWidth
+        self.sheetHeight = sheetHeight
+        self.spacing = spacing
+        self.allowRotation = allowRotation
+        self.sheets = []
+
+    # place all items, returns (placements, keys of items too big for a sheet)
+    def pack(self, items):
+        # each rectangle reserves the spacing on its right and top, so the usable sheet grows by the same amount
+        width = self.sheetWidth + self.spacing
+        height = self.sheetHeight + self.spacing
+        placements = []
+        unplaced = []
+
+        # placing the largest items first gives much denser skylines
+        for item in sorted(items, key = lambda i: (max(i.width, i.height), i.width * i.height), reverse = True):
+            orientations = [(item.width, item.height, False)]
+            if self.allowRotation and item.width != item.height:
+                orientations.append((item.height, item.width, True))
+
+            placed = False
+            for sheetIndex in range(len(self.sheets) + 1):
+                if sheetIndex == len(self.sheets):
+                    # open a new sheet only if the item can fit on an empty one
+                    if not any(w + self.spacing <= width + 1e-9 and h + self.spacing <= height + 1e-9 for w, h, r in orientations):
+                        break
+                    self.sheets.append(Skyline(width, height))
+                sheet = self.sheets[sheetIndex]
+
+                best = None
+                for w, h, rotated in orientations:
+                    position = sheet.findPosition(w + self.spacing, h + self.spacing)
+                    if position and (best is None or position[:2] < best[0][:2]):
+                        best = (position, w, h, rotated)
+                if best:
+                    (top, x, y), w, h, rotated = best
+                    sheet.place(x, y, w + self.spacing, h + self.spacing)
+                    sheet.usedArea += item.width * item.height
+                    placements.append(Placement(item.key, sheetIndex, x, y, rotated))
+                    placed = True
+                    break
+
+            if not placed:
+                unplaced.append(item.key)
+
+        return placements, unplaced
+
+    # fraction of each sheet covered by parts
+    def sheetUtilization(self):
+        sheetArea = self.sheetWidth * self.sheetHeight
+        return [sheet.usedArea / sheetArea for sheet in self.sheets]
+
+
+# rotation and translation that move a part with the given bounding box onto its placement
+def placementTransform(placement, boundBox):
+    minX, minY, maxX, maxY = boundBox
+    if placement.rotated:
+        # a quarter turn maps (x, y) to (-y, x)
+        return (0.5 * math.pi, placement.x + maxY, placement.y - minX)
+    return (0.0, placement.x - minX, placement.y - minY)
+
+
+# the original layout, every item in a single row along x
+def rowLayout(items, spacing = 0.0):
+    placements = []
+    x = 0.0
+    for item in items:
+        placements.append(Placement(item.key, 0, x, 0.0, False))
+        x += item.width + spacing
+    return placements
@@ -0,0 +1,67 @@
+# the export steps that follow the extraction of the bodies from Fusion: the flatness decision, kerf offsetting,
+# layout and DXF output, so whole exports can run from dumped geometry without Fusion
+
+import os
+from collections import namedtuple
+from .bodydump import readDump
+from .dxf import UNIT_SCALES
+from .flatness import isDumpedBodyFlat
+from .geometry import curvesBoundingBox
+from .layout import Part, groupFilePath, layoutGroups, writeLayoutFiles
+from .offset import OffsetError, offsetProfile
+
+# lengths are in Fusion's internal centimeters, kerf is the full width of the cut,
+# thicknessTolerance None writes all parts to a single file, units are the units of the written DXF files,
+# orderCuts writes the curves in cutting order, polylines joins them into polylines simplified within simplifyTolerance
+ExportOptions = namedtuple('ExportOptions', ['kerf', 'rigorous', 'sheetWidth', 'sheetHeight', 'spacing', 'sheetGap',
+                                             'allowRotation', 'trueShape', 'nestTime', 'thicknessTolerance', 'units', 'orderCuts',
+                                             'polylines', 'simplifyTolerance'],
+                           defaults = (0.0, False, 0.0, 0.0, 0.5, 5.0, True, False, 10.0, None, 'mm', True, True, 0.0))
+
+
+# turn dumped bodies into parts ready to lay out, returns (parts, messages about the bodies that were left out)
+def prepareParts(bodies, options) -> tuple:
+    parts = []
+    messages = []
+    for body in bodies:
+        if not isDumpedBodyFlat(body.flatness, options.rigorous):
+            messages.append(body.name + ' is not flat')
+            continue
+        curves = body.curves
+        if options.kerf > 0.0:
+            # the outer loop grows and the holes shrink by half the kerf each
+            try:
+                curves = offsetProfile(curves, options.kerf / 2)
+            except OffsetError as error:
+                messages.append(body.name + ' could not be offset: ' + str(error))
+                continue
+        parts.append(Part(body.name, curves, curvesBoundingBox(curves), body.thickness))
+    return parts, messages
+
+
+# export the bodies to path, or to one file per thickness next to it, returns (written paths, messages)
+def exportBodies(bodies, path, options, workers = None, nfpCache = None) -> tuple:
+    parts, messages = prepareParts(bodies, options)
+    layouts = layoutGroups(parts, options.thicknessTolerance, options.sheetWidth, options.sheetHeight, options.spacing,
+                           options.allowRotation, options.trueShape, options.nestTime, nfpCache, workers, options.orderCuts,
+                           options.polylines, options.simplifyTolerance)
+
+    scale = UNIT_SCALES[options.units]
+    tasks = []
+    for thickness, groupParts, layout in layouts:
+        for key in layout.unplaced:
+            messages.append(groupParts[key].name + ' is too large for the sheet and was not exported')
+        if len(layout.transforms) > 0:
+            groupPath = path if thickness is None else groupFilePath(path, thickness * scale, options.units)
+            if layout.toolpath is not None:
+                messages.append('%s: cut length %s %s, %d pierces, travel %s %s' % (
+                    os.path.basename(groupPath), round(layout.toolpath.cutLength * scale, 1), options.units,
+                    layout.toolpath.pierces, round(layout.toolpath.travel * scale, 1), options.units))
+            tasks.append((groupPath, groupParts, layout.transforms, options.sheetWidth + options.sheetGap, options.units, scale))
+    return writeLayoutFiles(tasks, workers), messages
+
+
+# task is (dump path, output path, options, workers), so whole dumps can be exported in a pool
+def exportDumpFile(task) -> tuple:
+    dumpPath, outputPath, options, workers = task
+    return exportBodies(readDump(dumpPath), outputPath, options, workers)
@@ -0,0 +1,121 @@
+# joining the separate lines and arcs of a profile into polyline records, so faceted or imported bodies
+# don't reach the laser software as thousands of tiny entities
+# end-to-end curves are chained through the hashed endpoint index of chainLoops, then the vertices of straight runs
+# are thinned with Douglas-Peucker: at the chaining tolerance this only merges collinear segments,
+# a larger simplify tolerance also drops vertices that stray less than it from the simplified outline
+
+import math
+from .geometry import Line, Arc, Polyline, chainLoops, curveEndPoint, curveStartPoint, polylineSegments
+
+
+# distance from p to the segment from a to b
+def _segmentDistance(p, a, b) -> float:
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    lengthSquared = dx * dx + dy * dy
+    if lengthSquared == 0.0:
+        return math.hypot(p[0] - a[0], p[1] - a[1])
+    t = max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / lengthSquared))
+    return math.hypot(p[0] - a[0] - t * dx, p[1] - a[1] - t * dy)
+
+
+# indices of the points of a straight run kept by Douglas-Peucker, the first and last point are always kept
+# the run is split with an explicit stack, since faceted outlines can have far more points than the recursion limit
+def simplifyRun(points, tolerance) -> list:
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        farthest, distance = None, tolerance
+        for k in range(first + 1, last):
+            d = _segmentDistance(points[k], points[first], points[last])
+            if d > distance:
+                farthest, distance = k, d
+        if farthest is not None:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+    return [k for k in range(len(points)) if keep[k]]
+
+
+# vertices and bulges of a chain of lines and arcs, bulges[i] belongs to the segment starting at points[i]
+def _chainVertices(chain):
+    points = [curveStartPoint(chain[0])]
+    bulges = []
+    for curve in chain:
+        points.append(curveEndPoint(curve))
+        bulges.append(math.tan(curve.sweep / 4.0) if isinstance(curve, Arc) else 0.0)
+    return points, bulges
+
+
+# thin the vertices inside straight runs, a vertex is only dropped when both of its segments are straight
+def _simplifyVertices(points, bulges, closed, tolerance):
+    count = len(bulges)
+    if closed:
+        # start the loop at a vertex that can't be dropped: the end of an arc, or else the vertex farthest from the first
+        # and the one farthest from that, which are both corners of the convex hull, so a loop of lines is split in two runs
+        start = next((k for k in range(count) if bulges[k - 1] != 0.0 or bulges[k] != 0.0), None)
+        if start is None:
+            def farthestFrom(point):
+                return max(range(count), key = lambda k: math.hypot(points[k][0] - point[0], points[k][1] - point[1]))
+            start = farthestFrom(points[0])
+            fixed = {start, farthestFrom(points[start])}
+        else:
+            fixed = set()
+        points = points[start:count] + points[:start] + [points[start]]
+        bulges = bulges[start:] + bulges[:start]
+        fixed = {(k - start) % count for k in fixed}
+    else:
+        fixed = set()
+
+    keptPoints = [points[0]]
+    keptBulges = []
+    k = 0
+    while k < count:
+        if bulges[k] != 0.0:
+            keptPoints.append(points[k + 1])
+            keptBulges.append(bulges[k])
+            k += 1
+            continue
+        # the straight run ends before the next arc or fixed vertex
+        end = k + 1
+        while end < count and bulges[end] == 0.0 and end not in fixed:
+            end += 1
+        run = points[k:end + 1]
+        for index in simplifyRun(run, tolerance)[1:]:
+            keptPoints.append(run[index])
+            keptBulges.append(0.0)
+        k = end
+    if closed:
+        keptPoints.pop()
+    else:
+        keptBulges.append(0.0)
+    return keptPoints, keptBulges
+
+
+# join end-to-end curves into polylines, returns circles, closed polylines and lines or arcs that connect to nothing
+# as they are, and a Polyline for every other chain
+# simplifyTolerance above zero also drops the vertices of straight runs that lie within it of the simplified outline
+def joinPolylines(curves, tolerance = 1e-6, simplifyTolerance = 0.0) -> list:
+    segments = []
+    for curve in curves:
+        if isinstance(curve, Polyline) and not curve.closed:
+            segments.extend(polylineSegments(curve))
+        else:
+            segments.append(curve)
+    loops, chains = chainLoops(segments, tolerance)
+
+    joined = []
+    for chain, closed in [(loop, True) for loop in loops] + [(chain, False) for chain in chains]:
+        if len(chain) == 1:
+            joined.append(chain[0])
+            continue
+        points, bulges = _chainVertices(chain)
+        points, bulges = _simplifyVertices(points, bulges, closed, max(tolerance, simplifyTolerance))
+        if len(points) == 2 and bulges[0] == 0.0 and bulges[1] == 0.0:
+            # a straight chain, or nothing left of a loop but a line there and back
+            joined.append(Line(points[0], points[1]))
+        else:
+            joined.append(Polyline(points, bulges, closed))
+    return joined
+
@@ -0,0 +1,145 @@
+# compact struct-of-arrays form of a profile, used to keep many profiles in memory and on disk without a Python object
+# per curve: every field is one contiguous array of float64 over all segments, and the segments of each loop are
+# consecutive, starting at loopOffsets[i]
+# lines fill the end point fields, arcs and circles also the center, radius, start angle and sweep fields
+# (a circle is an arc with a sweep of 2 pi), bulged polyline segments are stored as the arcs they stand for
+#
+# the fields are NumPy arrays when NumPy is available and array('d') otherwise, and a set of profiles is saved
+# as a single (fields, segments) .npy file which NumPy maps into memory instead of reading it
+
+import ast
+import math
+import struct
+import sys
+from array import array
+from .geometry import Line, Arc, Circle, Polyline, chainLoops, curveEndPoint, curveStartPoint, polylineSegments
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FIELDS = ('kind', 'loop', 'startX', 'startY', 'endX', 'endY', 'centerX', 'centerY', 'radius', 'startAngle', 'sweep')
+LINE, ARC, CIRCLE = 0, 1, 2
+
+
+class ProfileArray:
+    # data holds one array per field, all of the same length
+    def __init__(self, data) -> None:
+        self.data = data
+        for name, values in zip(FIELDS, data):
+            setattr(self, name, values)
+        self._loopOffsets = None
+
+    def __len__(self):
+        return len(self.kind)
+
+    @classmethod
+    def fromCurves(cls, curves, tolerance = 1e-6):
+        loops, chains = chainLoops(curves, tolerance)
+        rows = []
+        for loop, path in enumerate(loops + chains):
+            for curve in path:
+                for segment in (polylineSegments(curve) if isinstance(curve, Polyline) else (curve,)):
+                    (startX, startY), (endX, endY) = curveStartPoint(segment), curveEndPoint(segment)
+                    if isinstance(segment, Line):
+                        rows.append((LINE, loop, startX, startY, endX, endY, 0.0, 0.0, 0.0, 0.0, 0.0))
+                    elif isinstance(segment, Arc):
+                        rows.append((ARC, loop, startX, startY, endX, endY, segment.center[0], segment.center[1],
+                                     segment.radius, segment.startAngle, segment.sweep))
+                    else:
+                        rows.append((CIRCLE, loop, startX, startY, endX, endY, segment.center[0], segment.center[1],
+                                     segment.radius, 0.0, 2.0 * math.pi))
+        return cls([_floatArray(row[i] for row in rows) for i in range(len(FIELDS))])
+
+    # index of the first segment of every loop, followed by the number of segments
+    @property
+    def loopOffsets(self) -> list:
+        if self._loopOffsets is None:
+            loops = self.loop.tolist()
+            self._loopOffsets = [i for i in range(len(loops)) if i == 0 or loops[i] != loops[i - 1]] + [len(loops)]
+        return self._loopOffsets
+
+    # the curve records of the segments in order
+    def curves(self) -> list:
+        columns = [values.tolist() for values in self.data]
+        curves = []
+        for kind, loop, startX, startY, endX, endY, centerX, centerY, radius, startAngle, sweep in zip(*columns):
+            if kind == LINE:
+                curves.append(Line((startX, startY), (endX, endY)))
+            elif kind == ARC:
+                curves.append(Arc((centerX, centerY), radius, startAngle, sweep))
+            else:
+                curves.append(Circle((centerX, centerY), radius))
+        return curves
+
+    # the curve records of each loop
+    def loops(self) -> list:
+        curves = self.curves()
+        offsets = self.loopOffsets
+        return [curves[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def _floatArray(values):
+    if numpy is not None:
+        return numpy.fromiter(values, dtype = numpy.float64)
+    return array('d', values)
+
+
+# concatenate profiles into one, e.g. for saving, returns the combined profile and the first segment of each profile
+def concatenateProfiles(profiles):
+    firsts = []
+    count = 0
+    for profile in profiles:
+        firsts.append(count)
+        count += len(profile)
+    if numpy is not None:
+        data = [numpy.concatenate([numpy.asarray(profile.data[i], dtype = numpy.float64) for profile in profiles] or
+                                  [numpy.zeros(0)]) for i in range(len(FIELDS))]
+    else:
+        data = [array('d', (value for profile in profiles for value in profile.data[i])) for i in range(len(FIELDS))]
+    return ProfileArray(data), firsts
+
+
+# the segments first to first + count of a profile, without copying when the fields are NumPy arrays
+def sliceProfile(profile, first, count):
+    return ProfileArray([values[first:first + count] for values in profile.data])
+
+
+# save a profile as a (fields, segments) float64 .npy file, written by hand when NumPy isn't available
+def saveProfile(stream, profile):
+    if numpy is not None:
+        numpy.save(stream, numpy.array([numpy.asarray(values, dtype = numpy.float64) for values in profile.data]))
+        return
+    header = "{'descr': '<f8', 'fortran_order': False, 'shape': (%d, %d), }" % (len(FIELDS), len(profile))
+    # the header is padded so the data starts on a 64 byte boundary, as NumPy does
+    header += ' ' * (-(len(header) + 11) % 64) + '\n'
+    stream.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1'))
+    for values in profile.data:
+        if sys.byteorder != 'little':
+            values = array('d', values)
+            values.byteswap()
+        stream.write(values.tobytes())
+
+
+# load a profile saved by saveProfile, with NumPy the file is mapped into memory rather than read
+def loadProfile(path) -> ProfileArray:
+    if numpy is not None:
+        data = numpy.load(path, mmap_mode = 'r', allow_pickle = False)
+        if data.ndim != 2 or data.shape[0] != len(FIELDS):
+            raise ValueError(path + ' does not hold a profile')
+        return ProfileArray(list(data))
+    with open(path, 'rb') as stream:
+        if stream.read(8) != b'\x93NUMPY\x01\x00':
+            raise ValueError(path + ' is not a version 1 .npy file')
+        header = ast.literal_eval(stream.read(struct.unpack('<H', stream.read(2))[0]).decode('latin1'))
+        if header['descr'] != '<f8' or header['fortran_order'] or header['shape'][0] != len(FIELDS):
+            raise ValueError(path + ' does not hold a profile')
+        values = array('d')
+        values.frombytes(stream.read())
+    if sys.byteorder != 'little':
+        values.byteswap()
+    count = header['shape'][1]
+    if len(values) != len(FIELDS) * count:
+        raise ValueError(path + ' is truncated')
+    return ProfileArray([values[i * count:(i + 1) * count] for i in range(len(FIELDS))])
@@ -0,0 +1,84 @@
+# extracted and kerf-offset profiles of bodies kept on disk between exports, so unchanged bodies don't have to be
+# projected and offset again, entries are keyed by the body's entity token, a fingerprint of its geometry and the kerf
+#
+# the store is a small json index next to a .npy file holding the segments of every stored profile as one
+# ProfileArray, the index names the segment file and where each profile starts in it
+# every save writes a new segment file before replacing the index, so a store is never read half written,
+# and with NumPy the segments are mapped into memory, so loading the store doesn't read the profiles that aren't used
+
+import json
+import os
+from .cache import LruCache
+from .profilearray import ProfileArray, concatenateProfiles, loadProfile, saveProfile, sliceProfile
+
+STORE_VERSION = 2
+
+
+class ProfileStore(LruCache):
+    def __init__(self, path = None, maxEntries = 5000) -> None:
+        super().__init__(maxEntries)
+        self.path = path
+        self.segmentsPath = None
+        # number of the latest segment file, so a save never overwrites the file the index points to
+        self.generation = 0
+        if path and os.path.isfile(path):
+            try:
+                with open(path) as f:
+                    index = json.load(f)
+                if index.get('version') != STORE_VERSION:
+                    raise ValueError('profile store of another version')
+                self.generation = index['generation']
+                if index['entries']:
+                    # only a file next to the index, the old segment file is deleted on the next save
+                    self.segmentsPath = os.path.join(os.path.dirname(path), os.path.basename(index['segments']))
+                    segments = loadProfile(self.segmentsPath)
+                    for key, value in index['entries']:
+                        if value['first'] + value['count'] > len(segments):
+                            raise ValueError('profile store segments are truncated')
+                        self.put(key, {'thickness': value['thickness'],
+                                       'profile': sliceProfile(segments, value['first'], value['count'])})
+            except (OSError, ValueError, TypeError, KeyError, AttributeError):
+                # a damaged or outdated store is just an empty one
+                self.entries.clear()
+                self.segmentsPath = None
+
+    # returns (thickness, curves) or None
+    def getProfile(self, key):
+        value = self.get(key)
+        if value is None:
+            return None
+        return value['thickness'], value['profile'].curves()
+
+    def putProfile(self, key, thickness, curves):
+        self.put(key, {'thickness': thickness, 'profile': ProfileArray.fromCurves(curves)})
+
+    def save(self):
+        if not self.path:
+            return
+        # the stored profiles are copied out of the old segment file, so nothing refers to it once it is replaced
+        values = list(self.entries.values())
+        segments, firsts = concatenateProfiles([value['profile'] for value in values])
+        for value, first in zip(values, firsts):
+            value['first'], value['count'] = first, len(value['profile'])
+            value['profile'] = sliceProfile(segments, first, len(value['profile']))
+
+        oldSegmentsPath = self.segmentsPath
+        self.generation += 1
+        self.segmentsPath = '%s.%d.npy' % (os.path.splitext(self.path)[0], self.generation)
+        with open(self.segmentsPath, 'wb') as f:
+            saveProfile(f, segments)
+
+        # entries are written oldest first, so loading them back keeps the eviction order
+        index = {'version': STORE_VERSION, 'generation': self.generation, 'segments': os.path.basename(self.segmentsPath),
+                 'entries': [[key, {'thickness': value['thickness'], 'first': value['first'], 'count': value['count']}]
+                             for key, value in self.entries.items()]}
+        tempPath = self.path + '.tmp'
+        with open(tempPath, 'w') as f:
+            json.dump(index, f)
+        os.replace(tempPath, self.path)
+        if oldSegmentsPath and os.path.isfile(oldSegmentsPath):
+            try:
+                os.remove(oldSegmentsPath)
+            except OSError:
+                # the file can't be removed while something still maps it, it is only wasted space
+                pass
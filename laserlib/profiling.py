@@ -0,0 +1,201 @@
+# per-body and per-phase timing of an export, with the number of Fusion API calls made in each phase
+# the API calls are counted by wrapping the methods and properties of the API classes while profiling,
+# so nothing outside this module needs to know about the counting
+
+import csv
+import functools
+import json
+import time
+from collections import Counter, OrderedDict
+
+
+class _PhaseRecord:
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self.apiCalls = 0
+        self.count = 0
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, tb):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    def __init__(self, profiler, key) -> None:
+        self.profiler = profiler
+        self.key = key
+
+    def __enter__(self):
+        self.profiler._stack.append(self.key)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, excType, excValue, tb):
+        record = self.profiler._record(self.key)
+        record.seconds += time.perf_counter() - self.start
+        record.count += 1
+        self.profiler._stack.pop()
+        return False
+
+
+class Profiler:
+    # a disabled profiler makes phase() a no-op, so it can be passed around unconditionally
+    def __init__(self, enabled = True) -> None:
+        self.enabled = enabled
+        self.records = OrderedDict()
+        self.apiCalls = Counter()
+        self._stack = []
+        self._start = time.perf_counter()
+
+    def _record(self, key) -> _PhaseRecord:
+        record = self.records.get(key)
+        if record is None:
+            record = self.records[key] = _PhaseRecord()
+        return record
+
+    # time a phase, nested phases are named after their parents (e.g. 'classify/ray cast') and inherit the body
+    # the calls made inside a nested phase only count towards the innermost one
+    def phase(self, name, body = None):
+        if not self.enabled:
+            return _NULL_PHASE
+        if self._stack:
+            parentBody, parentName = self._stack[-1]
+            body = body if body is not None else parentBody
+            name = parentName + '/' + name
+        return _Phase(self, (body, name))
+
+    # run function(*args) as a phase, for work handed to a worker thread, so the phase times the work itself
+    # rather than the wait for it across the ticks of a job
+    def runPhase(self, name, function, *args):
+        with self.phase(name):
+            return function(*args)
+
+    def countCall(self, name):
+        self.apiCalls[name] += 1
+        self._record(self._stack[-1] if self._stack else (None, 'other')).apiCalls += 1
+
+    # total time of the top level phases of each body, slowest first
+    def bodyTimes(self) -> list:
+        totals = Counter()
+        for (body, name), record in self.records.items():
+            if body is not None and '/' not in name:
+                totals[body] += record.seconds
+        return totals.most_common()
+
+    def toDict(self) -> dict:
+        return {
+            'totalSeconds': time.perf_counter() - self._start,
+            'totalApiCalls': sum(self.apiCalls.values()),
+            'bodies': [{'body': body, 'seconds': seconds} for body, seconds in self.bodyTimes()],
+            'phases': [{'body': body, 'phase': name, 'seconds': record.seconds, 'apiCalls': record.apiCalls, 'count': record.count}
+                       for (body, name), record in self.records.items()],
+            'apiCalls': dict(self.apiCalls.most_common())
+        }
+
+    def writeJson(self, path):
+        with open(path, 'w') as stream:
+            json.dump(self.toDict(), stream, indent = 1)
+
+    def writeCsv(self, path):
+        with open(path, 'w', newline = '') as stream:
+            writer = csv.writer(stream)
+            writer.writerow(['body', 'phase', 'seconds', 'apiCalls', 'count'])
+            for (body, name), record in self.records.items():
+                writer.writerow([body if body is not None else '', name, '%.6f' % record.seconds, record.apiCalls, record.count])
+
+
+# counts every call to a method or property of the classes in the given modules (e.g. adsk.core, adsk.fusion)
+# the original attributes are put back when the context exits
+# the wrappers are made the first time the context is entered, so installing the counter again is only a setattr per
+# attribute, which lets countSteps install it around every step of a job
+class ApiCallCounter:
+    def __init__(self, profiler, modules) -> None:
+        self.profiler = profiler
+        self.modules = modules
+        self._replacements = None
+        self._patched = []
+
+    def _wrap(self, name, function):
+        countCall = self.profiler.countCall
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            countCall(name)
+            return function(*args, **kwargs)
+        return wrapper
+
+    # (class, attribute name, original, replacement) of every attribute of the class that can be counted
+    def _classReplacements(self, cls):
+        replacements = []
+        for attributeName, value in list(vars(cls).items()):
+            if attributeName.startswith('_'):
+                continue
+            name = cls.__name__ + '.' + attributeName
+            if isinstance(value, property):
+                replacement = property(self._wrap(name, value.fget) if value.fget else None,
+                                       self._wrap(name, value.fset) if value.fset else None, value.fdel, value.__doc__)
+            elif isinstance(value, staticmethod):
+                replacement = staticmethod(self._wrap(name, value.__func__))
+            elif isinstance(value, classmethod):
+                replacement = classmethod(self._wrap(name, value.__func__))
+            elif callable(value) and not isinstance(value, type):
+                replacement = self._wrap(name, value)
+            else:
+                continue
+            replacements.append((cls, attributeName, value, replacement))
+        return replacements
+
+    def __enter__(self):
+        if self.profiler.enabled:
+            if self._replacements is None:
+                self._replacements = []
+                for module in self.modules:
+                    for value in list(vars(module).values()):
+                        if isinstance(value, type) and value.__module__ == module.__name__:
+                            self._replacements.extend(self._classReplacements(value))
+            for cls, attributeName, value, replacement in self._replacements:
+                try:
+                    setattr(cls, attributeName, replacement)
+                except (AttributeError, TypeError):
+                    continue
+                self._patched.append((cls, attributeName, value))
+        return self
+
+    def __exit__(self, excType, excValue, tb):
+        for cls, attributeName, value in reversed(self._patched):
+            setattr(cls, attributeName, value)
+        self._patched = []
+        return False
+
+    # run the steps of a job (see laserlib.jobs) with the counter installed only while a step runs, it is taken out
+    # at every yield, so the calls others make between the steps, and the time they take, aren't touched
+    def countSteps(self, steps):
+        if not self.profiler.enabled:
+            return (yield from steps)
+        value, error = None, None
+        while True:
+            with self:
+                try:
+                    yielded = steps.throw(error) if error is not None else steps.send(value)
+                except StopIteration as stop:
+                    return stop.value
+            try:
+                value, error = (yield yielded), None
+            except GeneratorExit:
+                # closing runs the finally blocks of the steps, which are a step of their own
+                with self:
+                    steps.close()
+                raise
+            except BaseException as e:
+                value, error = None, e
+
+
+# default for code that can be profiled but usually isn't
+NULL_PROFILER = Profiler(enabled = False)
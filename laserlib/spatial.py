@@ -0,0 +1,95 @@
+# bounding volume hierarchy over axis aligned boxes, used to find the bodies a ray or a point query can touch
+# without asking Fusion to search the whole assembly
+# boxes are (minX, minY, minZ, maxX, maxY, maxZ), the items can be anything (e.g. BRepBody objects)
+
+import math
+
+
+# distances along the ray where it enters and leaves the box, or None if it misses the box
+# the ray starts at origin, so an interval behind the origin is a miss and one around it starts at 0
+def rayBoxInterval(box, origin, direction, tolerance = 0.0):
+    near, far = 0.0, math.inf
+    for i in range(3):
+        low, high = box[i] - tolerance, box[i + 3] + tolerance
+        if abs(direction[i]) < 1e-12:
+            if origin[i] < low or origin[i] > high:
+                return None
+            continue
+        t0, t1 = (low - origin[i]) / direction[i], (high - origin[i]) / direction[i]
+        if t0 > t1:
+            t0, t1 = t1, t0
+        near, far = max(near, t0), min(far, t1)
+        if near > far:
+            return None
+    return near, far
+
+
+def boxContainsPoint(box, point, tolerance = 0.0) -> bool:
+    return all(box[i] - tolerance <= point[i] <= box[i + 3] + tolerance for i in range(3))
+
+
+def boxUnion(boxes):
+    return (min(box[0] for box in boxes), min(box[1] for box in boxes), min(box[2] for box in boxes),
+            max(box[3] for box in boxes), max(box[4] for box in boxes), max(box[5] for box in boxes))
+
+
+class BoundingVolumeHierarchy:
+    # items is a list of (item, box), leaves hold up to leafSize items
+    def __init__(self, items, leafSize = 4) -> None:
+        self.items = list(items)
+        self.leafSize = leafSize
+        # nodes are (box, first child, second child) or (box, None, leaf items)
+        self.nodes = []
+        if self.items:
+            self._build(self.items)
+
+    # split the items at the median of their box centers along the longest axis of the centers
+    def _build(self, items) -> int:
+        index = len(self.nodes)
+        self.nodes.append(None)
+        box = boxUnion([itemBox for item, itemBox in items])
+        if len(items) <= self.leafSize:
+            self.nodes[index] = (box, None, items)
+            return index
+
+        centers = [tuple((itemBox[i] + itemBox[i + 3]) / 2 for i in range(3)) for item, itemBox in items]
+        extents = [max(center[i] for center in centers) - min(center[i] for center in centers) for i in range(3)]
+        axis = extents.index(max(extents))
+        order = sorted(range(len(items)), key = lambda k: centers[k][axis])
+        middle = len(items) // 2
+        first = self._build([items[k] for k in order[:middle]])
+        second = self._build([items[k] for k in order[middle:]])
+        self.nodes[index] = (box, first, second)
+        return index
+
+    # the items whose boxes the ray passes through, as (entry distance, exit distance, item) nearest first
+    def raycast(self, origin, direction, tolerance = 0.0) -> list:
+        hits = []
+        stack = [0] if self.nodes else []
+        while stack:
+            box, first, second = self.nodes[stack.pop()]
+            if rayBoxInterval(box, origin, direction, tolerance) is None:
+                continue
+            if first is None:
+                for item, itemBox in second:
+                    interval = rayBoxInterval(itemBox, origin, direction, tolerance)
+                    if interval is not None:
+                        hits.append((interval[0], interval[1], item))
+            else:
+                stack.extend((first, second))
+        hits.sort(key = lambda hit: (hit[0], hit[1]))
+        return hits
+
+    # the items whose boxes contain the point, grown by the tolerance
+    def itemsAtPoint(self, point, tolerance = 0.0) -> list:
+        found = []
+        stack = [0] if self.nodes else []
+        while stack:
+            box, first, second = self.nodes[stack.pop()]
+            if not boxContainsPoint(box, point, tolerance):
+                continue
+            if first is None:
+                found.extend(item for item, itemBox in second if boxContainsPoint(itemBox, point, tolerance))
+            else:
+                stack.extend((first, second))
+        return found
@@ -0,0 +1,183 @@
+# cutting order of the exported profiles, so the laser cuts every hole before the outline around it
+# and spends as little time as possible travelling between pierce points
+# the loops of each part are ordered once, then the parts on each sheet are ordered by their pierce points
+# with a nearest neighbour tour improved by 2-opt
+
+import math
+from collections import namedtuple
+from .containment import loopContainment
+from .geometry import Polyline, chainLoops, curveEndPoint, curveLength, curveStartPoint, curvesBoundingBox, isClosedCurve
+
+# tours with more paths than this aren't improved with 2-opt
+MAX_IMPROVED_PATHS = 1000
+
+# estimated length of the cuts, number of pierces and length of the travel moves between them
+ToolpathStats = namedtuple('ToolpathStats', ['cutLength', 'pierces', 'travel'])
+
+
+def _distance(p, q) -> float:
+    return math.hypot(q[0] - p[0], q[1] - p[1])
+
+
+def boxContainsBox(outer, inner, tolerance = 1e-6) -> bool:
+    return (inner[0] >= outer[0] - tolerance and inner[1] >= outer[1] - tolerance and
+            inner[2] <= outer[2] + tolerance and inner[3] <= outer[3] + tolerance)
+
+
+# order of the paths that travels least, starting from start and going from the exit of each path to the entry of the next
+# before[i] lists the paths that have to be cut ahead of path i
+def orderPaths(entries, exits, before, start = (0.0, 0.0), passes = 10) -> list:
+    count = len(entries)
+    waiting = [len(paths) for paths in before]
+    after = [[] for i in range(count)]
+    for i, paths in enumerate(before):
+        for j in paths:
+            after[j].append(i)
+
+    # nearest neighbour among the paths whose predecessors have all been cut
+    ready = [i for i in range(count) if waiting[i] == 0]
+    order = []
+    position = start
+    while ready:
+        nearest = min(range(len(ready)), key = lambda k: _distance(position, entries[ready[k]]))
+        i = ready[nearest]
+        ready[nearest] = ready[-1]
+        ready.pop()
+        order.append(i)
+        position = exits[i]
+        for j in after[i]:
+            waiting[j] -= 1
+            if waiting[j] == 0:
+                ready.append(j)
+    if len(order) < count:
+        # a cycle in before can't be honoured, cut the rest in the given order
+        done = set(order)
+        order.extend(i for i in range(count) if i not in done)
+
+    # each 2-opt pass is quadratic, so very long tours keep the nearest neighbour order
+    if count > MAX_IMPROVED_PATHS:
+        return order
+    constrained = any(before)
+    for i in range(passes):
+        if not _improveOrder(order, entries, exits, before, start, constrained):
+            break
+    return order
+
+
+# one pass of 2-opt, reversing the order of a run of paths whenever that shortens the travel
+# the paths keep their own direction, so the travel inside a reversed run is summed from prefix sums of both directions
+def _improveOrder(order, entries, exits, before, start, constrained) -> bool:
+    count = len(order)
+    if count < 3:
+        return False
+    improved = False
+    position = [0] * len(entries)
+
+    def prefixSums():
+        forward, backward = [0.0], [0.0]
+        for k in range(count - 1):
+            forward.append(forward[-1] + _distance(exits[order[k]], entries[order[k + 1]]))
+            backward.append(backward[-1] + _distance(exits[order[k + 1]], entries[order[k]]))
+        return forward, backward
+
+    forward, backward = prefixSums()
+    for i in range(count - 1):
+        for j in range(i + 1, count):
+            previous = exits[order[i - 1]] if i > 0 else start
+            old = _distance(previous, entries[order[i]]) + forward[j] - forward[i]
+            new = _distance(previous, entries[order[j]]) + backward[j] - backward[i]
+            if j + 1 < count:
+                following = entries[order[j + 1]]
+                old += _distance(exits[order[j]], following)
+                new += _distance(exits[order[i]], following)
+            if new >= old - 1e-9:
+                continue
+            if constrained:
+                for k, path in enumerate(order):
+                    position[path] = k
+                if any(i <= position[other] <= j for k in range(i, j + 1) for other in before[order[k]]):
+                    continue
+            order[i:j + 1] = reversed(order[i:j + 1])
+            forward, backward = prefixSums()
+            improved = True
+    return improved
+
+
+# start a closed loop at the curve, or the vertex of a closed polyline, that begins nearest to point
+def _rotateLoop(loop, point) -> list:
+    if len(loop) == 1 and isinstance(loop[0], Polyline):
+        polyline = loop[0]
+        k = min(range(len(polyline.points)), key = lambda k: _distance(point, polyline.points[k]))
+        return [Polyline(polyline.points[k:] + polyline.points[:k], polyline.bulges[k:] + polyline.bulges[:k], True)]
+    if len(loop) < 2:
+        return loop
+    nearest = min(range(len(loop)), key = lambda k: _distance(point, curveStartPoint(loop[k])))
+    return loop[nearest:] + loop[:nearest]
+
+
+# the curves of a part chained into loops, each loop after the loops inside it, in an order that keeps the travel short
+def orderPartCurves(curves, tolerance = 1e-6) -> list:
+    loops, chains = chainLoops(curves, tolerance)
+    paths = loops + chains
+    if len(paths) < 2:
+        return [curve for path in paths for curve in path]
+
+    # every loop waits for the loops and open chains directly inside it, and those for theirs
+    containment = loopContainment(loops)
+    before = [[] for path in paths]
+    for i, parent in enumerate(containment.parents()):
+        if parent != -1:
+            before[parent].append(i)
+    for i in range(len(loops), len(paths)):
+        parent = containment.enclosingLoop(curveStartPoint(paths[i][0]))
+        if parent != -1:
+            before[parent].append(i)
+
+    entries = [curveStartPoint(path[0]) for path in paths]
+    exits = [curveEndPoint(path[-1]) for path in paths]
+    minX, minY, maxX, maxY = curvesBoundingBox(curves)
+    order = orderPaths(entries, exits, before, (minX, minY))
+
+    # pierce each loop where it is closest to the end of the previous cut
+    ordered = []
+    position = entries[order[0]]
+    for i in order:
+        path = _rotateLoop(paths[i], position) if i < len(loops) else paths[i]
+        ordered.extend(path)
+        position = curveEndPoint(path[-1])
+
+    # the tour is only a local optimum, so the paths stay in the order their curves came in
+    # when that already cuts every path after the ones inside it and travels less
+    given = {id(curve): k for k, curve in enumerate(curves)}
+    firstCurve = [min(given.get(id(curve), len(curves)) for curve in path) for path in paths]
+    givenOrder = sorted(range(len(paths)), key = lambda i: firstCurve[i])
+    rank = [0] * len(paths)
+    for k, i in enumerate(givenOrder):
+        rank[i] = k
+    if all(rank[j] < rank[i] for i in range(len(paths)) for j in before[i]):
+        givenCurves = [curve for i in givenOrder for curve in paths[i]]
+        if pathStats(givenCurves, tolerance).travel < pathStats(ordered, tolerance).travel:
+            return givenCurves
+    return ordered
+
+
+# (cut length, pierces, travel) of curves cut in the given order, a pierce is counted wherever a curve doesn't
+# continue from the end of the one before, the travel to the first pierce is left out
+def pathStats(curves, tolerance = 1e-6) -> ToolpathStats:
+    cutLength = 0.0
+    pierces = 0
+    travel = 0.0
+    position = None
+    for curve in curves:
+        cutLength += curveLength(curve)
+        startPoint = curveStartPoint(curve)
+        if position is None or isClosedCurve(curve) or _distance(position, startPoint) > tolerance:
+            if position is not None:
+                travel += _distance(position, startPoint)
+            pierces += 1
+        position = curveEndPoint(curve)
+    return ToolpathStats(cutLength, pierces, travel)
+
+
+def addStats(first, second) -> ToolpathStats:
+    return ToolpathStats(first.cutLength + second.cutLength, first.pierces + second.pierces, first.travel + second.travel)
@@ -0,0 +1,49 @@
+# process pools that also work from inside Fusion's embedded interpreter
+
+import concurrent.futures
+import multiprocessing
+import os
+import pickle
+import sys
+
+
+# inside an embedded interpreter (such as Fusion) sys.executable is the host application,
+# so spawned workers have to be pointed at the python interpreter that ships with it
+def poolContext():
+    # spawned workers import this package by name, so the directory holding it has to be on their path
+    packageRoot = os.path.abspath(__file__)
+    for i in range(len(__name__.split('.'))):
+        packageRoot = os.path.dirname(packageRoot)
+    if packageRoot not in sys.path:
+        sys.path.append(packageRoot)
+
+    context = multiprocessing.get_context('spawn')
+    if os.path.basename(sys.executable).lower().startswith('python'):
+        return context
+    for candidate in (os.path.join(sys.exec_prefix, 'python.exe'), os.path.join(sys.exec_prefix, 'Python', 'python.exe'),
+                      os.path.join(sys.exec_prefix, 'bin', 'python3')):
+        if os.path.isfile(candidate):
+            context.set_executable(candidate)
+            return context
+    return None
+
+
+# call function once per task and return the results in task order
+# tasks run in worker processes when they can be started, otherwise in threads of this process
+def runInPool(function, tasks, workers = None) -> list:
+    tasks = list(tasks)
+    if len(tasks) == 0:
+        return []
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers == 1:
+        return [function(task) for task in tasks]
+
+    context = poolContext()
+    if context is not None:
+        try:
+            with concurrent.futures.ProcessPoolExecutor(workers, context) as pool:
+                return list(pool.map(function, tasks))
+        except (OSError, ImportError, pickle.PicklingError, concurrent.futures.process.BrokenProcessPool):
+            pass
+    with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(function, tasks))
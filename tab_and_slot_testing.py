@@ -3,6 +3,33 @@
 
 import adsk.core, adsk.fusion, adsk.cam, traceback
 
+# the laserlib package sits next to this script, Fusion loads the script as a module of its folder like the add-in
+from .laserlib.spatial import BoundingVolumeHierarchy
+
+
+# ============================= SETTINGS ============================= #
+hole_diameter = 0.41
+hole_depth = 2.005
+
+tab_width = 0.825
+tab_spacing = 2.516  # center to center
+
+nut_width = 0.85
+nut_height = 0.31
+nut_offset = 0.295
+
+# how far past the back face of the top body the bottom body taken from the index has to contain the ray
+bottom_probe_depth = 0.01
+
+# cut and join the tool bodies of all joints on a body with a single base feature and combine,
+# instead of one per joint, so the timeline recomputes once per body rather than once per joint
+batch_combine = True
+
+# build the tool bodies once for each pair of sheet thicknesses and copy them for every joint
+cache_tool_templates = True
+# ==================================================================== #
+
+
 def run(context):
     ui = None
     try:
@@ -12,20 +39,6 @@ def run(context):
         des = adsk.fusion.Design.cast(app.activeProduct)
         root = des.rootComponent
 
-    
-        # ============================= SETTINGS ============================= #
-        hole_diameter = 0.41
-        hole_depth = 2.005
-
-        tab_width = 0.825
-        tab_spacing = 2.516  # center to center
-
-        nut_width = 0.85
-        nut_height = 0.31
-        nut_offset = 0.295
-        # ==================================================================== #
-
-
         # select a point which defines where to cut out the tab and slot geometry
         # this should be the point to add the screw hole in the top plate (same as selecting the points to add a hole in the usual hole feature)
         selections = ui.activeSelections
@@ -34,56 +47,68 @@ def run(context):
             if selection.entity.objectType == adsk.fusion.SketchPoint.classType():
                 selected_points.append(selection.entity)
 
+        # the bounding boxes of all bodies, so most queries don't have to search the whole assembly
+        body_index = get_body_index(root)
+
+        # the target bodies and the tool bodies to cut from them and join to them, when combining in batches
+        target_tools = []
+        # prebuilt tool bodies by sheet thicknesses and settings
+        tool_templates = {}
+        # the thickness of every top body, and the laser face, its normal and the thickness of every bottom body,
+        # as (body, value) pairs that are forgotten once a combine feature changes the body
+        top_thicknesses = []
+        laser_faces = []
         for selected_point in selected_points:
             point = selected_point.worldGeometry
-            face = get_face_under_point(point)
+            face = get_face_under_point(point, body_index)
             top_param_body = face.body
 
             # get the normal and reverse its direction so it points into the body
             normal: adsk.core.Vector3D = get_planar_face_normal(face)
             normal.scaleBy(-1.0)
 
-            # cast a ray to find the back face of the body
             hit_collection: adsk.core.ObjectCollection = adsk.core.ObjectCollection.create()
-            obj_collection = root.findBRepUsingRay(point, normal, 1, 1e-5, True, hit_collection)
-
-            # get the hit face that corresponds to the back face
-            for obj, hit in zip(obj_collection, hit_collection):
-                if obj.body == top_param_body and obj != face:
-                    hit_point = hit
-                    back_face = obj
-                    break
-            top_sheet_thickness = hit_point.distanceTo(point)
-
-            # now cast the ray to find the bottom body for the joinery
-            obj_collection = root.findBRepUsingRay(point, normal, 0, 1e-5, True, hit_collection)
-            bottom_param_body = obj_collection.item(1)
-            if bottom_param_body == top_param_body:
-                bottom_param_body = obj_collection.item(0)
+            top_sheet_thickness = get_body_value(top_thicknesses, top_param_body)
+            if top_sheet_thickness is None:
+                # cast a ray to find the back face of the body
+                obj_collection = root.findBRepUsingRay(point, normal, 1, 1e-5, True, hit_collection)
+
+                # get the hit face that corresponds to the back face
+                for obj, hit in zip(obj_collection, hit_collection):
+                    if obj.body == top_param_body and obj != face:
+                        hit_point = hit
+                        back_face = obj
+                        break
+                top_sheet_thickness = hit_point.distanceTo(point)
+                top_thicknesses.append((top_param_body, top_sheet_thickness))
+
+            # the bottom body for the joinery is the only other body along the ray,
+            # the ray is only cast into the assembly when the boxes of several bodies lie along it
+            # or the body of the only box doesn't continue the ray right past the top body, a box along the ray
+            # doesn't mean the body itself is
+            candidates = [body for near, far, body in body_index.raycast(point.asArray(), normal.asArray(), 1e-5) if not body == top_param_body]
+            if len(candidates) == 1 and body_contains_ray(candidates[0], point, normal, top_sheet_thickness + bottom_probe_depth):
+                bottom_param_body = candidates[0]
+            else:
+                obj_collection = root.findBRepUsingRay(point, normal, 0, 1e-5, True, hit_collection)
+                bottom_param_body = obj_collection.item(1)
+                if bottom_param_body == top_param_body:
+                    bottom_param_body = obj_collection.item(0)
             normal.scaleBy(-1.0)  # fix the normal vector
-            laser_face = get_face_to_cut_body(bottom_param_body)
-            bottom_sheet_thickness = get_2d_body_thickness(laser_face)
-            z_dir = get_planar_face_normal(laser_face)
+            laser_face_values = get_body_value(laser_faces, bottom_param_body)
+            if laser_face_values is None:
+                laser_face = get_face_to_cut_body(bottom_param_body)
+                laser_face_values = (laser_face, get_planar_face_normal(laser_face), get_2d_body_thickness(laser_face))
+                laser_faces.append((bottom_param_body, laser_face_values))
+            laser_face, z_dir, bottom_sheet_thickness = laser_face_values
             x_dir = normal.crossProduct(z_dir)
 
-            # create the bodies which represent the tab and screw cutouts
+            # get the bodies which represent the tab and screw cutouts
             tBRep: adsk.fusion.TemporaryBRepManager = adsk.fusion.TemporaryBRepManager.get()
-            bodies = []
-
-            # cylinder for screw hole in top sheet
-            center_body = tBRep.createCylinderOrCone(adsk.core.Point3D.create(0, 0, 0), hole_diameter / 2, adsk.core.Point3D.create(0, -top_sheet_thickness, 0), hole_diameter / 2)
-
-            # box for screw hole in bottom sheet
-            tBRep.booleanOperation(center_body, tBRep.createBox(adsk.core.OrientedBoundingBox3D.create(adsk.core.Point3D.create(0, (top_sheet_thickness - hole_depth) / 2 - top_sheet_thickness, 0), adsk.core.Vector3D.create(0, 1, 0), adsk.core.Vector3D.create(1, 0, 0), hole_depth - top_sheet_thickness, hole_diameter, bottom_sheet_thickness)), adsk.fusion.BooleanTypes.UnionBooleanType)
-
-            # box for nut cutout in bottom sheet
-            tBRep.booleanOperation(center_body, tBRep.createBox(adsk.core.OrientedBoundingBox3D.create(adsk.core.Point3D.create(0, -hole_depth + nut_height / 2 + nut_offset, 0), adsk.core.Vector3D.create(0, 1, 0), adsk.core.Vector3D.create(1, 0, 0), nut_height, nut_width, bottom_sheet_thickness)), adsk.fusion.BooleanTypes.UnionBooleanType)
-
-            # box for left tab (looking from front)
-            left_tab_body = tBRep.createBox(adsk.core.OrientedBoundingBox3D.create(adsk.core.Point3D.create(-tab_spacing / 2, -top_sheet_thickness / 2, 0), adsk.core.Vector3D.create(0, 1, 0), adsk.core.Vector3D.create(1, 0, 0), top_sheet_thickness, tab_width, bottom_sheet_thickness))
-
-            # box for right tab
-            right_tab_body = tBRep.createBox(adsk.core.OrientedBoundingBox3D.create(adsk.core.Point3D.create(tab_spacing / 2, -top_sheet_thickness / 2, 0), adsk.core.Vector3D.create(0, 1, 0), adsk.core.Vector3D.create(1, 0, 0), top_sheet_thickness, tab_width, bottom_sheet_thickness))
+            if cache_tool_templates:
+                center_body, left_tab_body, right_tab_body = get_tool_bodies(tBRep, tool_templates, top_sheet_thickness, bottom_sheet_thickness)
+            else:
+                center_body, left_tab_body, right_tab_body = create_tool_bodies(tBRep, top_sheet_thickness, bottom_sheet_thickness)
 
             # transform the tool bodies onto the part
             transform = adsk.core.Matrix3D.create()
@@ -92,53 +117,131 @@ def run(context):
             tBRep.transform(left_tab_body, transform)
             tBRep.transform(right_tab_body, transform)
 
-            # add the temporary bodies to a base feature
-            top_comp = top_param_body.parentComponent
-            top_base_feature = top_comp.features.baseFeatures.add()
-            top_base_feature.startEdit()
-            top_comp.bRepBodies.add(center_body, top_base_feature)
-            top_comp.bRepBodies.add(left_tab_body, top_base_feature)
-            top_comp.bRepBodies.add(right_tab_body, top_base_feature)
-            top_base_feature.finishEdit()
-
-            # create a combine feature to subtract the tab and slot bodies from the top part
-            tool_bodies = adsk.core.ObjectCollection.create()
-            tool_bodies.add(top_base_feature.bodies.item(0))
-            tool_bodies.add(top_base_feature.bodies.item(1))
-            tool_bodies.add(top_base_feature.bodies.item(2))
-            combine_input = top_comp.features.combineFeatures.createInput(top_param_body, tool_bodies)
-            combine_input.operation = adsk.fusion.FeatureOperations.CutFeatureOperation
-            combine_feature = top_comp.features.combineFeatures.add(combine_input)
-
-            # add the temporary bodies to a base feature
-            bottom_comp = bottom_param_body.parentComponent
-            bottom_base_feature = bottom_comp.features.baseFeatures.add()
-            bottom_base_feature.startEdit()
-            bottom_comp.bRepBodies.add(center_body, bottom_base_feature)
-            bottom_comp.bRepBodies.add(left_tab_body, bottom_base_feature)
-            bottom_comp.bRepBodies.add(right_tab_body, bottom_base_feature)
-            bottom_base_feature.finishEdit()
-
-            # create two combine features for the bottom part
-            tool_bodies_cut = adsk.core.ObjectCollection.create()
-            tool_bodies_cut.add(bottom_base_feature.bodies.item(0))
-            tool_bodies_add = adsk.core.ObjectCollection.create()
-            tool_bodies_add.add(bottom_base_feature.bodies.item(1))
-            tool_bodies_add.add(bottom_base_feature.bodies.item(2))
-
-            combine_input = bottom_comp.features.combineFeatures.createInput(bottom_param_body, tool_bodies_cut)
-            combine_input.operation = adsk.fusion.FeatureOperations.CutFeatureOperation
-            combine_feature = bottom_comp.features.combineFeatures.add(combine_input)
-
-            combine_input = bottom_comp.features.combineFeatures.createInput(bottom_param_body, tool_bodies_add)
-            combine_input.operation = adsk.fusion.FeatureOperations.JoinFeatureOperation
-            combine_feature = bottom_comp.features.combineFeatures.add(combine_input)
+            if batch_combine:
+                # hold on to the tool bodies until every joint has been laid out
+                add_tool_bodies(target_tools, top_param_body, [center_body, left_tab_body, right_tab_body], [])
+                add_tool_bodies(target_tools, bottom_param_body, [center_body], [left_tab_body, right_tab_body])
+            else:
+                # subtract the tab and slot bodies from the top part, cut the screw hole in the bottom part and join the tabs to it
+                combine_tool_bodies(top_param_body, [center_body, left_tab_body, right_tab_body], [])
+                combine_tool_bodies(bottom_param_body, [center_body], [left_tab_body, right_tab_body])
+
+                # the faces of both bodies have changed, a batch only changes them once every joint is laid out
+                for body_values in (top_thicknesses, laser_faces):
+                    forget_body(body_values, top_param_body)
+                    forget_body(body_values, bottom_param_body)
+
+        for target_body, cut_bodies, join_bodies in target_tools:
+            combine_tool_bodies(target_body, cut_bodies, join_bodies)
 
     except:
         if ui:
             ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
 
+# create the bodies which represent the tab and screw cutouts, centered on the origin with the top sheet along -y
+def create_tool_bodies(tBRep, top_sheet_thickness, bottom_sheet_thickness):
+    # cylinder for screw hole in top sheet
+    center_body = tBRep.createCylinderOrCone(adsk.core.Point3D.create(0, 0, 0), hole_diameter / 2, adsk.core.Point3D.create(0, -top_sheet_thickness, 0), hole_diameter / 2)
+
+    # box for screw hole in bottom sheet
+    tBRep.booleanOperation(center_body, tBRep.createBox(adsk.core.OrientedBoundingBox3D.create(adsk.core.Point3D.create(0, (top_sheet_thickness - hole_depth) / 2 - top_sheet_thickness, 0), adsk.core.Vector3D.create(0, 1, 0), adsk.core.Vector3D.create(1, 0, 0), hole_depth - top_sheet_thickness, hole_diameter, bottom_sheet_thickness)), adsk.fusion.BooleanTypes.UnionBooleanType)
+
+    # box for nut cutout in bottom sheet
+    tBRep.booleanOperation(center_body, tBRep.createBox(adsk.core.OrientedBoundingBox3D.create(adsk.core.Point3D.create(0, -hole_depth + nut_height / 2 + nut_offset, 0), adsk.core.Vector3D.create(0, 1, 0), adsk.core.Vector3D.create(1, 0, 0), nut_height, nut_width, bottom_sheet_thickness)), adsk.fusion.BooleanTypes.UnionBooleanType)
+
+    # box for left tab (looking from front)
+    left_tab_body = tBRep.createBox(adsk.core.OrientedBoundingBox3D.create(adsk.core.Point3D.create(-tab_spacing / 2, -top_sheet_thickness / 2, 0), adsk.core.Vector3D.create(0, 1, 0), adsk.core.Vector3D.create(1, 0, 0), top_sheet_thickness, tab_width, bottom_sheet_thickness))
+
+    # box for right tab
+    right_tab_body = tBRep.createBox(adsk.core.OrientedBoundingBox3D.create(adsk.core.Point3D.create(tab_spacing / 2, -top_sheet_thickness / 2, 0), adsk.core.Vector3D.create(0, 1, 0), adsk.core.Vector3D.create(1, 0, 0), top_sheet_thickness, tab_width, bottom_sheet_thickness))
+
+    return center_body, left_tab_body, right_tab_body
+
+
+# the tool bodies only depend on the sheet thicknesses and the settings, so they are built once for each combination
+# and every joint gets copies of them
+def get_tool_bodies(tBRep, tool_templates, top_sheet_thickness, bottom_sheet_thickness):
+    # the thicknesses come from ray casts, so they are rounded to keep noise from splitting the templates
+    settings = (hole_diameter, hole_depth, tab_width, tab_spacing, nut_width, nut_height, nut_offset)
+    key = (round(top_sheet_thickness, 6), round(bottom_sheet_thickness, 6), settings)
+    template = tool_templates.get(key)
+    if template is None:
+        template = tool_templates[key] = create_tool_bodies(tBRep, top_sheet_thickness, bottom_sheet_thickness)
+    return [tBRep.copy(body) for body in template]
+
+
+# the value remembered for a body, or None, bodies are compared with == as the API returns a new object every time
+def get_body_value(body_values, body):
+    for known_body, value in body_values:
+        if known_body == body:
+            return value
+    return None
+
+
+def forget_body(body_values, body):
+    body_values[:] = [(known_body, value) for known_body, value in body_values if not known_body == body]
+
+
+# queue tool bodies for a target body, a body can be the top part of one joint and the bottom part of another
+def add_tool_bodies(target_tools, target_body, cut_bodies, join_bodies):
+    for body, cuts, joins in target_tools:
+        if body == target_body:
+            cuts.extend(cut_bodies)
+            joins.extend(join_bodies)
+            return
+    target_tools.append((target_body, list(cut_bodies), list(join_bodies)))
+
+
+# add the temporary tool bodies to a single base feature in the component of the target body,
+# then cut and join them to the target body with one combine feature each
+def combine_tool_bodies(target_body, cut_bodies, join_bodies):
+    comp = target_body.parentComponent
+    base_feature = comp.features.baseFeatures.add()
+    base_feature.startEdit()
+    for tool_body in cut_bodies + join_bodies:
+        comp.bRepBodies.add(tool_body, base_feature)
+    base_feature.finishEdit()
+
+    # the bodies of the base feature are in the order they were added
+    base_bodies = base_feature.bodies
+    operations = ((adsk.fusion.FeatureOperations.CutFeatureOperation, 0, len(cut_bodies)),
+                  (adsk.fusion.FeatureOperations.JoinFeatureOperation, len(cut_bodies), len(join_bodies)))
+    for operation, first, count in operations:
+        if count == 0:
+            continue
+        tool_bodies = adsk.core.ObjectCollection.create()
+        for i in range(first, first + count):
+            tool_bodies.add(base_bodies.item(i))
+        combine_input = comp.features.combineFeatures.createInput(target_body, tool_bodies)
+        combine_input.operation = operation
+        comp.features.combineFeatures.add(combine_input)
+
+
+# bounding volume hierarchy over the boxes of the visible bodies in the root component and all occurrences,
+# hidden bodies are left out like the ray casts it stands in for leave them out
+def get_body_index(root) -> BoundingVolumeHierarchy:
+    body_lists = [root.bRepBodies] + [occurrence.bRepBodies for occurrence in root.allOccurrences]
+    items = []
+    for bodies in body_lists:
+        for i in range(bodies.count):
+            body = bodies.item(i)
+            if not body.isVisible:
+                continue
+            box = body.boundingBox
+            items.append((body, tuple(box.minPoint.asArray()) + tuple(box.maxPoint.asArray())))
+    return BoundingVolumeHierarchy(items)
+
+
+# whether the point at distance along the ray from origin is inside the body
+def body_contains_ray(body, origin: adsk.core.Point3D, direction: adsk.core.Vector3D, distance) -> bool:
+    probe = direction.copy()
+    probe.scaleBy(distance)
+    point = origin.copy()
+    point.translateBy(probe)
+    return body.pointContainment(point) == adsk.fusion.PointContainment.PointInsidePointContainment
+
+
 # Get the face the selected point lies on. This assumes the point is
 # in root component space. The returned face will be in the context
 # of the root component.
@@ -146,11 +249,16 @@ def run(context):
 # There is a case where more than one face can be found but in this case
 # None is returned. The case is when the point is very near the edge of
 # the face so it is ambiguous which face the point is on.
-def get_face_under_point(point: adsk.core.Point3D) -> adsk.fusion.BRepFace:
+#
+# If the body index is given, the assembly is only searched when the point is in the box of a body.
+def get_face_under_point(point: adsk.core.Point3D, body_index = None) -> adsk.fusion.BRepFace:
     app = adsk.core.Application.get()
     des: adsk.fusion.Design = app.activeProduct
     root = des.rootComponent
 
+    if body_index is not None and not body_index.itemsAtPoint(point.asArray(), 0.01):
+        return None
+
     found_faces: adsk.core.ObjectCollection = root.findBRepUsingPoint(point, adsk.fusion.BRepEntityTypes.BRepFaceEntityType, 0.01, True)
     if found_faces.count == 0:
         return None
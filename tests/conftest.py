@@ -0,0 +1,8 @@
+# the tests import laserlib from the repository root, like the benchmarks do
+# nothing here needs Fusion, the add-in is run against the stand-in API in benchmarks/fakeadsk
+# run from the repository root with: python -m pytest tests
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,77 @@
+# dumped body geometry written and read back, as JSON and as NumPy archives
+
+import json
+import math
+import pytest
+import laserlib.bodydump as bodydump
+from laserlib.bodydump import BodyRecord, readDump, writeDump
+from laserlib.geometry import Arc, Circle, Line, Polyline, polylineSegments
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+requiresNumpy = pytest.mark.skipif(numpy is None, reason = 'NumPy is not installed')
+
+FLATNESS = {'normal': [0.0, 0.0, 1.0], 'profileArea': 22.5, 'backArea': 22.5,
+            'sideEdges': [[True, [0.0, 0.0, 0.0], [0.0, 0.0, 0.3]], [False, [6.0, 0.0, 0.0], [6.0, 0.0, 0.3]]]}
+
+
+def makeBodies():
+    outline = [Line((0.0, 0.0), (6.0, 0.0)), Line((6.0, 0.0), (6.0, 4.0)), Arc((3.0, 4.0), 3.0, 0.0, math.pi),
+               Line((0.0, 4.0), (0.0, 0.0))]
+    return [
+        BodyRecord('Plate', 0.3, outline + [Circle((3.0, 2.0), 0.5), Arc((1.0, 1.0), 0.25, math.pi / 3, -1.25)], FLATNESS),
+        BodyRecord('Bracket', 0.6, [Polyline([(0.0, 0.0), (4.0, 0.0), (4.0, 2.0), (0.0, 2.0)], [0.0, 0.5, 0.0, -0.25], True)], None),
+        BodyRecord('Empty', 0.1, [], None),
+    ]
+
+
+# the numbers of a curve record, with its points spread out
+def curveValues(curve):
+    return [value for field in curve for value in (field if isinstance(field, tuple) else (field,))]
+
+
+def test_jsonRoundTrip(tmp_path):
+    bodies = makeBodies()
+    path = str(tmp_path / 'bodies.json')
+    writeDump(path, bodies)
+    assert readDump(path) == bodies
+
+
+# the archive stores polylines as their lines and arcs, grouped by curve type within each body
+@requiresNumpy
+def test_npzRoundTrip(tmp_path):
+    bodies = makeBodies()
+    path = str(tmp_path / 'bodies.npz')
+    writeDump(path, bodies)
+    loaded = readDump(path)
+    assert [(body.name, body.thickness, body.flatness) for body in loaded] == \
+        [(body.name, body.thickness, body.flatness) for body in bodies]
+    for body, loadedBody in zip(bodies, loaded):
+        segments = [segment for curve in body.curves
+                    for segment in (polylineSegments(curve) if isinstance(curve, Polyline) else [curve])]
+        expected = [segment for kind in (Line, Arc, Circle) for segment in segments if isinstance(segment, kind)]
+        assert [type(curve) for curve in loadedBody.curves] == [type(curve) for curve in expected]
+        for curve, expectedCurve in zip(loadedBody.curves, expected):
+            assert curveValues(curve) == pytest.approx(curveValues(expectedCurve))
+
+
+def test_npzNeedsNumpy(tmp_path, monkeypatch):
+    monkeypatch.setattr(bodydump, 'numpy', None)
+    with pytest.raises(ImportError):
+        writeDump(str(tmp_path / 'bodies.npz'), makeBodies())
+    with pytest.raises(ImportError):
+        readDump(str(tmp_path / 'bodies.NPZ'))
+
+
+def test_newerOrUnknownDumpsAreRejected(tmp_path):
+    path = tmp_path / 'bodies.json'
+    path.write_text(json.dumps({'version': bodydump.DUMP_VERSION + 1, 'bodies': []}))
+    with pytest.raises(ValueError):
+        readDump(str(path))
+    path.write_text(json.dumps({'version': bodydump.DUMP_VERSION, 'bodies': [
+        {'name': 'Part', 'thickness': 0.3, 'curves': [['spline', 0.0, 0.0]]}]}))
+    with pytest.raises(ValueError):
+        readDump(str(path))
@@ -0,0 +1,84 @@
+# the least-recently-used cache behind the classification, nesting and profile caches
+# and the classification cache of the add-in run against the stand-in API in benchmarks/fakeadsk
+
+import importlib
+import os
+import sys
+from laserlib.cache import LruCache
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fakeadsk'))
+
+
+def test_evictsTheLeastRecentlyUsed():
+    cache = LruCache(maxEntries = 3)
+    for key in 'abc':
+        cache.put(key, key.upper())
+    # reading and writing both make an entry the most recent
+    assert cache.get('a') == 'A'
+    cache.put('b', 'B2')
+    cache.put('d', 'D')
+    assert list(cache.entries) == ['a', 'b', 'd']
+    cache.put('e', 'E')
+    assert list(cache.entries) == ['b', 'd', 'e']
+    assert len(cache) == cache.maxEntries == 3
+    assert cache.get('c') is None and cache.get('b') == 'B2'
+
+
+def test_countsHitsAndMisses():
+    cache = LruCache()
+    assert cache.get('a') is None
+    cache.put('a', 1)
+    assert cache.get('a') == 1 and cache.get('a') == 1
+    assert cache.get('b') is None
+    assert (cache.hits, cache.misses) == (2, 2)
+    cache.discard('a')
+    cache.discard('missing')
+    assert cache.get('a') is None
+    assert (cache.hits, cache.misses, len(cache)) == (2, 3, 0)
+
+
+def test_jsonKeepsTheEvictionOrder():
+    cache = LruCache(maxEntries = 3)
+    for key in 'abc':
+        cache.put(key, {'value': key})
+    cache.get('a')
+    loaded = LruCache.fromJson(cache.toJson(), maxEntries = 3)
+    assert list(loaded.entries.items()) == list(cache.entries.items())
+    loaded.put('d', {'value': 'd'})
+    assert list(loaded.entries) == ['c', 'a', 'd']
+    # loading into a smaller cache keeps the most recent entries
+    assert list(LruCache.fromJson(cache.toJson(), maxEntries = 2).entries) == ['c', 'a']
+
+
+def test_damagedJsonLoadsEmpty():
+    for text in ('', 'not json', '{"a": 1}', '[["a", 1], ["b"]]', '[1, 2]'):
+        cache = LruCache.fromJson(text)
+        assert len(cache) == 0 and cache.maxEntries == 2000
+
+
+# a cached classification whose profile face token no longer resolves to a face of the body
+# is classified again and counted as a miss, not as a hit
+def test_staleClassificationCountsAsMiss():
+    scenes = importlib.import_module('scenes')
+    app, design = scenes.newSession()
+    bodies = scenes.buildPlateAssembly(design, 3)
+    scenes.loadAddIn()
+    bodyModule = importlib.import_module('laseraddin.laserexport.bodies')
+
+    cache = LruCache()
+    results = [bodyModule.classifyBody(body, cache, design) for body in bodies]
+    assert (cache.hits, cache.misses) == (0, 3)
+    fingerprints = [bodyModule.getBodyFingerprint(body) for body in bodies]
+    assert bodyModule.getCachedClassification(bodies[0], fingerprints[0], cache, design) == results[0]
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    # one token that was deleted, and one that now names a face of another body
+    cache.entries[fingerprints[1]]['face'] = 'token-deleted'
+    cache.entries[fingerprints[2]]['face'] = results[0][1].entityToken
+    for body, fingerprint in zip(bodies[1:], fingerprints[1:]):
+        assert bodyModule.getCachedClassification(body, fingerprint, cache, design) is None
+        assert fingerprint not in cache.entries
+    assert (cache.hits, cache.misses) == (1, 5)
+
+    assert [bodyModule.classifyBody(body, cache, design) for body in bodies] == results
+    assert (cache.hits, cache.misses) == (2, 7)
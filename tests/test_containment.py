@@ -0,0 +1,121 @@
+# nesting of profile loops against testing every loop, with holes, islands in the holes and holes in the islands
+
+import random
+import pytest
+from laserlib.containment import ContainmentIndex, loopContainment, loopDepths
+from laserlib.geometry import Circle, Line
+
+
+def square(minX, minY, maxX, maxY):
+    return [(minX, minY), (maxX, minY), (maxX, maxY), (minX, maxY)]
+
+
+# name: (polygon, parent name)
+NESTED = {
+    'plate': (square(0.0, 0.0, 100.0, 60.0), None),
+    'hole': (square(10.0, 10.0, 50.0, 50.0), 'plate'),
+    'island': (square(20.0, 20.0, 40.0, 40.0), 'hole'),
+    'islandHole': (square(25.0, 25.0, 35.0, 35.0), 'island'),
+    'notch': ([(60.0, 10.0), (90.0, 10.0), (90.0, 50.0), (75.0, 30.0), (60.0, 50.0)], 'plate'),
+    'notchIsland': ([(62.0, 12.0), (88.0, 12.0), (75.0, 25.0)], 'notch'),
+    'beside': (square(91.0, 10.0, 95.0, 50.0), 'plate'),
+    'otherPart': (square(200.0, 0.0, 230.0, 30.0), None),
+    'otherHole': (square(205.0, 5.0, 225.0, 25.0), 'otherPart'),
+}
+
+
+def shuffledLoops(seed):
+    names = sorted(NESTED)
+    random.Random(seed).shuffle(names)
+    return names, [NESTED[name][0] for name in names]
+
+
+def depthOf(name):
+    depth = 0
+    while NESTED[name][1] is not None:
+        name, depth = NESTED[name][1], depth + 1
+    return depth
+
+
+def insidePolygon(polygon, x, y):
+    inside = False
+    for i in range(len(polygon)):
+        (x0, y0), (x1, y1) = polygon[i - 1], polygon[i]
+        if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
+
+
+# the innermost loop around the point is the deepest of the loops that contain it
+def bruteEnclosingLoop(polygons, depths, point):
+    enclosing = [loop for loop, polygon in enumerate(polygons) if insidePolygon(polygon, *point)]
+    return max(enclosing, key = lambda loop: depths[loop], default = -1)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_parentsAndDepthsOfNestedLoops(seed):
+    names, polygons = shuffledLoops(seed)
+    index = ContainmentIndex(polygons)
+    parents = index.parents()
+    assert [names[parent] if parent != -1 else None for parent in parents] == [NESTED[name][1] for name in names]
+    assert loopDepths(parents) == [depthOf(name) for name in names]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_enclosingLoopMatchesEvenOdd(seed):
+    names, polygons = shuffledLoops(seed)
+    index = ContainmentIndex(polygons)
+    depths = [depthOf(name) for name in names]
+    rng = random.Random(seed)
+    points = [(rng.uniform(-10.0, 240.0), rng.uniform(-10.0, 70.0)) for i in range(2000)]
+    # points on the heights of the vertices, where the rays run through corners
+    points += [(rng.uniform(-10.0, 240.0), rng.choice([10.0, 12.0, 20.0, 25.0, 30.0, 50.0])) for i in range(500)]
+    for point in points:
+        assert index.enclosingLoop(point) == bruteEnclosingLoop(polygons, depths, point)
+
+
+def test_gridOfHolesWithIslands():
+    polygons = [square(0.0, 0.0, 410.0, 410.0)]
+    for i in range(20):
+        for k in range(20):
+            polygons.append(square(10.0 + 20.0 * i, 10.0 + 20.0 * k, 20.0 + 20.0 * i, 20.0 + 20.0 * k))
+            if (i + k) % 3 == 0:
+                polygons.append(square(12.0 + 20.0 * i, 12.0 + 20.0 * k, 18.0 + 20.0 * i, 18.0 + 20.0 * k))
+    index = ContainmentIndex(polygons)
+    parents = index.parents()
+    expected = [-1]
+    for loop in range(1, len(polygons)):
+        # the islands follow their holes
+        expected.append(loop - 1 if polygons[loop][0][0] % 20.0 == 12.0 else 0)
+    assert parents == expected
+    depths = loopDepths(parents)
+    assert depths.count(0) == 1 and depths.count(1) == 400 and depths.count(2) == len(polygons) - 401
+
+    rng = random.Random(21)
+    for i in range(2000):
+        point = (rng.uniform(-5.0, 415.0), rng.uniform(-5.0, 415.0))
+        assert index.enclosingLoop(point) == bruteEnclosingLoop(polygons, depths, point)
+
+
+def test_loopDepthsOfALongChain():
+    # deeper than the recursion limit, with the loops numbered in a random order so children often come before their parents
+    chain = list(range(5001))
+    random.Random(0).shuffle(chain)
+    parents, depths = [None] * 5001, [None] * 5001
+    for depth, loop in enumerate(chain):
+        parents[loop] = chain[depth - 1] if depth > 0 else -1
+        depths[loop] = depth
+    assert loopDepths(parents) == depths
+    assert loopDepths([]) == []
+    assert loopDepths([-1, -1, 0, 2, 0]) == [0, 0, 1, 2, 1]
+
+
+def test_loopsOfCurves():
+    loops = [[Line((0.0, 0.0), (10.0, 0.0)), Line((10.0, 0.0), (10.0, 10.0)), Line((10.0, 10.0), (0.0, 10.0)), Line((0.0, 10.0), (0.0, 0.0))],
+             [Circle((5.0, 5.0), 4.0)], [Circle((5.0, 5.0), 0.05)]]
+    index = loopContainment(loops)
+    assert index.parents() == [-1, 0, 1]
+    assert index.enclosingLoop((5.0, 5.0)) == 2
+    assert index.enclosingLoop((5.0, 5.5)) == 1
+    assert index.enclosingLoop((0.5, 0.5)) == 0
+    assert index.enclosingLoop((11.0, 5.0)) == -1
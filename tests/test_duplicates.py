@@ -0,0 +1,79 @@
+# repeated parts recognized from their signatures whichever way the copies are placed
+
+import math
+import random
+from laserlib.duplicates import ShapeIndex, shapeSignature, signaturesMatch
+
+
+# profile edges of a 10 x 6 plate with a round hole and a square cutout, as (length, start, end) in the z = 0 plane
+# the hole is a single closed edge that starts and ends at the same point
+def plateEdges(hole = (2.5, 3.0), cutout = (6.0, 2.0)):
+    edges = []
+    for loop in ([(0.0, 0.0), (10.0, 0.0), (10.0, 6.0), (0.0, 6.0)],
+                 [(cutout[0], cutout[1]), (cutout[0], cutout[1] + 2.0), (cutout[0] + 2.0, cutout[1] + 2.0), (cutout[0] + 2.0, cutout[1])]):
+        for start, end in zip(loop, loop[1:] + loop[:1]):
+            edges.append((math.dist(start, end), start + (0.0,), end + (0.0,)))
+    seam = (hole[0] + 1.0, hole[1], 0.0)
+    edges.append((2.0 * math.pi, seam, seam))
+    return edges
+
+
+PLATE_AREA = 60.0 - math.pi - 4.0
+
+
+# rotate the edges about an axis through the origin, optionally mirror them first, then move them
+def placeEdges(edges, axis = (0.0, 0.0, 1.0), angle = 0.0, offset = (0.0, 0.0, 0.0), mirror = False):
+    norm = math.sqrt(sum(value * value for value in axis))
+    x, y, z = (value / norm for value in axis)
+    c, s = math.cos(angle), math.sin(angle)
+    rotation = [[c + x * x * (1 - c), x * y * (1 - c) - z * s, x * z * (1 - c) + y * s],
+                [y * x * (1 - c) + z * s, c + y * y * (1 - c), y * z * (1 - c) - x * s],
+                [z * x * (1 - c) - y * s, z * y * (1 - c) + x * s, c + z * z * (1 - c)]]
+
+    def place(point):
+        point = (-point[0], point[1], point[2]) if mirror else point
+        return tuple(sum(rotation[i][k] * point[k] for k in range(3)) + offset[i] for i in range(3))
+
+    return [(length, place(start), place(end)) for length, start, end in edges]
+
+
+def test_movedRotatedAndMirroredCopiesMatch():
+    original = shapeSignature(0.3, PLATE_AREA, plateEdges())
+    rng = random.Random(18)
+    for mirror in (False, True):
+        for i in range(20):
+            axis = tuple(rng.uniform(-1.0, 1.0) for k in range(3))
+            offset = tuple(rng.uniform(-100.0, 100.0) for k in range(3))
+            edges = placeEdges(plateEdges(), axis, rng.uniform(0.0, 2.0 * math.pi), offset, mirror)
+            # the edges of a copy can come in any order
+            rng.shuffle(edges)
+            assert signaturesMatch(original, shapeSignature(0.3, PLATE_AREA, edges))
+
+
+def test_featuresInOtherPlacesDontMatch():
+    original = shapeSignature(0.3, PLATE_AREA, plateEdges())
+    # the same outline, area and edge lengths, only the hole or the cutout sit elsewhere
+    assert not signaturesMatch(original, shapeSignature(0.3, PLATE_AREA, plateEdges(hole = (2.5, 4.0))))
+    assert not signaturesMatch(original, shapeSignature(0.3, PLATE_AREA, plateEdges(cutout = (5.0, 2.0))))
+    assert not signaturesMatch(original, shapeSignature(0.6, PLATE_AREA, plateEdges()))
+    assert not signaturesMatch(original, shapeSignature(0.3, PLATE_AREA, plateEdges()[:-1]))
+
+
+def test_matchingIsWithinTheRelativeTolerance():
+    original = shapeSignature(0.3, PLATE_AREA, plateEdges())
+    assert signaturesMatch(original, shapeSignature(0.3, PLATE_AREA * (1.0 + 1e-7), plateEdges()))
+    assert not signaturesMatch(original, shapeSignature(0.3, PLATE_AREA * (1.0 + 1e-3), plateEdges()))
+    assert signaturesMatch(original, shapeSignature(0.3, PLATE_AREA * (1.0 + 1e-3), plateEdges()), tolerance = 1e-2)
+
+
+def test_indexCountsTheCopiesOfEachShape():
+    index = ShapeIndex()
+    shapes = [
+        index.add(shapeSignature(0.3, PLATE_AREA, plateEdges()), 'Plate'),
+        index.add(shapeSignature(0.3, PLATE_AREA, plateEdges(hole = (2.5, 4.0))), 'Other'),
+        index.add(shapeSignature(0.3, PLATE_AREA, placeEdges(plateEdges(), angle = 1.0, offset = (5.0, 0.0, 0.0))), 'Plate (1)'),
+        index.add(shapeSignature(0.3, PLATE_AREA, placeEdges(plateEdges(), mirror = True)), 'Plate (2)'),
+    ]
+    assert shapes == [(0, True), (1, True), (0, False), (0, False)]
+    assert index.find(shapeSignature(0.3, PLATE_AREA, plateEdges(cutout = (5.0, 2.0)))) is None
+    assert index.quantities() == [('Plate', 3), ('Other', 1)]
@@ -0,0 +1,113 @@
+# the streaming DXF writer, fed plain curve records and read back as group code / value pairs
+
+import io
+import math
+import pytest
+from laserlib.dxf import DxfWriter, formatNumber
+from laserlib.geometry import Arc, Circle, Line, Polyline
+
+
+def readGroups(text):
+    lines = text.split('\n')
+    return [(int(lines[i]), lines[i + 1]) for i in range(0, len(lines) - 1, 2)]
+
+
+# the entities of the ENTITIES section, each as a list of its (code, value) pairs
+def readEntities(text):
+    groups = readGroups(text)
+    start = groups.index((2, 'ENTITIES')) + 1
+    entities = []
+    for code, value in groups[start:]:
+        if code == 0:
+            if value in ('ENDSEC', 'EOF'):
+                break
+            entities.append([])
+        entities[-1].append((code, value))
+    return entities
+
+
+def values(entity, code):
+    return [value for groupCode, value in entity if groupCode == code]
+
+
+def writeCurves(curves, **options):
+    stream = io.StringIO()
+    with DxfWriter(stream, **options) as writer:
+        writer.writeCurves(curves)
+    return stream.getvalue()
+
+
+def test_formatNumberDropsTrailingZeros():
+    assert formatNumber(1.5) == '1.5'
+    assert formatNumber(2.0) == '2'
+    assert formatNumber(-0.0000001) == '0'
+
+
+def test_fileHasHeaderAndSections():
+    groups = readGroups(writeCurves([], units = 'mm'))
+    assert groups[:4] == [(0, 'SECTION'), (2, 'HEADER'), (9, '$ACADVER'), (1, 'AC1009')]
+    assert (9, '$INSUNITS') in groups and groups[groups.index((9, '$INSUNITS')) + 1] == (70, '4')
+    assert groups[-2:] == [(0, 'ENDSEC'), (0, 'EOF')]
+
+
+def test_lineIsScaledAndDisplaced():
+    stream = io.StringIO()
+    with DxfWriter(stream, scale = 10.0) as writer:
+        writer.writeCurves([Line((0.0, 0.0), (1.0, 2.0))], dx = 1.0, dy = -1.0)
+    [entity] = readEntities(stream.getvalue())
+    assert entity[0] == (0, 'LINE')
+    assert values(entity, 10) == ['10'] and values(entity, 20) == ['-10']
+    assert values(entity, 11) == ['20'] and values(entity, 21) == ['10']
+
+
+def test_clockwiseArcIsWrittenCounterClockwise():
+    [entity] = readEntities(writeCurves([Arc((0.0, 0.0), 2.0, math.pi / 2, -math.pi / 2)]))
+    assert entity[0] == (0, 'ARC')
+    assert values(entity, 40) == ['2']
+    assert values(entity, 50) == ['0'] and values(entity, 51) == ['90']
+
+
+def test_circle():
+    [entity] = readEntities(writeCurves([Circle((1.0, 1.0), 0.5)]))
+    assert entity[0] == (0, 'CIRCLE')
+    assert values(entity, 10) == ['1'] and values(entity, 40) == ['0.5']
+
+
+def test_polylineIsAnR12PolylineWithVertices():
+    polyline = Polyline([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0)], [0.0, 0.5, 0.0], True)
+    entities = readEntities(writeCurves([polyline]))
+    assert [entity[0][1] for entity in entities] == ['POLYLINE', 'VERTEX', 'VERTEX', 'VERTEX', 'SEQEND']
+    assert values(entities[0], 66) == ['1'] and values(entities[0], 70) == ['1']
+    assert [(values(vertex, 10), values(vertex, 20)) for vertex in entities[1:4]] == \
+        [(['0'], ['0']), (['1'], ['0']), (['1'], ['1'])]
+    # the bulge belongs to the vertex its segment starts at
+    assert [values(vertex, 42) for vertex in entities[1:4]] == [[], ['0.5'], []]
+
+
+def test_entitiesAreStreamedAsTheyAreWritten():
+    stream = io.StringIO()
+    writer = DxfWriter(stream)
+    writer.begin()
+    sizes = []
+    for i in range(3):
+        writer.writeCurves([Line((i, 0.0), (i, 1.0))])
+        sizes.append(len(stream.getvalue()))
+    writer.close()
+    assert sizes[0] < sizes[1] < sizes[2]
+    assert writer.entityCount == 3
+
+
+def test_blocksAreWrittenAheadOfTheirInserts():
+    stream = io.StringIO()
+    with DxfWriter(stream, blocks = [('PART1', [Circle((0.0, 0.0), 1.0)])]) as writer:
+        writer.writeInsert('PART1', 5.0, 0.0, math.pi / 2)
+    text = stream.getvalue()
+    assert text.index('BLOCKS') < text.index('ENTITIES')
+    [insert] = readEntities(text)
+    assert insert[0] == (0, 'INSERT')
+    assert values(insert, 2) == ['PART1'] and values(insert, 10) == ['5'] and values(insert, 50) == ['90']
+
+
+def test_unknownCurveIsRejected():
+    with pytest.raises(TypeError):
+        writeCurves([(0.0, 0.0)])
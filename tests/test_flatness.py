@@ -0,0 +1,130 @@
+# the batch flatness check of a face table, the NumPy path and the per-body loop without it have to agree
+
+import math
+import pytest
+import laserlib.flatness as flatness
+from laserlib.flatness import AMBIGUOUS, CYLINDER, FLAT, NOT_FLAT, PLANE, FaceTable, classifyFaceTable
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# (surface type, normal, offset, area) of the faces of a box shaped plate between z = bottom and z = top
+def plateFaces(bottom = 0.0, top = 0.6, width = 10.0, height = 5.0):
+    thickness = top - bottom
+    return [(PLANE, (0.0, 0.0, 1.0), top, width * height), (PLANE, (0.0, 0.0, -1.0), -bottom, width * height),
+            (PLANE, (1.0, 0.0, 0.0), width, height * thickness), (PLANE, (-1.0, 0.0, 0.0), 0.0, height * thickness),
+            (PLANE, (0.0, 1.0, 0.0), height, width * thickness), (PLANE, (0.0, -1.0, 0.0), 0.0, width * thickness)]
+
+
+def withHoles():
+    faces = plateFaces()
+    hole = math.pi * 0.25
+    faces[0] = faces[0][:3] + (faces[0][3] - 2 * hole,)
+    faces[1] = faces[1][:3] + (faces[1][3] - 2 * hole,)
+    return faces + [(CYLINDER, None, None, 2.0 * math.pi * 0.5 * 0.6)] * 2
+
+
+def withPocket():
+    return plateFaces() + [(PLANE, (0.0, 0.0, 1.0), 0.3, 4.0)]
+
+
+def withSlantedFace():
+    faces = plateFaces()
+    faces[2] = (PLANE, (math.sqrt(0.5), 0.0, math.sqrt(0.5)), 7.5, 4.0)
+    return faces
+
+
+def withReversedBackNormal():
+    # the plane of the back face may point either way, here along the profile normal
+    faces = plateFaces(5.0, 5.6)
+    faces[1] = (PLANE, (0.0, 0.0, 1.0), 5.0, faces[1][3])
+    return faces
+
+
+def withZeroThickness():
+    return plateFaces(2.0, 2.0)
+
+
+def withUnequalCaps():
+    faces = plateFaces()
+    faces[1] = faces[1][:3] + (faces[1][3] - 1.0,)
+    return faces
+
+
+def cylinderRod():
+    return [(CYLINDER, None, None, 100.0), (PLANE, (0.0, 0.0, 1.0), 10.0, 3.0), (PLANE, (0.0, 0.0, -1.0), 0.0, 3.0)]
+
+
+def withoutBackFace():
+    return plateFaces()[:1] + plateFaces()[2:]
+
+
+# the faces of each case, the status with compareAreas on and off and the thickness of a flat body
+CASES = {
+    'plate': (plateFaces(), FLAT, FLAT, 0.6),
+    'plate away from the origin': (plateFaces(5.0, 5.6), FLAT, FLAT, 0.6),
+    'plate with holes': (withHoles(), FLAT, FLAT, 0.6),
+    'pocket': (withPocket(), AMBIGUOUS, AMBIGUOUS, 0.0),
+    'slanted face': (withSlantedFace(), AMBIGUOUS, AMBIGUOUS, 0.0),
+    'reversed back normal': (withReversedBackNormal(), FLAT, FLAT, 0.6),
+    'zero thickness': (withZeroThickness(), AMBIGUOUS, AMBIGUOUS, 0.0),
+    'unequal caps': (withUnequalCaps(), NOT_FLAT, FLAT, 0.6),
+    'cylinder': (cylinderRod(), NOT_FLAT, NOT_FLAT, 0.0),
+    'no back face': (withoutBackFace(), NOT_FLAT, NOT_FLAT, 0.0),
+}
+
+
+def classify(table, compareAreas, useNumpy, monkeypatch):
+    monkeypatch.setattr(flatness, 'numpy', numpy if useNumpy else None)
+    return classifyFaceTable(table, compareAreas)
+
+
+def assertSame(a, b):
+    assert (a.status, a.profileFace, a.backFace) == (b.status, b.profileFace, b.backFace)
+    assert a.thickness == pytest.approx(b.thickness, abs = 1e-12)
+    assert a.normal == pytest.approx(b.normal, abs = 1e-12)
+
+
+@pytest.mark.parametrize('compareAreas', [True, False])
+@pytest.mark.parametrize('name', list(CASES))
+def test_loopMatchesTheExpectedVerdict(name, compareAreas, monkeypatch):
+    faces, withAreas, withoutAreas, thickness = CASES[name]
+    table = FaceTable()
+    table.addBody(faces)
+    [verdict] = classify(table, compareAreas, False, monkeypatch)
+    assert verdict.status == (withAreas if compareAreas else withoutAreas)
+    assert verdict.thickness == pytest.approx(thickness if verdict.status == FLAT else 0.0)
+    if verdict.status == FLAT:
+        assert faces[verdict.profileFace][0] == PLANE and verdict.backFace == 1
+
+
+@pytest.mark.skipif(numpy is None, reason = 'NumPy is not installed')
+@pytest.mark.parametrize('compareAreas', [True, False])
+@pytest.mark.parametrize('name', list(CASES))
+def test_numpyMatchesTheLoop(name, compareAreas, monkeypatch):
+    table = FaceTable()
+    table.addBody(CASES[name][0])
+    [vectorized] = classify(table, compareAreas, True, monkeypatch)
+    [looped] = classify(table, compareAreas, False, monkeypatch)
+    assertSame(vectorized, looped)
+
+
+@pytest.mark.skipif(numpy is None, reason = 'NumPy is not installed')
+@pytest.mark.parametrize('compareAreas', [True, False])
+def test_numpyMatchesTheLoopOnAMixedTable(compareAreas, monkeypatch):
+    # the bodies of one table differ in their number of faces, and the faces are not in any order
+    table = FaceTable()
+    for k, (faces, withAreas, withoutAreas, thickness) in enumerate(list(CASES.values()) * 3):
+        table.addBody(faces[k % len(faces):] + faces[:k % len(faces)])
+    vectorized = classify(table, compareAreas, True, monkeypatch)
+    looped = classify(table, compareAreas, False, monkeypatch)
+    assert len(vectorized) == len(looped) == table.bodyCount
+    for a, b in zip(vectorized, looped):
+        assertSame(a, b)
+
+
+def test_emptyTable():
+    assert classifyFaceTable(FaceTable()) == []
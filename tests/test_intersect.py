@@ -0,0 +1,190 @@
+# the batched crossing kernels of the interior point search, with NumPy and without it
+# against the scalar getLineIntersection they replace
+
+import math
+import random
+import pytest
+import laserlib.intersect as intersect
+from laserlib.geometry import Arc, Circle, Line, arcPoint
+from laserlib.intersect import getArcCrossingParameters, getCrossingLine, getCrossingParameters, getInteriorPoint, \
+    getLineIntersection, getSegmentArrays
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@pytest.fixture(params = [pytest.param(True, marks = pytest.mark.skipif(numpy is None, reason = 'NumPy is not installed')), False])
+def useNumpy(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(intersect, 'numpy', None)
+    return request.param
+
+
+def pointAt(p, q, t):
+    return (p[0] + t * (q[0] - p[0]), p[1] + t * (q[1] - p[1]))
+
+
+# even-odd test against the edges of closed polygons
+def insidePolygons(polygons, x, y):
+    inside = False
+    for polygon in polygons:
+        for i in range(len(polygon)):
+            (x0, y0), (x1, y1) = polygon[i - 1], polygon[i]
+            if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+                inside = not inside
+    return inside
+
+
+def edgeDistance(polygons, x, y):
+    distance = float('inf')
+    for polygon in polygons:
+        for i in range(len(polygon)):
+            (x0, y0), (x1, y1) = polygon[i - 1], polygon[i]
+            ex, ey = x1 - x0, y1 - y0
+            s = min(1.0, max(0.0, ((x - x0) * ex + (y - y0) * ey) / (ex * ex + ey * ey)))
+            distance = min(distance, math.hypot(x - x0 - s * ex, y - y0 - s * ey))
+    return distance
+
+
+# the interior point has to be inside the material, not on its boundary
+def assertStrictlyInside(polygons, point):
+    assert point is not None
+    assert insidePolygons(polygons, *point)
+    assert edgeDistance(polygons, *point) > 1e-6
+
+
+# fine strokes of an arc or circle, for comparing the exact crossings with segment ones
+def arcStrokes(arc, count = 2000):
+    startAngle, sweep = (0.0, 2.0 * math.pi) if isinstance(arc, Circle) else (arc.startAngle, arc.sweep)
+    return [arcPoint(arc, startAngle + sweep * k / count) for k in range(count + 1)]
+
+
+# closed loops of lines, arcs and circles as polygons through their strokes
+def curvePolygons(loops):
+    polygons = []
+    for loop in loops:
+        polygon = []
+        for curve in loop:
+            points = [curve.start, curve.end] if isinstance(curve, Line) else arcStrokes(curve)
+            polygon.extend(points[:-1] if not isinstance(curve, Circle) else points)
+        polygons.append(polygon)
+    return polygons
+
+
+def closedPointSets(polygons):
+    return [polygon + polygon[:1] for polygon in polygons]
+
+
+def boundingBox(polygons):
+    points = [point for polygon in polygons for point in polygon]
+    return (min(x for x, y in points), min(y for x, y in points), max(x for x, y in points), max(y for x, y in points))
+
+
+def test_crossingsMatchTheScalarIntersection(useNumpy):
+    rng = random.Random(4)
+    pointSets = [[(rng.uniform(0.0, 10.0), rng.uniform(0.0, 10.0)) for k in range(2)] for i in range(300)]
+    # segments along the crossing line and degenerate ones never count as crossings
+    pointSets += [[(2.0, 2.0), (3.0, 3.0)], [(5.0, 1.0), (5.0, 1.0)]]
+    p, q = getCrossingLine((0.0, 0.0, 10.0, 10.0))
+    params = getCrossingParameters(getSegmentArrays(pointSets), p, q)
+    assert isinstance(params, numpy.ndarray) if useNumpy else isinstance(params, list)
+
+    expected = []
+    for (ax, ay), (bx, by) in pointSets:
+        hit = getLineIntersection(p[0], p[1], q[0], q[1], ax, ay, bx, by)
+        if hit:
+            expected.append(hit)
+    found = [pointAt(p, q, t) for t in params]
+    assert len(found) == len(expected) > 0
+    for a, b in zip(found, expected):
+        assert a == pytest.approx(b, abs = 1e-9)
+
+
+# the crossing line is the diagonal of the bounding box, so it runs through the corners of the square and the frame,
+# and only touches the tip of the notch
+@pytest.mark.parametrize('name', ['square', 'frame', 'comb', 'notched'])
+def test_interiorPointOfPolygonsIsInside(useNumpy, name):
+    polygons = {
+        'square': [[(0.0, 0.0), (4.0, 0.0), (4.0, 4.0), (0.0, 4.0)]],
+        'frame': [[(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (0.0, 10.0)], [(1.0, 1.0), (9.0, 1.0), (9.0, 9.0), (1.0, 9.0)]],
+        'comb': [[(0.0, 0.0), (10.0, 0.0), (10.0, 6.0), (8.0, 6.0), (8.0, 1.0), (6.0, 1.0), (6.0, 6.0), (4.0, 6.0), (4.0, 1.0),
+                  (2.0, 1.0), (2.0, 6.0), (0.0, 6.0)]],
+        'notched': [[(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (6.0, 10.0), (5.0, 5.0), (4.0, 10.0), (0.0, 10.0)]],
+    }[name]
+    point = getInteriorPoint(getSegmentArrays(closedPointSets(polygons)), boundingBox(polygons))
+    assertStrictlyInside(polygons, point)
+
+
+def test_noInteriorPointWithoutTwoCrossings(useNumpy):
+    assert getInteriorPoint(getSegmentArrays([[(0.0, 0.0), (1.0, 0.0)]]), (0.0, 0.0, 1.0, 1.0)) is None
+    # a triangle on one side of the crossing line, touching it at its corners only
+    triangle = [[(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (6.0, 4.0)]]
+    assert getInteriorPoint(getSegmentArrays(closedPointSets(triangle)), boundingBox(triangle)) is None
+
+
+def test_arcCrossingsMatchTheCircleEquation():
+    rng = random.Random(13)
+    arcs = [Circle((rng.uniform(2.0, 8.0), rng.uniform(2.0, 8.0)), rng.uniform(0.5, 3.0)) for i in range(50)]
+    arcs += [Arc((rng.uniform(2.0, 8.0), rng.uniform(2.0, 8.0)), rng.uniform(0.5, 3.0), rng.uniform(-math.pi, math.pi),
+                 rng.choice([-1.0, 1.0]) * rng.uniform(0.2, 2.0 * math.pi - 0.2)) for i in range(200)]
+    p, q = getCrossingLine((0.0, 0.0, 10.0, 10.0))
+    for arc in arcs:
+        params = getArcCrossingParameters([arc], p, q)
+        for t in params:
+            x, y = pointAt(p, q, t)
+            assert math.hypot(x - arc.center[0], y - arc.center[1]) == pytest.approx(arc.radius, abs = 1e-9)
+
+        # the strokes cross the line where the arc does, within the distance the strokes stray from the arc
+        strokes = arcStrokes(arc)
+        expected = []
+        for (ax, ay), (bx, by) in zip(strokes[:-1], strokes[1:]):
+            hit = getLineIntersection(p[0], p[1], q[0], q[1], ax, ay, bx, by)
+            if hit:
+                expected.append(hit)
+        assert len(params) == len(expected)
+        for a, b in zip(sorted(pointAt(p, q, t) for t in params), sorted(expected)):
+            assert a == pytest.approx(b, abs = 1e-4)
+
+
+def test_arcCrossingsOfTangentsAndMisses():
+    p, q = (0.0, 0.0), (10.0, 0.0)
+    assert getArcCrossingParameters([Circle((5.0, 1.0), 1.0)], p, q) == []
+    assert getArcCrossingParameters([Circle((5.0, 3.0), 1.0)], p, q) == []
+    assert getArcCrossingParameters([Circle((5.0, 0.0), 2.0)], p, q) == pytest.approx([0.3, 0.7])
+    # ends on the line count like the ends of segments, when the arc leaves them above the line,
+    # so the upper half of the circle counts at both ends, clockwise or counter-clockwise, and the lower half at neither
+    assert getArcCrossingParameters([Arc((5.0, 0.0), 2.0, 0.0, math.pi)], p, q) == pytest.approx([0.3, 0.7])
+    assert getArcCrossingParameters([Arc((5.0, 0.0), 2.0, math.pi, -math.pi)], p, q) == pytest.approx([0.3, 0.7])
+    assert getArcCrossingParameters([Arc((5.0, 0.0), 2.0, math.pi, math.pi)], p, q) == []
+    assert getArcCrossingParameters([Arc((5.0, 0.0), 2.0, 0.0, -math.pi)], p, q) == []
+    # a quarter from below up to the right end, and three quarters from there over the top and down through the left end
+    assert getArcCrossingParameters([Arc((5.0, 0.0), 2.0, -0.5 * math.pi, 0.5 * math.pi)], p, q) == []
+    assert getArcCrossingParameters([Arc((5.0, 0.0), 2.0, 0.0, 1.5 * math.pi)], p, q) == pytest.approx([0.3, 0.7])
+
+
+def slotLoop(x0, x1, y, radius):
+    return [Line((x0, y - radius), (x1, y - radius)), Arc((x1, y), radius, -0.5 * math.pi, math.pi),
+            Line((x1, y + radius), (x0, y + radius)), Arc((x0, y), radius, 0.5 * math.pi, math.pi)]
+
+
+# the crossing line runs through the centers of the ring, through the joints of the slot and its lines
+# and through the end of the straight edge of the D
+@pytest.mark.parametrize('name', ['ring', 'slotted', 'd', 'lens'])
+def test_interiorPointOfCurvesIsInside(useNumpy, name):
+    corner = math.atan2(3.0, 4.0)
+    loops = {
+        'ring': [[Circle((5.0, 5.0), 5.0)], [Circle((5.0, 5.0), 2.0)]],
+        'slotted': [[Line((0.0, 0.0), (10.0, 0.0)), Line((10.0, 0.0), (10.0, 10.0)), Line((10.0, 10.0), (0.0, 10.0)),
+                     Line((0.0, 10.0), (0.0, 0.0))], slotLoop(4.0, 6.0, 5.0, 1.0)],
+        'd': [[Arc((0.0, 0.0), 5.0, -0.5 * math.pi, math.pi), Line((0.0, 5.0), (0.0, -5.0))]],
+        'lens': [[Arc((0.0, -3.0), 5.0, corner, math.pi - 2.0 * corner), Arc((0.0, 3.0), 5.0, math.pi + corner,
+                                                                             math.pi - 2.0 * corner)]],
+    }[name]
+    curves = [curve for loop in loops for curve in loop]
+    pointSets = [(curve.start, curve.end) for curve in curves if isinstance(curve, Line)]
+    arcs = [curve for curve in curves if not isinstance(curve, Line)]
+    polygons = curvePolygons(loops)
+    point = getInteriorPoint(getSegmentArrays(pointSets), boundingBox(polygons[:1]), arcs)
+    assertStrictlyInside(polygons, point)
@@ -0,0 +1,202 @@
+# the chunked job driven by a stub event loop: a queue of posted ticks and a clock that only moves when told to
+
+import threading
+from concurrent.futures import Future
+import pytest
+from laserlib.jobs import ChunkedJob, runInThread
+
+
+class StubLoop:
+    def __init__(self) -> None:
+        self.posted = 0
+        self.ticks = 0
+        self.now = 0.0
+
+    def post(self):
+        self.posted += 1
+
+    def clock(self):
+        return self.now
+
+    # run the posted ticks until nothing is posted any more
+    def run(self, job, limit = 1000):
+        while self.posted and self.ticks < limit:
+            self.posted -= 1
+            self.ticks += 1
+            job.tick()
+
+
+def makeJob(loop, steps, **kwargs):
+    progress = []
+    job = ChunkedJob(steps, loop.post, onProgress = progress.append, clock = loop.clock, **kwargs)
+    return job, progress
+
+
+def test_stepsAreChunkedByTheTimeSlice():
+    loop = StubLoop()
+
+    def steps():
+        for i in range(10):
+            loop.now += 0.03
+            yield i
+
+    job, progress = makeJob(loop, steps(), chunkTime = 0.1)
+    job.start()
+    loop.run(job)
+    assert progress == list(range(10))
+    assert job.finished and not job.cancelled and job.error is None
+    # four steps of 0.03 fill a slice of 0.1, so ten steps take three ticks
+    assert loop.ticks == 3
+
+
+def test_futureResultIsSentBackOnceDone():
+    loop = StubLoop()
+    future = Future()
+    received = []
+
+    def steps():
+        received.append((yield future))
+        yield 'after'
+
+    job, progress = makeJob(loop, steps())
+    job.start()
+    loop.run(job)
+    # waiting on the Future posts nothing, the event loop is left alone
+    assert not job.finished and loop.posted == 0
+
+    future.set_result(42)
+    assert loop.posted == 1
+    loop.run(job)
+    assert received == [42] and progress == ['after'] and job.finished
+
+
+def test_futureErrorIsThrownIntoTheSteps():
+    loop = StubLoop()
+    future = Future()
+    caught = []
+
+    def steps():
+        try:
+            yield future
+        except ValueError as error:
+            caught.append(str(error))
+        yield 'recovered'
+
+    job, progress = makeJob(loop, steps())
+    job.start()
+    loop.run(job)
+    future.set_exception(ValueError('bad'))
+    loop.run(job)
+    assert caught == ['bad'] and progress == ['recovered'] and job.finished and job.error is None
+
+
+def test_finishedFutureDoesNotWaitForATick():
+    loop = StubLoop()
+    future = Future()
+    future.set_result('done')
+
+    def steps():
+        yield (yield future)
+
+    job, progress = makeJob(loop, steps())
+    job.start()
+    loop.run(job)
+    assert progress == ['done'] and loop.ticks == 1
+
+
+def test_strayTickWhileWaitingDoesNothing():
+    loop = StubLoop()
+    future = Future()
+
+    def steps():
+        yield (yield future)
+
+    job, progress = makeJob(loop, steps())
+    job.start()
+    loop.run(job)
+    assert job.tick() is True and progress == [] and not job.finished
+
+
+def test_cancelledJobRunsItsCleanup():
+    loop = StubLoop()
+    cancelled = []
+    cleanedUp = []
+
+    def steps():
+        try:
+            for i in range(100):
+                loop.now += 1.0
+                yield i
+        finally:
+            cleanedUp.append(True)
+
+    job, progress = makeJob(loop, steps(), isCancelled = lambda: bool(cancelled))
+    job.start()
+    loop.run(job, limit = 3)
+    cancelled.append(True)
+    loop.run(job)
+    assert progress == [0, 1, 2]
+    assert job.finished and job.cancelled and cleanedUp == [True]
+    assert job.tick() is False
+
+
+def test_cancelWhileWaitingDropsTheFuture():
+    loop = StubLoop()
+    future = Future()
+    cleanedUp = []
+
+    def steps():
+        try:
+            yield future
+            yield 'never'
+        finally:
+            cleanedUp.append(True)
+
+    job, progress = makeJob(loop, steps())
+    job.start()
+    loop.run(job)
+    job.cancel()
+    future.set_result(1)
+    loop.run(job)
+    assert job.cancelled and cleanedUp == [True] and progress == []
+
+
+def test_errorFinishesTheJobAndPropagates():
+    loop = StubLoop()
+
+    def steps():
+        yield 1
+        raise RuntimeError('broken')
+
+    job, progress = makeJob(loop, steps())
+    job.start()
+    with pytest.raises(RuntimeError):
+        loop.run(job)
+    assert job.finished and isinstance(job.error, RuntimeError) and progress == [1]
+    assert job.tick() is False
+
+
+def test_runInThread():
+    mainThread = threading.current_thread()
+    assert runInThread(lambda a, b: (a + b, threading.current_thread() is mainThread), 2, 3).result(timeout = 5) == (5, False)
+    with pytest.raises(ZeroDivisionError):
+        runInThread(lambda: 1 / 0).result(timeout = 5)
+
+
+def test_jobWaitsOnAThread():
+    loop = StubLoop()
+    release = threading.Event()
+    posted = threading.Event()
+    loop.post = lambda: (StubLoop.post(loop), posted.set())
+
+    def steps():
+        yield (yield runInThread(release.wait, 5))
+
+    job, progress = makeJob(loop, steps())
+    job.start()
+    loop.run(job)
+    posted.clear()
+    release.set()
+    assert posted.wait(5)
+    loop.run(job)
+    assert progress == [True] and job.finished
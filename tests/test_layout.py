@@ -0,0 +1,51 @@
+# grouping the parts by thickness and naming the file of each group
+
+import os
+import pytest
+from laserlib.geometry import Line
+from laserlib.layout import Part, groupByThickness, groupFilePath
+
+
+def makeParts(thicknesses):
+    square = [Line((0.0, 0.0), (1.0, 0.0)), Line((1.0, 0.0), (1.0, 1.0)), Line((1.0, 1.0), (0.0, 1.0)), Line((0.0, 1.0), (0.0, 0.0))]
+    return [Part('Part' + str(i), square, (0.0, 0.0, 1.0, 1.0), thickness) for i, thickness in enumerate(thicknesses)]
+
+
+def groupNames(groups):
+    return [[part.name for part in parts] for thickness, parts in groups]
+
+
+def test_closeThicknessesShareAGroup():
+    groups = groupByThickness(makeParts([3.05, 3.0]), 0.1)
+    assert groupNames(groups) == [['Part1', 'Part0']]
+    assert groups[0][0] == pytest.approx(3.025)
+
+
+def test_distantThicknessesAreSeparate():
+    groups = groupByThickness(makeParts([6.0, 3.0, 6.0]), 0.1)
+    assert groupNames(groups) == [['Part1'], ['Part0', 'Part2']]
+    assert [thickness for thickness, parts in groups] == [3.0, 6.0]
+
+
+def test_groupsAreMeasuredFromTheirThinnestPart():
+    # 3.16 is within the tolerance of 3.08 but not of 3.0, so the thicknesses don't chain into one group
+    groups = groupByThickness(makeParts([3.16, 3.0, 3.08, 3.25, 3.5]), 0.25)
+    assert groupNames(groups) == [['Part1', 'Part2', 'Part0', 'Part3'], ['Part4']]
+    groups = groupByThickness(makeParts([3.16, 3.0, 3.08]), 0.1)
+    assert groupNames(groups) == [['Part1', 'Part2'], ['Part0']]
+
+
+def test_noPartsNoGroups():
+    assert groupByThickness([], 0.1) == []
+
+
+@pytest.mark.parametrize('path, thickness, units, expected', [
+    ('parts.dxf', 3.175, 'mm', 'parts_3.175mm.dxf'),
+    ('parts.dxf', 3.0, 'mm', 'parts_3mm.dxf'),
+    ('parts.DXF', 6.00049, 'mm', 'parts_6mm.DXF'),
+    # without an extension the files are DXF files, dots in the folder names aren't extensions
+    ('parts', 0.125, 'in', 'parts_0.125in.dxf'),
+    (os.path.join('out.v2', 'parts'), 2.5, 'cm', os.path.join('out.v2', 'parts_2.5cm.dxf')),
+])
+def test_groupFilePath(path, thickness, units, expected):
+    assert groupFilePath(path, thickness, units) == expected
@@ -0,0 +1,143 @@
+# true-shape nesting: placed outlines stay on their sheet and apart, and the NFP cache kept between runs
+
+import math
+import pickle
+import random
+from laserlib.nesting import NestPart, NfpCache, canonicalShape, nestParts
+from laserlib.packing import PackItem, SkylinePacker
+
+L_SHAPE = [(0.0, 0.0), (10.0, 0.0), (10.0, 5.0), (5.0, 5.0), (5.0, 10.0), (0.0, 10.0)]
+
+
+# the outline of a part where a placement puts it on its sheet
+def placedPolygon(placement, polygon):
+    cosA, sinA = math.cos(placement.angle), math.sin(placement.angle)
+    return [(x * cosA - y * sinA + placement.x, x * sinA + y * cosA + placement.y) for x, y in polygon]
+
+
+def segmentDistance(p, q, a, b):
+    def pointSegment(point, start, end):
+        dx, dy = end[0] - start[0], end[1] - start[1]
+        length = dx * dx + dy * dy
+        t = max(0.0, min(1.0, ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / length)) if length > 0.0 else 0.0
+        return math.hypot(point[0] - start[0] - t * dx, point[1] - start[1] - t * dy)
+
+    def side(o, u, v):
+        return (u[0] - o[0]) * (v[1] - o[1]) - (u[1] - o[1]) * (v[0] - o[0])
+
+    if side(p, q, a) * side(p, q, b) < 0.0 and side(a, b, p) * side(a, b, q) < 0.0:
+        return 0.0
+    return min(pointSegment(p, a, b), pointSegment(q, a, b), pointSegment(a, p, q), pointSegment(b, p, q))
+
+
+def strictlyInside(polygon, x, y, margin = 1e-6):
+    inside = False
+    for i in range(len(polygon)):
+        (x0, y0), (x1, y1) = polygon[i - 1], polygon[i]
+        if segmentDistance((x, y), (x, y), (x0, y0), (x1, y1)) < margin:
+            return False
+        if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
+
+
+# points on a grid inside the polygon, away from its outline
+def interiorSamples(polygon, step = 0.37):
+    minX, minY = min(x for x, y in polygon), min(y for x, y in polygon)
+    maxX, maxY = max(x for x, y in polygon), max(y for x, y in polygon)
+    points = [(minX + step * (i + 0.5), minY + step * (j + 0.5)) for i in range(int((maxX - minX) / step))
+              for j in range(int((maxY - minY) / step))]
+    return [(x, y) for x, y in points if strictlyInside(polygon, x, y, 1e-3)]
+
+
+def assertPlacedApart(result, polygons, sheetWidth, sheetHeight, spacing):
+    bySheet = {}
+    for placement in result.placements:
+        placed = placedPolygon(placement, polygons[placement.key])
+        assert all(-1e-6 <= x <= sheetWidth + 1e-6 and -1e-6 <= y <= sheetHeight + 1e-6 for x, y in placed)
+        bySheet.setdefault(placement.sheet, []).append(placed)
+    for placed in bySheet.values():
+        for i in range(len(placed)):
+            for j in range(i):
+                a, b = placed[i], placed[j]
+                distance = min(segmentDistance(a[k - 1], a[k], b[l - 1], b[l]) for k in range(len(a)) for l in range(len(b)))
+                assert distance >= spacing - 1e-6
+                # touching outlines are fine without spacing, but one can't reach into the other
+                assert not any(strictlyInside(b, x, y) for x, y in a) and not any(strictlyInside(a, x, y) for x, y in b)
+                assert not any(strictlyInside(b, x, y) for x, y in interiorSamples(a))
+
+
+def test_interlockingShapesShareASheetTheirBoxesCannot():
+    polygons = {'a': L_SHAPE, 'b': L_SHAPE}
+    result = nestParts([NestPart(key, polygon) for key, polygon in polygons.items()], 15.0, 15.0, 0.0, rotations = 4,
+                       timeBudget = 0.2, workers = 1, seed = 1)
+    assert result.unplaced == [] and len(result.utilization) == 1
+    assertPlacedApart(result, polygons, 15.0, 15.0, 0.0)
+
+    # the bounding boxes of the same parts take a sheet each
+    placements, unplaced = SkylinePacker(15.0, 15.0).pack([PackItem(key, 10.0, 10.0) for key in polygons])
+    assert unplaced == [] and len({placement.sheet for placement in placements}) == 2
+
+
+def test_placementsStayOnTheSheetAndKeepTheSpacing():
+    rng = random.Random(3)
+    polygons = {}
+    for i in range(12):
+        w, h = rng.uniform(3.0, 9.0), rng.uniform(3.0, 9.0)
+        if i % 3 == 0:
+            polygons[i] = [(x * w / 10.0, y * h / 10.0) for x, y in L_SHAPE]
+        elif i % 3 == 1:
+            polygons[i] = [(0.0, 0.0), (w, 0.0), (0.0, h)]
+        else:
+            polygons[i] = [(0.0, 0.0), (w, 0.0), (w, h), (0.0, h)]
+    spacing = 0.5
+    result = nestParts([NestPart(key, polygon) for key, polygon in polygons.items()], 20.0, 15.0, spacing, rotations = 4,
+                       timeBudget = 0.2, workers = 1, seed = 2)
+    assert result.unplaced == [] and sorted(p.key for p in result.placements) == sorted(polygons)
+    assertPlacedApart(result, polygons, 20.0, 15.0, spacing)
+
+
+def test_workersOnlyGetTheEntriesOfTheirShapes():
+    cache = NfpCache()
+    key = canonicalShape(L_SHAPE)[0]
+    cache.put((key, 0.0, key, 90.0, 0.5), [])
+    cache.put((key, 0.0, key, 90.0, 1.0), [])
+    cache.put((key, 0.0, 'other', 0.0, 0.5), [])
+    cache.put(('other', 0.0, 'other', 0.0, 0.5), [])
+    assert list(cache.entriesFor({key: L_SHAPE}, 0.5)) == [(key, 0.0, key, 90.0, 0.5)]
+
+
+def nestedParts():
+    square = [(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (0.0, 10.0)]
+    triangle = [(0.0, 0.0), (12.0, 0.0), (0.0, 7.0)]
+    return [NestPart('square', square), NestPart('triangle', triangle), NestPart('square2', square)]
+
+
+def test_cacheRoundTripsThroughItsFile(tmp_path):
+    path = str(tmp_path / 'nfp.json')
+    cache = NfpCache(path)
+    result = nestParts(nestedParts(), 50.0, 50.0, 1.0, rotations = 2, timeBudget = 0.0, cache = cache)
+    assert len(cache) > 0
+
+    loaded = NfpCache(path)
+    assert list(loaded.entries.items()) == list(cache.entries.items())
+    assert nestParts(nestedParts(), 50.0, 50.0, 1.0, rotations = 2, timeBudget = 0.0, cache = loaded) == result
+    assert loaded.misses == 0
+
+
+class Payload:
+    def __reduce__(self):
+        return (exec, ('raise SystemExit("unpickled")',))
+
+
+def test_pickledFileIsNotLoaded(tmp_path):
+    path = tmp_path / 'nfp.json'
+    path.write_bytes(pickle.dumps(Payload()))
+    assert len(NfpCache(str(path))) == 0
+
+
+def test_damagedFileIsAnEmptyCache(tmp_path):
+    path = tmp_path / 'nfp.json'
+    for text in ('{"version": 1, "entries": [[["a", 0.0], []]]}', '{"version": 0, "entries": []}', '[1, 2]', '{'):
+        path.write_text(text)
+        assert len(NfpCache(str(path))) == 0
@@ -0,0 +1,105 @@
+# the kerf offset engine on synthetic loops: outlines grow and holes shrink by half the kerf
+
+import math
+import pytest
+from laserlib.geometry import Arc, Circle, Line, chainLoops, curvesBoundingBox, loopArea
+from laserlib.offset import OffsetError, offsetLoop, offsetProfile
+
+KERF = 0.2
+
+
+def polygon(points):
+    return [Line(points[i], points[(i + 1) % len(points)]) for i in range(len(points))]
+
+
+def square(minX, minY, maxX, maxY):
+    return polygon([(minX, minY), (maxX, minY), (maxX, maxY), (minX, maxY)])
+
+
+def roundedRectangle(minX, minY, maxX, maxY, r):
+    return [Line((minX + r, minY), (maxX - r, minY)), Arc((maxX - r, minY + r), r, -0.5 * math.pi, 0.5 * math.pi),
+            Line((maxX, minY + r), (maxX, maxY - r)), Arc((maxX - r, maxY - r), r, 0.0, 0.5 * math.pi),
+            Line((maxX - r, maxY), (minX + r, maxY)), Arc((minX + r, maxY - r), r, 0.5 * math.pi, 0.5 * math.pi),
+            Line((minX, maxY - r), (minX, minY + r)), Arc((minX + r, minY + r), r, math.pi, 0.5 * math.pi)]
+
+
+def loopsOf(curves):
+    loops, chains = chainLoops(curves)
+    assert chains == []
+    return sorted(loops, key = lambda loop: -abs(loopArea(loop)))
+
+
+def test_outerLoopGrowsAndHoleShrinksByHalfTheKerf():
+    d = KERF / 2
+    outer, hole = loopsOf(offsetProfile(square(0.0, 0.0, 10.0, 10.0) + square(3.0, 3.0, 7.0, 7.0), d))
+    assert curvesBoundingBox(outer) == pytest.approx((-d, -d, 10.0 + d, 10.0 + d))
+    assert curvesBoundingBox(hole) == pytest.approx((3.0 + d, 3.0 + d, 7.0 - d, 7.0 - d))
+    # the outside corners are rounded, so the outline gains its perimeter times d plus a circle of radius d
+    assert abs(loopArea(outer)) == pytest.approx(100.0 + 40.0 * d + math.pi * d * d)
+    assert abs(loopArea(hole)) == pytest.approx((4.0 - 2 * d) ** 2)
+
+
+def test_orientationOfTheInputDoesNotMatter():
+    d = KERF / 2
+    clockwise = polygon([(0.0, 0.0), (0.0, 10.0), (10.0, 10.0), (10.0, 0.0)])
+    assert curvesBoundingBox(offsetLoop(clockwise, d)) == pytest.approx((-d, -d, 10.0 + d, 10.0 + d))
+
+
+def test_roundCornersAreCentredOnTheOriginalVertices():
+    d = KERF / 2
+    arcs = [curve for curve in offsetProfile(square(0.0, 0.0, 10.0, 10.0), d) if isinstance(curve, Arc)]
+    assert sorted(arc.center for arc in arcs) == [(0.0, 0.0), (0.0, 10.0), (10.0, 0.0), (10.0, 10.0)]
+    assert all(arc.radius == pytest.approx(d) for arc in arcs)
+
+
+def test_arcsKeepTheirCentresAndChangeRadius():
+    d = KERF / 2
+    grown = [curve for curve in offsetProfile(roundedRectangle(0.0, 0.0, 10.0, 6.0, 1.0), d) if isinstance(curve, Arc)]
+    assert sorted(arc.center for arc in grown) == [(1.0, 1.0), (1.0, 5.0), (9.0, 1.0), (9.0, 5.0)]
+    assert all(arc.radius == pytest.approx(1.0 + d) for arc in grown)
+
+    result = offsetProfile(square(0.0, 0.0, 10.0, 10.0) + [Circle((5.0, 5.0), 2.0)], d)
+    [circle] = [curve for curve in result if isinstance(curve, Circle)]
+    assert circle.center == (5.0, 5.0) and circle.radius == pytest.approx(2.0 - d)
+
+
+def test_holesSmallerThanTheKerfVanish():
+    d = KERF / 2
+    result = offsetProfile(square(0.0, 0.0, 10.0, 10.0) + [Circle((2.0, 2.0), 0.05)] + square(5.0, 5.0, 5.15, 5.15), d)
+    [outer] = loopsOf(result)
+    assert curvesBoundingBox(outer) == pytest.approx((-d, -d, 10.0 + d, 10.0 + d))
+
+
+def test_islandInAHoleGrows():
+    d = KERF / 2
+    loops = loopsOf(offsetProfile(square(0.0, 0.0, 10.0, 10.0) + square(2.0, 2.0, 8.0, 8.0) + square(4.0, 4.0, 6.0, 6.0), d))
+    assert curvesBoundingBox(loops[2]) == pytest.approx((4.0 - d, 4.0 - d, 6.0 + d, 6.0 + d))
+
+
+def notchedSquare(width):
+    left, right = 5.0 - width / 2, 5.0 + width / 2
+    return polygon([(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (right, 10.0), (right, 7.0), (left, 7.0), (left, 10.0), (0.0, 10.0)])
+
+
+def notchCurves(curves):
+    # the curves that reach into the notch, below the top edge of the outline
+    return [curve for curve in curves if curvesBoundingBox([curve])[1] < 10.0 and 4.5 < curvesBoundingBox([curve])[0] < 5.5]
+
+
+def test_notchNarrowerThanTheKerfClosesUp():
+    d = KERF / 2
+    [outline] = loopsOf(offsetProfile(notchedSquare(0.15), d))
+    # only the round corners at its mouth are left of the notch, meeting above the top edge
+    assert notchCurves(outline) == []
+    assert abs(loopArea(outline)) == pytest.approx(100.0 + 40.0 * d + math.pi * d * d, abs = 0.01)
+
+
+def test_notchWiderThanTheKerfStaysOpen():
+    d = KERF / 2
+    [outline] = loopsOf(offsetProfile(notchedSquare(0.5), d))
+    assert curvesBoundingBox(notchCurves(outline)) == pytest.approx((5.0 - 0.25 + d, 7.0 + d, 5.0 + 0.25 - d, 10.0))
+
+
+def test_openProfileIsRejected():
+    with pytest.raises(OffsetError):
+        offsetProfile(square(0.0, 0.0, 10.0, 10.0)[:3], 0.1)
@@ -0,0 +1,94 @@
+# the skyline packer, on bounding boxes alone
+
+import math
+import random
+from laserlib.packing import PackItem, Placement, SkylinePacker, placementTransform, rowLayout
+
+
+# (x0, y0, x1, y1) of the rectangle an item covers on its sheet, without the spacing
+def placedBox(placement, item):
+    width, height = (item.height, item.width) if placement.rotated else (item.width, item.height)
+    return (placement.x, placement.y, placement.x + width, placement.y + height)
+
+
+def overlaps(a, b, gap = 0.0):
+    return a[0] < b[2] + gap - 1e-9 and b[0] < a[2] + gap - 1e-9 and a[1] < b[3] + gap - 1e-9 and b[1] < a[3] + gap - 1e-9
+
+
+def randomItems(count, seed = 0):
+    rng = random.Random(seed)
+    return [PackItem(i, rng.uniform(1.0, 20.0), rng.uniform(1.0, 20.0)) for i in range(count)]
+
+
+def test_everyItemIsPlacedOnceInsideItsSheet():
+    items = randomItems(200)
+    packer = SkylinePacker(60.0, 40.0)
+    placements, unplaced = packer.pack(items)
+    assert unplaced == []
+    assert sorted(p.key for p in placements) == list(range(200))
+    for placement in placements:
+        x0, y0, x1, y1 = placedBox(placement, items[placement.key])
+        assert x0 >= -1e-9 and y0 >= -1e-9 and x1 <= 60.0 + 1e-9 and y1 <= 40.0 + 1e-9
+
+
+def test_itemsDoNotOverlapAndKeepTheSpacing():
+    items = randomItems(150, seed = 1)
+    spacing = 0.5
+    placements, unplaced = SkylinePacker(60.0, 40.0, spacing).pack(items)
+    bySheet = {}
+    for placement in placements:
+        bySheet.setdefault(placement.sheet, []).append(placedBox(placement, items[placement.key]))
+    for boxes in bySheet.values():
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                assert not overlaps(boxes[i], boxes[j], spacing)
+
+
+def test_itemsSpillOntoExtraSheets():
+    # each sheet holds exactly four of these
+    items = [PackItem(i, 10.0, 10.0) for i in range(10)]
+    packer = SkylinePacker(20.0, 20.0)
+    placements, unplaced = packer.pack(items)
+    assert unplaced == []
+    assert len(packer.sheets) == 3
+    assert [sum(1 for p in placements if p.sheet == sheet) for sheet in range(3)] == [4, 4, 2]
+
+
+def test_utilizationIsTheCoveredFraction():
+    packer = SkylinePacker(20.0, 20.0)
+    packer.pack([PackItem(i, 10.0, 10.0) for i in range(6)])
+    assert [round(u, 6) for u in packer.sheetUtilization()] == [1.0, 0.5]
+
+
+def test_rotationLetsATallItemFitAWideSheet():
+    item = PackItem('tall', 5.0, 30.0)
+    placements, unplaced = SkylinePacker(40.0, 10.0).pack([item])
+    assert unplaced == [] and placements[0].rotated
+    placements, unplaced = SkylinePacker(40.0, 10.0, allowRotation = False).pack([item])
+    assert placements == [] and unplaced == ['tall']
+
+
+def test_itemTooLargeForTheSheetIsReported():
+    packer = SkylinePacker(20.0, 20.0)
+    placements, unplaced = packer.pack([PackItem('big', 30.0, 30.0), PackItem('small', 5.0, 5.0)])
+    assert unplaced == ['big']
+    assert [p.key for p in placements] == ['small']
+
+
+def test_placementTransformMovesTheBoxOntoThePlacement():
+    box = (2.0, 3.0, 6.0, 4.0)
+    for rotated in (False, True):
+        angle, dx, dy = placementTransform(Placement('a', 0, 10.0, 20.0, rotated), box)
+        corners = [(box[0], box[1]), (box[2], box[1]), (box[2], box[3]), (box[0], box[3])]
+        moved = [(x * math.cos(angle) - y * math.sin(angle) + dx, x * math.sin(angle) + y * math.cos(angle) + dy)
+                 for x, y in corners]
+        width, height = (1.0, 4.0) if rotated else (4.0, 1.0)
+        assert math.isclose(min(x for x, y in moved), 10.0, abs_tol = 1e-9)
+        assert math.isclose(min(y for x, y in moved), 20.0, abs_tol = 1e-9)
+        assert math.isclose(max(x for x, y in moved), 10.0 + width, abs_tol = 1e-9)
+        assert math.isclose(max(y for x, y in moved), 20.0 + height, abs_tol = 1e-9)
+
+
+def test_rowLayoutPlacesItemsSideBySide():
+    placements = rowLayout([PackItem('a', 2.0, 1.0), PackItem('b', 3.0, 5.0), PackItem('c', 1.0, 1.0)], spacing = 0.5)
+    assert [(p.key, p.x, p.y) for p in placements] == [('a', 0.0, 0.0), ('b', 2.5, 0.0), ('c', 6.0, 0.0)]
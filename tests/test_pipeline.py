@@ -0,0 +1,70 @@
+# whole exports from dumped body geometry, read back with the DXF helpers of test_dxf
+
+import pytest
+from laserlib.bodydump import BodyRecord, writeDump
+from laserlib.geometry import Circle, Line
+from laserlib.pipeline import ExportOptions, exportBodies, exportDumpFile
+from test_dxf import readEntities, values
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CORNERS = [(0.0, 0.0), (6.0, 0.0), (6.0, 4.0), (0.0, 4.0)]
+
+
+# a 6 x 4 cm plate with a hole of 1 cm radius
+def makePlate(name = 'Plate', thickness = 0.3, flatness = None):
+    curves = [Line(CORNERS[i - 1], CORNERS[i]) for i in range(4)] + [Circle((3.0, 2.0), 1.0)]
+    return BodyRecord(name, thickness, curves, flatness)
+
+
+def readFile(path):
+    with open(path) as stream:
+        return readEntities(stream.read())
+
+
+def points(entities, code = 10):
+    return {(float(values(entity, code)[0]), float(values(entity, code + 10)[0])) for entity in entities}
+
+
+@pytest.mark.parametrize('polylines', [True, False])
+@pytest.mark.parametrize('extension', ['.json', pytest.param('.npz', marks = pytest.mark.skipif(numpy is None, reason = 'NumPy is not installed'))])
+def test_dumpedPlateIsWrittenInMillimeters(tmp_path, extension, polylines):
+    dumpPath = str(tmp_path / ('plate' + extension))
+    writeDump(dumpPath, [makePlate()])
+    path = str(tmp_path / 'plate.dxf')
+    paths, messages = exportDumpFile((dumpPath, path, ExportOptions(polylines = polylines), 1))
+    assert paths == [path]
+    assert messages == ['plate.dxf: cut length 262.8 mm, 2 pierces, travel 73.0 mm']
+
+    entities = readFile(path)
+    # the hole is cut before the outline
+    hole, outline = entities[0], entities[1:]
+    assert hole[0] == (0, 'CIRCLE')
+    assert points([hole]) == {(30.0, 20.0)} and values(hole, 40) == ['10']
+    corners = {(10.0 * x, 10.0 * y) for x, y in CORNERS}
+    if polylines:
+        assert [entity[0][1] for entity in outline] == ['POLYLINE'] + ['VERTEX'] * 4 + ['SEQEND']
+        assert values(outline[0], 70) == ['1']
+        assert points(outline[1:5]) == corners
+    else:
+        assert [entity[0][1] for entity in outline] == ['LINE'] * 4
+        assert points(outline) == corners and points(outline, 11) == corners
+
+
+def test_thicknessGroupsAreWrittenToSeparateFiles(tmp_path):
+    bodies = [makePlate('Thin', 0.3), makePlate('Thick', 0.6), makePlate('AlsoThin', 0.301)]
+    paths, messages = exportBodies(bodies, str(tmp_path / 'parts.dxf'), ExportOptions(thicknessTolerance = 0.01), 1)
+    assert paths == [str(tmp_path / 'parts_3.005mm.dxf'), str(tmp_path / 'parts_6mm.dxf')]
+    assert [len([entity for entity in readFile(path) if entity[0] == (0, 'CIRCLE')]) for path in paths] == [2, 1]
+
+
+def test_leftOutBodiesAreReported(tmp_path):
+    notFlat = {'normal': [0.0, 0.0, 1.0], 'profileArea': 20.86, 'backArea': 12.0, 'sideEdges': None}
+    bodies = [makePlate(), makePlate('Wedge', flatness = notFlat)]
+    options = ExportOptions(sheetWidth = 5.0, sheetHeight = 5.0, allowRotation = False, orderCuts = False)
+    paths, messages = exportBodies(bodies, str(tmp_path / 'parts.dxf'), options, 1)
+    assert paths == []
+    assert messages == ['Wedge is not flat', 'Plate is too large for the sheet and was not exported']
@@ -0,0 +1,113 @@
+# joining lines and arcs into polylines: nothing cut is lost, and simplifying stays within its tolerance
+
+import math
+import random
+import pytest
+from laserlib.geometry import Arc, Circle, Line, Polyline, curveLength, polylineSegments, reverseCurve
+from laserlib.polylines import joinPolylines
+
+
+# a 10 x 6 rectangle with corners rounded to radius 1, counter-clockwise from the bottom edge
+def roundedRectangle():
+    return [
+        Line((1.0, 0.0), (9.0, 0.0)), Arc((9.0, 1.0), 1.0, -0.5 * math.pi, 0.5 * math.pi),
+        Line((10.0, 1.0), (10.0, 5.0)), Arc((9.0, 5.0), 1.0, 0.0, 0.5 * math.pi),
+        Line((9.0, 6.0), (1.0, 6.0)), Arc((1.0, 5.0), 1.0, 0.5 * math.pi, 0.5 * math.pi),
+        Line((0.0, 5.0), (0.0, 1.0)), Arc((1.0, 1.0), 1.0, math.pi, 0.5 * math.pi),
+    ]
+
+
+def totalLength(curves):
+    return sum(curveLength(curve) for curve in curves)
+
+
+# the curves in a random order, some of them turned round
+def scramble(curves, seed):
+    rng = random.Random(seed)
+    curves = [reverseCurve(curve) if rng.random() < 0.5 else curve for curve in curves]
+    rng.shuffle(curves)
+    return curves
+
+
+def segmentDistance(p, a, b):
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    t = max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(p[0] - a[0] - t * dx, p[1] - a[1] - t * dy)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_roundedRectangleBecomesOneClosedPolyline(seed):
+    curves = roundedRectangle()
+    [polyline] = joinPolylines(scramble(curves, seed))
+    assert isinstance(polyline, Polyline) and polyline.closed
+    assert len(polyline.points) == len(polyline.bulges) == 8
+    assert sorted(abs(bulge) for bulge in polyline.bulges) == pytest.approx([0.0] * 4 + [math.tan(math.pi / 8)] * 4)
+    # all the bulges turn the same way, whichever way round the loop was chained
+    assert len({math.copysign(1.0, bulge) for bulge in polyline.bulges if bulge}) == 1
+    assert curveLength(polyline) == pytest.approx(totalLength(curves))
+    for segment in polylineSegments(polyline):
+        if isinstance(segment, Arc):
+            assert segment.radius == pytest.approx(1.0)
+            assert min(math.dist(segment.center, corner) for corner in ((1.0, 1.0), (9.0, 1.0), (9.0, 5.0), (1.0, 5.0))) == \
+                pytest.approx(0.0, abs = 1e-9)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_openChainsStayOpen(seed):
+    hook = [Line((0.0, 0.0), (0.0, 5.0)), Arc((1.0, 5.0), 1.0, math.pi, -math.pi), Line((2.0, 5.0), (2.0, 3.0))]
+    straight = [Line((5.0, 0.0), (6.0, 0.0)), Line((6.0, 0.0), (7.5, 0.0)), Line((7.5, 0.0), (9.0, 0.0))]
+    single = Arc((20.0, 0.0), 2.0, 0.0, 1.0)
+    circle = Circle((30.0, 0.0), 1.0)
+    joined = joinPolylines(scramble(hook + straight + [single, circle], seed))
+    assert totalLength(joined) == pytest.approx(totalLength(hook + straight + [single, circle]))
+
+    [polyline] = [curve for curve in joined if isinstance(curve, Polyline)]
+    assert not polyline.closed
+    assert {polyline.points[0], polyline.points[-1]} == {(0.0, 0.0), (2.0, 3.0)}
+    assert len(polyline.points) == len(polyline.bulges) == 4 and polyline.bulges[-1] == 0.0
+    # collinear lines are merged into one
+    assert Line((5.0, 0.0), (9.0, 0.0)) in joined or Line((9.0, 0.0), (5.0, 0.0)) in joined
+    assert single in joined or reverseCurve(single) in joined
+    assert circle in joined
+    assert len(joined) == 4
+
+
+def test_collinearVerticesAreDropped():
+    corners = [(0.0, 0.0), (10.0, 0.0), (10.0, 6.0), (0.0, 6.0)]
+    # every edge split into pieces of different lengths
+    curves = []
+    for a, b in zip(corners, corners[1:] + corners[:1]):
+        cuts = [0.0, 0.1, 0.35, 0.5, 0.9, 1.0]
+        points = [(a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1])) for t in cuts]
+        curves.extend(Line(p, q) for p, q in zip(points[:-1], points[1:]))
+    [polyline] = joinPolylines(scramble(curves, 1))
+    assert polyline.closed and sorted(polyline.points) == sorted(corners)
+    assert curveLength(polyline) == pytest.approx(32.0)
+
+
+# a faceted outline with noisy vertices and a rounded corner, simplified at several tolerances
+@pytest.mark.parametrize('simplifyTolerance', [0.0, 0.01, 0.05, 0.2, 1.0])
+def test_simplifyingStaysWithinTheTolerance(simplifyTolerance):
+    rng = random.Random(20)
+    points = [(x * 0.1, rng.uniform(-0.1, 0.1)) for x in range(101)]
+    points += [(10.0 + rng.uniform(-0.1, 0.1), y * 0.1) for y in range(1, 60)]
+    # the arc starts where the last facet ends
+    cornerX, cornerY = points[-1][0] - 1.0, points[-1][1]
+    curves = [Line(p, q) for p, q in zip(points[:-1], points[1:])]
+    curves += [Arc((cornerX, cornerY), 1.0, 0.0, 0.5 * math.pi), Line((cornerX, cornerY + 1.0), (0.0, cornerY + 1.0)),
+               Line((0.0, cornerY + 1.0), points[0])]
+    [polyline] = joinPolylines(scramble(curves, 2), simplifyTolerance = simplifyTolerance)
+    assert polyline.closed
+
+    segments = polylineSegments(polyline)
+    lines = [segment for segment in segments if isinstance(segment, Line)]
+    arcs = [segment for segment in segments if isinstance(segment, Arc)]
+    # the arc is kept as it is, the kept vertices are vertices of the original outline
+    assert len(arcs) == 1 and arcs[0].radius == pytest.approx(1.0)
+    original = {point for curve in curves if isinstance(curve, Line) for point in (curve.start, curve.end)}
+    assert all(point in original for point in polyline.points)
+    # every dropped vertex lies within the tolerance of the simplified outline
+    for point in original:
+        assert min(segmentDistance(point, line.start, line.end) for line in lines) <= max(simplifyTolerance, 1e-6) + 1e-12
+    if simplifyTolerance >= 0.2:
+        assert len(polyline.points) < 10
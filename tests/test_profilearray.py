@@ -0,0 +1,139 @@
+# the array form of profiles and its .npy files, with NumPy and with the pure Python fallback
+# a file written by either one has to load with the other
+
+import math
+import pytest
+import laserlib.profilearray as profilearray
+from laserlib.geometry import Arc, Circle, Line, Polyline, polylineSegments
+from laserlib.profilearray import ProfileArray, concatenateProfiles, loadProfile, saveProfile, sliceProfile
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+WITH_NUMPY = pytest.param(True, marks = pytest.mark.skipif(numpy is None, reason = 'NumPy is not installed'))
+BACKENDS = [WITH_NUMPY, False]
+
+
+@pytest.fixture
+def useNumpy(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(profilearray, 'numpy', None)
+    return request.param
+
+
+def square(minX, minY, maxX, maxY):
+    points = [(minX, minY), (maxX, minY), (maxX, maxY), (minX, maxY)]
+    return [Line(points[i - 1], points[i]) for i in range(4)]
+
+
+def slot():
+    # two half circles joined by lines, one of them running clockwise
+    return [Line((20.0, 0.0), (30.0, 0.0)), Arc((30.0, 1.0), 1.0, -0.5 * math.pi, math.pi), Line((30.0, 2.0), (20.0, 2.0)),
+            Arc((20.0, 1.0), 1.0, 1.5 * math.pi, -math.pi)]
+
+
+def bulgedPolyline():
+    return Polyline([(40.0, 0.0), (45.0, 0.0), (45.0, 5.0), (40.0, 5.0)], [0.0, 0.4, 0.0, -0.3], True)
+
+
+def openChain():
+    return [Line((0.0, 20.0), (3.0, 21.0)), Arc((6.0, 21.0), 3.0, math.pi, -0.5 * math.pi)]
+
+
+PROFILES = {
+    'plate with a hole': square(0.0, 0.0, 10.0, 10.0) + [Circle((5.0, 5.0), 2.0)],
+    'slot': slot(),
+    'polyline': [bulgedPolyline()],
+    'open chain': openChain(),
+}
+
+
+# every curve as a tuple that doesn't depend on its direction, polylines as the segments they stand for
+def normalized(curves):
+    result = []
+    for curve in curves:
+        for segment in (polylineSegments(curve) if isinstance(curve, Polyline) else (curve,)):
+            if isinstance(segment, Line):
+                result.append(('line',) + tuple(sorted((round(x, 9), round(y, 9)) for x, y in (segment.start, segment.end))))
+            elif isinstance(segment, Arc):
+                start, sweep = (segment.startAngle, segment.sweep) if segment.sweep >= 0.0 else \
+                    (segment.startAngle + segment.sweep, -segment.sweep)
+                result.append(('arc', round(segment.center[0], 9), round(segment.center[1], 9), round(segment.radius, 9),
+                               round(start % (2.0 * math.pi), 9), round(sweep, 9)))
+            else:
+                result.append(('circle', round(segment.center[0], 9), round(segment.center[1], 9), round(segment.radius, 9)))
+    return sorted(result)
+
+
+@pytest.mark.parametrize('useNumpy', BACKENDS, indirect = True)
+@pytest.mark.parametrize('name', sorted(PROFILES))
+def test_curvesRoundTripThroughTheArrays(useNumpy, name):
+    profile = ProfileArray.fromCurves(PROFILES[name])
+    assert normalized(profile.curves()) == normalized(PROFILES[name])
+    assert isinstance(profile.kind, numpy.ndarray) if useNumpy else not hasattr(profile.kind, 'shape')
+
+
+@pytest.mark.parametrize('useNumpy', BACKENDS, indirect = True)
+def test_loopsAreConsecutive(useNumpy):
+    profile = ProfileArray.fromCurves(square(0.0, 0.0, 10.0, 10.0) + [Circle((5.0, 5.0), 2.0)] + slot())
+    loops = profile.loops()
+    assert sorted(len(loop) for loop in loops) == [1, 4, 4]
+    assert sum(len(loop) for loop in loops) == len(profile)
+
+
+@pytest.mark.parametrize('useNumpy', BACKENDS, indirect = True)
+def test_concatenatedProfilesSliceBackIntoTheirParts(useNumpy):
+    profiles = [ProfileArray.fromCurves(PROFILES[name]) for name in sorted(PROFILES)]
+    combined, firsts = concatenateProfiles(profiles)
+    assert len(combined) == sum(len(profile) for profile in profiles)
+    for profile, first in zip(profiles, firsts):
+        assert sliceProfile(combined, first, len(profile)).curves() == profile.curves()
+    assert len(concatenateProfiles([])[0]) == 0
+
+
+@pytest.mark.parametrize('useNumpy', BACKENDS, indirect = True)
+def test_savedProfileLoadsBack(useNumpy, tmp_path):
+    profiles = [ProfileArray.fromCurves(PROFILES[name]) for name in sorted(PROFILES)]
+    combined, firsts = concatenateProfiles(profiles)
+    path = str(tmp_path / 'segments.npy')
+    with open(path, 'wb') as stream:
+        saveProfile(stream, combined)
+    loaded = loadProfile(path)
+    assert loaded.curves() == combined.curves()
+    if useNumpy:
+        # mapped into memory rather than read
+        assert isinstance(loaded.kind.base, numpy.memmap) or isinstance(loaded.kind, numpy.memmap)
+    for profile, first in zip(profiles, firsts):
+        assert sliceProfile(loaded, first, len(profile)).curves() == profile.curves()
+
+
+@pytest.mark.skipif(numpy is None, reason = 'NumPy is not installed')
+@pytest.mark.parametrize('writeWithNumpy', [True, False])
+def test_filesLoadWithTheOtherBackend(writeWithNumpy, tmp_path, monkeypatch):
+    path = str(tmp_path / 'segments.npy')
+    combined, firsts = concatenateProfiles([ProfileArray.fromCurves(PROFILES[name]) for name in sorted(PROFILES)])
+    expected = combined.curves()
+
+    monkeypatch.setattr(profilearray, 'numpy', numpy if writeWithNumpy else None)
+    with open(path, 'wb') as stream:
+        saveProfile(stream, combined)
+    monkeypatch.setattr(profilearray, 'numpy', None if writeWithNumpy else numpy)
+    assert loadProfile(path).curves() == expected
+    # and NumPy itself reads the hand-written header
+    assert numpy.load(path).shape == (len(profilearray.FIELDS), len(expected))
+
+
+@pytest.mark.parametrize('useNumpy', BACKENDS, indirect = True)
+def test_damagedFilesAreRejected(useNumpy, tmp_path):
+    path = tmp_path / 'segments.npy'
+    with open(str(path), 'wb') as stream:
+        saveProfile(stream, ProfileArray.fromCurves(slot()))
+    data = path.read_bytes()
+    path.write_bytes(data[:-8])
+    with pytest.raises(ValueError):
+        loadProfile(str(path))
+    path.write_bytes(b'not a numpy file')
+    with pytest.raises(ValueError):
+        loadProfile(str(path))
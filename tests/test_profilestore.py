@@ -0,0 +1,118 @@
+# the profile store that lets re-exports reuse the profiles of unchanged bodies
+
+import json
+import math
+import os
+import pytest
+import laserlib.profilearray as profilearray
+from laserlib.geometry import Arc, Circle, Line
+from laserlib.profilestore import ProfileStore
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@pytest.fixture(params = [pytest.param(True, marks = pytest.mark.skipif(numpy is None, reason = 'NumPy is not installed')), False])
+def useNumpy(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(profilearray, 'numpy', None)
+    return request.param
+
+
+def plate(x):
+    return [Line((x, 0.0), (x + 10.0, 0.0)), Arc((x + 10.0, 2.0), 2.0, -0.5 * math.pi, 0.5 * math.pi), Line((x + 12.0, 2.0), (x + 12.0, 8.0)),
+            Line((x + 12.0, 8.0), (x, 8.0)), Line((x, 8.0), (x, 0.0)), Circle((x + 5.0, 4.0), 1.5)]
+
+
+def savedStore(path):
+    store = ProfileStore(path)
+    store.putProfile('a', 0.3, plate(0.0))
+    store.putProfile('b', 0.6, plate(20.0))
+    store.save()
+    return store
+
+
+def segmentFiles(folder):
+    return sorted(name for name in os.listdir(folder) if name.endswith('.npy'))
+
+
+def test_storedProfilesLoadBack(useNumpy, tmp_path):
+    path = str(tmp_path / 'store.json')
+    saved = savedStore(path)
+    store = ProfileStore(path)
+    assert len(store) == 2
+    for key in ('a', 'b'):
+        thickness, curves = store.getProfile(key)
+        assert thickness == saved.getProfile(key)[0]
+        assert curves == saved.getProfile(key)[1]
+    assert store.getProfile('a')[0] == 0.3 and len(store.getProfile('a')[1]) == 6
+    assert store.getProfile('missing') is None
+    assert (store.hits, store.misses) == (4, 1)
+
+
+def test_savedStoreLoadsWithTheOtherBackend(tmp_path, monkeypatch):
+    if numpy is None:
+        pytest.skip('NumPy is not installed')
+    path = str(tmp_path / 'store.json')
+    monkeypatch.setattr(profilearray, 'numpy', None)
+    expected = savedStore(path).getProfile('b')
+    monkeypatch.setattr(profilearray, 'numpy', numpy)
+    assert ProfileStore(path).getProfile('b') == expected
+
+
+def test_saveWritesTheNextGenerationAndRemovesTheOld(useNumpy, tmp_path):
+    path = str(tmp_path / 'store.json')
+    savedStore(path)
+    assert segmentFiles(str(tmp_path)) == ['store.1.npy']
+
+    store = ProfileStore(path)
+    store.putProfile('c', 1.2, plate(40.0))
+    store.save()
+    assert segmentFiles(str(tmp_path)) == ['store.2.npy']
+    with open(path) as f:
+        assert json.load(f)['generation'] == 2
+    reloaded = ProfileStore(path)
+    assert sorted(reloaded.entries) == ['a', 'b', 'c'] and reloaded.getProfile('c')[0] == 1.2
+
+
+def test_missingStoreIsEmpty(tmp_path):
+    assert len(ProfileStore(str(tmp_path / 'store.json'))) == 0
+
+
+@pytest.mark.parametrize('damage', ['index', 'index version', 'index entries', 'segments missing', 'segments truncated',
+                                    'segments garbage'])
+def test_damagedStoreIsEmpty(useNumpy, damage, tmp_path):
+    path = str(tmp_path / 'store.json')
+    savedStore(path)
+    segments = str(tmp_path / 'store.1.npy')
+    with open(path) as f:
+        index = json.load(f)
+    if damage == 'index':
+        with open(path, 'w') as f:
+            f.write('{"version": 2, "gener')
+    elif damage == 'index version':
+        index['version'] = 1
+    elif damage == 'index entries':
+        index['entries'][0][1]['count'] += 1000
+    elif damage == 'segments missing':
+        os.remove(segments)
+    elif damage == 'segments truncated':
+        with open(segments, 'rb') as f:
+            data = f.read()
+        with open(segments, 'wb') as f:
+            f.write(data[:len(data) // 2])
+    else:
+        with open(segments, 'wb') as f:
+            f.write(b'\x00' * 200)
+    if damage in ('index version', 'index entries'):
+        with open(path, 'w') as f:
+            json.dump(index, f)
+
+    store = ProfileStore(path)
+    assert len(store) == 0 and store.getProfile('a') is None
+    # and it can be saved over
+    store.putProfile('a', 0.3, plate(0.0))
+    store.save()
+    assert ProfileStore(path).getProfile('a')[0] == 0.3
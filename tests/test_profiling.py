@@ -0,0 +1,240 @@
+# phase timing with a clock that only moves when told to, and API call counting on a stand-in API module
+
+import csv
+import json
+import types
+import pytest
+import laserlib.profiling as profiling
+from laserlib.profiling import ApiCallCounter, Profiler
+
+
+class StubClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = StubClock()
+    monkeypatch.setattr(profiling.time, 'perf_counter', clock)
+    return clock
+
+
+# a module with one API class, the way adsk.core and adsk.fusion hold theirs
+def makeApiModule():
+    module = types.ModuleType('stubapi')
+
+    class Body:
+        def __init__(self) -> None:
+            self._area = 2.0
+
+        def volume(self, scale = 1.0):
+            return 3.0 * scale
+
+        @property
+        def area(self):
+            return self._area
+
+        @area.setter
+        def area(self, value):
+            self._area = value
+
+        @staticmethod
+        def create():
+            return Body()
+
+        @classmethod
+        def kind(cls):
+            return cls.__name__
+
+    Body.__module__ = module.__name__
+    module.Body = Body
+    return module
+
+
+def seconds(profiler):
+    return {key: record.seconds for key, record in profiler.records.items()}
+
+
+def test_nestedPhasesAddUpToTheirParents(clock):
+    profiler = Profiler()
+    for body in ('Plate', 'Bracket'):
+        with profiler.phase('classify', body):
+            clock.now += 1.0
+            with profiler.phase('fingerprint'):
+                clock.now += 0.5
+            with profiler.phase('ray cast'):
+                clock.now += 2.0
+                with profiler.phase('hit'):
+                    clock.now += 0.25
+        with profiler.phase('extract', body):
+            clock.now += 0.75
+    with profiler.phase('write'):
+        clock.now += 4.0
+
+    assert seconds(profiler) == {
+        ('Plate', 'classify'): 3.75, ('Plate', 'classify/fingerprint'): 0.5, ('Plate', 'classify/ray cast'): 2.25,
+        ('Plate', 'classify/ray cast/hit'): 0.25, ('Plate', 'extract'): 0.75,
+        ('Bracket', 'classify'): 3.75, ('Bracket', 'classify/fingerprint'): 0.5, ('Bracket', 'classify/ray cast'): 2.25,
+        ('Bracket', 'classify/ray cast/hit'): 0.25, ('Bracket', 'extract'): 0.75,
+        (None, 'write'): 4.0,
+    }
+    # only the top level phases of a body count towards its time
+    assert profiler.bodyTimes() == [('Plate', 4.5), ('Bracket', 4.5)]
+    assert all(record.count == 1 for record in profiler.records.values())
+
+    # phases run again add up
+    with profiler.phase('extract', 'Plate'):
+        clock.now += 1.0
+    record = profiler.records[('Plate', 'extract')]
+    assert (record.seconds, record.count) == (1.75, 2)
+    assert profiler.bodyTimes() == [('Plate', 5.5), ('Bracket', 4.5)]
+    assert profiler.toDict()['totalSeconds'] == 14.0
+
+
+def test_callsCountTowardsTheInnermostPhase():
+    profiler = Profiler()
+    profiler.countCall('Body.area')
+    with profiler.phase('classify', 'Plate'):
+        profiler.countCall('Body.faces')
+        with profiler.phase('ray cast'):
+            profiler.countCall('Body.faces')
+            profiler.countCall('Face.geometry')
+    assert profiler.apiCalls == {'Body.area': 1, 'Body.faces': 2, 'Face.geometry': 1}
+    assert {key: record.apiCalls for key, record in profiler.records.items()} == \
+        {(None, 'other'): 1, ('Plate', 'classify'): 1, ('Plate', 'classify/ray cast'): 2}
+
+
+def test_disabledProfilerRecordsNothing():
+    profiler = Profiler(enabled = False)
+    with profiler.phase('classify', 'Plate'):
+        assert profiler.runPhase('extract', lambda a, b: a + b, 1, 2) == 3
+    assert profiler.records == {} and profiler.bodyTimes() == []
+
+
+def test_runPhaseTimesTheFunction(clock):
+    profiler = Profiler()
+
+    def work(value):
+        clock.now += 2.0
+        return value * 2
+
+    with profiler.phase('export'):
+        assert profiler.runPhase('offset', work, 21) == 42
+    assert seconds(profiler) == {(None, 'export'): 2.0, (None, 'export/offset'): 2.0}
+
+
+def test_reportsAreWritten(tmp_path, clock):
+    profiler = Profiler()
+    with profiler.phase('classify', 'Plate'):
+        clock.now += 1.5
+        profiler.countCall('Body.faces')
+    profiler.writeJson(str(tmp_path / 'profile.json'))
+    profiler.writeCsv(str(tmp_path / 'profile.csv'))
+    with open(str(tmp_path / 'profile.json')) as stream:
+        report = json.load(stream)
+    assert report['totalApiCalls'] == 1 and report['bodies'] == [{'body': 'Plate', 'seconds': 1.5}]
+    assert report['phases'] == [{'body': 'Plate', 'phase': 'classify', 'seconds': 1.5, 'apiCalls': 1, 'count': 1}]
+    with open(str(tmp_path / 'profile.csv'), newline = '') as stream:
+        assert list(csv.reader(stream)) == [['body', 'phase', 'seconds', 'apiCalls', 'count'], ['Plate', 'classify', '1.500000', '1', '1']]
+
+
+def test_counterWrapsTheApiClassesAndPutsThemBack():
+    module = makeApiModule()
+    original = dict(vars(module.Body))
+    profiler = Profiler()
+    counter = ApiCallCounter(profiler, [module])
+    with counter:
+        body = module.Body.create()
+        assert body.volume(2.0) == 6.0 and body.area == 2.0
+        body.area = 5.0
+        assert body.area == 5.0 and module.Body.kind() == 'Body'
+        # attributes starting with an underscore are left alone
+        assert body._area == 5.0
+    assert profiler.apiCalls == {'Body.create': 1, 'Body.volume': 1, 'Body.area': 3, 'Body.kind': 1}
+    assert all(vars(module.Body)[name] is value for name, value in original.items())
+    body.volume()
+    assert sum(profiler.apiCalls.values()) == 6
+
+    # installing the counter again reuses the wrappers made the first time
+    replacements = counter._replacements
+    with counter:
+        body.volume()
+    assert counter._replacements is replacements and profiler.apiCalls['Body.volume'] == 2
+
+
+def test_stepsAreCountedButNotTheCallsBetweenThem():
+    module = makeApiModule()
+    profiler = Profiler()
+    body = module.Body()
+
+    def steps():
+        for i in range(3):
+            body.volume()
+            received = yield i
+            assert received == 'resume'
+        return body.area
+
+    job = ApiCallCounter(profiler, [module]).countSteps(steps())
+    yielded = [next(job)]
+    while True:
+        # the job driver reads the API between the steps
+        body.volume()
+        body.area
+        try:
+            yielded.append(job.send('resume'))
+        except StopIteration as stop:
+            result = stop.value
+            break
+    assert yielded == [0, 1, 2] and result == 2.0
+    assert profiler.apiCalls == {'Body.volume': 3, 'Body.area': 1}
+    assert vars(module.Body)['volume'].__name__ == 'volume' and not hasattr(vars(module.Body)['volume'], '__wrapped__')
+
+
+def test_errorsAndClosingReachTheSteps():
+    module = makeApiModule()
+    profiler = Profiler()
+    body = module.Body()
+    events = []
+
+    def steps():
+        try:
+            yield 1
+        except ValueError:
+            events.append('caught')
+            body.volume()
+        try:
+            yield 2
+        finally:
+            # the clean up runs with the counter installed
+            body.volume()
+            events.append('closed')
+
+    counter = ApiCallCounter(profiler, [module])
+    job = counter.countSteps(steps())
+    assert next(job) == 1
+    assert job.throw(ValueError()) == 2
+    job.close()
+    assert events == ['caught', 'closed']
+    assert profiler.apiCalls == {'Body.volume': 2}
+    assert counter._patched == [] and not hasattr(vars(module.Body)['volume'], '__wrapped__')
+
+
+def test_disabledProfilerDrivesTheStepsUntouched():
+    module = makeApiModule()
+    profiler = Profiler(enabled = False)
+    body = module.Body()
+
+    def steps():
+        yield body.volume()
+        return 'done'
+
+    job = ApiCallCounter(profiler, [module]).countSteps(steps())
+    assert next(job) == 3.0
+    with pytest.raises(StopIteration) as stop:
+        next(job)
+    assert stop.value.value == 'done'
+    assert profiler.apiCalls == {} and not hasattr(vars(module.Body)['volume'], '__wrapped__')
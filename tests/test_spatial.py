@@ -0,0 +1,117 @@
+# the bounding volume hierarchy against testing every box, and the ray box interval against points along the ray
+
+import random
+import pytest
+from laserlib.spatial import BoundingVolumeHierarchy, boxContainsPoint, rayBoxInterval
+
+
+# boxes on a grid of whole numbers, so rays and points along the grid lines run exactly over their faces
+def makeBoxes(count, seed):
+    rng = random.Random(seed)
+    boxes = []
+    for i in range(count):
+        low = [rng.randint(0, 20) for k in range(3)]
+        boxes.append(tuple(low) + tuple(low[k] + rng.randint(0, 4) for k in range(3)))
+    return boxes
+
+
+def makeHierarchy(boxes):
+    return BoundingVolumeHierarchy(list(enumerate(boxes)), leafSize = 3)
+
+
+def bruteRaycast(boxes, origin, direction, tolerance = 0.0):
+    hits = []
+    for item, box in enumerate(boxes):
+        interval = rayBoxInterval(box, origin, direction, tolerance)
+        if interval is not None:
+            hits.append((interval[0], interval[1], item))
+    return sorted(hits)
+
+
+def makeRays(seed):
+    rng = random.Random(seed)
+    rays = []
+    for i in range(100):
+        origin = tuple(rng.uniform(-5.0, 25.0) for k in range(3))
+        rays.append((origin, tuple(rng.uniform(-1.0, 1.0) for k in range(3))))
+    # along the axes and the grid lines, with zero direction components, from outside and inside the boxes
+    for i in range(60):
+        origin = tuple(float(rng.randint(-2, 22)) for k in range(3))
+        direction = [0.0, 0.0, 0.0]
+        direction[rng.randrange(3)] = rng.choice([-1.0, 1.0])
+        rays.append((origin, tuple(direction)))
+    rays.append(((2.5, 2.5, -10.0), (0.0, 0.0, 1.0)))
+    return rays
+
+
+@pytest.mark.parametrize('tolerance', [0.0, 0.25])
+def test_raycastMatchesEveryBox(tolerance):
+    boxes = makeBoxes(200, seed = 17)
+    hierarchy = makeHierarchy(boxes)
+    for origin, direction in makeRays(seed = 18):
+        hits = hierarchy.raycast(origin, direction, tolerance)
+        assert sorted(hits) == bruteRaycast(boxes, origin, direction, tolerance)
+        assert [hit[:2] for hit in hits] == sorted(hit[:2] for hit in hits)
+
+
+def test_pointQueryMatchesEveryBox():
+    boxes = makeBoxes(200, seed = 17)
+    hierarchy = makeHierarchy(boxes)
+    rng = random.Random(19)
+    points = [tuple(rng.uniform(-2.0, 26.0) for k in range(3)) for i in range(300)]
+    # corners and grid points lie on the faces, edges and corners of boxes
+    points += [tuple(float(rng.randint(0, 24)) for k in range(3)) for i in range(300)]
+    for tolerance in (0.0, 0.5):
+        for point in points:
+            found = hierarchy.itemsAtPoint(point, tolerance)
+            assert sorted(found) == [item for item, box in enumerate(boxes) if boxContainsPoint(box, point, tolerance)]
+
+
+def test_pointOnAFaceIsInTheBox():
+    boxes = [(0, 0, 0, 2, 2, 2), (2, 0, 0, 4, 2, 2), (5, 5, 5, 6, 6, 6)]
+    hierarchy = BoundingVolumeHierarchy(list(enumerate(boxes)), leafSize = 1)
+    # the shared face belongs to both boxes
+    assert sorted(hierarchy.itemsAtPoint((2.0, 1.0, 1.0))) == [0, 1]
+    assert hierarchy.itemsAtPoint((0.0, 1.0, 2.0)) == [0]
+    assert hierarchy.itemsAtPoint((4.0 + 1e-9, 1.0, 1.0)) == []
+    assert hierarchy.itemsAtPoint((4.1, 1.0, 1.0), tolerance = 0.1) == [1]
+
+
+def test_rayIntervalEntersAndLeavesTheBox():
+    box = (0.0, 0.0, 0.0, 2.0, 2.0, 2.0)
+    assert rayBoxInterval(box, (-1.0, 1.0, 1.0), (1.0, 0.0, 0.0)) == (1.0, 3.0)
+    assert rayBoxInterval(box, (3.0, 1.0, 1.0), (-2.0, 0.0, 0.0)) == (0.5, 1.5)
+    # from inside the interval starts at the origin, a box behind the origin is missed
+    assert rayBoxInterval(box, (1.0, 1.0, 1.0), (0.0, 1.0, 0.0)) == (0.0, 1.0)
+    assert rayBoxInterval(box, (3.0, 1.0, 1.0), (1.0, 0.0, 0.0)) is None
+    # parallel to an axis, running over a face, just beside it, and beside it within the tolerance
+    assert rayBoxInterval(box, (-1.0, 2.0, 1.0), (1.0, 0.0, 0.0)) == (1.0, 3.0)
+    assert rayBoxInterval(box, (-1.0, 2.5, 1.0), (1.0, 0.0, 0.0)) is None
+    assert rayBoxInterval(box, (-1.0, 2.5, 1.0), (1.0, 0.0, 0.0), tolerance = 0.5) == (0.5, 3.5)
+
+
+def test_rayIntervalAgreesWithPointsAlongTheRay():
+    rng = random.Random(20)
+    samples = [t * 0.02 for t in range(3000)]
+    for i in range(150):
+        box = makeBoxes(1, seed = i)[0]
+        origin = tuple(rng.uniform(-5.0, 25.0) for k in range(3))
+        direction = tuple(rng.choice([0.0, rng.uniform(-1.0, 1.0)]) for k in range(3))
+        if not any(direction):
+            continue
+        interval = rayBoxInterval(box, origin, direction)
+        inside = [t for t in samples if boxContainsPoint(box, [origin[k] + t * direction[k] for k in range(3)], 1e-9)]
+        if interval is None:
+            assert inside == []
+            continue
+        # the points at the ends of the interval are in the box, and the samples in the box lie between them
+        for t in interval:
+            assert boxContainsPoint(box, [origin[k] + t * direction[k] for k in range(3)], 1e-9)
+        if inside:
+            assert interval[0] - 0.02 <= inside[0] and inside[-1] <= interval[1] + 0.02
+
+
+def test_emptyHierarchyFindsNothing():
+    hierarchy = BoundingVolumeHierarchy([])
+    assert hierarchy.raycast((0.0, 0.0, 0.0), (1.0, 0.0, 0.0)) == []
+    assert hierarchy.itemsAtPoint((0.0, 0.0, 0.0)) == []
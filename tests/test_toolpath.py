@@ -0,0 +1,131 @@
+# cutting order: holes ahead of the outlines around them, and 2-opt only where it keeps to that
+
+import math
+import random
+import pytest
+from laserlib.geometry import Circle, Line
+from laserlib.toolpath import orderPartCurves, orderPaths, pathStats
+
+
+def squareLoop(minX, minY, maxX, maxY):
+    corners = [(minX, minY), (maxX, minY), (maxX, maxY), (minX, maxY)]
+    return [Line(corners[i - 1], corners[i]) for i in range(4)]
+
+
+# the curves of a part, named by loop: an outline with a square hole that has an island in it, a round hole
+# and an open engraving line
+def makePart():
+    return {
+        'outline': squareLoop(0.0, 0.0, 30.0, 20.0),
+        'hole': squareLoop(2.0, 2.0, 12.0, 12.0),
+        'island': [Circle((7.0, 7.0), 2.0)],
+        'round': [Circle((20.0, 10.0), 3.0)],
+        'engraving': [Line((15.0, 16.0), (25.0, 16.0))],
+    }
+
+
+# a curve by its end points, so lines still match after the loops have been turned round
+def curveKey(curve):
+    if isinstance(curve, Circle):
+        return curve
+    return frozenset((curve.start, curve.end))
+
+
+# the names of the loops in the order they are cut, checking that every loop is cut in one go
+def loopOrder(part, curves):
+    names = {curveKey(curve): name for name, loop in part.items() for curve in loop}
+    order = []
+    for curve in curves:
+        name = names[curveKey(curve)]
+        if not order or order[-1] != name:
+            assert name not in order
+            order.append(name)
+    return order
+
+
+def travel(order, entries, exits, start = (0.0, 0.0)):
+    total, position = 0.0, start
+    for i in order:
+        total += math.dist(position, entries[i])
+        position = exits[i]
+    return total
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_partIsCutFromTheInsideOut(seed):
+    part = makePart()
+    names = ['outline', 'hole', 'island', 'round', 'engraving']
+    random.Random(seed).shuffle(names)
+    curves = [curve for name in names for curve in part[name]]
+    ordered = orderPartCurves(curves)
+    assert sorted(map(str, map(curveKey, ordered))) == sorted(map(str, map(curveKey, curves)))
+    order = loopOrder(part, ordered)
+    assert order.index('island') < order.index('hole') < order.index('outline')
+    assert order.index('round') < order.index('outline') and order.index('engraving') < order.index('outline')
+
+
+def test_loopsArePiercedNearTheEndOfTheLastCut():
+    ordered = orderPartCurves(squareLoop(0.0, 0.0, 30.0, 20.0) + squareLoop(24.0, 14.0, 28.0, 18.0))
+    # the hole is cut first from where its loop starts, and the outline is pierced at the corner nearest its end
+    assert [curve.start for curve in ordered] == [(24.0, 18.0), (24.0, 14.0), (28.0, 14.0), (28.0, 18.0),
+                                                  (30.0, 20.0), (0.0, 20.0), (0.0, 0.0), (30.0, 0.0)]
+
+
+# paths by number, before[i] only names paths with lower numbers, so the constraints can always be met
+def makePaths(count, constraints, seed):
+    rng = random.Random(seed)
+    entries = [(rng.uniform(0.0, 100.0), rng.uniform(0.0, 100.0)) for i in range(count)]
+    exits = [(x + rng.uniform(-5.0, 5.0), y + rng.uniform(-5.0, 5.0)) for x, y in entries]
+    before = [[] for i in range(count)]
+    for k in range(constraints):
+        i = rng.randrange(1, count)
+        j = rng.randrange(i)
+        if j not in before[i]:
+            before[i].append(j)
+    return entries, exits, before
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_twoOptKeepsThePathsThatComeFirst(seed):
+    entries, exits, before = makePaths(60, 40, seed)
+    nearest = orderPaths(entries, exits, before, passes = 0)
+    order = orderPaths(entries, exits, before)
+    assert sorted(order) == list(range(60))
+    position = {path: k for k, path in enumerate(order)}
+    assert all(position[j] < position[i] for i in range(60) for j in before[i])
+    # 2-opt only takes moves that shorten the nearest neighbour tour
+    assert travel(order, entries, exits) <= travel(nearest, entries, exits) + 1e-9
+
+
+def test_twoOptShortensAnUnconstrainedTour():
+    entries, exits, before = makePaths(80, 0, 3)
+    nearest = orderPaths(entries, exits, before, passes = 0)
+    assert travel(orderPaths(entries, exits, before), entries, exits) < travel(nearest, entries, exits)
+
+
+def test_cycleIsCutInTheGivenOrder():
+    entries = [(0.0, 0.0), (1.0, 0.0), (2.0, 0.0)]
+    assert sorted(orderPaths(entries, entries, [[1], [0], []])) == [0, 1, 2]
+
+
+# plates with holes listed in a random order, either after the outline or already ahead of it
+def test_orderingNeverTravelsFurtherThanTheInput():
+    for seed in range(100):
+        rng = random.Random(seed)
+        holes = [Circle((rng.uniform(3.0, 57.0), rng.uniform(3.0, 37.0)), 1.0) for i in range(rng.randint(3, 30))]
+        outline = squareLoop(0.0, 0.0, 60.0, 40.0)
+        for curves in (outline + holes, holes + outline):
+            stats = pathStats(curves)
+            orderedStats = pathStats(orderPartCurves(curves))
+            assert orderedStats.travel <= stats.travel
+            assert orderedStats.cutLength == pytest.approx(stats.cutLength)
+            assert orderedStats.pierces == stats.pierces == len(holes) + 1
+
+
+def test_pathStats():
+    curves = squareLoop(0.0, 0.0, 4.0, 2.0) + [Circle((10.0, 1.0), 1.0), Line((0.0, 5.0), (1.0, 5.0)), Line((1.0, 5.0), (2.0, 5.0))]
+    stats = pathStats(curves)
+    assert stats.cutLength == pytest.approx(12.0 + 2.0 * math.pi + 2.0)
+    # the square and the two lines are cut in one go each, the circle always needs its own pierce
+    assert stats.pierces == 3
+    assert stats.travel == pytest.approx(math.dist((0.0, 0.0), (11.0, 1.0)) + math.dist((11.0, 1.0), (0.0, 5.0)))